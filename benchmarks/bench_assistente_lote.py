@@ -0,0 +1,153 @@
+# /src/benchmarks/bench_assistente_lote.py
+# Lote de perguntas independentes no assistente simples (ch01): vazão por
+# nível de concorrência, efeito dos limites de taxa e falhas parciais.
+#
+#   concorrência   tempo total, perguntas/s e tempo até a primeira resposta
+#                  (em ordem e fora de ordem) para 1, 2, 4, ... perguntas
+#                  em andamento
+#   limites        requisições/s e tokens/min com o LimitadorTaxa; confere
+#                  que o uso real nunca passa da rajada mais a taxa
+#   falhas         parte das perguntas falha de vez e parte falha duas vezes
+#                  e passa na terceira tentativa; as demais respostas não são afetadas
+#
+# O modelo é o ModeloFalso, com latência e sem rede.
+#
+# Uso: python benchmarks/bench_assistente_lote.py [--perguntas 200] [--latencia 0.2]
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "ch01")]
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+from assistente_simples import aconversar_lote, conversar_lote  # noqa: E402
+from comum.limitador import LimitadorTaxa  # noqa: E402
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+
+# Chamadas e tokens (entrada + saída) de todos os modelos desta execução
+uso = {"chamadas": 0, "tokens": 0}
+
+
+class ModeloContado(ModeloFalso):
+    """ModeloFalso que soma o uso e falha quando a pergunta pede.
+
+    Perguntas com "#falha" sempre falham; com "#instavel", falham nas
+    `falhas_por_instavel` primeiras chamadas e depois passam.
+    """
+
+    falhas_por_instavel: int = 0
+    _tentativas: dict = {}
+
+    def _responder(self, messages, kwargs):
+        uso["chamadas"] += 1
+        pergunta = messages[-1].content
+        tentativa = self._tentativas[pergunta] = self._tentativas.get(pergunta, 0) + 1
+        if "#falha" in pergunta or ("#instavel" in pergunta and tentativa <= self.falhas_por_instavel):
+            raise TimeoutError("falha simulada do provedor")
+        resposta = super()._responder(messages, kwargs)
+        uso["tokens"] += resposta.usage_metadata["total_tokens"]
+        return resposta
+
+
+def gerar_perguntas(quantidade: int, palavras: int = 20) -> list[str]:
+    return [f"Pergunta {i}: " + " ".join(f"termo{(i * 7 + j) % 997}" for j in range(palavras)) for i in range(quantidade)]
+
+
+async def primeira_e_total(modelo, perguntas, so_primeira: bool = False, **opcoes) -> tuple[float, float, list]:
+    inicio = time.perf_counter()
+    primeira = None
+    resultados = []
+    lote = aconversar_lote(modelo, perguntas, **opcoes)
+    async for r in lote:
+        if primeira is None:
+            primeira = time.perf_counter() - inicio
+        resultados.append(r)
+        if so_primeira:
+            await lote.aclose()  # cancela as perguntas restantes
+            break
+    return primeira, time.perf_counter() - inicio, resultados
+
+
+def concorrencia(args):
+    modelo = ModeloContado(latencia=args.latencia, variacao=1.0)
+    perguntas = gerar_perguntas(args.perguntas)
+    print(f"{'concorrência':>12}{'segundos':>10}{'perguntas/s':>13}{'1ª em ordem (s)':>17}{'1ª pronta (s)':>15}")
+    vazoes = {}
+    for n in (1, 2, 4, 8, 16, 32, 64):
+        if n == 1:
+            # Sequencial fica longo: mede um trecho e extrapola
+            trecho = perguntas[:max(10, args.perguntas // 20)]
+            primeira, total, resultados = asyncio.run(primeira_e_total(modelo, trecho, max_concorrencia=1))
+            total = total * len(perguntas) / len(trecho)
+            fora = primeira
+        else:
+            primeira, total, resultados = asyncio.run(primeira_e_total(modelo, perguntas, max_concorrencia=n))
+            fora, _, _ = asyncio.run(primeira_e_total(modelo, perguntas, True, max_concorrencia=n, em_ordem=False))
+            assert [r.indice for r in resultados] == list(range(len(perguntas))), "resultados fora de ordem"
+        assert all(r.ok for r in resultados)
+        vazoes[n] = len(perguntas) / total
+        print(f"{n:>12}{total:>10.2f}{vazoes[n]:>13.1f}{primeira:>17.3f}{fora:>15.3f}")
+    assert vazoes[16] > 8 * vazoes[1], "a vazão deveria crescer com a concorrência"
+
+
+def limites(args):
+    perguntas = gerar_perguntas(args.perguntas // 4, palavras=150)
+    modelo = ModeloContado(latencia=args.latencia)
+    print(f"\n{'limite':<30}{'segundos':>10}{'req/s':>8}{'tokens/min':>12}{'esperas':>9}")
+    casos = {
+        "sem limite": None,
+        "20 req/s": LimitadorTaxa(20),
+        "120k tokens/min (rajada 4k)": LimitadorTaxa(tokens_por_minuto=120_000, rajada_tokens=4_000),
+    }
+    for nome, limitador in casos.items():
+        uso.update(chamadas=0, tokens=0)
+        inicio = time.perf_counter()
+        resultados = conversar_lote(modelo, perguntas, max_concorrencia=32, limitador=limitador)
+        segundos = time.perf_counter() - inicio
+        assert all(r.ok for r in resultados)
+        print(f"{nome:<30}{segundos:>10.2f}{uso['chamadas'] / segundos:>8.1f}{uso['tokens'] / segundos * 60:>12.0f}"
+              f"{limitador.esperas if limitador else 0:>9}")
+        if nome == "20 req/s":
+            assert uso["chamadas"] <= 20 + 20 * segundos
+        elif limitador:
+            assert uso["tokens"] <= 4_000 + 120_000 / 60 * segundos
+
+
+def falhas(args):
+    perguntas = gerar_perguntas(args.perguntas)
+    for i in range(0, len(perguntas), 10):
+        perguntas[i] += " #falha"
+    for i in range(5, len(perguntas), 10):
+        perguntas[i] += " #instavel"
+    modelo = ModeloContado(latencia=args.latencia, falhas_por_instavel=2)
+    uso.update(chamadas=0, tokens=0)
+    inicio = time.perf_counter()
+    resultados = conversar_lote(modelo, perguntas, max_concorrencia=32, tentativas=4, espera_inicial=0.05)
+    segundos = time.perf_counter() - inicio
+    falharam = [r for r in resultados if not r.ok]
+    assert {r.indice for r in falharam} == set(range(0, len(perguntas), 10)), "só as perguntas com #falha deveriam falhar"
+    assert all(r.resposta for r in resultados if r.ok)
+    print(f"\nFalhas parciais: {len(falharam)} de {len(perguntas)} perguntas falharam de vez (as marcadas), "
+          f"{len(perguntas) - len(falharam)} respondidas, {uso['chamadas']} chamadas com as novas tentativas, "
+          f"{segundos:.2f} s. Ex.: {falharam[0].erro}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perguntas em lote no assistente simples: concorrência, limites e falhas")
+    parser.add_argument("--perguntas", type=int, default=200)
+    parser.add_argument("--latencia", type=float, default=0.2, help="segundos por chamada do modelo falso")
+    args = parser.parse_args()
+
+    print(f"{args.perguntas} perguntas, latência de {args.latencia * 1000:.0f} ms (+ até 100%)\n")
+    concorrencia(args)
+    limites(args)
+    falhas(args)
+
+
+if __name__ == "__main__":
+    main()
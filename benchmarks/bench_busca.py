@@ -0,0 +1,115 @@
+# /src/benchmarks/bench_busca.py
+# Latência da busca por nome: varredura com LIKE '%x%' vs índice FTS5 (trigram).
+#
+# Uso: python benchmarks/bench_busca.py [--tamanhos 10000,100000,1000000] [--repeticoes 20]
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa")]
+
+import chatbot  # noqa: E402
+
+TIPOS = ["notebook", "celular", "monitor", "teclado", "mouse", "cadeira", "fone", "cabo"]
+MARCAS = ["acme", "orion", "vega", "lince", "atlas", "zenite", "pampa", "boreal"]
+
+
+def codigo(i: int) -> str:
+    """Código alfanumérico pseudoaleatório e único, como um SKU."""
+    n = (i * 2654435761) % 36**6
+    digitos = "0123456789abcdefghijklmnopqrstuvwxyz"
+    return "".join(digitos[(n // 36**k) % 36] for k in range(6))
+
+
+def nome_produto(i: int) -> str:
+    return f"{TIPOS[i % 8]} {MARCAS[(i // 8) % 8]} {codigo(i)}"
+
+
+def popular_banco(caminho: str, quantidade: int):
+    """Cria o banco no formato antigo (só a tabela) com `quantidade` produtos."""
+    conn = sqlite3.connect(caminho)
+    conn.execute("""
+        CREATE TABLE produtos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            preco REAL NOT NULL,
+            estoque INTEGER NOT NULL
+        )
+    """)
+    rng = random.Random(7)
+    with conn:
+        conn.executemany(
+            "INSERT INTO produtos (nome, preco, estoque) VALUES (?, ?, ?)",
+            ((nome_produto(i), round(rng.uniform(10, 5000), 2), rng.randint(0, 200)) for i in range(quantidade)),
+        )
+    conn.close()
+
+
+def medir(funcao, repeticoes: int) -> float:
+    """Mediana da latência de `funcao` em milissegundos."""
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        amostras.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(amostras)
+
+
+def consultas(quantidade: int) -> dict:
+    alvo = quantidade // 2
+    return {
+        "trecho raro": lambda: chatbot.listar_produtos.invoke({"filtro_nome": codigo(alvo)}),
+        "nome exato": lambda: chatbot.atualizar_produto_por_nome.invoke({"nome": nome_produto(alvo)}),
+        "sem resultado": lambda: chatbot.listar_produtos.invoke({"filtro_nome": "inexistente"}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de busca por nome com e sem índice full-text")
+    parser.add_argument("--tamanhos", default="10000,100000,1000000")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_busca_")
+    caminho_original = chatbot.DB_PATH
+    # Mede o SQL da busca: sem o cache de leituras, as repetições iriam direto para a memória
+    tamanho_cache = chatbot.estatisticas_cache()["max_entradas"]
+    chatbot.configurar_cache(0)
+    print(f"{'linhas':>9}  {'consulta':<14}{'LIKE (ms)':>12}{'FTS5 (ms)':>12}{'ganho':>9}")
+    try:
+        for tamanho in (int(t) for t in args.tamanhos.split(",")):
+            caminho = os.path.join(diretorio, f"produtos-{tamanho}.db")
+            popular_banco(caminho, tamanho)
+
+            # Antes: banco sem índices, busca por LIKE
+            chatbot.configurar_banco(caminho)
+            antes = {nome: medir(f, args.repeticoes) for nome, f in consultas(tamanho).items()}
+
+            # Depois: mesma base migrada por inicializar_banco()
+            inicio = time.perf_counter()
+            chatbot.inicializar_banco()
+            migracao = time.perf_counter() - inicio
+            depois = {nome: medir(f, args.repeticoes) for nome, f in consultas(tamanho).items()}
+
+            for nome in antes:
+                ganho = antes[nome] / depois[nome] if depois[nome] else float("inf")
+                print(f"{tamanho:>9}  {nome:<14}{antes[nome]:>12.3f}{depois[nome]:>12.3f}{ganho:>8.1f}x")
+            print(f"{'':>9}  (migração do banco existente: {migracao:.2f} s)")
+            chatbot.configurar_banco(caminho_original)
+            os.remove(caminho)
+    finally:
+        chatbot.configurar_cache(tamanho_cache)
+        chatbot.configurar_banco(caminho_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
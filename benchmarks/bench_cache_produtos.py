@@ -0,0 +1,134 @@
+# /src/benchmarks/bench_cache_produtos.py
+# Throughput das tools de produtos com e sem o cache de leituras (tarefa/cache_produtos.py)
+# numa carga dominada por leituras (listagens, estoque baixo, busca por nome)
+# com uma fração de escritas que invalidam o cache.
+#
+# Confere também a consistência: a mesma sequência de tool calls, executada com
+# e sem cache em cópias do banco, devolve exatamente as mesmas respostas; e,
+# após uma rodada concorrente, as leituras servidas pelo cache batem com o banco.
+#
+# Uso: python benchmarks/bench_cache_produtos.py [--produtos 5000] [--chamadas 5000]
+#        [--escritas 0.05] [--threads 4]
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa")]
+
+import chatbot  # noqa: E402
+
+TIPOS = ["notebook", "celular", "monitor", "teclado", "mouse", "cadeira", "fone", "cabo"]
+
+
+def popular_banco(caminho: str, quantidade: int):
+    chatbot.configurar_banco(caminho)
+    chatbot.inicializar_banco()
+    rng = random.Random(42)
+    for inicio in range(0, quantidade, chatbot.MAX_ITENS_LOTE):
+        chatbot.criar_produtos_em_lote.invoke({"produtos": [
+            {"nome": f"{rng.choice(TIPOS)} modelo {i}", "preco": round(rng.uniform(10, 5000), 2), "estoque": rng.randint(0, 200)}
+            for i in range(inicio, min(quantidade, inicio + chatbot.MAX_ITENS_LOTE))
+        ]})
+    # Leva o WAL para o arquivo principal antes de copiá-lo
+    chatbot.get_conexao().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def leituras(rng: random.Random) -> tuple:
+    r = rng.random()
+    if r < 0.4:
+        return chatbot.listar_produtos, {"filtro_nome": rng.choice(TIPOS), "quantidade": 20}
+    if r < 0.6:
+        return chatbot.listar_produtos, {"quantidade": 50, "offset": rng.choice([0, 50, 100])}
+    if r < 0.85:
+        return chatbot.produtos_estoque_abaixo, {"limite": rng.choice([5, 10, 20]), "quantidade": 20}
+    # Nome ambíguo: só a busca, sem atualizar
+    return chatbot.atualizar_produto_por_nome, {"nome": rng.choice(TIPOS), "estoque": 1}
+
+
+def roteiro(produtos: int, chamadas: int, fracao_escritas: float, semente: int) -> list[tuple]:
+    """Sequência reproduzível de tool calls, `fracao_escritas` delas escritas."""
+    rng = random.Random(semente)
+    passos = []
+    for i in range(chamadas):
+        if rng.random() >= fracao_escritas:
+            passos.append(leituras(rng))
+            continue
+        r, pid = rng.random(), rng.randint(1, produtos)
+        if r < 0.6:
+            passos.append((chatbot.atualizar_produto, {"id": pid, "estoque": rng.randint(0, 200)}))
+        elif r < 0.8:
+            passos.append((chatbot.criar_produto, {"nome": f"{rng.choice(TIPOS)} novo {semente}-{i}", "preco": 9.9, "estoque": 3}))
+        else:
+            passos.append((chatbot.excluir_produto, {"id": pid}))
+    return passos
+
+
+def executar(passos: list[tuple], threads: int) -> tuple[float, list[str]]:
+    inicio = time.perf_counter()
+    if threads == 1:
+        respostas = [t.invoke(args) for t, args in passos]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            respostas = list(pool.map(lambda p: p[0].invoke(p[1]), passos))
+    return time.perf_counter() - inicio, respostas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tools de produtos com e sem cache de leituras")
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--chamadas", type=int, default=5000)
+    parser.add_argument("--escritas", type=float, default=0.05, help="fração de tool calls que escrevem")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_cache_produtos_")
+    base = os.path.join(diretorio, "base.db")
+    caminho_original = chatbot.DB_PATH
+    tamanho_original = chatbot.estatisticas_cache()["max_entradas"]
+    try:
+        popular_banco(base, args.produtos)
+
+        print(f"Banco com {args.produtos} produtos, {args.chamadas} tool calls por cenário, "
+              f"{args.escritas:.0%} escritas\n")
+        print(f"{'cenário':<28}{'tempo (s)':>10}{'calls/s':>10}{'acertos':>9}{'invalidações':>14}")
+        respostas = {}
+        for threads in sorted({1, args.threads}):
+            for rotulo, tamanho in (("sem cache", 0), ("com cache", 2048)):
+                caminho = os.path.join(diretorio, f"{tamanho}-{threads}.db")
+                shutil.copy(base, caminho)
+                chatbot.configurar_banco(caminho)
+                chatbot.configurar_cache(tamanho)
+                passos = roteiro(args.produtos, args.chamadas, args.escritas, semente=threads)
+                tempo, respostas[rotulo, threads] = executar(passos, threads)
+                est = chatbot.estatisticas_cache()
+                acertos = f"{est['taxa_acerto']:.0%}" if tamanho else "-"
+                nome = f"{rotulo} ({threads} thread{'s' if threads > 1 else ''})"
+                print(f"{nome:<28}{tempo:>10.3f}{args.chamadas / tempo:>10.0f}{acertos:>9}{est['invalidacoes']:>14}")
+
+            if threads == 1:
+                # Sequencial: cada resposta com cache deve ser idêntica à sem cache
+                divergentes = sum(a != b for a, b in zip(respostas["sem cache", 1], respostas["com cache", 1]))
+                assert divergentes == 0, f"{divergentes} respostas com cache diferem do banco"
+
+        # Após a rodada concorrente, as leituras em cache batem com o banco
+        verificacao = [leituras(random.Random(s)) for s in range(200)]
+        em_cache = [t.invoke(a) for t, a in verificacao]
+        chatbot.configurar_cache(0)
+        direto = [t.invoke(a) for t, a in verificacao]
+        assert em_cache == direto, "cache serviu leituras obsoletas após escritas concorrentes"
+        print("\nRespostas idênticas com e sem cache (sequencial e após escritas concorrentes).")
+    finally:
+        chatbot.configurar_cache(tamanho_original)
+        chatbot.configurar_banco(caminho_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# /src/benchmarks/bench_cache_prompt.py
+# Prompt caching do chatbot: confere que o prefixo (tools + system prompt) é
+# idêntico byte a byte entre turnos e, com ANTHROPIC_API_KEY definida, compara
+# latência e tokens lidos do cache com o modo desligado.
+#
+# Sem chave, só a verificação do payload é executada (nenhuma chamada de rede).
+#
+# Uso: python benchmarks/bench_cache_prompt.py [--turnos 6]
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa")]
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+
+import chatbot  # noqa: E402
+from comum.cache_prompt import CACHE_EFEMERO, MetricasCache, ferramentas_com_cache  # noqa: E402
+
+
+def estados(turnos: int) -> list[dict]:
+    """Estados sucessivos de uma sessão: o histórico cresce e, no meio, surge um resumo."""
+    mensagens, saida = [], []
+    for i in range(turnos):
+        mensagens.append(HumanMessage(content=f"Qual o estoque do produto {i}?"))
+        saida.append({"messages": list(mensagens), "resumo": "Usuário consultou produtos." if i >= turnos // 2 else ""})
+        chamada = {"name": "listar_produtos", "args": {"filtro_nome": f"p{i}"}, "id": f"c{i}", "type": "tool_call"}
+        mensagens += [
+            AIMessage(content="", tool_calls=[chamada]),
+            ToolMessage(content=f"[{i}] p{i} - R$ 10.00 (estoque: {i})", tool_call_id=f"c{i}"),
+            AIMessage(content=f"O produto {i} tem {i} unidades."),
+        ]
+    return saida
+
+
+def prefixo(payload: dict) -> bytes:
+    """Parte da requisição que deve ser cacheada: tools e o primeiro bloco do system."""
+    system = payload["system"]
+    primeiro = system[0] if isinstance(system, list) else system
+    return json.dumps([payload["tools"], primeiro], sort_keys=True, ensure_ascii=False).encode()
+
+
+def conferir_payloads(turnos: int):
+    tools = ferramentas_com_cache(chatbot.ALL_TOOLS)
+    hashes = set()
+    for state in estados(turnos):
+        mensagens = chatbot.contexto.mensagens(state, chatbot.SYSTEM_PROMPT, CACHE_EFEMERO)
+        # O payload é montado pelo modelo do provedor, dentro do ModeloResiliente
+        payload = chatbot.modelo.obter().interno._get_request_payload(mensagens, tools=tools)
+        assert payload["tools"][-1].get("cache_control") == CACHE_EFEMERO, "última tool sem cache_control"
+        assert payload["system"][0].get("cache_control") == CACHE_EFEMERO, "system prompt sem cache_control"
+        hashes.add(hashlib.sha256(prefixo(payload)).hexdigest())
+    assert len(hashes) == 1, f"prefixo mudou entre turnos ({len(hashes)} variações)"
+    tamanho = len(prefixo(payload))
+    print(f"Prefixo idêntico em {turnos} turnos (com e sem resumo): {tamanho} bytes (~{tamanho // 4} tokens)")
+
+
+def medir_api(turnos: int):
+    print(f"\n{'modo':<12}{'chamada':>9}{'lidos':>8}{'gravados':>10}{'sem cache':>11}{'latência (s)':>14}")
+    for nome, cache in (("sem cache", None), ("com cache", CACHE_EFEMERO)):
+        tools = ferramentas_com_cache(chatbot.ALL_TOOLS) if cache else chatbot.ALL_TOOLS
+        modelo = chatbot.modelo.obter().bind_tools(tools)
+        metricas = MetricasCache()
+        for n, state in enumerate(estados(turnos), 1):
+            inicio = time.perf_counter()
+            resposta = modelo.invoke(chatbot.contexto.mensagens(state, chatbot.SYSTEM_PROMPT, cache))
+            uso = metricas.registrar(resposta, time.perf_counter() - inicio)
+            print(f"{nome:<12}{n:>9}{uso.lidos_do_cache:>8}{uso.gravados_no_cache:>10}{uso.sem_cache:>11}{uso.segundos:>14.2f}")
+        total = metricas.resumo()
+        latencias = [c.segundos for c in metricas.chamadas]
+        print(f"{nome:<12}{'total':>9}{total['lidos_do_cache']:>8}{total['gravados_no_cache']:>10}"
+              f"{total['sem_cache']:>11}{statistics.median(latencias):>14.2f}  (mediana; acerto {total['taxa_acerto']:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estabilidade do prefixo e ganho do prompt caching")
+    parser.add_argument("--turnos", type=int, default=6)
+    args = parser.parse_args()
+
+    conferir_payloads(args.turnos)
+    if os.getenv("ANTHROPIC_API_KEY"):
+        medir_api(args.turnos)
+    else:
+        print("ANTHROPIC_API_KEY não definida: medição de latência e tokens na API ignorada.")
+
+
+if __name__ == "__main__":
+    main()
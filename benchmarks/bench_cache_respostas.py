@@ -0,0 +1,133 @@
+# /src/benchmarks/bench_cache_respostas.py
+# Latência de chamadas repetidas ao LLM com o cache de respostas (comum.cache_respostas):
+# sem cache vs camada em memória vs camada em disco (novo processo simulado).
+#
+# O modelo é falso e dorme `--latencia` segundos por chamada, como uma API remota.
+# Também confere que chamadas com temperature > 0 nunca são servidas do cache e
+# que IDs de tool calls diferentes não impedem o acerto.
+#
+# Uso: python benchmarks/bench_cache_respostas.py [--chamadas 200] [--distintas 20] [--latencia 0.05]
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+from comum.cache_respostas import CacheRespostas  # noqa: E402
+
+
+class ModeloLento(BaseChatModel):
+    """Modelo falso com latência fixa; responde com uma tool call de ID aleatório."""
+
+    temperature: float = 0.0
+    latencia: float = 0.05
+    chamadas: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "modelo-lento"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"temperature": self.temperature}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.chamadas += 1
+        time.sleep(self.latencia)
+        resposta = AIMessage(
+            content=f"resposta para {messages[-1].content[:30]}",
+            tool_calls=[{"name": "buscar", "args": {"q": "x"}, "id": f"call_{uuid.uuid4().hex}"}],
+        )
+        return ChatResult(generations=[ChatGeneration(message=resposta)])
+
+
+def carga(chamadas: int, distintas: int) -> list[list]:
+    rng = random.Random(3)
+    perguntas = [f"Qual é a capital do país {i}?" for i in range(distintas)]
+    sistema = SystemMessage(content="Você é um assistente prestativo. Responda em português.")
+    return [[sistema, HumanMessage(content=rng.choice(perguntas))] for _ in range(chamadas)]
+
+
+def rodar(modelo: ModeloLento, mensagens: list[list]) -> float:
+    inicio = time.perf_counter()
+    for m in mensagens:
+        modelo.invoke(m)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de respostas do LLM em memória e em disco")
+    parser.add_argument("--chamadas", type=int, default=200)
+    parser.add_argument("--distintas", type=int, default=20)
+    parser.add_argument("--latencia", type=float, default=0.05)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_cache_respostas_")
+    caminho = os.path.join(diretorio, "respostas.db")
+    mensagens = carga(args.chamadas, args.distintas)
+    try:
+        resultados = {}
+        sem_cache = ModeloLento(latencia=args.latencia)
+        resultados["sem cache"] = (rodar(sem_cache, mensagens), sem_cache.chamadas, None)
+
+        cache = CacheRespostas(caminho)
+        com_cache = ModeloLento(latencia=args.latencia, cache=cache)
+        resultados["memória + disco (frio)"] = (rodar(com_cache, mensagens), com_cache.chamadas, cache.estatisticas())
+        cache.fechar()
+
+        # Novo processo: memória vazia, respostas vindas do SQLite
+        cache = CacheRespostas(caminho)
+        reaberto = ModeloLento(latencia=args.latencia, cache=cache)
+        resultados["disco (reaberto)"] = (rodar(reaberto, mensagens), reaberto.chamadas, cache.estatisticas())
+
+        # Memória pequena: força despejos do LRU e leituras do disco
+        pequeno = CacheRespostas(caminho, max_memoria=args.distintas // 4)
+        lru = ModeloLento(latencia=args.latencia, cache=pequeno)
+        resultados[f"LRU com {args.distintas // 4} entradas"] = (rodar(lru, mensagens), lru.chamadas, pequeno.estatisticas())
+
+        print(f"{args.chamadas} chamadas, {args.distintas} prompts distintos, {args.latencia * 1000:.0f} ms por chamada ao modelo\n")
+        print(f"{'cenário':<26}{'tempo (s)':>10}{'chamadas ao modelo':>20}{'acertos mem/disco':>19}{'taxa':>7}")
+        for nome, (tempo, reais, est) in resultados.items():
+            acertos = f"{est['acertos_memoria']}/{est['acertos_disco']}" if est else "-"
+            taxa = f"{est['taxa_acerto']:.0%}" if est else "-"
+            print(f"{nome:<26}{tempo:>10.3f}{reais:>20}{acertos:>19}{taxa:>7}")
+
+        assert resultados["disco (reaberto)"][1] == 0, "cache em disco não foi reaproveitado"
+
+        # Conversa com tool call: o histórico muda de ID a cada execução, mas a chave não
+        historico = mensagens[0] + [
+            AIMessage(content="", tool_calls=[{"name": "buscar", "args": {"q": "x"}, "id": "call_a"}]),
+            ToolMessage(content="ok", tool_call_id="call_a"),
+        ]
+        reaberto.invoke(historico)
+        antes = reaberto.chamadas
+        historico[2:] = [
+            AIMessage(content="", id="outro", tool_calls=[{"name": "buscar", "args": {"q": "x"}, "id": "call_b"}]),
+            ToolMessage(content="ok", tool_call_id="call_b"),
+        ]
+        reaberto.invoke(historico)
+        assert reaberto.chamadas == antes, "IDs de tool calls impediram o acerto"
+
+        criativo = ModeloLento(latencia=0, temperature=0.7, cache=cache)
+        rodar(criativo, mensagens[:10])
+        assert criativo.chamadas == 10, "resposta com temperature > 0 veio do cache"
+        print("\nChave estável com IDs de tool call diferentes; temperature > 0 não usa o cache.")
+        cache.fechar()
+        pequeno.fechar()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# /src/benchmarks/bench_carga.py
+# Teste de carga offline dos agentes: N sessões concorrentes passando pelo grafo
+# compilado com o ModeloFalso (tool calls roteirizadas e latência configurável).
+# Mostra p50/p95/p99 da latência por turno, vazão, tempo no modelo, nas tools e
+# o overhead restante (grafo + checkpointer), e o crescimento de memória.
+#
+# Nenhuma chamada de rede é feita; pode rodar em CI.
+#
+# Uso: python benchmarks/bench_carga.py [--agente chatbot|ch06] [--sessoes 50] [--turnos 10]
+#        [--latencia 0.05] [--modo async|threads] [--checkpointer memoria|sqlite] [--memoria]
+#
+# --checkpointer vale só para o chatbot: o agente do ch06 é compilado sem checkpointer.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa"), os.path.join(RAIZ, "ch06")]
+
+# Os modelos reais só são criados no primeiro uso (Preguicoso) e aqui não são usados;
+# as chaves fictícias valem só se algum for criado por engano, sem ir à rede
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("ANTHROPIC_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+
+from comum.carga import executar_carga  # noqa: E402
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+
+ROTEIRO_CHATBOT = [
+    [[{"name": "listar_produtos", "args": {"quantidade": 20}}], "Aqui estão os 20 primeiros produtos."],
+    [
+        [
+            {"name": "produtos_estoque_abaixo", "args": {"limite": 10}},
+            {"name": "listar_produtos", "args": {"filtro_nome": "mouse"}},
+        ],
+        "Estes produtos estão com estoque baixo.",
+    ],
+    [[{"name": "criar_produto", "args": {"nome": "produto carga", "preco": 9.9, "estoque": 5}}], "Produto criado."],
+    ["Olá! Posso listar, criar, atualizar ou excluir produtos."],
+    [[{"name": "atualizar_produto_por_nome", "args": {"nome": "teclado", "estoque": 7}}], "Estoque atualizado."],
+]
+
+ROTEIRO_CH06 = [
+    [[{"name": "calcular", "args": {"operacao": "somar", "a": 2, "b": 3}}], "O resultado é 5."],
+    [[{"name": "listar_tarefas", "args": {}}], "Estas são as suas tarefas."],
+    [[{"name": "criar_tarefa", "args": {"titulo": "tarefa de carga"}}], "Tarefa criada."],
+    [
+        [{"name": "obter_hora", "args": {}}, {"name": "calcular", "args": {"operacao": "multiplicar", "a": 6, "b": 7}}],
+        "Aqui estão a hora e o resultado.",
+    ],
+    ["Olá! Como posso ajudar?"],
+]
+
+
+def preparar_chatbot(args, diretorio: str):
+    import chatbot
+
+    chatbot.configurar_banco(os.path.join(diretorio, "produtos.db"))
+    chatbot.inicializar_banco()
+    tipos = ["notebook", "celular", "monitor", "teclado", "mouse", "cadeira"]
+    chatbot.criar_produtos_em_lote.invoke({"produtos": [
+        {"nome": f"{tipos[i % len(tipos)]} modelo {i}", "preco": 10.0 + i, "estoque": i % 30} for i in range(600)
+    ]})
+    if args.checkpointer == "sqlite":
+        from checkpointer_sqlite import CheckpointerSQLite
+        checkpointer = CheckpointerSQLite(os.path.join(diretorio, "sessoes.db"))
+    else:
+        checkpointer = MemorySaver()
+    modelo = ModeloFalso(roteiro=ROTEIRO_CHATBOT, latencia=args.latencia, variacao=0.2)
+    return chatbot.criar_agente(checkpointer=checkpointer, modelo=modelo), chatbot
+
+
+def preparar_ch06(args, diretorio: str):
+    import agente_react_completo
+
+    modelo = ModeloFalso(roteiro=ROTEIRO_CH06, latencia=args.latencia, variacao=0.2)
+    return agente_react_completo.create_agent(modelo=modelo), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga offline dos agentes com modelo falso")
+    parser.add_argument("--agente", choices=["chatbot", "ch06"], default="chatbot")
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--turnos", type=int, default=10)
+    parser.add_argument("--latencia", type=float, default=0.05, help="segundos por chamada ao modelo falso")
+    parser.add_argument("--modo", choices=["async", "threads"], default="async")
+    parser.add_argument("--checkpointer", choices=["memoria", "sqlite"],
+                        help="checkpointer do chatbot (padrão: memoria)")
+    parser.add_argument("--memoria", action="store_true", help="mede crescimento de memória (tracemalloc)")
+    args = parser.parse_args()
+    if args.agente == "ch06" and args.checkpointer:
+        parser.error("--checkpointer só se aplica ao --agente chatbot (o do ch06 não usa checkpointer)")
+    if args.agente == "chatbot":
+        args.checkpointer = args.checkpointer or "memoria"
+
+    diretorio = tempfile.mkdtemp(prefix="bench_carga_")
+    chatbot = None
+    try:
+        preparar = preparar_chatbot if args.agente == "chatbot" else preparar_ch06
+        agente, chatbot = preparar(args, diretorio)
+        caminho_original = chatbot and os.path.join(os.path.dirname(chatbot.__file__), "produtos.db")
+
+        resultado = executar_carga(
+            agente, sessoes=args.sessoes, turnos=args.turnos, modo=args.modo, rastrear_memoria=args.memoria
+        )
+        r = resultado.resumo()
+
+        print(f"Agente {args.agente}, {args.sessoes} sessões x {args.turnos} turnos, modo {args.modo}, "
+              f"checkpointer {args.checkpointer or 'nenhum'}, modelo falso de {args.latencia * 1000:.0f} ms\n")
+        print(f"turnos concluídos     {r['turnos']} ({r['erros']} erros) em {r['duracao_s']:.2f} s")
+        print(f"vazão                 {r['turnos_por_s']:.1f} turnos/s")
+        print(f"latência p50/p95/p99  {r['p50_ms']:.1f} / {r['p95_ms']:.1f} / {r['p99_ms']:.1f} ms")
+        print(f"por turno (média)     modelo {r['modelo_ms']:.1f} ms, tools {r['tools_ms']:.1f} ms, "
+              f"overhead {r['overhead_ms']:.1f} ms (p95 {r['overhead_p95_ms']:.1f} ms)")
+        if "memoria_crescimento_kib" in r:
+            por_turno = r["memoria_crescimento_kib"] / max(1, r["turnos"])
+            print(f"memória               +{r['memoria_crescimento_kib']:.0f} KiB ({por_turno:.1f} KiB/turno), "
+                  f"pico {r['memoria_pico_kib']:.0f} KiB")
+        for erro in sorted(set(resultado.erros))[:5]:
+            print(f"  erro: {erro}")
+        assert not resultado.erros, f"{len(resultado.erros)} turnos falharam"
+    finally:
+        if chatbot is not None:
+            chatbot.configurar_banco(caminho_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
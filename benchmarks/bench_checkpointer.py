@@ -0,0 +1,117 @@
+# /src/benchmarks/bench_checkpointer.py
+# Latência de escrita (turno completo) e leitura (get_tuple) dos checkpoints à
+# medida que a conversa cresce: MemorySaver vs SQLite com cópias completas vs
+# SQLite com deltas. Também mostra o tamanho do arquivo de sessões.
+#
+# O "LLM" é um nó que só responde com texto fixo, para isolar o custo do checkpointer.
+#
+# Uso: python benchmarks/bench_checkpointer.py [--turnos 400] [--marcos 50,100,200,400] [--tamanho 400]
+
+import argparse
+import operator
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Annotated, TypedDict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa")]
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+
+from checkpointer_sqlite import CheckpointerSQLite  # noqa: E402
+
+
+class Estado(TypedDict):
+    messages: Annotated[list[AnyMessage], operator.add]
+
+
+def criar_grafo(checkpointer, tamanho: int):
+    resposta = "x" * tamanho
+
+    def responder(state: Estado) -> dict:
+        return {"messages": [AIMessage(content=resposta)]}
+
+    grafo = StateGraph(Estado)
+    grafo.add_node("llm", responder)
+    grafo.add_edge(START, "llm")
+    grafo.add_edge("llm", END)
+    return grafo.compile(checkpointer=checkpointer)
+
+
+def tamanho_arquivo(caminho: str) -> int:
+    return sum(os.path.getsize(caminho + s) for s in ("", "-wal") if os.path.exists(caminho + s))
+
+
+def medir(nome: str, checkpointer, args) -> list[tuple]:
+    """Roda `args.turnos` turnos e mede, em cada marco, a latência média do turno e da leitura."""
+    grafo = criar_grafo(checkpointer, args.tamanho)
+    config = {"configurable": {"thread_id": f"bench-{nome}"}}
+    marcos = sorted(int(m) for m in args.marcos.split(","))
+    pergunta = "y" * args.tamanho
+    linhas = []
+    escrita = 0.0
+    turnos_no_intervalo = 0
+    for turno in range(1, args.turnos + 1):
+        inicio = time.perf_counter()
+        grafo.invoke({"messages": [HumanMessage(content=pergunta)]}, config)
+        escrita += time.perf_counter() - inicio
+        turnos_no_intervalo += 1
+        if turno in marcos:
+            inicio = time.perf_counter()
+            for _ in range(args.leituras):
+                tupla = checkpointer.get_tuple(config)
+            leitura = (time.perf_counter() - inicio) / args.leituras
+            mensagens = tupla.checkpoint["channel_values"]["messages"]
+            assert len(mensagens) == 2 * turno, f"{nome}: {len(mensagens)} mensagens no turno {turno}"
+            linhas.append((turno, escrita / turnos_no_intervalo * 1000, leitura * 1000))
+            escrita, turnos_no_intervalo = 0.0, 0
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência e espaço do checkpointer conforme a conversa cresce")
+    parser.add_argument("--turnos", type=int, default=400)
+    parser.add_argument("--marcos", default="50,100,200,400")
+    parser.add_argument("--tamanho", type=int, default=400, help="caracteres por mensagem")
+    parser.add_argument("--leituras", type=int, default=20)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_checkpointer_")
+    try:
+        cenarios = {
+            "MemorySaver": lambda: (MemorySaver(), None),
+            "SQLite cópia completa": lambda: (
+                CheckpointerSQLite(os.path.join(diretorio, "completo.db"), intervalo_snapshot=1),
+                os.path.join(diretorio, "completo.db"),
+            ),
+            "SQLite delta": lambda: (
+                CheckpointerSQLite(os.path.join(diretorio, "delta.db")),
+                os.path.join(diretorio, "delta.db"),
+            ),
+        }
+        print(f"{args.turnos} turnos (2 mensagens de {args.tamanho} caracteres cada)\n")
+        print(f"{'cenário':<24}{'turno':>7}{'turno (ms)':>12}{'get_tuple (ms)':>16}")
+        tamanhos = {}
+        for nome, criar in cenarios.items():
+            checkpointer, caminho = criar()
+            for turno, escrita, leitura in medir(nome, checkpointer, args):
+                print(f"{nome:<24}{turno:>7}{escrita:>12.3f}{leitura:>16.3f}")
+            if caminho:
+                # Fechar a última conexão transfere o WAL para o arquivo principal
+                checkpointer.fechar()
+                tamanhos[nome] = tamanho_arquivo(caminho)
+
+        print(f"\n{'arquivo de sessões':<24}{'tamanho (KiB)':>14}")
+        for nome, tamanho in tamanhos.items():
+            print(f"{nome:<24}{tamanho / 1024:>14.0f}")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
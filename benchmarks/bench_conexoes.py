@@ -0,0 +1,111 @@
+# /src/benchmarks/bench_conexoes.py
+# Throughput das tools de produtos: conexão nova por chamada vs pool por thread.
+#
+# Uso: python benchmarks/bench_conexoes.py [--produtos 5000] [--chamadas 3000] [--threads 4]
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa")]
+
+import chatbot  # noqa: E402
+
+
+def popular_banco(caminho: str, quantidade: int):
+    """Cria um banco de produtos com `quantidade` linhas aleatórias."""
+    conn = sqlite3.connect(caminho)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS produtos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            preco REAL NOT NULL,
+            estoque INTEGER NOT NULL
+        )
+    """)
+    rng = random.Random(42)
+    tipos = ["notebook", "celular", "monitor", "teclado", "mouse", "cadeira", "fone", "cabo"]
+    with conn:
+        conn.executemany(
+            "INSERT INTO produtos (nome, preco, estoque) VALUES (?, ?, ?)",
+            ((f"{rng.choice(tipos)} modelo {i}", round(rng.uniform(10, 5000), 2), rng.randint(0, 200))
+             for i in range(quantidade)),
+        )
+    conn.close()
+
+
+def roteiro(quantidade_produtos: int, chamadas: int, semente: int) -> list[tuple]:
+    """Sequência reproduzível de tool calls de uma sessão de gestão de estoque."""
+    rng = random.Random(semente)
+    passos = []
+    for i in range(chamadas):
+        r = rng.random()
+        pid = rng.randint(1, quantidade_produtos)
+        if r < 0.35:
+            passos.append((chatbot.atualizar_produto, {"id": pid, "estoque": rng.randint(0, 200)}))
+        elif r < 0.55:
+            passos.append((chatbot.criar_produto, {"nome": f"produto bench {semente}-{i}", "preco": 9.9, "estoque": 3}))
+        elif r < 0.75:
+            passos.append((chatbot.excluir_produto, {"id": pid}))
+        else:
+            passos.append((chatbot.atualizar_produto_por_nome, {"nome": f"mouse modelo {pid}", "preco": 19.9}))
+    return passos
+
+
+def executar(passos: list[tuple], threads: int) -> float:
+    inicio = time.perf_counter()
+    if threads == 1:
+        for t, args in passos:
+            t.invoke(args)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda p: p[0].invoke(p[1]), passos))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput das tools com e sem pool de conexões")
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--chamadas", type=int, default=3000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_conexoes_")
+    base = os.path.join(diretorio, "base.db")
+    popular_banco(base, args.produtos)
+    get_conexao_pool = chatbot.get_conexao
+    caminho_original = chatbot.DB_PATH
+
+    print(f"Banco com {args.produtos} produtos, {args.chamadas} tool calls por cenário\n")
+    print(f"{'cenário':<34}{'tempo (s)':>10}{'calls/s':>12}")
+    try:
+        for threads in sorted({1, args.threads}):
+            for rotulo in ("conexão por chamada", "pool por thread"):
+                caminho = os.path.join(diretorio, f"{rotulo[:4]}-{threads}.db")
+                shutil.copy(base, caminho)
+                chatbot.configurar_banco(caminho)
+                if rotulo == "conexão por chamada":
+                    # Comportamento anterior: sqlite3.connect() a cada tool call
+                    chatbot.get_conexao = lambda: sqlite3.connect(caminho)
+                else:
+                    chatbot.get_conexao = get_conexao_pool
+
+                passos = roteiro(args.produtos, args.chamadas, semente=threads)
+                tempo = executar(passos, threads)
+                nome = f"{rotulo} ({threads} thread{'s' if threads > 1 else ''})"
+                print(f"{nome:<34}{tempo:>10.3f}{args.chamadas / tempo:>12.0f}")
+    finally:
+        chatbot.get_conexao = get_conexao_pool
+        chatbot.configurar_banco(caminho_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
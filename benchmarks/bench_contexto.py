@@ -0,0 +1,153 @@
+# /src/benchmarks/bench_contexto.py
+# Tokens enviados ao LLM por chamada numa sessão roteirizada de 200 turnos:
+# histórico completo vs janela com orçamento (comum.contexto).
+#
+# O grafo é o mesmo do chatbot (contexto -> llm -> tools -> contexto), mas o
+# "LLM" segue um roteiro fixo: turnos com uma listagem volumosa, turnos com duas
+# tool calls paralelas e turnos só de conversa. O modelo de resumo é falso e só
+# contabiliza os tokens que receberia. Também confere que toda janela enviada
+# mantém cada AIMessage com tool_calls junto das suas ToolMessages.
+#
+# Uso: python benchmarks/bench_contexto.py [--turnos 200] [--orcamento 8000]
+
+import argparse
+import operator
+import os
+import sys
+from typing import Annotated, TypedDict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from langchain_core.messages import (  # noqa: E402
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+
+from comum.contexto import GerenciadorContexto  # noqa: E402
+
+SYSTEM_PROMPT = "Você é um assistente de gestão de produtos. " * 20
+
+
+class Estado(TypedDict):
+    messages: Annotated[list[AnyMessage], operator.add]
+    resumo: str
+    corte: int
+
+
+class ModeloResumoFalso:
+    """Devolve um resumo fixo e conta os tokens de entrada de cada chamada."""
+
+    def __init__(self):
+        self.tokens_entrada = 0
+
+    def invoke(self, mensagens, config=None):
+        self.tokens_entrada += count_tokens_approximately(mensagens)
+        return AIMessage(content="Resumo: o usuário consultou e alterou vários produtos. " * 8)
+
+
+def listagem(turno: int) -> str:
+    return "\n".join(f"[{turno * 100 + i}] produto {i} - R$ {i * 3.5:.2f} (estoque: {i % 40})" for i in range(60))
+
+
+def conferir_pares(mensagens: list[AnyMessage]):
+    """Toda ToolMessage tem sua tool_call na janela, e toda tool_call tem resposta."""
+    chamadas = {c["id"] for m in mensagens if isinstance(m, AIMessage) for c in m.tool_calls}
+    respostas = {m.tool_call_id for m in mensagens if isinstance(m, ToolMessage)}
+    assert chamadas == respostas, f"pares quebrados: {chamadas ^ respostas}"
+
+
+def criar_grafo(contexto: GerenciadorContexto | None, registro: list[int]):
+    def no_llm(state: Estado) -> dict:
+        if contexto is None:
+            enviadas = [SystemMessage(content=SYSTEM_PROMPT)] + state["messages"]
+        else:
+            enviadas = contexto.mensagens(state, SYSTEM_PROMPT)
+        conferir_pares(enviadas)
+        registro.append(count_tokens_approximately(enviadas))
+
+        ultima = state["messages"][-1]
+        turno = sum(isinstance(m, HumanMessage) for m in state["messages"])
+        if isinstance(ultima, HumanMessage) and turno % 3 == 0:
+            chamadas = [{"name": "listar_produtos", "args": {}, "id": f"l{turno}", "type": "tool_call"}]
+        elif isinstance(ultima, HumanMessage) and turno % 3 == 1:
+            chamadas = [
+                {"name": "atualizar_produto", "args": {"id": turno, "estoque": 5}, "id": f"a{turno}", "type": "tool_call"},
+                {"name": "criar_produto", "args": {"nome": f"p{turno}"}, "id": f"c{turno}", "type": "tool_call"},
+            ]
+        else:
+            return {"messages": [AIMessage(content=f"Pronto, turno {turno} concluído. " * 6)]}
+        return {"messages": [AIMessage(content="", tool_calls=chamadas)]}
+
+    def no_tools(state: Estado) -> dict:
+        ultima = state["messages"][-1]
+        return {"messages": [
+            ToolMessage(
+                content=listagem(len(state["messages"])) if c["name"] == "listar_produtos" else f"{c['name']} ok",
+                tool_call_id=c["id"], name=c["name"],
+            )
+            for c in ultima.tool_calls
+        ]}
+
+    def rotear(state: Estado):
+        return "tools" if state["messages"][-1].tool_calls else END
+
+    grafo = StateGraph(Estado)
+    grafo.add_node("contexto", contexto.no_contexto if contexto else lambda state: {})
+    grafo.add_node("llm", no_llm)
+    grafo.add_node("tools", no_tools)
+    grafo.add_edge(START, "contexto")
+    grafo.add_edge("contexto", "llm")
+    grafo.add_conditional_edges("llm", rotear, ["tools", END])
+    grafo.add_edge("tools", "contexto")
+    return grafo.compile(checkpointer=MemorySaver())
+
+
+def sessao(contexto: GerenciadorContexto | None, turnos: int) -> list[list[int]]:
+    """Roda a sessão e devolve os tokens de cada chamada ao LLM, agrupados por turno."""
+    grafo = criar_grafo(contexto, registro := [])
+    config = {"configurable": {"thread_id": "bench"}}
+    por_turno = []
+    for turno in range(1, turnos + 1):
+        inicio = len(registro)
+        grafo.invoke({"messages": [HumanMessage(content=f"Pergunta {turno}: como está o estoque hoje? " * 3)]}, config)
+        por_turno.append(registro[inicio:])
+    return por_turno
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tokens por chamada ao LLM com e sem janela de contexto")
+    parser.add_argument("--turnos", type=int, default=200)
+    parser.add_argument("--orcamento", type=int, default=8000)
+    args = parser.parse_args()
+
+    resumo = ModeloResumoFalso()
+    contexto = GerenciadorContexto(orcamento_tokens=args.orcamento, modelo_resumo=resumo)
+    cenarios = {"histórico completo": sessao(None, args.turnos), "janela com orçamento": sessao(contexto, args.turnos)}
+
+    limite_chamada = args.orcamento + count_tokens_approximately([SystemMessage(content=SYSTEM_PROMPT)])
+    assert max(max(t) for t in cenarios["janela com orçamento"]) <= limite_chamada, "janela passou do orçamento"
+
+    marcos = sorted({1, args.turnos // 4, args.turnos // 2, args.turnos})
+    print(f"{args.turnos} turnos, orçamento de {args.orcamento} tokens para o histórico\n")
+    print(f"{'cenário':<22}" + "".join(f"{f'turno {m}':>12}" for m in marcos) + f"{'total':>14}")
+    totais = {}
+    for nome, por_turno in cenarios.items():
+        totais[nome] = sum(map(sum, por_turno))
+        print(f"{nome:<22}" + "".join(f"{max(por_turno[m - 1]):>12}" for m in marcos) + f"{totais[nome]:>14}")
+
+    total_janela = totais["janela com orçamento"] + resumo.tokens_entrada
+    print("\n(maior chamada do turno, em tokens aproximados)")
+    print(f"Resumos gerados: {contexto.resumos_gerados}, tokens enviados ao modelo de resumo: {resumo.tokens_entrada}")
+    print(f"Total com resumos: {total_janela} ({totais['histórico completo'] / total_janela:.1f}x menos tokens)")
+    print("Pares tool_call/ToolMessage conferidos em todas as chamadas.")
+
+
+if __name__ == "__main__":
+    main()
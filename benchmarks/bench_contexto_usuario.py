@@ -0,0 +1,139 @@
+# /src/benchmarks/bench_contexto_usuario.py
+# Contexto por usuário das tools do ch06 (ch06/contexto_usuario.py): custo da
+# leitura do usuário numa tool e isolamento entre usuários concorrentes.
+#
+# 1. Custo por leitura: `get_config()["configurable"]["usuario_id"]` (como as
+#    tools faziam a cada chamada) vs `contexto_atual().usuario_id`.
+# 2. Muitos usuários executando turnos do agente ao mesmo tempo (threads e
+#    asyncio, com o usuário vindo da config ou do `context=` do LangGraph), com
+#    criar_tarefa e listar_tarefas em paralelo no mesmo turno. Ao final, cada
+#    usuário tem exatamente as tarefas que criou e toda listagem devolvida a
+#    um usuário contém só ids dele.
+#
+# Uso: python benchmarks/bench_contexto_usuario.py [--usuarios 200] [--turnos 5] [--threads 32]
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "ch06")]
+
+# O módulo do agente cria o modelo real ao ser importado; ele nunca é chamado
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+
+from langchain_core.messages import HumanMessage, ToolMessage  # noqa: E402
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+from langgraph.config import get_config  # noqa: E402
+
+import agente_react_completo as agente  # noqa: E402
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+from contexto_usuario import ContextoUsuario, contexto_atual, usar_contexto  # noqa: E402
+from repositorio_tarefas import RepositorioTarefas  # noqa: E402
+
+ROTEIRO = [[
+    [{"name": "criar_tarefa", "args": {"titulo": "Revisar relatório"}}, {"name": "listar_tarefas", "args": {}}],
+    "Tarefa criada; estas são as suas tarefas.",
+]]
+
+# Tarefas criadas para cada usuário antes da rodada concorrente
+TAREFAS_INICIAIS = 20
+
+
+def custo_leitura(leituras: int) -> tuple[float, float]:
+    """Nanossegundos por leitura do usuário dentro de uma execução do LangChain."""
+    def antigo(_):
+        inicio = time.perf_counter()
+        for _ in range(leituras):
+            get_config().get("configurable", {}).get("usuario_id", 1)
+        return time.perf_counter() - inicio
+
+    def novo(_):
+        inicio = time.perf_counter()
+        with usar_contexto(ContextoUsuario(usuario_id=7)):
+            for _ in range(leituras):
+                contexto_atual().usuario_id
+        return time.perf_counter() - inicio
+
+    config = {"configurable": {"usuario_id": 7}}
+    return tuple(RunnableLambda(f).invoke(None, config) / leituras * 1e9 for f in (antigo, novo))
+
+
+def ids_listados(mensagens) -> set[int]:
+    return {
+        int(i) for m in mensagens if isinstance(m, ToolMessage) and m.content.startswith("Encontradas")
+        for i in re.findall(r"\[(\d+)\]", m.content)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Isolamento e custo do contexto por usuário nas tools do ch06")
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--turnos", type=int, default=5, help="turnos por usuário")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--leituras", type=int, default=200_000)
+    args = parser.parse_args()
+
+    antigo, novo = custo_leitura(args.leituras)
+    print(f"Leitura do usuário numa tool: get_config() {antigo:.0f} ns, contexto_atual() {novo:.0f} ns "
+          f"({antigo / novo:.1f}x)\n")
+
+    agente.TAREFAS = RepositorioTarefas()
+    usuarios = list(range(1000, 1000 + args.usuarios))
+    for u in usuarios:
+        agente.TAREFAS.criar_varias(u, ((f"inicial {i}", None) for i in range(TAREFAS_INICIAIS)))
+    grafo = agente.create_agent(modelo=ModeloFalso(roteiro=ROTEIRO))
+    vazamentos: list[str] = []
+
+    def conferir(usuario: int, estado: dict):
+        for tarefa_id in ids_listados(estado["messages"]):
+            if agente.TAREFAS.obter(usuario, tarefa_id) is None:
+                vazamentos.append(f"usuário {usuario} recebeu a tarefa {tarefa_id}")
+
+    def sessao_sync(usuario: int):
+        for turno in range(args.turnos):
+            entrada = {"messages": [HumanMessage(content=f"turno {turno}")]}
+            if usuario % 2:
+                estado = grafo.invoke(entrada, context=ContextoUsuario(usuario_id=usuario))
+            else:
+                estado = grafo.invoke(entrada, {"configurable": {"usuario_id": usuario}})
+            conferir(usuario, estado)
+
+    async def sessao_async(usuario: int):
+        for turno in range(args.turnos):
+            entrada = {"messages": [HumanMessage(content=f"turno {turno}")]}
+            estado = await grafo.ainvoke(entrada, {"configurable": {"usuario_id": usuario}})
+            conferir(usuario, estado)
+
+    async def todas_async(grupo: list[int]):
+        await asyncio.gather(*(sessao_async(u) for u in grupo))
+
+    metade = len(usuarios) // 2
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(sessao_sync, usuarios[:metade]))
+    tempo_sync = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    asyncio.run(todas_async(usuarios[metade:]))
+    tempo_async = time.perf_counter() - inicio
+
+    turnos = args.turnos * len(usuarios)
+    print(f"{len(usuarios)} usuários x {args.turnos} turnos ({turnos} turnos, 2 tools em paralelo por turno)")
+    print(f"  threads ({args.threads}): {metade * args.turnos / tempo_sync:.0f} turnos/s; "
+          f"asyncio: {(len(usuarios) - metade) * args.turnos / tempo_async:.0f} turnos/s")
+
+    assert not vazamentos, f"{len(vazamentos)} vazamentos entre usuários, ex.: {vazamentos[:3]}"
+    for u in usuarios:
+        criadas = agente.TAREFAS.contar(u) - TAREFAS_INICIAIS
+        assert criadas == args.turnos, f"usuário {u} tem {criadas} tarefas criadas, esperado {args.turnos}"
+    assert agente.TAREFAS.contar(1) == 0, "tarefas criadas no usuário padrão"
+    print("  nenhuma listagem com tarefas de outro usuário; cada usuário criou exatamente as suas tarefas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# /src/benchmarks/bench_estoque_baixo.py
+# Custo de `produtos_estoque_abaixo` em catálogos grandes: sem índice (varredura
+# da tabela + ordenação), com o índice de cobertura em (estoque, id, nome, preco)
+# criado por `inicializar_banco()`, e respondida da memória pelo monitor de
+# estoque baixo (tarefa/monitor_estoque.py), que é mantido pelas tools de escrita.
+#
+# Depois de uma rodada de escritas aleatórias pelas tools (inclusive as de
+# lote, que registram a linha antes e depois de cada produto), confere que o monitor
+# responde exatamente o mesmo que o banco e que os callbacks de assinatura
+# dispararam para cada produto que entrou ou saiu do conjunto.
+#
+# Uso: python benchmarks/bench_estoque_baixo.py [--tamanhos 10000 100000 1000000]
+#        [--consultas 300] [--escritas 2000]
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa")]
+
+import chatbot  # noqa: E402
+
+LIMITES = [5, 10, 20]
+
+
+def popular_banco(caminho: str, quantidade: int):
+    """Cria o banco direto pelo SQLite (as tools de lote levariam minutos em 1M)."""
+    rng = random.Random(42)
+    conn = sqlite3.connect(caminho)
+    conn.execute("""
+        CREATE TABLE produtos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            preco REAL NOT NULL,
+            estoque INTEGER NOT NULL
+        )
+    """)
+    with conn:
+        conn.executemany(
+            "INSERT INTO produtos (nome, preco, estoque) VALUES (?, ?, ?)",
+            ((f"produto {i}", round(rng.uniform(10, 5000), 2), rng.randint(0, 1000)) for i in range(quantidade)),
+        )
+    conn.close()
+
+
+def consultas(quantidade: int, semente: int) -> list[dict]:
+    rng = random.Random(semente)
+    return [{"limite": rng.choice(LIMITES), "quantidade": 20} for _ in range(quantidade)]
+
+
+def medir(chamadas: list[dict]) -> tuple[float, list[str]]:
+    inicio = time.perf_counter()
+    respostas = [chatbot.produtos_estoque_abaixo.invoke(args) for args in chamadas]
+    return (time.perf_counter() - inicio) / len(chamadas), respostas
+
+
+def medir_consulta(chamadas: list[dict], monitor: bool) -> float:
+    """Só a obtenção das linhas, sem o overhead de invocar a tool e formatar a resposta."""
+    sql = "SELECT id, nome, preco, estoque FROM produtos WHERE estoque < ? ORDER BY estoque, id LIMIT ?"
+    conn = chatbot.get_conexao()
+    inicio = time.perf_counter()
+    for args in chamadas:
+        if monitor:
+            chatbot._monitor.abaixo(args["limite"], args["quantidade"] + 1)
+        else:
+            conn.execute(sql, (args["limite"], args["quantidade"] + 1)).fetchall()
+    return (time.perf_counter() - inicio) / len(chamadas)
+
+
+def paginas(limite: int) -> list[str]:
+    """Todas as páginas da consulta, seguindo os cursores."""
+    respostas, args = [], {"limite": limite, "quantidade": 50}
+    while True:
+        resposta = chatbot.produtos_estoque_abaixo.invoke(args)
+        respostas.append(resposta)
+        if "cursor='" not in resposta:
+            return respostas
+        args["cursor"] = resposta.split("cursor='")[1].split("'")[0]
+
+
+def escrever(produtos: int, quantidade: int):
+    """Escritas aleatórias pelas tools, concentradas perto dos limites monitorados."""
+    rng = random.Random(7)
+    for i in range(quantidade):
+        r, pid = rng.random(), rng.randint(1, produtos)
+        if r < 0.6:
+            chatbot.atualizar_produto.invoke({"id": pid, "estoque": rng.randint(0, 30)})
+        elif r < 0.75:
+            chatbot.criar_produto.invoke({"nome": f"reposição {i}", "preco": 9.9, "estoque": rng.randint(0, 30)})
+        elif r < 0.85:
+            chatbot.excluir_produto.invoke({"id": pid})
+        elif r < 0.9:
+            chatbot.criar_produtos_em_lote.invoke({"produtos": [
+                {"nome": f"lote {i}-{j}", "preco": 1.0, "estoque": rng.randint(0, 30)} for j in range(5)
+            ]})
+        elif r < 0.95:
+            # Inclui ids já excluídos e campos diferentes (dois UPDATEs na mesma transação)
+            chatbot.atualizar_produtos_em_lote.invoke({"produtos": [
+                {"id": rng.randint(1, produtos), "estoque": rng.randint(0, 30)} for _ in range(4)
+            ] + [{"id": rng.randint(1, produtos), "preco": 5.0, "estoque": rng.randint(0, 30)}]})
+        else:
+            chatbot.excluir_produtos_em_lote.invoke({"ids": [rng.randint(1, produtos) for _ in range(3)]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas de estoque baixo sem índice, com índice e com monitor em memória")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--consultas", type=int, default=300)
+    parser.add_argument("--escritas", type=int, default=2000, help="escritas pelas tools na verificação")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_estoque_baixo_")
+    caminho_original = chatbot.DB_PATH
+    tamanho_cache = chatbot.estatisticas_cache()["max_entradas"]
+    teto_original = int(os.getenv("MONITOR_ESTOQUE_LIMITE", "0"))
+    try:
+        # Sem cache de leituras: mede o custo real de cada consulta
+        chatbot.configurar_cache(0)
+        chatbot.configurar_monitor(0)
+
+        print(f"{args.consultas} consultas por cenário, limites {LIMITES}, 20 por página (ms por consulta;")
+        print("'tool' inclui invocar a tool e formatar a resposta, 'consulta' é só a obtenção das linhas)\n")
+        print(f"{'produtos':>10}{'medida':>10}{'sem índice':>12}{'com índice':>12}{'monitor':>10}{'ganho índice':>14}{'ganho monitor':>15}")
+        for n in args.tamanhos:
+            caminho = os.path.join(diretorio, f"{n}.db")
+            popular_banco(caminho, n)
+            chamadas = consultas(args.consultas, n)
+
+            # Banco no formato antigo: a tabela sem o índice de estoque
+            chatbot.configurar_banco(caminho)
+            sem_indice, esperado = medir(chamadas)
+            consulta = {"sem índice": medir_consulta(chamadas, False)}
+
+            chatbot.inicializar_banco()
+            plano = chatbot.get_conexao().execute(
+                "EXPLAIN QUERY PLAN SELECT id, nome, preco, estoque FROM produtos WHERE estoque < 5 ORDER BY estoque, id LIMIT 21"
+            ).fetchall()
+            assert any("COVERING INDEX idx_produtos_estoque" in linha[-1] for linha in plano), plano
+            com_indice, respostas = medir(chamadas)
+            consulta["com índice"] = medir_consulta(chamadas, False)
+            assert respostas == esperado
+
+            chatbot.assinar_estoque_baixo(max(LIMITES))
+            medir(chamadas[:1])  # carga inicial
+            monitor, respostas = medir(chamadas)
+            consulta["monitor"] = medir_consulta(chamadas, True)
+            assert respostas == esperado
+            chatbot.configurar_monitor(0)
+
+            for rotulo, tempos in (("tool", (sem_indice, com_indice, monitor)), ("consulta", tuple(consulta.values()))):
+                a, b, c = (t * 1000 for t in tempos)
+                print(f"{n:>10}{rotulo:>10}{a:>12.3f}{b:>12.3f}{c:>10.3f}{a / b:>13.1f}x{b / c:>14.1f}x")
+
+        # Consistência do monitor após escritas pelas tools
+        n = args.tamanhos[0]
+        caminho = os.path.join(diretorio, "escritas.db")
+        popular_banco(caminho, n)
+        chatbot.configurar_banco(caminho)
+        chatbot.inicializar_banco()
+        chatbot.get_conexao().execute("UPDATE produtos SET estoque = estoque % 30")
+        chatbot.get_conexao().commit()
+
+        conjunto = {id for id, in chatbot.get_conexao().execute("SELECT id FROM produtos WHERE estoque < 10")}
+        eventos = {"entrou": 0, "saiu": 0}
+
+        def ao_mudar(evento, linha, limite):
+            eventos[evento] += 1
+            (conjunto.add if evento == "entrou" else conjunto.discard)(linha[0])
+
+        chatbot.assinar_estoque_baixo(10, ao_mudar)
+        chatbot.assinar_estoque_baixo(max(LIMITES))
+        recargas = chatbot._monitor.recargas
+        escrever(n, args.escritas)
+        em_memoria = {limite: paginas(limite) for limite in LIMITES}
+        assert chatbot._monitor.recargas == recargas, "o monitor recarregou do banco durante as escritas"
+        em_memoria_total = chatbot._monitor.tamanho()
+
+        chatbot.configurar_monitor(0)
+        for limite in LIMITES:
+            assert em_memoria[limite] == paginas(limite), f"monitor diverge do banco no limite {limite}"
+        atual = {id for id, in chatbot.get_conexao().execute("SELECT id FROM produtos WHERE estoque < 10")}
+        assert conjunto == atual, "callbacks não acompanharam o conjunto abaixo de 10"
+        print(f"\nApós {args.escritas} escritas: monitor idêntico ao banco, {em_memoria_total} produtos "
+              f"em memória, {eventos['entrou']} entradas e {eventos['saiu']} saídas notificadas abaixo de 10.")
+    finally:
+        chatbot.configurar_monitor(teto_original)
+        chatbot.configurar_cache(tamanho_cache)
+        chatbot.configurar_banco(caminho_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# /src/benchmarks/bench_grafo_contador.py
+# Escalabilidade do grafo contador do ch06 com o histórico no estado:
+#
+#   cópia        os nós devolvem `state["historico"] + [...]` (versão antiga)
+#   operator.add reducer padrão: os nós devolvem só o item novo, mas o reducer
+#                ainda faz `atual + novos`, copiando o histórico a cada passo
+#   anexar       reducer só-de-anexação de ch06/grafo_contador.py
+#
+# As duas primeiras são O(N²) no número de iterações; `anexar` deve crescer
+# linearmente até 100k iterações. Como cada passo do LangGraph tem um custo fixo
+# alto, o benchmark também mede só o histórico (as mesmas 2 anexações por
+# iteração, fora do grafo), onde a diferença assintótica aparece sem ruído.
+# Confere também que as três variantes produzem o mesmo histórico e que o
+# Historico volta de um checkpoint com o serializador do ch06 (sem aviso de
+# tipo não registrado).
+#
+# Uso: python benchmarks/bench_grafo_contador.py [--iteracoes 1000 10000 100000]
+#        [--max-quadratico 20000]
+
+import argparse
+import logging
+import operator
+import os
+import sys
+import time
+from typing import Annotated, Optional, TypedDict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "ch06")]
+
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+
+import grafo_contador  # noqa: E402
+
+
+class EstadoCopia(TypedDict):
+    valor: int
+    historico: list[str]
+    limite: Optional[int]
+
+
+class EstadoAdd(TypedDict):
+    valor: int
+    historico: Annotated[list[str], operator.add]
+    limite: Optional[int]
+
+
+def copia_incrementar(state: EstadoCopia) -> dict:
+    novo_valor = state["valor"] + 1
+    return {"valor": novo_valor, "historico": state["historico"] + [f"Incrementado para {novo_valor}"]}
+
+
+def copia_verificar(state: EstadoCopia) -> dict:
+    return {"historico": state["historico"] + ["Verificando..."]}
+
+
+def copia_finalizar(state: EstadoCopia) -> dict:
+    return {"historico": state["historico"] + ["Concluido"]}
+
+
+def sem_anotacoes(funcao):
+    # As funções do ch06 anotam ContadorState; sem isso o LangGraph tentaria
+    # registrar os canais dele também, com outro reducer
+    return lambda state: funcao(state)
+
+
+def montar(estado, incrementar, verificar, finalizar):
+    grafo = StateGraph(estado)
+    grafo.add_node("incrementar", sem_anotacoes(incrementar))
+    grafo.add_node("verificar", sem_anotacoes(verificar))
+    grafo.add_node("finalizar", sem_anotacoes(finalizar))
+    grafo.add_conditional_edges(
+        START, sem_anotacoes(grafo_contador.deve_continuar), {"continuar": "incrementar", "parar": END}
+    )
+    grafo.add_edge("incrementar", "verificar")
+    grafo.add_conditional_edges(
+        "verificar", sem_anotacoes(grafo_contador.deve_continuar), {"continuar": "incrementar", "parar": "finalizar"}
+    )
+    grafo.add_edge("finalizar", END)
+    return grafo.compile()
+
+
+VARIANTES = {
+    "cópia": (montar(EstadoCopia, copia_incrementar, copia_verificar, copia_finalizar), True),
+    "operator.add": (
+        montar(EstadoAdd, grafo_contador.incrementar, grafo_contador.verificar, grafo_contador.finalizar), True
+    ),
+    "anexar": (grafo_contador.app, False),
+}
+
+
+def so_historico(n: int, com_copia: bool) -> dict[str, float]:
+    """Segundos para montar o histórico de `n` iterações, copiando a lista e com `anexar`."""
+    passos = {"cópia": operator.add, "anexar": grafo_contador.anexar}
+    if not com_copia:
+        del passos["cópia"]
+    tempos = {}
+    for nome, passo in passos.items():
+        historico = ["Início"]
+        inicio = time.perf_counter()
+        for i in range(n):
+            historico = passo(historico, [f"Incrementado para {i + 1}"])
+            historico = passo(historico, ["Verificando..."])
+        tempos[nome] = time.perf_counter() - inicio
+    return tempos
+
+
+class Avisos(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.mensagens: list[str] = []
+
+    def emit(self, registro: logging.LogRecord):
+        self.mensagens.append(registro.getMessage())
+
+
+def conferir_checkpoint():
+    avisos = Avisos()
+    logging.getLogger("langgraph").addHandler(avisos)
+    try:
+        app = grafo_contador.grafo.compile(checkpointer=MemorySaver(serde=grafo_contador.serializador()))
+        config = {"configurable": {"thread_id": "contador"}}
+        resultado = app.invoke({"valor": 0, "historico": ["Início"], "limite": 50}, {**config, "recursion_limit": 110})
+        salvo = app.get_state(config).values["historico"]
+    finally:
+        logging.getLogger("langgraph").removeHandler(avisos)
+    assert isinstance(salvo, grafo_contador.Historico) and salvo == resultado["historico"]
+    assert not avisos.mensagens, avisos.mensagens
+    print("Checkpoint: Historico gravado e carregado com o serializador do ch06, sem avisos.\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Histórico do grafo contador: cópia, operator.add e reducer só-de-anexação")
+    parser.add_argument("--iteracoes", type=int, nargs="+", default=[1000, 10_000, 20_000, 100_000])
+    parser.add_argument("--max-quadratico", type=int, default=20_000,
+                        help="maior número de iterações para as variantes O(N²)")
+    args = parser.parse_args()
+
+    # Mesmo histórico nas três variantes
+    referencia = None
+    for nome, (app, _) in VARIANTES.items():
+        historico = list(grafo_contador.executar(200, app)["historico"])
+        assert referencia is None or historico == referencia, f"{nome}: histórico diferente"
+        referencia = historico
+    assert len(referencia) == 2 * 200 + 2
+    conferir_checkpoint()
+
+    print("Só o histórico, fora do grafo (s):")
+    print(f"{'iterações':>10}{'cópia':>12}{'anexar':>12}")
+    for n in args.iteracoes:
+        t = so_historico(n, com_copia=n <= args.max_quadratico)
+        copia = f"{t['cópia']:>12.3f}" if "cópia" in t else f"{'-':>12}"
+        print(f"{n:>10}{copia}{t['anexar']:>12.3f}")
+
+    print("\nGrafo completo (s):")
+    print(f"{'iterações':>10}" + "".join(f"{nome + ' (s)':>18}" for nome in VARIANTES) + f"{'anexar µs/iter':>16}")
+    tempos: dict[tuple[str, int], float] = {}
+    for n in args.iteracoes:
+        linha = f"{n:>10}"
+        for nome, (app, quadratico) in VARIANTES.items():
+            if quadratico and n > args.max_quadratico:
+                linha += f"{'-':>18}"
+                continue
+            inicio = time.perf_counter()
+            resultado = grafo_contador.executar(n, app)
+            tempos[nome, n] = time.perf_counter() - inicio
+            assert resultado["valor"] == n and len(resultado["historico"]) == 2 * n + 2
+            linha += f"{tempos[nome, n]:>18.2f}"
+        print(linha + f"{tempos['anexar', n] / n * 1e6:>16.1f}")
+
+    # Linear: o custo por iteração do maior N não passa de 2x o do menor
+    menor, maior = min(args.iteracoes), max(args.iteracoes)
+    if maior >= 10 * menor:
+        por_iter = {n: tempos["anexar", n] / n for n in (menor, maior)}
+        assert por_iter[maior] < 2 * por_iter[menor], f"anexar não escalou linearmente: {por_iter}"
+        print(f"\nanexar: {por_iter[menor] * 1e6:.1f} µs/iteração com {menor} e {por_iter[maior] * 1e6:.1f} com {maior}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+# /src/benchmarks/bench_grafos.py
+# Custo fixo do LangGraph nos grafos do ch06, com nós que não fazem trabalho
+# (ModeloFalso no lugar do LLM), para saber quanto cada superstep custa por si:
+#
+#   compilacao/*     compile() de grafo_contador, grafo_llm e do agente ReAct (ms)
+#   passo/*          latência por superstep do contador, do chat e de um turno
+#                    do agente com uma tool call; `passo/um_no` é o invoke
+#                    inteiro de um grafo de um nó, o piso de qualquer chamada (µs)
+#   reducer/*        invoke com N mensagens de entrada e um nó que anexa mais
+#                    uma, com operator.add (o reducer dos grafos) e
+#                    add_messages (µs)
+#   checkpointer/*   turno do chat sem checkpointer, com MemorySaver, com o
+#                    SQLite do tarefa/ e com o SqliteSaver do LangGraph, se
+#                    instalado (µs)
+#
+# Cada caso roda uma vez para aquecer e é medido `--repeticoes` vezes. Como no
+# timeit, a comparação usa o mínimo das amostras, o menos sensível a ruído da
+# máquina; a mediana também vai para o JSON. `--saida` grava os resultados em
+# JSON (com versões e máquina); `--comparar` lê um JSON anterior, mostra a
+# variação de cada caso e sai com código 1 se algum ficou mais lento que a
+# `--tolerancia`.
+#
+# Uso: python benchmarks/bench_grafos.py [--saida atual.json] [--comparar base.json]
+#        [--tolerancia 0.4] [--repeticoes 5] [--filtro reducer]
+
+import argparse
+import gc
+import json
+import operator
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from typing import Annotated, Callable, TypedDict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa"), os.path.join(RAIZ, "ch06")]
+
+# Os modelos reais só são criados no primeiro uso (Preguicoso) e aqui não são usados;
+# as chaves fictícias valem só se algum for criado por engano, sem ir à rede
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+os.environ.pop("INSTRUMENTACAO", None)
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+from langgraph.graph.message import add_messages  # noqa: E402
+
+import agente_react_completo as agente  # noqa: E402
+import grafo_contador  # noqa: E402
+import grafo_llm  # noqa: E402
+from checkpointer_sqlite import CheckpointerSQLite  # noqa: E402
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+from repositorio_tarefas import RepositorioTarefas  # noqa: E402
+
+ROTEIRO_AGENTE = [[[{"name": "calcular", "args": {"operacao": "soma", "a": 2, "b": 3}}], "O resultado é 5."]]
+
+# Supersteps de um turno do agente com uma tool call: contexto, llm_call,
+# tool_node, contexto, llm_call
+PASSOS_TURNO_AGENTE = 5
+
+# Um caso devolve (segundos, unidades medidas); o resultado é segundos/unidade
+Caso = Callable[[], tuple[float, int]]
+
+
+def cronometrar(funcao: Callable, vezes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(vezes):
+        funcao()
+    return time.perf_counter() - inicio
+
+
+# === GRAFOS COM NÓS VAZIOS ===
+
+class EstadoUnico(TypedDict):
+    valor: int
+
+
+def grafo_um_no():
+    grafo = StateGraph(EstadoUnico)
+    grafo.add_node("no", lambda state: {"valor": state["valor"] + 1})
+    grafo.add_edge(START, "no")
+    grafo.add_edge("no", END)
+    return grafo.compile()
+
+
+def responder(state) -> dict:
+    return {"messages": [AIMessage(content="ok")]}
+
+
+def grafo_chat(checkpointer=None):
+    """A topologia do grafo_llm (preparar -> chamar_modelo) com o modelo trocado por uma resposta fixa."""
+    grafo = StateGraph(grafo_llm.ChatState)
+    grafo.add_node("preparar", grafo_llm.preparar)
+    grafo.add_node("chamar_modelo", responder)
+    grafo.add_edge(START, "preparar")
+    grafo.add_edge("preparar", "chamar_modelo")
+    grafo.add_edge("chamar_modelo", END)
+    return grafo.compile(checkpointer=checkpointer)
+
+
+class EstadoAdd(TypedDict):
+    messages: Annotated[list[AnyMessage], operator.add]
+
+
+class EstadoAddMessages(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+
+def grafo_reducer(estado):
+    """Um nó que anexa uma mensagem: o custo do passo é o do reducer sobre o histórico."""
+    grafo = StateGraph(estado)
+    grafo.add_node("responder", responder)
+    grafo.add_edge(START, "responder")
+    grafo.add_edge("responder", END)
+    return grafo.compile()
+
+
+def historico(n: int) -> list:
+    return [(HumanMessage if i % 2 == 0 else AIMessage)(content=f"mensagem {i}", id=f"m{i}") for i in range(n)]
+
+
+# === CASOS ===
+
+def casos(diretorio: str, iteracoes: int, turnos: int) -> dict[str, tuple[str, Caso]]:
+    """Nome -> (unidade, caso). Os grafos são compilados aqui, fora da medição."""
+    agente.TAREFAS = RepositorioTarefas()
+    modelo = ModeloFalso(roteiro=ROTEIRO_AGENTE)
+    um_no = grafo_um_no()
+    chat = grafo_chat()
+    react = agente.create_agent(modelo=modelo)
+    pergunta = {"messages": [HumanMessage(content="Quanto é 2 + 3?")]}
+
+    resultado: dict[str, tuple[str, Caso]] = {
+        "compilacao/grafo_contador": ("ms", lambda: (cronometrar(grafo_contador.grafo.compile, 20), 20)),
+        "compilacao/grafo_llm": ("ms", lambda: (cronometrar(grafo_llm.grafo.compile, 20), 20)),
+        "compilacao/agente_react": ("ms", lambda: (cronometrar(lambda: agente.create_agent(modelo=modelo), 10), 10)),
+        "passo/um_no": ("µs", lambda: (cronometrar(lambda: um_no.invoke({"valor": 0}), 500), 500)),
+        # 2 supersteps por iteração mais o finalizar
+        "passo/grafo_contador": ("µs", lambda: (cronometrar(lambda: grafo_contador.executar(iteracoes), 1),
+                                               2 * iteracoes + 1)),
+        "passo/chat": ("µs", lambda: (cronometrar(lambda: chat.invoke(pergunta), 300), 2 * 300)),
+        "passo/agente_react": ("µs", lambda: (cronometrar(lambda: react.invoke(pergunta), turnos),
+                                             PASSOS_TURNO_AGENTE * turnos)),
+    }
+
+    for n in (0, 1000, 10_000, 100_000):
+        mensagens = historico(n)
+        for nome, estado in (("operator.add", EstadoAdd), ("add_messages", EstadoAddMessages)):
+            app = grafo_reducer(estado)
+            vezes = max(5, min(300, 300_000 // max(n, 1)))
+            resultado[f"reducer/{nome}/{n}"] = (
+                "µs", lambda app=app, mensagens=mensagens, vezes=vezes: (
+                    cronometrar(lambda: app.invoke({"messages": mensagens}), vezes), vezes
+                ),
+            )
+
+    checkpointers = {
+        "nenhum": lambda: None,
+        "memoria": MemorySaver,
+        "sqlite_tarefa": lambda: CheckpointerSQLite(os.path.join(diretorio, f"tarefa_{time.perf_counter_ns()}.db")),
+    }
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        checkpointers["sqlite_langgraph"] = lambda: SqliteSaver(sqlite3.connect(
+            os.path.join(diretorio, f"langgraph_{time.perf_counter_ns()}.db"), check_same_thread=False
+        ))
+    except ImportError:  # langgraph-checkpoint-sqlite é opcional
+        pass
+
+    def turnos_chat(criar_checkpointer) -> tuple[float, int]:
+        # Conversa nova a cada repetição: o histórico cresce de 1 a `turnos` turnos
+        checkpointer = criar_checkpointer()
+        app = grafo_chat(checkpointer)
+        config = {"configurable": {"thread_id": "bench"}}
+        tempo = cronometrar(lambda: app.invoke(pergunta, config), turnos)
+        if isinstance(checkpointer, CheckpointerSQLite):
+            checkpointer.fechar()
+        return tempo, turnos
+
+    for nome, criar in checkpointers.items():
+        resultado[f"checkpointer/{nome}"] = ("µs", lambda criar=criar: turnos_chat(criar))
+    return resultado
+
+
+ESCALA = {"ms": 1e3, "µs": 1e6}
+
+
+def medir(casos_: dict[str, tuple[str, Caso]], repeticoes: int) -> dict[str, dict]:
+    resultados = {}
+    for nome, (unidade, caso) in casos_.items():
+        caso()  # aquecimento: imports e caches da primeira execução ficam fora das amostras
+        amostras = []
+        for _ in range(repeticoes):
+            # Como o timeit: sem o coletor de lixo varrendo os históricos grandes no meio da medição
+            gc.collect()
+            gc.disable()
+            try:
+                segundos, unidades = caso()
+            finally:
+                gc.enable()
+            amostras.append(segundos / unidades * ESCALA[unidade])
+        resultados[nome] = {
+            "mediana": statistics.median(amostras),
+            "minimo": min(amostras),
+            "unidade": unidade,
+            "amostras": amostras,
+        }
+        print(f"  {nome:<34}{resultados[nome]['minimo']:>12.1f}{resultados[nome]['mediana']:>12.1f} {unidade}")
+    return resultados
+
+
+def versao(pacote: str) -> str:
+    try:
+        return version(pacote)
+    except PackageNotFoundError:
+        return "-"
+
+
+def comparar(atuais: dict[str, dict], caminho: str, tolerancia: float) -> list[str]:
+    """Imprime a variação em relação a um JSON anterior; devolve os casos que pioraram além da tolerância."""
+    with open(caminho, encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\nComparação com {caminho} (langgraph {base['ambiente'].get('langgraph', '-')}, {base['data']}):")
+    print(f"{'caso (mínimo)':<36}{'base':>12}{'atual':>12}{'variação':>11}")
+    regressoes = []
+    for nome, atual in atuais.items():
+        anterior = base["resultados"].get(nome)
+        if anterior is None:
+            print(f"{nome:<36}{'-':>12}{atual['minimo']:>12.1f}{'novo':>11}")
+            continue
+        variacao = atual["minimo"] / anterior["minimo"] - 1
+        marca = ""
+        if variacao > tolerancia:
+            regressoes.append(nome)
+            marca = "  REGRESSÃO"
+        print(f"{nome:<36}{anterior['minimo']:>12.1f}{atual['minimo']:>12.1f}{variacao:>+10.0%}{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo fixo do LangGraph nos grafos do ch06, com resultados em JSON")
+    parser.add_argument("--repeticoes", type=int, default=5, help="amostras por caso")
+    parser.add_argument("--iteracoes", type=int, default=500, help="iterações do grafo_contador")
+    parser.add_argument("--turnos", type=int, default=50, help="turnos do agente e do chat com checkpointer")
+    parser.add_argument("--filtro", default="", help="só os casos cujo nome contém este texto")
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.4,
+                        help="piora relativa do mínimo tolerada na comparação (0.4 = 40%%; numa máquina dedicada, menos)")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_grafos_")
+    try:
+        selecionados = {
+            nome: caso for nome, caso in casos(diretorio, args.iteracoes, args.turnos).items() if args.filtro in nome
+        }
+        assert selecionados, f"nenhum caso contém {args.filtro!r}"
+        print(f"{len(selecionados)} casos, {args.repeticoes} amostras cada")
+        print(f"  {'caso':<34}{'mínimo':>12}{'mediana':>12}")
+        resultados = medir(selecionados, args.repeticoes)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    # Sanidade: o custo do operator.add cresce com o histórico, o do passo vazio não
+    if {"reducer/operator.add/0", "reducer/operator.add/100000"} <= resultados.keys():
+        assert resultados["reducer/operator.add/100000"]["minimo"] > resultados["reducer/operator.add/0"]["minimo"]
+
+    relatorio = {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "processador": platform.processor() or platform.machine(),
+            "langgraph": versao("langgraph"),
+            "langchain-core": versao("langchain-core"),
+        },
+        "parametros": {k: getattr(args, k) for k in ("repeticoes", "iteracoes", "turnos")},
+        "resultados": resultados,
+    }
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        regressoes = comparar(resultados, args.comparar, args.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} caso(s) mais lentos que a tolerância de {args.tolerancia:.0%}: {', '.join(regressoes)}")
+            sys.exit(1)
+        print(f"\nNenhum caso mais lento que a tolerância de {args.tolerancia:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
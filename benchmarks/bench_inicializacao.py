@@ -0,0 +1,171 @@
+# /src/benchmarks/bench_inicializacao.py
+# Tempo de inicialização dos pontos de entrada, cada um num interpretador novo:
+#
+#   import         soma do `python -X importtime` para importar o módulo (ms),
+#                  e os pacotes mais caros entre os importados
+#   prompt         do início do processo até o primeiro "Você:" aparecer,
+#                  nos scripts interativos (ms)
+#   modelo         criar o cliente do provedor e bindar as tools no primeiro
+#                  uso, custo que saiu da inicialização (ms)
+#
+# Confere também que nenhum módulo importa o pacote do provedor
+# (langchain_anthropic / langchain_google_genai) durante o import. O chatbot
+# roda com bancos temporários; nada é enviado ao modelo.
+#
+# Uso: python benchmarks/bench_inicializacao.py [--repeticoes 3] [--saida inicializacao.json]
+
+import argparse
+import json
+import os
+import select
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROVEDORES = ("langchain_anthropic", "langchain_google_genai")
+
+# Nome -> (diretório, módulo, atributo com o modelo preguiçoso, código que abre o prompt)
+PONTOS = {
+    "tarefa/chatbot.py": (
+        "tarefa", "chatbot", "modelo_com_tools",
+        "chatbot.configurar_banco({produtos!r}); chatbot.SESSOES_PATH = {sessoes!r}; chatbot.main()",
+    ),
+    "ch06/agente_react_completo.py": ("ch06", "agente_react_completo", "modelo_com_tools", "agente_react_completo.main()"),
+    "ch06/grafo_llm.py": ("ch06", "grafo_llm", "modelo", None),
+    "ch03/executar_tools.py": ("ch03", "executar_tools", "modelo_com_tools", None),
+}
+
+# Scripts que abrem o prompt já no import (não dá para só importá-los)
+SCRIPTS = {"ch01/hello_llm.py": "ch01/hello_llm.py"}
+
+MARCADOR_PROMPT = b"Voc"
+
+
+def ambiente() -> dict:
+    return {
+        **os.environ,
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "offline"),
+        "ANTHROPIC_API_KEY": os.environ.get("ANTHROPIC_API_KEY", "offline"),
+        "CACHE_RESPOSTAS": "0",
+        "PYTHONUNBUFFERED": "1",
+    }
+
+
+def preparar(diretorio: str, modulo: str) -> str:
+    return f"import sys; sys.path[:0] = [{os.path.join(RAIZ, diretorio)!r}, {RAIZ!r}]; import {modulo}"
+
+
+def medir_import(diretorio: str, modulo: str) -> tuple[float, list[tuple[str, float]], set[str]]:
+    """ms de import (soma dos módulos de topo), os 5 imports diretos do módulo mais caros e todos os importados."""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", preparar(diretorio, modulo)],
+        capture_output=True, text=True, env=ambiente(), cwd=RAIZ, check=True,
+    ).stderr
+    # Cada nível de aninhamento indenta o nome com mais 2 espaços
+    niveis: dict[int, list[tuple[str, float]]] = {0: [], 1: []}
+    importados = set()
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        nivel = (len(nome) - len(nome.lstrip()) - 1) // 2
+        importados.add(nome.strip())
+        if nivel in niveis:
+            niveis[nivel].append((nome.strip(), int(acumulado) / 1000))
+    total = sum(ms for _, ms in niveis[0])
+    return total, sorted(niveis[1], key=lambda t: -t[1])[:5], importados
+
+
+def medir_prompt(comando: list[str], limite: float = 60.0) -> float:
+    """ms do início do processo até o prompt aparecer na saída."""
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        comando, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=ambiente(), cwd=RAIZ,
+    )
+    lido = b""
+    try:
+        while MARCADOR_PROMPT not in lido:
+            restante = limite - (time.perf_counter() - inicio)
+            prontos, _, _ = select.select([processo.stdout], [], [], max(restante, 0))
+            bloco = os.read(processo.stdout.fileno(), 4096) if prontos else b""
+            if not bloco:
+                raise RuntimeError(f"{comando[-1][:60]!r} não mostrou o prompt: {lido[-200:]!r}")
+            lido += bloco
+        return (time.perf_counter() - inicio) * 1000
+    finally:
+        processo.kill()
+        processo.wait()
+
+
+def medir_modelo(diretorio: str, modulo: str, atributo: str) -> float:
+    """ms da primeira criação do modelo preguiçoso, com o módulo já importado."""
+    codigo = (
+        f"{preparar(diretorio, modulo)}; import time; inicio = time.perf_counter(); "
+        f"{modulo}.{atributo}.obter(); print((time.perf_counter() - inicio) * 1000)"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo], capture_output=True, text=True, env=ambiente(), cwd=RAIZ, check=True
+    ).stdout
+    return float(saida.split()[-1])
+
+
+def coluna(ms) -> str:
+    return f"{ms:>13.0f}" if ms is not None else f"{'-':>13}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de import e até o primeiro prompt dos pontos de entrada")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por medida (fica o mínimo)")
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_inicializacao_")
+    resultados: dict[str, dict] = {}
+    try:
+        bancos = {"produtos": os.path.join(diretorio, "produtos.db"), "sessoes": os.path.join(diretorio, "sessoes.db")}
+        print(f"Mínimo de {args.repeticoes} execuções, cada uma num interpretador novo\n")
+        print(f"{'ponto de entrada':<32}{'import (ms)':>13}{'prompt (ms)':>13}{'modelo (ms)':>13}")
+        for nome, (pasta, modulo, atributo, abrir_prompt) in PONTOS.items():
+            medidas = [medir_import(pasta, modulo) for _ in range(args.repeticoes)]
+            importacao, mais_caros, importados = min(medidas, key=lambda m: m[0])
+            carregados = [p for p in PROVEDORES if p in importados]
+            assert not carregados, f"{nome} importa {carregados} já no import"
+
+            prompt = None
+            if abrir_prompt:
+                comando = [sys.executable, "-c", f"{preparar(pasta, modulo)}; {abrir_prompt.format(**bancos)}"]
+                prompt = min(medir_prompt(comando) for _ in range(args.repeticoes))
+            try:
+                modelo = min(medir_modelo(pasta, modulo, atributo) for _ in range(args.repeticoes))
+            except subprocess.CalledProcessError as erro:  # ex.: provedor não instalado
+                modelo = None
+                print(f"  ({nome}: modelo não pôde ser criado: {erro.stderr.strip().splitlines()[-1]})")
+
+            resultados[nome] = {"import_ms": importacao, "prompt_ms": prompt, "modelo_ms": modelo,
+                                "mais_caros": dict(mais_caros)}
+            print(f"{nome:<32}{coluna(importacao)}{coluna(prompt)}{coluna(modelo)}")
+
+        for nome, script in SCRIPTS.items():
+            prompt = min(medir_prompt([sys.executable, os.path.join(RAIZ, script)]) for _ in range(args.repeticoes))
+            resultados[nome] = {"import_ms": None, "prompt_ms": prompt, "modelo_ms": None, "mais_caros": {}}
+            print(f"{nome:<32}{coluna(None)}{coluna(prompt)}{coluna(None)}")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    print("\nImports mais caros de cada módulo (ms, acumulado):")
+    for nome, r in resultados.items():
+        if r["mais_caros"]:
+            print(f"  {nome}: " + ", ".join(f"{m} {ms:.0f}" for m, ms in r["mais_caros"].items()))
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "resultados": resultados}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
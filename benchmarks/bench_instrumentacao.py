@@ -0,0 +1,160 @@
+# /src/benchmarks/bench_instrumentacao.py
+# Custo da instrumentação (comum/instrumentacao.py) desligada e ligada, e o que
+# ela registra num turno do chatbot de produtos e do agente do ch06 rodando com
+# o ModeloFalso e o checkpointer SQLite.
+#
+# Desligada, cada função marcada custa só um teste a mais por chamada; o
+# benchmark mede isso isoladamente e no turno inteiro. Ligada, confere que os
+# nós, a aresta de roteamento, as tools e o checkpointer aparecem no JSONL,
+# que o SQL das tools foi atribuído a elas, que o arquivo Prometheus é gerado
+# e que o CLI de resumo lê o JSONL.
+#
+# Uso: python benchmarks/bench_instrumentacao.py [--turnos 300] [--chamadas 1000000]
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa"), os.path.join(RAIZ, "ch06")]
+
+# Os modelos reais só são criados no primeiro uso (Preguicoso) e aqui não são usados;
+# as chaves fictícias valem só se algum for criado por engano, sem ir à rede
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("ANTHROPIC_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+os.environ.pop("INSTRUMENTACAO", None)
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from comum import instrumentacao  # noqa: E402
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+
+ROTEIRO_CH06 = [
+    [[{"name": "calcular", "args": {"operacao": "somar", "a": 2, "b": 3}}], "O resultado é cinco."],
+    [[{"name": "listar_tarefas", "args": {}}], "Estas são as suas tarefas."],
+    ["Olá! Como posso ajudar?"],
+]
+
+
+def custo_por_chamada(chamadas: int) -> tuple[float, float]:
+    """Nanossegundos por chamada de uma função vazia, sem e com o decorador (desligado)."""
+    def vazia(x):
+        return x
+
+    marcada = instrumentacao.instrumentar("bench")(vazia)
+    tempos = []
+    for funcao in (vazia, marcada):
+        inicio = time.perf_counter()
+        for i in range(chamadas):
+            funcao(i)
+        tempos.append((time.perf_counter() - inicio) / chamadas * 1e9)
+    return tempos[0], tempos[1]
+
+
+def turnos(agente, config: dict, quantidade: int) -> float:
+    """Milissegundos por turno."""
+    inicio = time.perf_counter()
+    for i in range(quantidade):
+        agente.invoke({"messages": [HumanMessage(content=f"Pedido {i}")]}, config)
+    return (time.perf_counter() - inicio) / quantidade * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overhead e conteúdo da instrumentação de nós, tools e SQL")
+    parser.add_argument("--turnos", type=int, default=300)
+    parser.add_argument("--chamadas", type=int, default=1_000_000, help="chamadas no teste do decorador isolado")
+    args = parser.parse_args()
+
+    import chatbot
+    import agente_react_completo
+    from checkpointer_sqlite import CheckpointerSQLite
+    from servidor import ROTEIRO_FALSO
+
+    diretorio = tempfile.mkdtemp(prefix="bench_instrumentacao_")
+    caminho_original = chatbot.DB_PATH
+    jsonl = os.path.join(diretorio, "metricas.jsonl")
+    prom = os.path.join(diretorio, "metricas.prom")
+    try:
+        plana, marcada = custo_por_chamada(args.chamadas)
+        print(f"Função vazia: {plana:.0f} ns; com @instrumentar desligado: {marcada:.0f} ns "
+              f"(+{marcada - plana:.0f} ns por chamada)\n")
+
+        def agentes():
+            """Agentes novos: conexões e checkpointer abertos com o estado atual da instrumentação."""
+            chatbot.configurar_banco(os.path.join(diretorio, "produtos.db"))
+            checkpointer = CheckpointerSQLite(os.path.join(diretorio, f"sessoes-{time.monotonic_ns()}.db"))
+            return {
+                "chatbot": (
+                    chatbot.criar_agente(checkpointer=checkpointer, modelo=ModeloFalso(roteiro=ROTEIRO_FALSO)),
+                    {"configurable": {"thread_id": "bench"}},
+                ),
+                "ch06": (
+                    agente_react_completo.create_agent(modelo=ModeloFalso(roteiro=ROTEIRO_CH06)),
+                    {"configurable": {"usuario_id": 1}},
+                ),
+            }
+
+        chatbot.configurar_banco(os.path.join(diretorio, "produtos.db"))
+        chatbot.inicializar_banco()
+        chatbot.criar_produtos_em_lote.invoke({"produtos": [
+            {"nome": f"produto {i}", "preco": 10.0 + i, "estoque": i % 30} for i in range(500)
+        ]})
+
+        # Aquecimento (imports preguiçosos, caches do LangGraph)
+        for agente, config in agentes().values():
+            turnos(agente, config, 5)
+
+        tempos = {}
+        for cenario in ("desligada", "ligada (JSONL)", "ligada (Prometheus)"):
+            if cenario != "desligada":
+                instrumentacao.ativar(jsonl if "JSONL" in cenario else prom)
+            for nome, (agente, config) in agentes().items():
+                tempos[cenario, nome] = turnos(agente, config, args.turnos)
+            instrumentacao.desativar()
+
+        print(f"{'instrumentação':<22}{'chatbot (ms/turno)':>20}{'ch06 (ms/turno)':>17}")
+        for cenario in ("desligada", "ligada (JSONL)", "ligada (Prometheus)"):
+            print(f"{cenario:<22}{tempos[cenario, 'chatbot']:>20.2f}{tempos[cenario, 'ch06']:>17.2f}")
+
+        with open(jsonl, encoding="utf-8") as arquivo:
+            medicoes = [json.loads(linha) for linha in arquivo]
+        vistos = {(m["tipo"], m["nome"]) for m in medicoes}
+        esperados = {
+            ("no", "contexto"), ("no", "llm"), ("no", "tools"), ("aresta", "rotear"),
+            ("tool", "listar_produtos"), ("tool", "produtos_estoque_abaixo"),
+            ("checkpoint", "put"), ("checkpoint", "put_writes"), ("checkpoint", "get_tuple"),
+            ("no", "llm_call"), ("no", "tool_node"), ("aresta", "should_continue"),
+            ("tool", "calcular"),
+        }
+        assert esperados <= vistos, f"faltaram medições: {esperados - vistos}"
+        # Com o cache de leituras, só as faltas chegam ao banco
+        assert any(m["sql_linhas"] > 0 for m in medicoes if m["nome"] == "listar_produtos"), "SQL não atribuído à tool"
+        assert all(m["sql_consultas"] > 0 for m in medicoes if m["nome"] == "put"), "SQL não atribuído ao checkpoint"
+        assert any(m["tokens_saida"] > 0 for m in medicoes if m["nome"] == "llm"), "tokens do LLM não registrados"
+
+        with open(prom, encoding="utf-8") as arquivo:
+            texto = arquivo.read()
+        assert 'agente_sql_segundos_total{tipo="tool",nome="listar_produtos"}' in texto
+        assert 'agente_duracao_segundos_count{tipo="checkpoint",nome="put"}' in texto
+
+        resumo = subprocess.run(
+            [sys.executable, "-m", "comum.instrumentacao", jsonl, "--ordenar", "total"],
+            cwd=RAIZ, capture_output=True, text=True, check=True,
+        ).stdout
+        print(f"\nResumo de {len(medicoes)} medições (python -m comum.instrumentacao metricas.jsonl):\n")
+        print(resumo)
+        assert "listar_produtos" in resumo and "put_writes" in resumo
+    finally:
+        instrumentacao.desativar()
+        chatbot.configurar_banco(caminho_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
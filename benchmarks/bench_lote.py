@@ -0,0 +1,84 @@
+# /src/benchmarks/bench_lote.py
+# Linhas por segundo: uma tool call por produto vs ferramentas em lote (executemany).
+#
+# Uso: python benchmarks/bench_lote.py [--itens 500] [--rodadas 3]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa")]
+
+import chatbot  # noqa: E402
+
+
+def cronometrar(funcao) -> float:
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def rodada(caminho: str, itens: int) -> dict[str, tuple[float, float]]:
+    """Executa criar/atualizar/excluir `itens` produtos pelos dois caminhos em um banco novo.
+
+    Returns:
+        operação -> (segundos item a item, segundos em lote)
+    """
+    chatbot.configurar_banco(caminho)
+    chatbot.inicializar_banco()
+    novos = [{"nome": f"produto {i}", "preco": 10.0 + i, "estoque": i % 50} for i in range(itens)]
+
+    # Item a item: uma tool call (e um commit) por produto; banco vazio => IDs 1..itens
+    ids_item = range(1, itens + 1)
+    t_criar = cronometrar(lambda: [chatbot.criar_produto.invoke(p) for p in novos])
+    t_atualizar = cronometrar(lambda: [chatbot.atualizar_produto.invoke({"id": i, "estoque": 7}) for i in ids_item])
+    t_excluir = cronometrar(lambda: [chatbot.excluir_produto.invoke({"id": i}) for i in ids_item])
+
+    # Em lote: uma tool call e uma transação para todos; IDs seguem de itens+1
+    ids_lote = list(range(itens + 1, 2 * itens + 1))
+    t_criar_lote = cronometrar(lambda: chatbot.criar_produtos_em_lote.invoke({"produtos": novos}))
+    t_atualizar_lote = cronometrar(lambda: chatbot.atualizar_produtos_em_lote.invoke(
+        {"produtos": [{"id": i, "estoque": 7} for i in ids_lote]}
+    ))
+    t_excluir_lote = cronometrar(lambda: chatbot.excluir_produtos_em_lote.invoke({"ids": ids_lote}))
+
+    restantes = chatbot.get_conexao().execute("SELECT COUNT(*) FROM produtos").fetchone()[0]
+    assert restantes == 0, f"{restantes} produtos não foram excluídos"
+    return {
+        "criar": (t_criar, t_criar_lote),
+        "atualizar": (t_atualizar, t_atualizar_lote),
+        "excluir": (t_excluir, t_excluir_lote),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput das ferramentas em lote vs item a item")
+    parser.add_argument("--itens", type=int, default=500)
+    parser.add_argument("--rodadas", type=int, default=3)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_lote_")
+    caminho_original = chatbot.DB_PATH
+    try:
+        melhores: dict[str, tuple[float, float]] = {}
+        for n in range(args.rodadas):
+            caminho = os.path.join(diretorio, f"produtos-{n}.db")
+            for operacao, (item, lote) in rodada(caminho, args.itens).items():
+                anterior = melhores.get(operacao, (float("inf"), float("inf")))
+                melhores[operacao] = (min(anterior[0], item), min(anterior[1], lote))
+
+        print(f"{args.itens} produtos por operação (melhor de {args.rodadas} rodadas)\n")
+        print(f"{'operação':<12}{'item a item (linhas/s)':>24}{'lote (linhas/s)':>18}{'ganho':>9}")
+        for operacao, (item, lote) in melhores.items():
+            print(f"{operacao:<12}{args.itens / item:>24.0f}{args.itens / lote:>18.0f}{item / lote:>8.1f}x")
+    finally:
+        chatbot.configurar_banco(caminho_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
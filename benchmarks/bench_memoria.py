@@ -0,0 +1,151 @@
+# /src/benchmarks/bench_memoria.py
+# Estratégias de memória dos chatbots do ch02 (comum/memoria.py) numa sessão
+# longa: completa (o comportamento antigo), janela por tokens, resumo contínuo
+# e híbrida.
+#
+# O modelo é falso: responde com um texto de tamanho variável e conta os
+# tokens que recebe, separando as chamadas de resumo. Para cada estratégia
+# mostra os tokens enviados por turno (média, último e máximo), os tokens
+# enviados ao resumo, o que a memória guarda ao final e o tempo gasto na
+# memória. Confere que as estratégias limitadas nunca passam do orçamento e
+# compara o ContadorTokens com recontar a janela inteira a cada turno.
+#
+# Uso: python benchmarks/bench_memoria.py [--turnos 2000] [--orcamento 4000]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "ch02")]
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_core.messages.utils import count_tokens_approximately  # noqa: E402
+
+from chatbot_com_memoria import Chatbot  # noqa: E402
+from comum.contexto import INSTRUCAO_RESUMO  # noqa: E402
+from comum.memoria import ESTRATEGIAS, ContadorTokens, criar_memoria  # noqa: E402
+
+INSTRUCOES = "Você é um assistente. Responda em português de forma concisa."
+RESUMO = "O usuário perguntou sobre produtos, preços e prazos de entrega; o assistente respondeu a cada um. "
+
+
+class ModeloFalso:
+    """Responde com 20 a 200 palavras e conta os tokens recebidos (conversa e resumos à parte)."""
+
+    def __init__(self, semente: int = 42):
+        self.rng = random.Random(semente)
+        self.por_turno: list[int] = []
+        self.tokens_resumo = 0
+
+    def invoke(self, mensagens, config=None):
+        tokens = count_tokens_approximately(mensagens)
+        primeira = mensagens[0].content if mensagens else ""
+        if isinstance(primeira, str) and primeira.startswith(INSTRUCAO_RESUMO[:40]):
+            self.tokens_resumo += tokens
+            return AIMessage(content=RESUMO * 4)
+        self.por_turno.append(tokens)
+        palavras = self.rng.randint(20, 200)
+        return AIMessage(content=" ".join(f"palavra{i}" for i in range(palavras)))
+
+
+def perguntas(turnos: int, semente: int = 7):
+    rng = random.Random(semente)
+    for i in range(turnos):
+        yield f"Pergunta {i}: " + " ".join(f"termo{rng.randint(0, 999)}" for _ in range(rng.randint(5, 60)))
+
+
+def sessao(estrategia: str, turnos: int, orcamento: int) -> dict:
+    modelo = ModeloFalso()
+    memoria = criar_memoria(estrategia, orcamento, modelo_resumo=modelo)
+    bot = Chatbot(INSTRUCOES, memoria=memoria, modelo=modelo)
+    tempo_memoria = 0.0
+    maior_memoria = 0
+    for texto in perguntas(turnos):
+        inicio = time.perf_counter()
+        mensagens = memoria.para_modelo([HumanMessage(content=texto)], INSTRUCOES)
+        tempo_memoria += time.perf_counter() - inicio
+        resposta = modelo.invoke(mensagens)
+        inicio = time.perf_counter()
+        memoria.adicionar(mensagens[-1], resposta)
+        # Inclui o tempo do resumo, que aqui é instantâneo
+        tempo_memoria += time.perf_counter() - inicio
+        maior_memoria = max(maior_memoria, memoria.tokens)
+        if estrategia != "completa":
+            assert memoria.tokens <= orcamento or len(memoria.mensagens()) == 2, (
+                f"{estrategia}: {memoria.tokens} tokens guardados com orçamento de {orcamento}"
+            )
+    # O Chatbot do ch02 enxerga a mesma memória
+    assert bot.historico[0].content == INSTRUCOES and bot.historico[1:] == memoria.mensagens()
+    return {
+        "media": sum(modelo.por_turno) / turnos,
+        "ultimo": modelo.por_turno[-1],
+        "maximo": max(modelo.por_turno),
+        "total": sum(modelo.por_turno) + modelo.tokens_resumo,
+        "resumo": modelo.tokens_resumo,
+        "resumos": memoria.resumos_gerados,
+        "guardadas": len(memoria.mensagens()),
+        "maior_memoria": maior_memoria,
+        "tempo_ms": tempo_memoria / turnos * 1000,
+    }
+
+
+def contagem(turnos: int, janela: int) -> tuple[float, float, ContadorTokens]:
+    """Segundos para somar os tokens da janela (últimas `janela` mensagens) a cada turno.
+
+    Sem cache cada mensagem é contada de novo em todo turno em que continua na
+    janela; com o ContadorTokens, só na primeira vez.
+    """
+    historico = []
+    for texto in perguntas(turnos):
+        historico += [HumanMessage(content=texto), AIMessage(content=texto * 3)]
+
+    inicio = time.perf_counter()
+    sem_cache = [count_tokens_approximately(historico[max(0, n - janela):n]) for n in range(2, len(historico) + 1, 2)]
+    recontando = time.perf_counter() - inicio
+
+    contador = ContadorTokens()
+    inicio = time.perf_counter()
+    com_cache = [contador(historico[max(0, n - janela):n]) for n in range(2, len(historico) + 1, 2)]
+    cacheado = time.perf_counter() - inicio
+    assert com_cache == sem_cache
+    return recontando, cacheado, contador
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estratégias de memória dos chatbots do ch02 em sessões longas")
+    parser.add_argument("--turnos", type=int, default=2000)
+    parser.add_argument("--orcamento", type=int, default=4000, help="tokens guardados pela memória")
+    args = parser.parse_args()
+
+    print(f"{args.turnos} turnos, orçamento de {args.orcamento} tokens (tokens aproximados)\n")
+    print(f"{'estratégia':<11}{'média/turno':>12}{'último':>9}{'máximo':>9}{'total':>12}{'p/ resumo':>11}"
+          f"{'resumos':>9}{'guardadas':>11}{'memória (ms/turno)':>20}")
+    resultados = {}
+    for estrategia in ESTRATEGIAS:
+        r = resultados[estrategia] = sessao(estrategia, args.turnos, args.orcamento)
+        print(f"{estrategia:<11}{r['media']:>12.0f}{r['ultimo']:>9}{r['maximo']:>9}{r['total']:>12}{r['resumo']:>11}"
+              f"{r['resumos']:>9}{r['guardadas']:>11}{r['tempo_ms']:>20.3f}")
+
+    completa = resultados["completa"]
+    for estrategia, r in resultados.items():
+        if estrategia != "completa":
+            assert r["maximo"] < completa["maximo"], f"{estrategia} não limitou o histórico"
+    print(f"\nÚltimo turno: completa envia {completa['ultimo']} tokens; "
+          + ", ".join(f"{e} {r['ultimo']}" for e, r in resultados.items() if e != "completa"))
+
+    # Mensagens que a janela costuma guardar com este orçamento
+    janela = max(2, resultados["janela"]["guardadas"])
+    recontando, cacheado, contador = contagem(args.turnos, janela)
+    print(f"\nSomar os tokens de uma janela de {janela} mensagens a cada turno: recontando {recontando * 1000:.0f} ms, "
+          f"ContadorTokens {cacheado * 1000:.0f} ms ({recontando / cacheado:.1f}x); "
+          f"{contador.calculadas} contagens e {contador.reaproveitadas} reaproveitadas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# /src/benchmarks/bench_modelos.py
+# Proteções do ModeloResiliente (comum/modelos.py) contra um provedor local
+# que injeta latência e erros:
+#
+#   latência       p50/p95/p99 com cauda lenta (3% das chamadas 25x mais
+#                  lentas): modelo direto, sem hedge e com hedge (asyncio e threads)
+#   tentativas     20% de 429/503: taxa de sucesso direto e com novas tentativas;
+#                  400 não é repetido; chamada travada estoura o prazo
+#   disjuntor      provedor fora do ar: quantas chamadas chegam a ele, custo da
+#                  recusa imediata, teste meio-aberto e recuperação
+#   limite         requisições/s com hedges: o total enviado respeita o limitador
+#   compatibilidade  bind_tools, streaming com nova tentativa antes do 1º chunk
+#                  e o agente do ch06 usando o modelo envolvido
+#
+# Uso: python benchmarks/bench_modelos.py [--chamadas 400] [--latencia 0.02]
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "ch06")]
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+
+from comum.carga import percentil  # noqa: E402
+from comum.limitador import LimitadorTaxa  # noqa: E402
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+from comum.modelos import CircuitoAberto, Resiliencia, envolver  # noqa: E402
+
+# Chamadas que chegaram ao provedor simulado (inclusive as que falharam)
+uso = {"chamadas": 0}
+
+
+class ErroProvedor(Exception):
+    """Erro HTTP simulado, com `status_code` como nas exceções dos SDKs."""
+
+    def __init__(self, status_code: int, mensagem: str):
+        super().__init__(f"Error code: {status_code} - {mensagem}")
+        self.status_code = status_code
+
+
+class ModeloInstavel(ModeloFalso):
+    """ModeloFalso com cauda de latência, erros transitórios e quedas.
+
+    Attributes:
+        cauda: Fração das chamadas que leva `lenta` segundos.
+        lenta: Latência das chamadas da cauda.
+        erros: Fração das chamadas que falha na hora com 429 ou 503.
+        falhas_iniciais: As primeiras chamadas (contadas em `uso`) falham com 503.
+        fora_do_ar: Todas as chamadas falham com 503.
+
+    Perguntas com "#invalida" falham com 400 (erro do pedido, não do provedor).
+    """
+
+    cauda: float = 0.0
+    lenta: float = 1.0
+    erros: float = 0.0
+    falhas_iniciais: int = 0
+    fora_do_ar: bool = False
+
+    def _responder(self, messages, kwargs):
+        uso["chamadas"] += 1
+        if self.fora_do_ar or uso["chamadas"] <= self.falhas_iniciais:
+            raise ErroProvedor(503, "Service Unavailable")
+        if "#invalida" in messages[-1].content:
+            raise ErroProvedor(400, "Bad Request")
+        if random.random() < self.erros:
+            raise ErroProvedor(random.choice((429, 503)), "Too Many Requests / Unavailable")
+        return super()._responder(messages, kwargs)
+
+    def _espera(self) -> float:
+        return self.lenta if random.random() < self.cauda else super()._espera()
+
+
+async def chamar_todas(modelo, chamadas: int, concorrencia: int) -> tuple[list[float], list[Exception], float]:
+    """Latência de cada chamada bem-sucedida, os erros e o tempo total."""
+    vagas = asyncio.Semaphore(concorrencia)
+    latencias, erros = [], []
+
+    async def uma(i: int):
+        async with vagas:
+            inicio = time.perf_counter()
+            try:
+                await modelo.ainvoke([HumanMessage(content=f"Pergunta {i}")])
+            except Exception as erro:
+                erros.append(erro)
+                return
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(uma(i) for i in range(chamadas)))
+    return latencias, erros, time.perf_counter() - inicio
+
+
+def chamar_em_threads(modelo, chamadas: int, concorrencia: int) -> list[float]:
+    def uma(i: int) -> float:
+        inicio = time.perf_counter()
+        modelo.invoke([HumanMessage(content=f"Pergunta {i}")])
+        return time.perf_counter() - inicio
+
+    with ThreadPoolExecutor(concorrencia) as executor:
+        return list(executor.map(uma, range(chamadas)))
+
+
+def latencia(args):
+    stub = ModeloInstavel(latencia=args.latencia, variacao=0.5, cauda=0.03, lenta=args.latencia * 25)
+    config = dict(hedge_amostras=20, tentativas=1)
+    print(f"{'modo':<24}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'chamadas extras':>17}")
+    p99 = {}
+    for nome in ("direto", "sem hedge", "com hedge", "com hedge (threads)"):
+        modelo = stub if nome == "direto" else envolver(stub, Resiliencia(hedge=nome != "sem hedge", **config))
+        # Regime estável: o hedge só começa depois das primeiras `hedge_amostras` latências
+        asyncio.run(chamar_todas(modelo, 2 * config["hedge_amostras"], 16))
+        uso["chamadas"] = 0
+        if "threads" in nome:
+            latencias = chamar_em_threads(modelo, args.chamadas, 16)
+        else:
+            latencias, erros, _ = asyncio.run(chamar_todas(modelo, args.chamadas, 16))
+            assert not erros
+        p99[nome] = percentil(latencias, 99)
+        extras = uso["chamadas"] - args.chamadas
+        print(f"{nome:<24}{percentil(latencias, 50) * 1000:>10.1f}{percentil(latencias, 95) * 1000:>10.1f}"
+              f"{p99[nome] * 1000:>10.1f}{extras:>11} ({extras / args.chamadas:.0%})")
+        if nome.startswith("com hedge"):
+            assert p99[nome] < p99["sem hedge"] / 2, "o hedge deveria cortar a cauda"
+            assert extras <= 0.1 * args.chamadas, "hedges demais"
+
+
+def tentativas(args):
+    stub = ModeloInstavel(latencia=args.latencia, erros=0.2)
+    resiliencia = Resiliencia(tentativas=4, espera_inicial=0.01, espera_maxima=0.1, hedge=False, falhas_para_abrir=50)
+    print(f"\n{'20% de 429/503':<24}{'sucesso':>10}{'chamadas':>10}{'segundos':>10}")
+    for nome, modelo in (("direto", stub), ("com novas tentativas", envolver(stub, resiliencia))):
+        uso["chamadas"] = 0
+        latencias, erros, segundos = asyncio.run(chamar_todas(modelo, args.chamadas, 32))
+        taxa = len(latencias) / args.chamadas
+        print(f"{nome:<24}{taxa:>10.1%}{uso['chamadas']:>10}{segundos:>10.2f}")
+    assert taxa >= 0.98, "as novas tentativas deveriam cobrir os erros transitórios"
+
+    # Erro do pedido: não adianta repetir
+    modelo = envolver(stub.model_copy(update={"erros": 0.0}), resiliencia)
+    uso["chamadas"] = 0
+    try:
+        modelo.invoke("pedido #invalida")
+        raise AssertionError("o 400 deveria chegar a quem chamou")
+    except ErroProvedor as erro:
+        assert erro.status_code == 400 and uso["chamadas"] == 1, "400 não deve ser repetido"
+
+    # Chamada travada: cada tentativa tem prazo
+    travado = envolver(
+        ModeloInstavel(latencia=2.0),
+        Resiliencia(tentativas=2, timeout=0.1, espera_inicial=0.01, hedge=False),
+    )
+    inicio = time.perf_counter()
+    for invocar in (travado.invoke, lambda m: asyncio.run(travado.ainvoke(m))):
+        try:
+            invocar("pergunta")
+            raise AssertionError("a chamada travada deveria estourar o prazo")
+        except TimeoutError:
+            pass
+    segundos = time.perf_counter() - inicio
+    assert segundos < 1.0, "o prazo não foi respeitado"
+    print(f"400 repassado sem nova tentativa; chamada travada (2 s) desistiu em {segundos / 2:.2f} s com 2 tentativas de 0.1 s")
+
+
+def disjuntor(args):
+    stub = ModeloInstavel(latencia=args.latencia, fora_do_ar=True)
+    modelo = envolver(stub, Resiliencia(tentativas=3, espera_inicial=0.005, hedge=False,
+                                        falhas_para_abrir=5, tempo_aberto=0.3))
+    uso["chamadas"] = 0
+    recusadas, inicio_recusas = 0, None
+    for _ in range(50):
+        try:
+            modelo.invoke("pergunta")
+        except CircuitoAberto:
+            recusadas += 1
+            inicio_recusas = inicio_recusas or time.perf_counter()
+        except ErroProvedor:
+            pass
+    custo = (time.perf_counter() - inicio_recusas) / recusadas
+    print(f"\nProvedor fora do ar, 50 pedidos: {uso['chamadas']} chegaram a ele, {recusadas} recusados na hora "
+          f"({custo * 1e6:.0f} µs cada); disjuntor {modelo.disjuntor.estado}")
+    assert uso["chamadas"] == 5, "o disjuntor deveria abrir após 5 falhas seguidas"
+    assert recusadas >= 48 and custo < 0.001
+
+    # Meio-aberto com o provedor ainda fora: uma chamada de teste e abre de novo
+    time.sleep(0.3)
+    for _ in range(3):
+        try:
+            modelo.invoke("pergunta")
+        except (CircuitoAberto, ErroProvedor):
+            pass
+    assert uso["chamadas"] == 6 and modelo.disjuntor.aberturas == 2
+
+    # Provedor de volta: a chamada de teste passa e o disjuntor fecha
+    stub.fora_do_ar = False
+    time.sleep(0.3)
+    assert modelo.invoke("pergunta").content and modelo.disjuntor.estado == "fechado"
+    print(f"Teste meio-aberto com o provedor fora: 1 chamada, reabriu; com ele de volta: fechou "
+          f"({modelo.disjuntor.aberturas} aberturas)")
+
+
+def limite(args):
+    # Saturado, o limitador segura os hedges; com folga, eles saem dentro do limite
+    print()
+    for rps, concorrencia in ((40, 32), (200, 8)):
+        stub = ModeloInstavel(latencia=args.latencia, cauda=0.1, lenta=0.3)
+        modelo = envolver(stub, Resiliencia(hedge_amostras=10), limitador=LimitadorTaxa(rps))
+        uso["chamadas"] = 0
+        latencias, erros, segundos = asyncio.run(chamar_todas(modelo, 200, concorrencia))
+        assert not erros
+        print(f"Limite de {rps} req/s, {concorrencia} em paralelo: {uso['chamadas']} chamadas "
+              f"({modelo.metricas.hedges} hedges) em {segundos:.2f} s = {uso['chamadas'] / segundos:.1f} req/s")
+        assert uso["chamadas"] <= rps + rps * segundos, "hedges passaram do limite"
+
+
+ROTEIRO_CH06 = [
+    [[{"name": "calcular", "args": {"operacao": "somar", "a": 2, "b": 3}}], "O resultado é cinco."],
+]
+
+
+def compatibilidade(args):
+    @tool
+    def calcular(operacao: str, a: float, b: float) -> str:
+        """Faz uma operação com dois números."""
+        return str(a + b)
+
+    modelo = envolver(ModeloFalso(roteiro=ROTEIRO_CH06), Resiliencia(hedge=False))
+    resposta = modelo.bind_tools([calcular]).invoke("Quanto é 2 + 3?")
+    assert resposta.tool_calls[0]["name"] == "calcular"
+
+    # Falha antes do primeiro chunk: nova tentativa transparente para quem lê o stream
+    uso["chamadas"] = 0
+    instavel = envolver(ModeloInstavel(falhas_iniciais=1), Resiliencia(espera_inicial=0.01, hedge=False))
+    texto = "".join(c.content for c in instavel.stream("oi"))
+    assert texto == instavel.invoke("oi").content and uso["chamadas"] == 3
+
+    import agente_react_completo
+
+    agente = agente_react_completo.create_agent(modelo=modelo)
+    estado = agente.invoke({"messages": [HumanMessage(content="Quanto é 2 + 3?")]}, {"configurable": {"usuario_id": 1}})
+    assert estado["messages"][-1].content == "O resultado é cinco."
+    print("\nbind_tools, streaming (com nova tentativa antes do 1º chunk) e agente do ch06: ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedge, novas tentativas, disjuntor e limite do ModeloResiliente")
+    parser.add_argument("--chamadas", type=int, default=400)
+    parser.add_argument("--latencia", type=float, default=0.02, help="segundos por chamada do provedor simulado")
+    parser.add_argument("--semente", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.semente)
+
+    print(f"{args.chamadas} chamadas, latência de {args.latencia * 1000:.0f} ms (+ até 50%)\n")
+    latencia(args)
+    tentativas(args)
+    disjuntor(args)
+    limite(args)
+    compatibilidade(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# /src/benchmarks/bench_prefixo_estavel.py
+# Prefixo estável do AssistenteContextualizado (ch02) e montagem das mensagens
+# sem cópia.
+#
+# Cache: o modelo falso imita o cache de prefixo dos provedores. Cada
+# requisição reaproveita o maior prefixo (em fronteiras de mensagem) já visto
+# numa requisição anterior, desde que tenha pelo menos `--minimo-cache`
+# tokens, e informa isso em `usage_metadata` como um provedor de verdade; a
+# taxa de acerto sai do MetricasCache. O relógio é simulado e avança
+# `--intervalo` segundos por turno. Compara o modo antigo (data/hora no
+# system prompt) com o de prefixo estável, para cada estratégia de memória.
+#
+# Montagem: custo por turno de montar a lista enviada ao modelo e percorrê-la
+# uma vez, copiando o histórico (como antes) ou com a VisaoMensagens, para
+# históricos de vários tamanhos. A última coluna mede o `invoke` inteiro de um
+# chat model do LangChain (o ModeloFalso, sem latência): o BaseChatModel
+# converte a entrada numa lista nova, então ali a cópia do histórico acontece
+# de qualquer jeito e o ganho da visão fica restrito à montagem.
+#
+# Uso: python benchmarks/bench_prefixo_estavel.py [--turnos 300] [--intervalo 45] [--minimo-cache 1024]
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "ch02")]
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage  # noqa: E402
+
+from assistente_contextualizado import AssistenteContextualizado  # noqa: E402
+from comum.cache_prompt import MetricasCache  # noqa: E402
+from comum.memoria import ContadorTokens, MemoriaCompleta, criar_memoria  # noqa: E402
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+
+
+class ModeloCachePrefixo:
+    """Responde com texto de tamanho variável e simula o cache de prefixo do provedor."""
+
+    def __init__(self, minimo_tokens: int = 1024, semente: int = 42):
+        self.minimo_tokens = minimo_tokens
+        self.rng = random.Random(semente)
+        self.contador = ContadorTokens()
+        self.metricas = MetricasCache()
+        # Hashes encadeados dos prefixos já cacheados
+        self.prefixos: set[int] = set()
+
+    def invoke(self, mensagens, config=None):
+        chave, tokens, lidos, novos = 0, 0, 0, []
+        for m in mensagens:
+            chave = hash((chave, m.type, m.content))
+            tokens += self.contador.tokens(m)
+            if chave in self.prefixos:
+                lidos = tokens
+            elif tokens >= self.minimo_tokens:
+                novos.append(chave)
+        self.prefixos.update(novos)
+        if lidos < self.minimo_tokens:
+            lidos = 0
+        palavras = self.rng.randint(20, 200)
+        resposta = AIMessage(
+            content=" ".join(f"palavra{i}" for i in range(palavras)),
+            usage_metadata={
+                "input_tokens": tokens,
+                "output_tokens": palavras,
+                "total_tokens": tokens + palavras,
+                "input_token_details": {"cache_read": lidos},
+            },
+        )
+        self.metricas.registrar(resposta)
+        return resposta
+
+
+def perguntas(turnos: int, semente: int = 7):
+    rng = random.Random(semente)
+    for i in range(turnos):
+        yield f"Pergunta {i}: " + " ".join(f"termo{rng.randint(0, 999)}" for _ in range(rng.randint(5, 60)))
+
+
+def sessao(estrategia: str, prefixo_estavel: bool, args) -> dict:
+    modelo = ModeloCachePrefixo(args.minimo_cache)
+    inicio = datetime(2025, 3, 10, 9, 0, 7)
+    turno = [0]
+    assistente = AssistenteContextualizado(
+        "Ana",
+        memoria=criar_memoria(estrategia, args.orcamento),
+        modelo=modelo,
+        prefixo_estavel=prefixo_estavel,
+        relogio=lambda: inicio + timedelta(seconds=turno[0] * args.intervalo),
+    )
+    for texto in perguntas(args.turnos):
+        assistente.conversar(texto)
+        turno[0] += 1
+    # A data/hora não fica guardada na memória
+    assert all(not str(m.content).startswith("[Contexto:") for m in assistente.historico)
+    return modelo.metricas.resumo()
+
+
+def montar_copiando(memoria, novas, system_prompt):
+    """Como `para_modelo` montava a lista antes: system + cópia do histórico + novas."""
+    return [SystemMessage(content=system_prompt)] + list(memoria._mensagens) + list(novas)
+
+
+def _memoria_com(tamanho: int) -> MemoriaCompleta:
+    memoria = MemoriaCompleta()
+    for i in range(tamanho // 2):
+        memoria._mensagens.extend((HumanMessage(content=f"p{i}"), AIMessage(content=f"r{i}")))
+    return memoria
+
+
+NOVAS = (HumanMessage(content="nova"), HumanMessage(content="[Contexto: agora são 09:00 de 10/03/2025]"))
+MONTAGENS = (montar_copiando, lambda m, n, s: m.para_modelo(n, s))
+
+
+def montagem(tamanho: int, repeticoes: int) -> tuple[float, float]:
+    """µs por turno para montar e percorrer as mensagens com `tamanho` mensagens no histórico."""
+    memoria = _memoria_com(tamanho)
+    resultados = []
+    for montar in MONTAGENS:
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            mensagens = montar(memoria, NOVAS, "Você é o Jarvis.")
+            for _ in mensagens:  # o provedor percorre a lista uma vez para serializá-la
+                pass
+            assert mensagens[-2] is NOVAS[0] and len(mensagens) == tamanho + 3
+            melhor = min(melhor, time.perf_counter() - inicio)
+        resultados.append(melhor * 1e6)
+    return resultados[0], resultados[1]
+
+
+def invoke_completo(tamanho: int, repeticoes: int) -> tuple[float, float]:
+    """µs por turno de montar as mensagens e chamar `invoke` de um chat model sem latência."""
+    memoria = _memoria_com(tamanho)
+    modelo = ModeloFalso(roteiro=[["ok"]])
+    resultados = []
+    for montar in MONTAGENS:
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            modelo.invoke(montar(memoria, NOVAS, "Você é o Jarvis."))
+            melhor = min(melhor, time.perf_counter() - inicio)
+        resultados.append(melhor * 1e6)
+    return resultados[0], resultados[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de prefixo e montagem de mensagens do AssistenteContextualizado")
+    parser.add_argument("--turnos", type=int, default=300)
+    parser.add_argument("--intervalo", type=float, default=45.0, help="segundos simulados entre turnos")
+    parser.add_argument("--minimo-cache", type=int, default=1024, help="menor prefixo (tokens) que o provedor cacheia")
+    parser.add_argument("--orcamento", type=int, default=4000, help="tokens guardados pela memória")
+    args = parser.parse_args()
+
+    print(f"{args.turnos} turnos, {args.intervalo:.0f} s entre turnos, cache a partir de {args.minimo_cache} tokens\n")
+    print(f"{'memória':<10}{'modo':<17}{'entrada':>10}{'do cache':>10}{'acerto':>9}")
+    for estrategia in ("completa", "hibrida", "janela"):
+        taxas = {}
+        for prefixo_estavel, modo in ((False, "data no system"), (True, "prefixo estável")):
+            r = sessao(estrategia, prefixo_estavel, args)
+            taxas[prefixo_estavel] = r["taxa_acerto"]
+            print(f"{estrategia:<10}{modo:<17}{r['entrada']:>10}{r['lidos_do_cache']:>10}{r['taxa_acerto']:>9.1%}")
+        assert taxas[True] >= taxas[False], f"{estrategia}: o prefixo estável não melhorou o cache"
+
+    print(f"\n{'':>10}{'montagem':>26}{'invoke inteiro':>26}")
+    print(f"{'histórico':>10}" + f"{'cópia (µs)':>13}{'visão (µs)':>13}" * 2)
+    for tamanho in (100, 1_000, 10_000, 100_000):
+        repeticoes = 20 if tamanho < 100_000 else 5
+        copia, visao = montagem(tamanho, repeticoes)
+        invoke_copia, invoke_visao = invoke_completo(tamanho, repeticoes)
+        print(f"{tamanho:>10}{copia:>13.1f}{visao:>13.1f}{invoke_copia:>13.1f}{invoke_visao:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
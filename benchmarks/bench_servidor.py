@@ -0,0 +1,198 @@
+# /src/benchmarks/bench_servidor.py
+# Teste de carga do servidor HTTP (tarefa/servidor.py) com o ModeloFalso: sobe o
+# servidor em outro processo e aumenta o número de sessões simultâneas (cada uma
+# com sua conexão keep-alive) até a latência sair do objetivo ou surgirem 503/504.
+# Informa quantas sessões concorrentes um processo sustenta.
+#
+# Também confere o streaming SSE e que o servidor rejeita com 503 (em vez de
+# enfileirar sem limite) quando a fila enche.
+#
+# Nenhuma chamada de rede externa é feita; pode rodar em CI.
+#
+# Uso: python benchmarks/bench_servidor.py [--niveis 10,50,100,200,400] [--turnos 5]
+#        [--latencia 0.5] [--slo-p95 2.0] [--max-concorrentes 256] [--sessoes-em-memoria]
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from comum.carga import percentil  # noqa: E402
+
+
+class Cliente:
+    """Cliente HTTP/1.1 mínimo com uma conexão keep-alive."""
+
+    def __init__(self, porta: int):
+        self.porta = porta
+        self.reader = self.writer = None
+
+    async def requisitar(self, metodo: str, caminho: str, dados: dict = None, headers: dict = None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.porta)
+        corpo = json.dumps(dados).encode() if dados is not None else b""
+        linhas = [f"{metodo} {caminho} HTTP/1.1", "Host: localhost", f"Content-Length: {len(corpo)}"]
+        linhas += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        self.writer.write(("\r\n".join(linhas) + "\r\n\r\n").encode() + corpo)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        cabecalhos = {}
+        while (linha := await self.reader.readline()) not in (b"\r\n", b""):
+            nome, _, valor = linha.decode().partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+        if "content-length" in cabecalhos:
+            resposta = await self.reader.readexactly(int(cabecalhos["content-length"]))
+        else:
+            resposta = await self.reader.read()
+        if cabecalhos.get("connection") == "close":
+            self.fechar()
+        return status, resposta
+
+    def fechar(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def nivel(porta: int, sessoes: int, turnos: int) -> dict:
+    latencias, status = [], {}
+
+    async def sessao():
+        cliente = Cliente(porta)
+        try:
+            _, corpo = await cliente.requisitar("POST", "/sessoes")
+            caminho = f"/sessoes/{json.loads(corpo)['sessao']}/mensagens"
+            for turno in range(turnos):
+                inicio = time.perf_counter()
+                codigo, _ = await cliente.requisitar("POST", caminho, {"mensagem": f"Pedido {turno}"})
+                status[codigo] = status.get(codigo, 0) + 1
+                if codigo == 200:
+                    latencias.append(time.perf_counter() - inicio)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status["conexão"] = status.get("conexão", 0) + 1
+        finally:
+            cliente.fechar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(sessao() for _ in range(sessoes)))
+    duracao = time.perf_counter() - inicio
+    return {
+        "sessoes": sessoes,
+        "ok": status.get(200, 0),
+        "falhas": sum(n for codigo, n in status.items() if codigo != 200),
+        "status": status,
+        "turnos_por_s": len(latencias) / duracao,
+        "p50": percentil(latencias, 50),
+        "p95": percentil(latencias, 95),
+        "p99": percentil(latencias, 99),
+    }
+
+
+async def verificar_streaming(porta: int):
+    cliente = Cliente(porta)
+    _, corpo = await cliente.requisitar("POST", "/sessoes")
+    sessao = json.loads(corpo)["sessao"]
+    codigo, eventos = await cliente.requisitar(
+        "POST", f"/sessoes/{sessao}/mensagens", {"mensagem": "oi"}, {"Accept": "text/event-stream"}
+    )
+    eventos = eventos.decode()
+    assert codigo == 200 and "event: tool_fim" in eventos and "event: fim" in eventos, eventos
+    cliente.fechar()
+
+
+async def saude(porta: int) -> dict:
+    cliente = Cliente(porta)
+    _, corpo = await cliente.requisitar("GET", "/saude")
+    cliente.fechar()
+    return json.loads(corpo)
+
+
+def iniciar_servidor(diretorio: str, *argumentos: str) -> tuple[subprocess.Popen, int]:
+    ambiente = {
+        **os.environ,
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "offline"),
+        "ANTHROPIC_API_KEY": os.environ.get("ANTHROPIC_API_KEY", "offline"),
+        "CACHE_RESPOSTAS": "0",
+    }
+    processo = subprocess.Popen(
+        [
+            sys.executable, os.path.join(RAIZ, "tarefa", "servidor.py"), "--porta", "0", "--modelo-falso",
+            "--banco", os.path.join(diretorio, "produtos.db"), "--sessoes-db", os.path.join(diretorio, "sessoes.db"),
+            *argumentos,
+        ],
+        stdout=subprocess.PIPE, text=True, env=ambiente,
+    )
+    linha = processo.stdout.readline()
+    if "ouvindo em" not in linha:
+        processo.kill()
+        raise RuntimeError(f"servidor não iniciou: {linha!r}")
+    return processo, int(linha.rsplit(":", 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor HTTP do chatbot")
+    parser.add_argument("--niveis", default="10,50,100,200,400", help="sessões simultâneas por nível")
+    parser.add_argument("--turnos", type=int, default=5)
+    parser.add_argument("--latencia", type=float, default=0.5, help="segundos por chamada ao modelo falso")
+    parser.add_argument("--slo-p95", type=float, default=2.0, help="p95 máximo aceito por turno (s)")
+    parser.add_argument("--max-concorrentes", type=int, default=256)
+    parser.add_argument("--sessoes-em-memoria", action="store_true")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_servidor_")
+    processos = []
+    try:
+        extras = ["--latencia", str(args.latencia), "--max-concorrentes", str(args.max_concorrentes),
+                  "--max-fila", str(args.max_concorrentes * 4), "--espera-maxima", "30"]
+        if args.sessoes_em_memoria:
+            extras.append("--sessoes-em-memoria")
+        processo, porta = iniciar_servidor(diretorio, *extras)
+        processos.append(processo)
+        asyncio.run(verificar_streaming(porta))
+
+        checkpointer = "memória" if args.sessoes_em_memoria else "SQLite"
+        print(f"Modelo falso de {args.latencia * 1000:.0f} ms, {args.turnos} turnos por sessão, checkpointer "
+              f"{checkpointer}, max_concorrentes {args.max_concorrentes}, SLO p95 {args.slo_p95:.2f} s\n")
+        print(f"{'sessões':>8}{'turnos ok':>11}{'falhas':>8}{'turnos/s':>10}{'p50 (s)':>9}{'p95 (s)':>9}{'p99 (s)':>9}")
+        sustentadas = 0
+        for sessoes in (int(n) for n in args.niveis.split(",")):
+            r = asyncio.run(nivel(porta, sessoes, args.turnos))
+            print(f"{sessoes:>8}{r['ok']:>11}{r['falhas']:>8}{r['turnos_por_s']:>10.1f}"
+                  f"{r['p50']:>9.3f}{r['p95']:>9.3f}{r['p99']:>9.3f}")
+            if r["falhas"] or r["p95"] > args.slo_p95:
+                break
+            sustentadas = sessoes
+        estado = asyncio.run(saude(porta))
+        print(f"\nSessões simultâneas dentro do SLO: {sustentadas}")
+        print(f"Servidor: {estado['concluidos']} turnos, {estado['rejeitados']} rejeitados, "
+              f"{estado['timeouts']} timeouts, {estado['erros']} erros")
+        assert estado["erros"] == 0, "o servidor registrou erros internos"
+
+        # Backpressure: 2 vagas e fila de 2, com 20 sessões chegando juntas
+        processo, porta = iniciar_servidor(
+            diretorio, "--latencia", str(args.latencia), "--max-concorrentes", "2", "--max-fila", "2",
+            "--espera-maxima", "0.1", "--sessoes-em-memoria",
+        )
+        processos.append(processo)
+        r = asyncio.run(nivel(porta, 20, 1))
+        print(f"Backpressure (2 vagas, fila 2, 20 sessões): {r['ok']} atendidas, "
+              f"{r['status'].get(503, 0)} recusadas com 503")
+        assert r["status"].get(503, 0) > 0 and r["ok"] > 0, r["status"]
+    finally:
+        for processo in processos:
+            processo.terminate()
+            processo.wait()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
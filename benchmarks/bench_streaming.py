@@ -0,0 +1,126 @@
+# /src/benchmarks/bench_streaming.py
+# Tempo até o primeiro token (TTFT) com streaming vs esperar o `invoke` terminar,
+# nos dois agentes (chatbot de produtos e agente ReAct do ch06), com o
+# ModeloFalso gerando tokens com atraso entre eles, como uma API real.
+#
+# Sem streaming o usuário só vê algo quando o loop ReAct inteiro acaba; com
+# `comum.streaming.transmitir` o primeiro token chega assim que a chamada final
+# ao LLM começa a gerar. Também confere que os tokens concatenados formam a
+# resposta final e que cada tool tem evento de início e de fim.
+#
+# Uso: python benchmarks/bench_streaming.py [--turnos 10] [--latencia 0.3] [--por-token 0.03]
+
+import argparse
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tarefa"), os.path.join(RAIZ, "ch06")]
+
+# Os modelos reais só são criados no primeiro uso (Preguicoso) e aqui não são usados;
+# as chaves fictícias valem só se algum for criado por engano, sem ir à rede
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("ANTHROPIC_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+from comum.streaming import imprimir_eventos, transmitir  # noqa: E402
+
+ROTEIRO_CHATBOT = [
+    [[{"name": "listar_produtos", "args": {"quantidade": 5}}], "Aqui estão os cinco primeiros produtos do catálogo, ordenados por id."],
+    [
+        [{"name": "produtos_estoque_abaixo", "args": {"limite": 10}}, {"name": "listar_produtos", "args": {"filtro_nome": "mouse"}}],
+        "Estes são os produtos com estoque abaixo de dez unidades e os mouses cadastrados.",
+    ],
+    ["Olá! Posso listar, criar, atualizar ou excluir produtos do catálogo."],
+]
+
+ROTEIRO_CH06 = [
+    [[{"name": "calcular", "args": {"operacao": "somar", "a": 2, "b": 3}}], "O resultado da soma de dois com três é cinco."],
+    [[{"name": "listar_tarefas", "args": {}}], "Estas são as suas tarefas cadastradas no momento."],
+    ["Olá! Como posso ajudar com suas tarefas hoje?"],
+]
+
+
+def medir(agente, config: dict, turnos: int) -> dict:
+    invoke, ttft, total = [], [], []
+    for turno in range(turnos):
+        entrada = {"messages": [HumanMessage(content=f"Pedido {turno}")]}
+        inicio = time.perf_counter()
+        agente.invoke(entrada, config)
+        invoke.append(time.perf_counter() - inicio)
+
+        eventos = list(transmitir(agente, entrada, config))
+        fim = eventos[-1]
+        ttft.append(fim.primeiro_token)
+        total.append(fim.total)
+
+        tokens = "".join(e.texto for e in eventos if e.tipo == "token")
+        assert tokens == fim.texto, (tokens, fim.texto)
+        inicios = {e.tool_call_id for e in eventos if e.tipo == "tool_inicio"}
+        fins = {e.tool_call_id for e in eventos if e.tipo == "tool_fim"}
+        assert inicios == fins, "tool sem evento de início ou de fim"
+    return {
+        "invoke": statistics.fmean(invoke),
+        "ttft": statistics.fmean(ttft),
+        "total": statistics.fmean(total),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo até o primeiro token com streaming dos agentes")
+    parser.add_argument("--turnos", type=int, default=10)
+    parser.add_argument("--latencia", type=float, default=0.3, help="segundos até o primeiro chunk do modelo falso")
+    parser.add_argument("--por-token", type=float, default=0.03, help="segundos entre chunks")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_streaming_")
+    import chatbot
+    caminho_original = os.path.join(os.path.dirname(chatbot.__file__), "produtos.db")
+    try:
+        chatbot.configurar_banco(os.path.join(diretorio, "produtos.db"))
+        chatbot.inicializar_banco()
+        import agente_react_completo
+
+        def modelo(roteiro):
+            return ModeloFalso(roteiro=roteiro, latencia=args.latencia, latencia_por_token=args.por_token)
+
+        agentes = {
+            "chatbot": (
+                chatbot.criar_agente(checkpointer=MemorySaver(), modelo=modelo(ROTEIRO_CHATBOT)),
+                {"configurable": {"thread_id": "streaming"}},
+            ),
+            "ch06": (agente_react_completo.create_agent(modelo=modelo(ROTEIRO_CH06)), {"configurable": {"usuario_id": 1}}),
+        }
+
+        print(f"Modelo falso: {args.latencia * 1000:.0f} ms até o primeiro chunk, "
+              f"{args.por_token * 1000:.0f} ms entre chunks; médias de {args.turnos} turnos\n")
+        print(f"{'agente':<10}{'invoke (s)':>12}{'TTFT stream (s)':>17}{'total stream (s)':>18}{'ganho TTFT':>12}")
+        for nome, (agente, config) in agentes.items():
+            r = medir(agente, config, args.turnos)
+            print(f"{nome:<10}{r['invoke']:>12.3f}{r['ttft']:>17.3f}{r['total']:>18.3f}{r['invoke'] / r['ttft']:>11.1f}x")
+            assert r["ttft"] < r["invoke"], "o primeiro token não chegou antes do fim do turno"
+
+        # Renderização do CLI, numa sessão nova: o ModeloFalso escolhe o turno do
+        # roteiro pelo histórico, e o 1º turno é o que chama tools
+        saida = io.StringIO()
+        agente, _ = agentes["chatbot"]
+        config = {"configurable": {"thread_id": "cli"}}
+        imprimir_eventos(transmitir(agente, {"messages": [HumanMessage(content="oi")]}, config), "Assistente: ", saida)
+        print("\nSaída do CLI:\n" + saida.getvalue())
+        assert "[tool]" in saida.getvalue() and "primeiro token em" in saida.getvalue()
+    finally:
+        chatbot.configurar_banco(caminho_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# /src/benchmarks/bench_tarefas.py
+# Repositório de tarefas do ch06 (ch06/repositorio_tarefas.py) contra o antigo
+# `dict[usuario_id, list[dict]]` com `NEXT_ID` global, com 100k tarefas por usuário.
+#
+# Mede criação, conclusão por id, listagem filtrada por estado e busca por id,
+# em memória e com persistência SQLite, e as tools `concluir_tarefa` e
+# `listar_tarefas` do agente. Confere também que ids alocados por várias threads
+# não se repetem, que o repositório recarregado do SQLite é igual ao em memória
+# e que as listagens batem com as do formato antigo.
+#
+# Uso: python benchmarks/bench_tarefas.py [--tarefas 100000] [--usuarios 3] [--operacoes 2000]
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "ch06")]
+
+# O módulo do agente cria o modelo real ao ser importado; ele nunca é chamado
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("CACHE_RESPOSTAS", "0")
+
+from repositorio_tarefas import RepositorioTarefas  # noqa: E402
+
+
+class Antigo:
+    """O armazenamento anterior do agente, reproduzido para comparação."""
+
+    def __init__(self):
+        self.db: dict[int, list[dict]] = {}
+        self.next_id = 1
+
+    def criar(self, usuario_id: int, titulo: str, vencimento=None):
+        self.db.setdefault(usuario_id, []).append(
+            {"id": self.next_id, "titulo": titulo, "estado": "pendente", "vencimento": vencimento}
+        )
+        self.next_id += 1
+
+    def concluir(self, usuario_id: int, tarefa_id: int):
+        for tarefa in self.db.get(usuario_id, []):
+            if tarefa["id"] == tarefa_id:
+                tarefa["estado"] = "concluida"
+                return tarefa
+        return None
+
+    def listar(self, usuario_id: int, estado=None):
+        tarefas = self.db.get(usuario_id, [])
+        return [t for t in tarefas if t["estado"] == estado] if estado else list(tarefas)
+
+
+def cronometrar(funcao, *args) -> float:
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repositório indexado de tarefas vs dict de listas")
+    parser.add_argument("--tarefas", type=int, default=100_000, help="tarefas por usuário")
+    parser.add_argument("--usuarios", type=int, default=3)
+    parser.add_argument("--operacoes", type=int, default=2000, help="conclusões e buscas por id medidas")
+    parser.add_argument("--listagens", type=int, default=20)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_tarefas_")
+    try:
+        usuarios = list(range(1, args.usuarios + 1))
+        rng = random.Random(42)
+        # Usuários intercalados: as tarefas de cada um ficam espalhadas pelos ids
+        criacoes = [(u, f"tarefa {i} de {u}", f"2025-12-{1 + i % 28:02d}") for i in range(args.tarefas) for u in usuarios]
+        total = len(criacoes)
+        alvos = [(u, rng.randint(1, total)) for u in rng.choices(usuarios, k=args.operacoes)]
+
+        armazenamentos = {
+            "dict de listas (antigo)": Antigo(),
+            "repositório em memória": RepositorioTarefas(),
+            "repositório + SQLite": RepositorioTarefas(os.path.join(diretorio, "tarefas.db")),
+        }
+        print(f"{args.usuarios} usuários x {args.tarefas} tarefas; tempos por operação\n")
+        print(f"{'armazenamento':<26}{'criar (µs)':>12}{'concluir (µs)':>15}{'listar pend. (ms)':>19}{'listar todas (ms)':>19}")
+        listagens = {}
+        for nome, repo in armazenamentos.items():
+            # Uma transação por tarefa, como nas tools
+            tempo_criar = cronometrar(lambda: [repo.criar(u, t, v) for u, t, v in criacoes])
+
+            tempo_concluir = cronometrar(lambda: [repo.concluir(u, i) for u, i in alvos])
+            pendentes = cronometrar(lambda: [repo.listar(u, "pendente") for u in usuarios * args.listagens])
+            todas = cronometrar(lambda: [repo.listar(u) for u in usuarios * args.listagens])
+            n_listagens = len(usuarios) * args.listagens
+            print(f"{nome:<26}{tempo_criar / total * 1e6:>12.2f}{tempo_concluir / len(alvos) * 1e6:>15.2f}"
+                  f"{pendentes / n_listagens * 1000:>19.2f}{todas / n_listagens * 1000:>19.2f}")
+            listagens[nome] = {
+                (u, e): [(t["id"], t["estado"]) if isinstance(t, dict) else (t.id, t.estado) for t in repo.listar(u, e)]
+                for u in usuarios for e in (None, "pendente", "concluida")
+            }
+
+        referencia = listagens["dict de listas (antigo)"]
+        for nome, resultado in listagens.items():
+            assert resultado == referencia, f"{nome}: listagens diferem do formato antigo"
+
+        # Persistência: recarregar o arquivo devolve o mesmo conteúdo
+        persistido = armazenamentos["repositório + SQLite"]
+        persistido.fechar()
+        inicio = time.perf_counter()
+        recarregado = RepositorioTarefas(persistido.caminho)
+        tempo_carga = time.perf_counter() - inicio
+        assert len(recarregado) == total
+        for u in usuarios:
+            assert recarregado.listar(u) == armazenamentos["repositório em memória"].listar(u)
+        novo = recarregado.criar(usuarios[0], "depois de recarregar")
+        assert novo.id == total + 1, "o alocador de ids não continuou do maior id gravado"
+        recarregado.fechar()
+        print(f"\nRecarga de {total} tarefas do SQLite: {tempo_carga:.2f} s")
+
+        # Ids únicos com criação concorrente
+        repo = RepositorioTarefas()
+        threads = [
+            threading.Thread(target=lambda u=u: [repo.criar(u, f"t{i}") for i in range(20_000)]) for u in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ids = [t.id for u in range(8) for t in repo.listar(u)]
+        assert len(ids) == len(set(ids)) == 160_000, "ids repetidos com criação concorrente"
+        print("160000 tarefas criadas por 8 threads: ids únicos.")
+
+        # Tools do agente sobre o repositório cheio
+        import agente_react_completo as agente
+        agente.TAREFAS = armazenamentos["repositório em memória"]
+        config = {"configurable": {"usuario_id": usuarios[0]}}
+        inicio = time.perf_counter()
+        for u, i in alvos[:500]:
+            agente.concluir_tarefa.invoke({"tarefa_id": i}, config)
+        concluir = (time.perf_counter() - inicio) / 500
+        inicio = time.perf_counter()
+        resposta = agente.listar_tarefas.invoke({"estado": "concluida"}, config)
+        listar = time.perf_counter() - inicio
+        assert resposta.startswith(f"Encontradas {agente.TAREFAS.contar(usuarios[0], 'concluida')} tarefa(s)")
+        print(f"Tool concluir_tarefa: {concluir * 1e6:.0f} µs; listar_tarefas (concluídas): {listar * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# /src/benchmarks/bench_tools_paralelas.py
+# Tempo de parede de um turno com várias tool calls lentas: sequencial vs threads vs asyncio.
+#
+# Também confere que as ToolMessages saem na ordem das chamadas e que o erro de
+# uma tool não afeta as outras.
+#
+# Uso: python benchmarks/bench_tools_paralelas.py [--chamadas 8] [--latencia 0.2] [--limite 4]
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from langchain_core.tools import tool  # noqa: E402
+
+from comum.execucao_tools import executar_tool_calls, aexecutar_tool_calls  # noqa: E402
+
+
+@tool
+def consulta_lenta(chave: str, segundos: float) -> str:
+    """Simula uma tool de I/O lento (API externa, banco remoto)."""
+    time.sleep(segundos)
+    return f"resultado de {chave}"
+
+
+@tool
+async def aconsulta_lenta(chave: str, segundos: float) -> str:
+    """Versão assíncrona nativa da consulta lenta."""
+    await asyncio.sleep(segundos)
+    return f"resultado de {chave}"
+
+
+@tool
+def consulta_quebrada(chave: str) -> str:
+    """Tool que sempre falha."""
+    raise RuntimeError(f"falha simulada em {chave}")
+
+
+TOOLS = {t.name: t for t in (consulta_lenta, aconsulta_lenta, consulta_quebrada)}
+
+
+def montar_chamadas(nome_tool: str, quantidade: int, latencia: float) -> list[dict]:
+    chamadas = [
+        {"name": nome_tool, "args": {"chave": f"k{i}", "segundos": latencia}, "id": f"call-{i}", "type": "tool_call"}
+        for i in range(quantidade)
+    ]
+    # Uma chamada quebrada no meio e uma tool inexistente no fim
+    chamadas.insert(quantidade // 2, {"name": "consulta_quebrada", "args": {"chave": "x"}, "id": "call-erro", "type": "tool_call"})
+    chamadas.append({"name": "nao_existe", "args": {}, "id": "call-desconhecida", "type": "tool_call"})
+    return chamadas
+
+
+def conferir(chamadas: list[dict], mensagens: list) -> None:
+    assert [m.tool_call_id for m in mensagens] == [c["id"] for c in chamadas], "ordem das ToolMessages mudou"
+    for chamada, mensagem in zip(chamadas, mensagens):
+        if chamada["id"] == "call-erro":
+            assert mensagem.content.startswith("Erro ao executar consulta_quebrada"), mensagem.content
+        elif chamada["id"] == "call-desconhecida":
+            assert mensagem.content.startswith("Erro ao executar nao_existe"), mensagem.content
+        else:
+            assert mensagem.content == f"resultado de {chamada['args']['chave']}", mensagem.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execução paralela das tool calls de um turno")
+    parser.add_argument("--chamadas", type=int, default=8)
+    parser.add_argument("--latencia", type=float, default=0.2)
+    parser.add_argument("--limite", type=int, default=4, help="máximo de tools simultâneas")
+    args = parser.parse_args()
+
+    sincronas = montar_chamadas("consulta_lenta", args.chamadas, args.latencia)
+    assincronas = montar_chamadas("aconsulta_lenta", args.chamadas, args.latencia)
+    cenarios = {
+        "sequencial (limite 1)": lambda: executar_tool_calls(sincronas, TOOLS, max_concorrencia=1),
+        f"threads (limite {args.limite})": lambda: executar_tool_calls(sincronas, TOOLS, max_concorrencia=args.limite),
+        f"asyncio (limite {args.limite})": lambda: asyncio.run(
+            aexecutar_tool_calls(assincronas, TOOLS, max_concorrencia=args.limite)
+        ),
+        f"threads via config (max_concurrency={args.chamadas})": lambda: executar_tool_calls(
+            sincronas, TOOLS, config={"max_concurrency": args.chamadas}
+        ),
+    }
+
+    print(f"{args.chamadas} tool calls de {args.latencia:.2f} s + 2 com erro por turno\n")
+    print(f"{'cenário':<44}{'tempo (s)':>10}{'speedup':>10}")
+    base = None
+    for nome, executar in cenarios.items():
+        inicio = time.perf_counter()
+        mensagens = executar()
+        tempo = time.perf_counter() - inicio
+        conferir(sincronas if "asyncio" not in nome else assincronas, mensagens)
+        base = base or tempo
+        print(f"{nome:<44}{tempo:>10.3f}{base / tempo:>9.1f}x")
+
+    ideal = args.latencia * -(-args.chamadas // args.limite)
+    print(f"\nOrdem e isolamento de erros conferidos. Mínimo teórico com limite {args.limite}: {ideal:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# /src/benchmarks/bench_tradutor.py
+# Linhas por segundo do tradutor (ch01/tradutor.py): uma chamada bloqueante por
+# linha (o modo interativo aplicado a um arquivo) vs o modo arquivo, com
+# pedidos agrupados e concorrentes.
+#
+# O modelo é o ModeloFalso com latência fixa por chamada mais um tempo por
+# palavra gerada, como uma API real; a "tradução" é determinística, então a
+# saída é conferida linha a linha (ordem e conteúdo). O arquivo tem linhas
+# repetidas, reaproveitadas pelo cache. Uma rodada extra injeta falhas e
+# respostas fora do formato para exercitar as novas tentativas e a volta para
+# pedidos de uma linha; outra, sem novas tentativas, confere que as linhas que
+# falham saem marcadas sem interromper o arquivo.
+#
+# Uso: python benchmarks/bench_tradutor.py [--linhas 2000] [--latencia 0.2] [--por-palavra 0.001]
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "ch01")]
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+from tradutor import INSTRUCAO_LOTE, MARCA_FALHA, conversar, traduzir_arquivo  # noqa: E402
+
+_sorteio = random.Random(3)
+
+
+def traduzir(texto: str) -> str:
+    return "jp " + " ".join(palavra[::-1] for palavra in texto.split())
+
+
+class ModeloTradutorFalso(ModeloFalso):
+    """ModeloFalso que "traduz" a última mensagem, linha a linha nos pedidos numerados.
+
+    Attributes:
+        falhas: Fração das chamadas que levantam erro.
+        fora_do_formato: Fração dos pedidos numerados respondidos sem a última linha.
+    """
+
+    falhas: float = 0.0
+    fora_do_formato: float = 0.0
+
+    def _responder(self, messages, kwargs) -> AIMessage:
+        if _sorteio.random() < self.falhas:
+            raise ConnectionError("falha simulada do provedor")
+        texto = messages[-1].content
+        if messages[0].content == INSTRUCAO_LOTE:
+            linhas = [linha.split("| ", 1) for linha in texto.splitlines()]
+            if _sorteio.random() < self.fora_do_formato:
+                linhas = linhas[:-1]
+            resposta = "\n".join(f"{n}| {traduzir(t)}" for n, t in linhas)
+        else:
+            resposta = traduzir(texto)
+        return AIMessage(content=resposta)
+
+
+def gerar_linhas(quantidade: int, repetidas: float, semente: int = 11) -> list[str]:
+    rng = random.Random(semente)
+    linhas = []
+    for i in range(quantidade):
+        if linhas and rng.random() < repetidas:
+            linhas.append(rng.choice(linhas))
+        elif rng.random() < 0.03:
+            linhas.append("")
+        else:
+            linhas.append(f"Frase {i}: " + " ".join(f"palavra{rng.randint(0, 999)}" for _ in range(rng.randint(3, 25))))
+    return linhas
+
+
+def conferir(linhas: list[str], saida: str) -> int:
+    """Confere ordem e conteúdo da saída; devolve quantas linhas saíram marcadas como falha."""
+    traduzidas = saida.split("\n")[:-1]
+    assert len(traduzidas) == len(linhas), f"{len(traduzidas)} linhas na saída para {len(linhas)} na entrada"
+    marcadas = 0
+    for original, traduzida in zip(linhas, traduzidas):
+        esperada = traduzir(original) if original.strip() else original
+        marcadas += traduzida == MARCA_FALHA + original
+        assert traduzida in (esperada, MARCA_FALHA + original), f"{original!r} -> {traduzida!r}"
+    return marcadas
+
+
+def por_linha(modelo, linhas: list[str]) -> float:
+    """Segundos para traduzir `linhas` com uma chamada bloqueante por linha."""
+    inicio = time.perf_counter()
+    for linha in linhas:
+        if linha.strip():
+            assert conversar(modelo, linha) == traduzir(linha)
+    return time.perf_counter() - inicio
+
+
+def em_lotes(modelo, linhas: list[str], **opcoes) -> tuple[float, dict]:
+    saida = io.StringIO()
+    inicio = time.perf_counter()
+    estatisticas = traduzir_arquivo(modelo, io.StringIO("\n".join(linhas) + "\n"), saida, **opcoes)
+    segundos = time.perf_counter() - inicio
+    assert conferir(linhas, saida.getvalue()) == estatisticas["falhas"]
+    return segundos, estatisticas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão do tradutor: linha a linha vs modo arquivo em lotes")
+    parser.add_argument("--linhas", type=int, default=2000)
+    parser.add_argument("--repetidas", type=float, default=0.3, help="fração de linhas repetidas no arquivo")
+    parser.add_argument("--latencia", type=float, default=0.2, help="segundos fixos por chamada")
+    parser.add_argument("--por-palavra", type=float, default=0.001, help="segundos por palavra gerada")
+    parser.add_argument("--amostra", type=int, default=30, help="linhas medidas no modo linha a linha")
+    args = parser.parse_args()
+
+    linhas = gerar_linhas(args.linhas, args.repetidas)
+    modelo = ModeloTradutorFalso(latencia=args.latencia, latencia_por_token=args.por_palavra)
+    print(f"{args.linhas} linhas ({args.repetidas:.0%} repetidas), {args.latencia * 1000:.0f} ms por chamada "
+          f"+ {args.por_palavra * 1000:.1f} ms por palavra\n")
+    print(f"{'modo':<34}{'segundos':>10}{'linhas/s':>11}{'pedidos':>9}")
+
+    amostra = linhas[:args.amostra]
+    segundos = por_linha(modelo, amostra)
+    base = len(amostra) / segundos
+    print(f"{'uma chamada por linha (amostra)':<34}{segundos:>10.2f}{base:>11.1f}{sum(map(bool, amostra)):>9}")
+
+    for linhas_pedido, concorrencia in ((1, 8), (50, 1), (50, 4), (50, 8)):
+        segundos, est = em_lotes(modelo, linhas, max_linhas=linhas_pedido, max_concorrencia=concorrencia)
+        vazao = len(linhas) / segundos
+        print(f"{f'lotes de {linhas_pedido}, {concorrencia} em paralelo':<34}{segundos:>10.2f}{vazao:>11.1f}{est['pedidos']:>9}")
+        assert est["traduzidas"] + est["reaproveitadas"] <= est["linhas"]
+        if linhas_pedido > 1 and concorrencia > 1:
+            assert vazao > 10 * base, "o modo arquivo deveria ser bem mais rápido que linha a linha"
+
+    instavel = ModeloTradutorFalso(
+        latencia=args.latencia, latencia_por_token=args.por_palavra, falhas=0.1, fora_do_formato=0.1
+    )
+    segundos, est = em_lotes(instavel, linhas, max_concorrencia=8, espera_inicial=0.01, tentativas=6)
+    print(f"\nCom 10% de falhas e 10% de respostas fora do formato: {segundos:.2f} s, {est['pedidos']} pedidos, "
+          f"{est['novas_tentativas']} novas tentativas, {est['lotes_refeitos']} lotes refeitos linha a linha; "
+          f"saída conferida.")
+    assert est["falhas"] == 0, "com 6 tentativas nenhuma linha deveria ficar sem tradução"
+
+    falho = ModeloTradutorFalso(latencia=args.latencia, latencia_por_token=args.por_palavra, falhas=0.3)
+    segundos, est = em_lotes(falho, linhas, max_concorrencia=8, tentativas=1)
+    print(f"Com 30% de falhas e sem novas tentativas: {segundos:.2f} s, {est['falhas']} de {est['linhas']} linhas "
+          f"marcadas sem tradução; arquivo completo.")
+    assert est["falhas"] > 0
+
+
+if __name__ == "__main__":
+    main()
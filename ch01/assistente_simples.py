@@ -1,28 +1,194 @@
 # assistente_simples.py
+#
+# Sem argumentos: conversa interativa. Com --lote, responde uma lista de
+# perguntas independentes (uma por linha, "-" para a entrada padrão) em
+# paralelo, respeitando os limites de taxa do provedor:
+#
+#   python assistente_simples.py --lote faq.txt --concorrencia 8 --rps 5 --tpm 200000
+import argparse
+import asyncio
 import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Sequence
+
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda
+
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.limitador import LimitadorTaxa  # noqa: E402
+from comum.modelos import ModeloResiliente, criar_modelo  # noqa: E402
 
 load_dotenv()
 
-def criar_assistente():
-    """Cria e retorna uma instância do modelo."""
-    return ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0.4
-    )
+SYSTEM_PROMPT = "Você é um assistente prestativo que responde em português."
 
-def conversar(modelo, pergunta: str) -> str:
-    """Envia uma pergunta ao modelo e retorna a resposta."""
-    mensagens = [
-        SystemMessage(content="Você é um assistente prestativo que responde em português."),
+# Tokens de saída reservados por pergunta antes de a resposta chegar
+TOKENS_SAIDA_ESTIMADOS = 500
+
+def criar_assistente(limitador: Optional[LimitadorTaxa] = None):
+    """Cria e retorna uma instância do modelo.
+
+    `limitador` substitui o limite compartilhado de MODELO_RPS/MODELO_TPM.
+    """
+    return criar_modelo("google", temperature=0.4, cache=False, limitador=limitador)
+
+def _mensagens(pergunta: str) -> list:
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
         HumanMessage(content=pergunta)
     ]
-    resposta = modelo.invoke(mensagens)
+
+def conversar(modelo, pergunta: str) -> str:
+    """Envia uma pergunta ao modelo e retorna a resposta."""
+    resposta = modelo.invoke(_mensagens(pergunta))
     return resposta.content
 
-def main():
+
+@dataclass
+class RespostaLote:
+    """Resultado de uma pergunta do lote: a resposta ou o erro da última tentativa."""
+
+    indice: int
+    pergunta: str
+    resposta: Optional[str] = None
+    erro: Optional[str] = None
+    segundos: float = 0.0  # do início do lote até a resposta
+
+    @property
+    def ok(self) -> bool:
+        return self.erro is None
+
+
+def _cadeia_lote(
+    modelo, limitador: Optional[LimitadorTaxa], tentativas: Optional[int], espera_inicial: float
+):
+    """Runnable pergunta -> texto: espera a vez no limitador, chama o modelo e tenta de novo se falhar.
+
+    O ModeloResiliente já tem as próprias novas tentativas e o próprio
+    limitador: com ele, `tentativas` passa a 1 por padrão (senão cada tentativa
+    daqui repetiria as de lá) e um segundo limitador é recusado.
+    """
+    if isinstance(modelo, ModeloResiliente):
+        if limitador is not None and modelo.limitador is not None:
+            raise ValueError("o modelo já tem limitador; passe o do lote para criar_modelo(limitador=...)")
+        tentativas = 1 if tentativas is None else tentativas
+    tentativas = max(1, 3 if tentativas is None else tentativas)
+
+    async def aperguntar(pergunta: str) -> str:
+        mensagens = _mensagens(pergunta)
+        reservados = count_tokens_approximately(mensagens) + TOKENS_SAIDA_ESTIMADOS
+        for tentativa in range(tentativas):
+            # Cada tentativa também passa pelo limitador
+            if limitador is not None:
+                await limitador.aesperar(reservados)
+            try:
+                resposta = await modelo.ainvoke(mensagens)
+            except Exception:
+                if limitador is not None:
+                    limitador.corrigir(-reservados)  # a chamada falhou: os tokens não foram usados
+                if tentativa == tentativas - 1:
+                    raise
+                # Espera exponencial com jitter
+                await asyncio.sleep(espera_inicial * 2 ** tentativa * (1 + random.random() / 2))
+                continue
+            uso = resposta.usage_metadata or {}
+            if limitador is not None and uso.get("total_tokens"):
+                limitador.corrigir(uso["total_tokens"] - reservados)
+            return resposta.text
+
+    # Não usamos `with_retry`: o `abatch_as_completed` dele repassa as
+    # chamadas direto ao runnable interno, sem as novas tentativas
+    return RunnableLambda(aperguntar)
+
+
+async def aconversar_lote(
+    modelo,
+    perguntas: Sequence[str],
+    *,
+    max_concorrencia: int = 8,
+    limitador: Optional[LimitadorTaxa] = None,
+    tentativas: Optional[int] = None,
+    espera_inicial: float = 1.0,
+    em_ordem: bool = True,
+) -> AsyncIterator[RespostaLote]:
+    """Responde perguntas independentes em paralelo, entregando cada resultado assim que possível.
+
+    Com `em_ordem`, os resultados saem na ordem das perguntas (cada um assim
+    que ele e os anteriores ficam prontos); sem, na ordem em que terminam. Uma
+    pergunta que falha em todas as tentativas vira um RespostaLote com `erro`,
+    sem interromper as demais.
+
+    `tentativas` (padrão: 3, ou 1 com um ModeloResiliente) e `limitador` são
+    para modelos sem as proteções de `comum.modelos`; com `criar_modelo`, o
+    limite vai no próprio modelo.
+    """
+    cadeia = _cadeia_lote(modelo, limitador, tentativas, espera_inicial)
+    vagas = asyncio.Semaphore(max(1, max_concorrencia))
+    inicio = time.perf_counter()
+
+    async def responder(indice: int, pergunta: str) -> RespostaLote:
+        resultado = RespostaLote(indice, pergunta)
+        async with vagas:
+            try:
+                resultado.resposta = await cadeia.ainvoke(pergunta)
+            except Exception as erro:
+                resultado.erro = f"{type(erro).__name__}: {erro}"
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+    # Como o `abatch` do LangChain (tarefas atrás de um semáforo), mas criadas
+    # na ordem das perguntas: o `abatch_as_completed` as inicia numa ordem
+    # arbitrária, e a primeira pergunta podia ser a última a sair
+    tarefas = [asyncio.create_task(responder(i, p)) for i, p in enumerate(perguntas)]
+    try:
+        if em_ordem:
+            for tarefa in tarefas:
+                yield await tarefa
+        else:
+            for proxima in asyncio.as_completed(tarefas):
+                yield await proxima
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+
+def conversar_lote(modelo, perguntas: Sequence[str], **opcoes) -> list[RespostaLote]:
+    """Versão síncrona de `aconversar_lote`: a lista de resultados, na ordem das perguntas."""
+    async def coletar():
+        return [r async for r in aconversar_lote(modelo, perguntas, **opcoes)]
+
+    return sorted(asyncio.run(coletar()), key=lambda r: r.indice)
+
+
+def modo_lote(args):
+    entrada = sys.stdin if args.lote == "-" else open(args.lote, encoding="utf-8")
+    with entrada:
+        perguntas = [linha.strip() for linha in entrada if linha.strip()]
+    # O limite vai no modelo, que já tenta de novo e espera a cota a cada tentativa
+    limitador = LimitadorTaxa(args.rps, args.tpm) if args.rps or args.tpm else None
+    modelo = criar_assistente(limitador)
+
+    async def executar() -> int:
+        falhas = 0
+        async for r in aconversar_lote(
+            modelo, perguntas, max_concorrencia=args.concorrencia, em_ordem=not args.fora_de_ordem,
+        ):
+            falhas += not r.ok
+            print(f"[{r.indice + 1}] {r.pergunta}")
+            print(f"{r.resposta}\n" if r.ok else f"ERRO: {r.erro}\n", flush=True)
+        return falhas
+
+    falhas = asyncio.run(executar())
+    print(f"{len(perguntas) - falhas} de {len(perguntas)} perguntas respondidas", file=sys.stderr)
+    return 1 if falhas else 0
+
+def modo_interativo():
     print("=== Assistente Simples ===")
     print("Digite 'sair' para encerrar.\n")
 
@@ -41,5 +207,19 @@ def main():
         resposta = conversar(modelo, pergunta)
         print(f"Assistente: {resposta}\n")
 
+def main():
+    parser = argparse.ArgumentParser(description="Assistente simples: conversa interativa ou lote de perguntas")
+    parser.add_argument("--lote", help='arquivo com uma pergunta por linha ("-" para a entrada padrão)')
+    parser.add_argument("--concorrencia", type=int, default=8, help="perguntas em andamento ao mesmo tempo")
+    parser.add_argument("--rps", type=float, help="máximo de requisições por segundo")
+    parser.add_argument("--tpm", type=float, help="máximo de tokens por minuto")
+    parser.add_argument("--fora-de-ordem", action="store_true", help="mostrar cada resposta assim que chegar")
+    args = parser.parse_args()
+
+    if args.lote is None:
+        modo_interativo()
+        return
+    sys.exit(modo_lote(args))
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,28 +1,39 @@
 # hello_llm.py
 import os
+import sys
 from dotenv import load_dotenv
-# from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
 
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import Resiliencia, criar_modelo  # noqa: E402
+from comum.preguicoso import Preguicoso  # noqa: E402
+
 # Carregar variáveis de ambiente do arquivo .env
 load_dotenv()
 
-# Criar instância do modelo
-modelo = ChatGoogleGenerativeAI(
-    model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-    temperature=0,  # 0 = determinístico, 1 = criativo
-    max_output_tokens=1024,
-    max_retries=3,
-    timeout=30,
-)
+# Criar instância do modelo (o import do provedor é o passo mais lento do
+# script, então ele só acontece no primeiro uso)
+# `criar_modelo` já aplica timeout, novas tentativas com espera, limite de taxa
+# e o cache de respostas (respostas repetidas vêm do cache)
+def _criar_modelo():
+    return criar_modelo(
+        "google",
+        temperature=0,  # 0 = determinístico, 1 = criativo
+        resiliencia=Resiliencia(tentativas=3, timeout=30),
+        max_output_tokens=1024,
+    )
+
+modelo = Preguicoso(_criar_modelo)
+# Prepara o modelo em segundo plano enquanto o usuário digita
+modelo.aquecer()
 
 #Criando loop para criar interação entre usuario e modelo:
 while True:
     mensagem = HumanMessage(content=input("Você: "))
     # Invocar o modelo
-    resposta = modelo.invoke([mensagem])
+    resposta = modelo.obter().invoke([mensagem])
     # Exibir a resposta
     print(f"Resposta do modelo1: {resposta.content}")
     if 'Tchau' in resposta.content:
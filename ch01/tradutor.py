@@ -1,28 +1,257 @@
-# assistente_simples.py
+# tradutor.py
+#
+# Sem argumentos: modo interativo, uma linha por vez.
+# Com um arquivo (ou "-" para a entrada padrão): traduz o arquivo inteiro em
+# lotes e escreve a tradução linha a linha, na ordem da entrada.
+#
+#   python tradutor.py textos.txt --saida textos.ja.txt --concorrencia 4
+#   cat textos.txt | python tradutor.py -
+#
+# No modo arquivo as linhas são lidas aos poucos e agrupadas em pedidos
+# numerados ("N| texto") até `max_caracteres`; até `max_concorrencia` pedidos
+# ficam em andamento ao mesmo tempo, e a saída é escrita assim que as linhas do
+# início do arquivo ficam prontas. Linhas repetidas são traduzidas uma vez só.
+import argparse
+import asyncio
 import os
+import random
+import re
+import sys
+from collections import OrderedDict, deque
+from typing import Optional, TextIO
+
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import ModeloResiliente, criar_modelo  # noqa: E402
+
 load_dotenv()
 
+INSTRUCAO = "Você é um sistema tradutor. Responda quaisquer mensagens apenas com sua tradução para o japonês, em romaji."
+
+INSTRUCAO_LOTE = INSTRUCAO + """
+Você receberá várias linhas numeradas no formato "N| texto". Traduza cada uma separadamente e responda
+com exatamente uma linha por entrada, no mesmo formato "N| tradução", mantendo a numeração e a ordem."""
+
+# Limites de cada pedido do modo arquivo e pedidos em andamento ao mesmo tempo
+MAX_CARACTERES_LOTE = int(os.getenv("TRADUTOR_MAX_CARACTERES", "4000"))
+MAX_LINHAS_LOTE = int(os.getenv("TRADUTOR_MAX_LINHAS", "50"))
+MAX_CONCORRENCIA = int(os.getenv("TRADUTOR_CONCORRENCIA", "4"))
+
+# Início das linhas que ficaram sem tradução no modo arquivo (seguido do texto original)
+MARCA_FALHA = "[sem tradução] "
+
+_LINHA_NUMERADA = re.compile(r"^\s*(\d+)\s*\|\s?(.*)$")
+
 def criar_assistente():
     """Cria e retorna uma instância do modelo."""
-    return ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0.4
-    )
+    return criar_modelo("google", temperature=0.4, cache=False)
 
 def conversar(modelo, pergunta: str) -> str:
     """Envia uma pergunta ao modelo e retorna a resposta."""
     mensagens = [
-        SystemMessage(content="Você é um sistema tradutor. Responda quaisquer mensagens apenas com sua tradução para o japonês, em romaji."),
+        SystemMessage(content=INSTRUCAO),
         HumanMessage(content=pergunta)
     ]
     resposta = modelo.invoke(mensagens)
     return resposta.content
 
-def main():
+
+class FalhaTraducao(Exception):
+    """Linha que ficou sem tradução: o pedido dela falhou em todas as tentativas."""
+
+    def __init__(self, linha: str, erro: Exception):
+        super().__init__(f"{type(erro).__name__}: {erro}")
+        self.linha = linha
+
+
+class TradutorLotes:
+    """Traduz arquivos grandes em pedidos agrupados e concorrentes.
+
+    Args:
+        modelo: Chat model usado nas traduções.
+        max_caracteres: Tamanho máximo do texto de um pedido (uma linha maior
+            que isso vai sozinha).
+        max_linhas: Máximo de linhas por pedido.
+        max_concorrencia: Pedidos em andamento ao mesmo tempo.
+        tentativas: Tentativas por pedido antes de desistir (padrão: 3, ou 1
+            com um ModeloResiliente, que já tenta de novo por conta própria).
+        espera_inicial: Segundos antes da 2ª tentativa; dobra a cada nova falha.
+        max_cache: Traduções guardadas para reaproveitar linhas repetidas.
+    """
+
+    def __init__(
+        self,
+        modelo,
+        *,
+        max_caracteres: int = MAX_CARACTERES_LOTE,
+        max_linhas: int = MAX_LINHAS_LOTE,
+        max_concorrencia: int = MAX_CONCORRENCIA,
+        tentativas: Optional[int] = None,
+        espera_inicial: float = 1.0,
+        max_cache: int = 100_000,
+    ):
+        self.modelo = modelo
+        self.max_caracteres = max_caracteres
+        self.max_linhas = max_linhas
+        self.max_concorrencia = max(1, max_concorrencia)
+        if tentativas is None:
+            tentativas = 1 if isinstance(modelo, ModeloResiliente) else 3
+        self.tentativas = max(1, tentativas)
+        self.espera_inicial = espera_inicial
+        self.max_cache = max_cache
+        # linha -> tradução, do uso mais antigo para o mais recente
+        self.cache: OrderedDict[str, str] = OrderedDict()
+        self.estatisticas = {"linhas": 0, "traduzidas": 0, "reaproveitadas": 0, "pedidos": 0,
+                             "novas_tentativas": 0, "lotes_refeitos": 0, "falhas": 0}
+
+    # === PEDIDOS ===
+
+    def _pedido(self, grupo: list[str]) -> list:
+        if len(grupo) == 1:
+            return [SystemMessage(content=INSTRUCAO), HumanMessage(content=grupo[0])]
+        numeradas = "\n".join(f"{i}| {linha}" for i, linha in enumerate(grupo, 1))
+        return [SystemMessage(content=INSTRUCAO_LOTE), HumanMessage(content=numeradas)]
+
+    def _interpretar(self, texto: str, quantidade: int) -> Optional[list[str]]:
+        """Traduções na ordem do pedido, ou None se a resposta não trouxer exatamente 1..quantidade."""
+        if quantidade == 1:
+            return [texto.strip()]
+        traducoes: dict[int, str] = {}
+        for linha in texto.splitlines():
+            encontrada = _LINHA_NUMERADA.match(linha)
+            if encontrada:
+                traducoes[int(encontrada.group(1))] = encontrada.group(2).strip()
+        if sorted(traducoes) != list(range(1, quantidade + 1)):
+            return None
+        return [traducoes[i] for i in range(1, quantidade + 1)]
+
+    async def _pedir(self, grupo: list[str]) -> Optional[list[str]]:
+        """Envia um pedido, tentando de novo com espera exponencial se a chamada falhar."""
+        for tentativa in range(self.tentativas):
+            try:
+                self.estatisticas["pedidos"] += 1
+                resposta = await self.modelo.ainvoke(self._pedido(grupo))
+                return self._interpretar(resposta.text, len(grupo))
+            except Exception:
+                if tentativa == self.tentativas - 1:
+                    raise
+                self.estatisticas["novas_tentativas"] += 1
+                # Jitter para que pedidos que falharam juntos não voltem juntos
+                await asyncio.sleep(self.espera_inicial * 2 ** tentativa * (1 + random.random() / 2))
+
+    async def _traduzir_grupo(self, grupo: list[str], vagas: asyncio.Semaphore, em_andamento: dict):
+        try:
+            async with vagas:
+                traducoes = await self._pedir(grupo)
+            if traducoes is None:
+                # Resposta fora do formato numerado: cada linha vira um pedido próprio
+                self.estatisticas["lotes_refeitos"] += 1
+                await asyncio.gather(*(self._traduzir_grupo([linha], vagas, em_andamento) for linha in grupo))
+                return
+            for linha, traducao in zip(grupo, traducoes):
+                self._guardar(linha, traducao)
+                em_andamento.pop(linha).set_result(traducao)
+        except Exception as erro:
+            for linha in grupo:
+                futuro = em_andamento.pop(linha, None)
+                if futuro is not None:
+                    futuro.set_exception(FalhaTraducao(linha, erro))
+
+    def _guardar(self, linha: str, traducao: str):
+        self.cache[linha] = traducao
+        if len(self.cache) > self.max_cache:
+            self.cache.popitem(last=False)
+
+    # === ARQUIVO ===
+
+    async def traduzir_arquivo(self, entrada: TextIO, saida: TextIO) -> dict:
+        """Traduz `entrada` linha a linha para `saida`, na mesma ordem; devolve as estatísticas."""
+        loop = asyncio.get_running_loop()
+        vagas = asyncio.Semaphore(self.max_concorrencia)
+        # Linhas na ordem da entrada: a tradução pronta ou o futuro dela
+        pendentes: deque = deque()
+        # Linha ainda sem tradução -> futuro compartilhado pelas repetições dela
+        em_andamento: dict[str, asyncio.Future] = {}
+        tarefas: set[asyncio.Task] = set()
+        grupo: list[str] = []
+        tamanho_grupo = 0
+        # Limita o que fica na memória quando a leitura é mais rápida que o modelo
+        max_pendentes = 2 * (self.max_concorrencia + 1) * self.max_linhas
+
+        def despachar():
+            nonlocal grupo, tamanho_grupo
+            if grupo:
+                tarefa = asyncio.create_task(self._traduzir_grupo(grupo, vagas, em_andamento))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+                grupo, tamanho_grupo = [], 0
+
+        def escrever_prontas():
+            while pendentes and (isinstance(pendentes[0], str) or pendentes[0].done()):
+                item = pendentes.popleft()
+                if isinstance(item, str):
+                    texto = item
+                elif item.exception() is not None:
+                    # Uma falha não interrompe o arquivo: a linha sai marcada, com o original
+                    texto = MARCA_FALHA + item.exception().linha
+                    self.estatisticas["falhas"] += 1
+                else:
+                    texto = item.result()
+                saida.write(texto + "\n")
+            saida.flush()
+
+        async def esperar_primeira():
+            # A primeira pendente pode ser o início do grupo ainda não enviado
+            if grupo and pendentes and pendentes[0] is em_andamento.get(grupo[0]):
+                despachar()
+            if pendentes and not isinstance(pendentes[0], str):
+                await asyncio.wait([pendentes[0]])
+            escrever_prontas()
+
+        while True:
+            # Leitura em blocos numa thread, para não travar os pedidos em andamento
+            bloco = await asyncio.to_thread(entrada.readlines, 1 << 16)
+            if not bloco:
+                break
+            for bruta in bloco:
+                linha = bruta.rstrip("\r\n")
+                self.estatisticas["linhas"] += 1
+                if not linha.strip():
+                    pendentes.append(linha)
+                elif linha in self.cache:
+                    self.cache.move_to_end(linha)
+                    self.estatisticas["reaproveitadas"] += 1
+                    pendentes.append(self.cache[linha])
+                elif linha in em_andamento:
+                    self.estatisticas["reaproveitadas"] += 1
+                    pendentes.append(em_andamento[linha])
+                else:
+                    if grupo and (len(grupo) >= self.max_linhas or tamanho_grupo + len(linha) > self.max_caracteres):
+                        despachar()
+                    em_andamento[linha] = loop.create_future()
+                    pendentes.append(em_andamento[linha])
+                    grupo.append(linha)
+                    tamanho_grupo += len(linha)
+                    self.estatisticas["traduzidas"] += 1
+                while len(pendentes) > max_pendentes:
+                    await esperar_primeira()
+            escrever_prontas()
+
+        despachar()
+        while pendentes:
+            await esperar_primeira()
+        return dict(self.estatisticas)
+
+
+def traduzir_arquivo(modelo, entrada: TextIO, saida: TextIO, **opcoes) -> dict:
+    """Atalho síncrono para `TradutorLotes(modelo, **opcoes).traduzir_arquivo(entrada, saida)`."""
+    return asyncio.run(TradutorLotes(modelo, **opcoes).traduzir_arquivo(entrada, saida))
+
+
+def modo_interativo():
     print("=== Assistente Simples ===")
     print("Digite 'sair' para encerrar.\n")
 
@@ -41,5 +270,40 @@ def main():
         resposta = conversar(modelo, pergunta)
         print(f"Assistente:\n{resposta}")
 
+def main():
+    parser = argparse.ArgumentParser(description="Tradutor para japonês (romaji): interativo ou de arquivos inteiros")
+    parser.add_argument("arquivo", nargs="?", help='arquivo a traduzir ("-" para a entrada padrão)')
+    parser.add_argument("--saida", help="arquivo de saída (padrão: saída padrão)")
+    parser.add_argument("--concorrencia", type=int, default=MAX_CONCORRENCIA, help="pedidos ao mesmo tempo")
+    parser.add_argument("--max-caracteres", type=int, default=MAX_CARACTERES_LOTE, help="texto por pedido")
+    parser.add_argument("--max-linhas", type=int, default=MAX_LINHAS_LOTE, help="linhas por pedido")
+    args = parser.parse_args()
+
+    if args.arquivo is None:
+        modo_interativo()
+        return
+
+    entrada = sys.stdin if args.arquivo == "-" else open(args.arquivo, encoding="utf-8")
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    try:
+        estatisticas = traduzir_arquivo(
+            criar_assistente(), entrada, saida,
+            max_caracteres=args.max_caracteres, max_linhas=args.max_linhas, max_concorrencia=args.concorrencia,
+        )
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if saida is not sys.stdout:
+            saida.close()
+    print(
+        f"{estatisticas['linhas']} linhas: {estatisticas['traduzidas']} enviadas ao modelo em {estatisticas['pedidos']} pedidos, "
+        f"{estatisticas['reaproveitadas']} repetidas reaproveitadas",
+        file=sys.stderr,
+    )
+    if estatisticas["falhas"]:
+        print(f"{estatisticas['falhas']} linhas sem tradução, marcadas com {MARCA_FALHA.strip()!r} na saída",
+              file=sys.stderr)
+        sys.exit(1)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
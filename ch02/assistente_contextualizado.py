@@ -1,22 +1,58 @@
 # assistente_contextualizado.py
 import os
+import sys
 from datetime import datetime
+from typing import Callable, Optional
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import HumanMessage
+
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import criar_modelo  # noqa: E402
+from comum.memoria import Memoria, criar_memoria  # noqa: E402
 
 load_dotenv()
 
 class AssistenteContextualizado:
-    def __init__(self, nome_usuario: str):
-        self.modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0)
+    """Assistente com o nome do usuário e a data/hora atual no contexto.
+
+    Com `prefixo_estavel` (padrão), o system prompt só tem a persona e o nome
+    do usuário, e não muda entre turnos: é o prefixo que o provedor consegue
+    reaproveitar do cache. A data e a hora vão numa mensagem curta no fim,
+    depois da pergunta, e não entram no histórico. Com `prefixo_estavel=False`
+    volta o comportamento antigo (data/hora no system prompt, que muda a cada
+    minuto e invalida o cache do prefixo inteiro).
+    """
+
+    def __init__(
+        self,
+        nome_usuario: str,
+        memoria: Optional[Memoria] = None,
+        modelo=None,
+        *,
+        prefixo_estavel: bool = True,
+        relogio: Callable[[], datetime] = datetime.now,
+    ):
+        self.modelo = modelo or criar_modelo("google", temperature=0)
         self.nome_usuario = nome_usuario
-        self.historico = []
+        # Histórico limitado: MEMORIA_ESTRATEGIA = janela, resumo, hibrida ou completa
+        self.memoria = memoria or criar_memoria(
+            os.getenv("MEMORIA_ESTRATEGIA", "hibrida"),
+            int(os.getenv("MEMORIA_MAX_TOKENS", "4000")),
+            modelo_resumo=self.modelo,
+        )
+        self.prefixo_estavel = prefixo_estavel
+        self.relogio = relogio
+        self._system_estavel = self._get_system_prompt_estavel()
+        self._mensagem_tempo: Optional[HumanMessage] = None
+
+    @property
+    def historico(self) -> list:
+        """Mensagens que a memória ainda guarda (sem o system)."""
+        return self.memoria.mensagens()
 
     def _get_system_prompt(self) -> str:
-        agora = datetime.now()
+        agora = self.relogio()
         return f"""Você é um assistente pessoal chamado Jarvis. Se for a primeira mensagem da conversa, cumprimente o usuário e se apresente.
 
 ## Contexto
@@ -30,19 +66,41 @@ class AssistenteContextualizado:
 - Seja conciso, mas completo
 """
 
-    def conversar(self, mensagem: str) -> str:
-        # System prompt atualizado a cada chamada (data/hora atual)
-        system = SystemMessage(content=self._get_system_prompt())
+    def _get_system_prompt_estavel(self) -> str:
+        # Igual em todos os turnos: só depende do nome do usuário
+        return f"""Você é um assistente pessoal chamado Jarvis. Se for a primeira mensagem da conversa, cumprimente o usuário e se apresente.
+
+## Contexto
+- Usuário: {self.nome_usuario}
+- A data e a hora atuais vêm na última mensagem, depois da pergunta do usuário
 
-        # Montar mensagens: system + histórico + nova mensagem
-        mensagens = [system] + self.historico + [HumanMessage(content=mensagem)]
+## Personalidade
+- Seja cordial e use o nome do usuário ocasionalmente
+- Responda em português brasileiro
+- Seja conciso, mas completo
+"""
+
+    def _contexto_tempo(self) -> HumanMessage:
+        """Mensagem com a data/hora atual, recriada só quando o minuto muda."""
+        texto = self.relogio().strftime("[Contexto: agora são %H:%M de %d/%m/%Y]")
+        if self._mensagem_tempo is None or self._mensagem_tempo.content != texto:
+            self._mensagem_tempo = HumanMessage(content=texto)
+        return self._mensagem_tempo
+
+    def conversar(self, mensagem: str) -> str:
+        pergunta = HumanMessage(content=mensagem)
+        # Montar mensagens sem copiar o histórico: system (+ resumo da memória)
+        # + histórico + nova mensagem (+ data/hora, no modo de prefixo estável)
+        if self.prefixo_estavel:
+            mensagens = self.memoria.para_modelo((pergunta, self._contexto_tempo()), self._system_estavel)
+        else:
+            mensagens = self.memoria.para_modelo((pergunta,), self._get_system_prompt())
 
         # Obter resposta
         resposta = self.modelo.invoke(mensagens)
 
-        # Atualizar histórico (sem o system, que é recriado)
-        self.historico.append(HumanMessage(content=mensagem))
-        self.historico.append(resposta)
+        # Atualizar histórico (sem o system e sem a data/hora, que são recriados)
+        self.memoria.adicionar(pergunta, resposta)
 
         return resposta.content
 
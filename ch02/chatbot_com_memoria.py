@@ -1,33 +1,48 @@
 # chatbot_com_memoria.py
 import os
+import sys
+from typing import Optional
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.memoria import Memoria, criar_memoria  # noqa: E402
+from comum.modelos import criar_modelo  # noqa: E402
+
 load_dotenv()
 
 class Chatbot:
-    def __init__(self, instrucoes: str):
-        self.modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0.7)
-        self.historico = [SystemMessage(content=instrucoes)]
+    def __init__(self, instrucoes: str, memoria: Optional[Memoria] = None, modelo=None):
+        self.modelo = modelo or criar_modelo("google", temperature=0.7, cache=False)
+        self.instrucoes = instrucoes
+        # Histórico limitado: MEMORIA_ESTRATEGIA = janela, resumo, hibrida ou completa
+        self.memoria = memoria or criar_memoria(
+            os.getenv("MEMORIA_ESTRATEGIA", "hibrida"),
+            int(os.getenv("MEMORIA_MAX_TOKENS", "4000")),
+            modelo_resumo=self.modelo,
+        )
+
+    @property
+    def historico(self) -> list:
+        """SystemMessage seguida das mensagens que a memória ainda guarda."""
+        return [SystemMessage(content=self.instrucoes)] + self.memoria.mensagens()
 
     def conversar(self, mensagem: str) -> str:
-        # Adicionar mensagem do usuário ao histórico
-        self.historico.append(HumanMessage(content=mensagem))
+        # Instruções (+ resumo), histórico da memória e a mensagem do usuário
+        mensagens = self.memoria.para_modelo([HumanMessage(content=mensagem)], self.instrucoes)
 
         # Obter resposta do modelo
-        resposta = self.modelo.invoke(self.historico)
+        resposta = self.modelo.invoke(mensagens)
 
-        # Adicionar resposta ao histórico
-        self.historico.append(resposta)
+        # Guardar o turno; a memória descarta ou resume os turnos antigos se precisar
+        self.memoria.adicionar(mensagens[-1], resposta)
 
         return resposta.content
 
     def limpar_historico(self):
-        # Mantém apenas a SystemMessage
-        self.historico = [self.historico[0]]
+        # Mantém apenas as instruções
+        self.memoria.limpar()
 
 def main():
     bot = Chatbot(
@@ -1,14 +1,16 @@
 # conversa_estruturada.py
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import criar_modelo  # noqa: E402
+
 load_dotenv()
 
-modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0)
+modelo = criar_modelo("google", temperature=0)
 
 # Histórico da conversa
 historico = [
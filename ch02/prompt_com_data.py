@@ -1,10 +1,14 @@
 # prompt_com_data.py
 import os
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import criar_modelo  # noqa: E402
+
 load_dotenv()
 
 def get_system_prompt() -> str:
@@ -42,9 +46,7 @@ def get_system_prompt() -> str:
 """
 
 def main():
-    modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0)
+    modelo = criar_modelo("google", temperature=0)
 
     mensagens = [
         SystemMessage(content=get_system_prompt()),
@@ -1,10 +1,14 @@
 # /src/ch03/assistente_com_tools.py
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools import tool
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
 
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import criar_modelo  # noqa: E402
+
 load_dotenv()
 
 # === TOOLS ===
@@ -38,9 +42,7 @@ class AssistenteCalculadora:
         self.tools = [somar, subtrair, multiplicar, dividir]
         self.tools_por_nome = {t.name: t for t in self.tools}
 
-        modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0)
+        modelo = criar_modelo("google", temperature=0)
         self.modelo = modelo.bind_tools(self.tools)
 
         self.system = SystemMessage(content="""
@@ -1,9 +1,14 @@
 # /src/ch03/binding_tools.py
 import os
+import sys
 from dotenv import load_dotenv
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage
 
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import criar_modelo  # noqa: E402
+
 load_dotenv()
 
 # Definir tools
@@ -39,10 +44,7 @@ def obter_clima(cidade: str) -> str:
 
 if __name__ == "__main__":
     # Criar modelo COM tools bindadas
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0)
+    modelo = criar_modelo("google", temperature=0)
     modelo_com_tools = modelo.bind_tools([calcular, obter_clima])
 
     # Testar - o modelo decide qual tool usar
@@ -1,16 +1,22 @@
 # /src/ch03/executar_tools.py
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, ToolMessage, BaseMessage
-import numexpr
+
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import criar_modelo  # noqa: E402
+from comum.preguicoso import Preguicoso  # noqa: E402
 
 load_dotenv()
 
 @tool
 def calcular(expressao: str) -> str:
     """Calcula uma expressão matemática."""
+    import numexpr  # traz o numpy junto: só quando a tool é usada
+
     try:
         resultado = numexpr.evaluate(expressao)
         return str(resultado)
@@ -27,18 +33,19 @@ def obter_clima(cidade: str) -> str:
 tools = [calcular, obter_clima]
 tools_por_nome = {t.name: t for t in tools}
 
-# Modelo com tools
-modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0)
-modelo_com_tools = modelo.bind_tools(tools)
+# Modelo com tools, criado na primeira chamada
+def _criar_modelo_com_tools():
+    modelo = criar_modelo("google", temperature=0)
+    return modelo.bind_tools(tools)
+
+modelo_com_tools = Preguicoso(_criar_modelo_com_tools)
 
 def processar_com_tools(mensagem: str) -> str:
     """Processa uma mensagem, executando tools se necessário."""
     mensagens: list[BaseMessage] = [HumanMessage(content=mensagem)]
 
     # Primeira chamada ao modelo
-    resposta = modelo_com_tools.invoke(mensagens)
+    resposta = modelo_com_tools.obter().invoke(mensagens)
     mensagens.append(resposta)
 
     # Se houver tool_calls, executar
@@ -55,11 +62,12 @@ def processar_com_tools(mensagem: str) -> str:
             mensagens.append(ToolMessage(content=resultado, tool_call_id=tool_call_id))
 
         # Nova chamada ao modelo com os resultados
-        resposta = modelo_com_tools.invoke(mensagens)
+        resposta = modelo_com_tools.obter().invoke(mensagens)
         mensagens.append(resposta)
     return resposta.text
 
 # Testar
-print(processar_com_tools("Quanto é 25 ao quadrado?"))
-print("\n---\n")
-print(processar_com_tools("Como está o clima em São Paulo?"))
+if __name__ == "__main__":
+    print(processar_com_tools("Quanto é 25 ao quadrado?"))
+    print("\n---\n")
+    print(processar_com_tools("Como está o clima em São Paulo?"))
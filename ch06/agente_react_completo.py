@@ -1,27 +1,39 @@
 # /src/ch06/agente_react_completo.py
 import os
+import sys
 import operator
+from functools import partial
 from typing import TypedDict, Annotated, Literal, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, AnyMessage
+from langchain_core.messages import HumanMessage, AnyMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, START, END
-from langgraph.config import get_config
+
+from contexto_usuario import ContextoUsuario, contexto_atual, resolver_contexto, usar_contexto
+from repositorio_tarefas import RepositorioTarefas
+
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.contexto import GerenciadorContexto  # noqa: E402
+from comum.execucao_tools import executar_tool_calls, aexecutar_tool_calls  # noqa: E402
+from comum.instrumentacao import instrumentar  # noqa: E402
+from comum.modelos import criar_modelo  # noqa: E402
+from comum.preguicoso import Preguicoso  # noqa: E402
+from comum.streaming import imprimir_eventos, transmitir  # noqa: E402
 
 load_dotenv()
 
 # === CONFIGURAÇÃO INICIAL ===
-TAREFAS_DB: dict[int, list[dict]] = {
-    1: [
-        {"id": 1, "titulo": "Estudar Python", "estado": "pendente", "vencimento": "2025-12-15"},
-        {"id": 2, "titulo": "Fazer compras", "estado": "concluida", "vencimento": "2025-12-10"},
-    ]
-}
-NEXT_ID = 3
+# Tarefas indexadas por id e por (usuário, estado); com TAREFAS_DB_PATH elas
+# ficam gravadas em SQLite entre execuções
+TAREFAS = RepositorioTarefas(os.getenv("TAREFAS_DB_PATH"))
+if not len(TAREFAS):
+    TAREFAS.criar(1, "Estudar Python", "2025-12-15")
+    TAREFAS.criar(1, "Fazer compras", "2025-12-10", estado="concluida")
 
 # === FERRAMENTAS (TOOLS) ===
 
@@ -65,24 +77,21 @@ def listar_tarefas(estado: Optional[str] = None) -> str:
     Args:
         estado: Filtrar por estado (pendente, concluida). Deixe vazio para todas.
     """
-    config = get_config()
-    usuario_id = config.get("configurable", {}).get("usuario_id", 1)
-    tarefas = TAREFAS_DB.get(usuario_id, [])
-
-    if estado:
-        tarefas = [t for t in tarefas if t["estado"] == estado]
+    usuario_id = contexto_atual().usuario_id
+    tarefas = TAREFAS.listar(usuario_id, estado)
 
     if not tarefas:
         return "Nenhuma tarefa encontrada."
 
-    resultado = f"Encontradas {len(tarefas)} tarefa(s):\n"
+    linhas = [f"Encontradas {len(tarefas)} tarefa(s):\n"]
     for t in tarefas:
-        emoji = "⏳" if t["estado"] == "pendente" else "✅"
-        resultado += f"\n{emoji} [{t['id']}] {t['titulo']}"
-        if t.get("vencimento"):
-            resultado += f" (vence: {t['vencimento']})"
+        emoji = "⏳" if t.estado == "pendente" else "✅"
+        linha = f"{emoji} [{t.id}] {t.titulo}"
+        if t.vencimento:
+            linha += f" (vence: {t.vencimento})"
+        linhas.append(linha)
 
-    return resultado
+    return "\n".join(linhas)
 
 class CriarTarefaInput(BaseModel):
     titulo: str = Field(description="Título da tarefa")
@@ -91,35 +100,20 @@ class CriarTarefaInput(BaseModel):
 @tool(args_schema=CriarTarefaInput)
 def criar_tarefa(titulo: str, vencimento: Optional[str] = None) -> str:
     """Cria uma nova tarefa."""
-    global NEXT_ID
-    config = get_config()
-    usuario_id = config.get("configurable", {}).get("usuario_id", 1)
-
-    if usuario_id not in TAREFAS_DB:
-        TAREFAS_DB[usuario_id] = []
-
-    nova_tarefa = {
-        "id": NEXT_ID,
-        "titulo": titulo,
-        "estado": "pendente",
-        "vencimento": vencimento
-    }
-    TAREFAS_DB[usuario_id].append(nova_tarefa)
-    NEXT_ID += 1
+    usuario_id = contexto_atual().usuario_id
+
+    nova_tarefa = TAREFAS.criar(usuario_id, titulo, vencimento)
 
-    return f"Tarefa criada com sucesso! ID: {nova_tarefa['id']}, Título: {titulo}"
+    return f"Tarefa criada com sucesso! ID: {nova_tarefa.id}, Título: {titulo}"
 
 @tool
 def concluir_tarefa(tarefa_id: int) -> str:
     """Marca uma tarefa como concluída."""
-    config = get_config()
-    usuario_id = config.get("configurable", {}).get("usuario_id", 1)
-    tarefas = TAREFAS_DB.get(usuario_id, [])
+    usuario_id = contexto_atual().usuario_id
 
-    for tarefa in tarefas:
-        if tarefa["id"] == tarefa_id:
-            tarefa["estado"] = "concluida"
-            return f"Tarefa '{tarefa['titulo']}' marcada como concluída!"
+    tarefa = TAREFAS.concluir(usuario_id, tarefa_id)
+    if tarefa is not None:
+        return f"Tarefa '{tarefa.titulo}' marcada como concluída!"
 
     return f"Tarefa com ID {tarefa_id} não encontrada."
 
@@ -129,6 +123,9 @@ TOOLS_BY_NAME = {t.name: t for t in ALL_TOOLS}
 # === DEFINIR ESTADO ===
 class AgentState(TypedDict):
     messages: Annotated[list[AnyMessage], operator.add]
+    # Janela de contexto: mensagens antes de `corte` só chegam ao LLM via `resumo`
+    resumo: str
+    corte: int
 
 # === CONFIGURAR MODELO ===
 SYSTEM_PROMPT = """Você é um assistente inteligente com acesso a ferramentas.
@@ -147,41 +144,51 @@ SYSTEM_PROMPT = """Você é um assistente inteligente com acesso a ferramentas.
 - Para datas, use formato DD/MM/AAAA
 """
 
-modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0)
-modelo_com_tools = modelo.bind_tools(ALL_TOOLS)
+def _criar_modelo():
+    # O provedor é importado só na primeira chamada ao LLM: é o import mais caro do script
+    return criar_modelo("google", temperature=0)
+
+# Criados no primeiro uso (`modelo.obter()`), não no import
+modelo = Preguicoso(_criar_modelo)
+modelo_com_tools = Preguicoso(lambda: modelo.obter().bind_tools(ALL_TOOLS))
+contexto = GerenciadorContexto(
+    orcamento_tokens=int(os.getenv("CONTEXTO_MAX_TOKENS", "8000")),
+    modelo_resumo=modelo,
+)
 
 # === NÓS DO GRAFO ===
 # Referência: seção "Padrões Reutilizáveis"
 
-def llm_call(state: AgentState) -> dict:
-    """Nó que chama o LLM."""
-    messages = state["messages"]
-    if not messages or not isinstance(messages[0], SystemMessage):
-        messages = [SystemMessage(content=SYSTEM_PROMPT)] + messages
-    response = modelo_com_tools.invoke(messages)
+@instrumentar("no", "llm_call")
+def llm_call(state: AgentState, modelo=None) -> dict:
+    """Nó que chama o LLM (`modelo` substitui o padrão)."""
+    messages = contexto.mensagens(state, SYSTEM_PROMPT)
+    response = (modelo or modelo_com_tools.obter()).invoke(messages)
     return {"messages": [response]}
 
-def tool_node(state: AgentState) -> dict:
-    """Nó que executa tools."""
-    messages = state["messages"]
-    last_message = messages[-1]
-    tool_messages = []
-
-    for tool_call in last_message.tool_calls:
-        try:
-            result = TOOLS_BY_NAME[tool_call["name"]].invoke(tool_call["args"])
-        except Exception as e:
-            result = f"Erro ao executar {tool_call['name']}: {e}"
-
-        tool_messages.append(ToolMessage(
-            content=str(result),
-            tool_call_id=tool_call["id"]
-        ))
-
-    return {"messages": tool_messages}
+@instrumentar("no", "llm_call")
+async def allm_call(state: AgentState, modelo=None) -> dict:
+    """Versão assíncrona de `llm_call`."""
+    messages = contexto.mensagens(state, SYSTEM_PROMPT)
+    response = await (modelo or modelo_com_tools.obter()).ainvoke(messages)
+    return {"messages": [response]}
 
+@instrumentar("no", "tool_node")
+def tool_node(state: AgentState, config: RunnableConfig) -> dict:
+    """Nó que executa tools (em paralelo, na ordem das tool calls)."""
+    last_message = state["messages"][-1]
+    # O usuário é resolvido uma vez por turno e herdado por todas as tools
+    with usar_contexto(resolver_contexto(config)):
+        return {"messages": executar_tool_calls(last_message.tool_calls, TOOLS_BY_NAME, config)}
+
+@instrumentar("no", "tool_node")
+async def atool_node(state: AgentState, config: RunnableConfig) -> dict:
+    """Versão assíncrona de `tool_node`."""
+    last_message = state["messages"][-1]
+    with usar_contexto(resolver_contexto(config)):
+        return {"messages": await aexecutar_tool_calls(last_message.tool_calls, TOOLS_BY_NAME, config)}
+
+@instrumentar("aresta", "should_continue")
 def should_continue(state: AgentState) -> Literal["tool_node", "__end__"]:
     """Função de decisão."""
     messages = state["messages"]
@@ -193,22 +200,41 @@ def should_continue(state: AgentState) -> Literal["tool_node", "__end__"]:
     return "__end__"
 
 # === CONSTRUIR E COMPILAR O GRAFO ===
-def create_agent():
-    graph = StateGraph(AgentState)
-    graph.add_node("llm_call", llm_call)
-    graph.add_node("tool_node", tool_node)
-    graph.add_edge(START, "llm_call")
+def create_agent(modelo=None):
+    """Compila o agente; `modelo` troca o Gemini por outro chat model (ex.: ModeloFalso)."""
+    if modelo is None:
+        gerenciador = contexto
+        no_llm = RunnableLambda(llm_call, afunc=allm_call, name="llm_call")
+    else:
+        gerenciador = GerenciadorContexto(contexto.orcamento_tokens, modelo_resumo=modelo)
+        com_tools = modelo.bind_tools(ALL_TOOLS)
+        no_llm = RunnableLambda(
+            partial(llm_call, modelo=com_tools), afunc=partial(allm_call, modelo=com_tools), name="llm_call"
+        )
+
+    # O usuário pode ser passado como `context=ContextoUsuario(...)` no invoke
+    graph = StateGraph(AgentState, context_schema=ContextoUsuario)
+    graph.add_node("contexto", gerenciador.no_contexto)
+    graph.add_node("llm_call", no_llm)
+    graph.add_node("tool_node", RunnableLambda(tool_node, afunc=atool_node, name="tool_node"))
+    graph.add_edge(START, "contexto")
+    graph.add_edge("contexto", "llm_call")
     graph.add_conditional_edges(
         "llm_call",
         should_continue,
         {"tool_node": "tool_node", "__end__": END}
     )
-    graph.add_edge("tool_node", "llm_call")
+    graph.add_edge("tool_node", "contexto")
     return graph.compile()
 
+# Agente padrão (Gemini), compilado uma vez no primeiro uso
+agente_padrao = Preguicoso(create_agent)
+
 # === TESTAR O AGENTE ===
 def main():
-    agent = create_agent()
+    agent = agente_padrao.obter()
+    # O cliente do Gemini é preparado enquanto o usuário digita a primeira mensagem
+    modelo_com_tools.aquecer()
     usuario_id = 1
 
     print("=== Agente ReAct Multi-Funcional ===")
@@ -221,12 +247,15 @@ def main():
         if not entrada:
             continue
 
-        resultado = agent.invoke(
-            {"messages": [HumanMessage(content=entrada)]},
-            config={"configurable": {"usuario_id": usuario_id}}
+        imprimir_eventos(
+            transmitir(
+                agent,
+                {"messages": [HumanMessage(content=entrada)]},
+                config={"configurable": {"usuario_id": usuario_id}}
+            ),
+            prefixo="Agente: ",
         )
-
-        print(f"Agente:\n{resultado['messages'][-1].content}\n")
+        print()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
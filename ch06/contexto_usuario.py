@@ -0,0 +1,65 @@
+# /src/ch06/contexto_usuario.py
+# Contexto tipado da execução (quem é o usuário) para as tools do agente.
+#
+# Antes cada tool chamava `get_config()` e procurava `usuario_id` dentro de
+# `config["configurable"]` a cada chamada. Agora o nó de tools resolve o
+# contexto uma vez por turno e o publica numa ContextVar; as tools leem
+# `contexto_atual()`, uma leitura O(1) sem dicionários aninhados. Como cada
+# turno define o seu valor e o contextvars isola tarefas asyncio e threads do
+# ContextThreadPoolExecutor (que copia o contexto no submit), turnos de usuários
+# diferentes rodando ao mesmo tempo nunca veem o contexto um do outro.
+#
+# O usuário pode vir do contexto de execução do LangGraph
+# (`agente.invoke(..., context=ContextoUsuario(usuario_id=7))`) ou, como antes,
+# de `config["configurable"]["usuario_id"]`.
+
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_config
+from langgraph.runtime import get_runtime
+
+# Usuário assumido quando a execução não informa nenhum
+USUARIO_PADRAO = 1
+
+
+@dataclass(frozen=True, slots=True)
+class ContextoUsuario:
+    usuario_id: int = USUARIO_PADRAO
+
+
+_atual: contextvars.ContextVar[Optional[ContextoUsuario]] = contextvars.ContextVar("contexto_usuario", default=None)
+
+
+def resolver_contexto(config: Optional[RunnableConfig] = None) -> ContextoUsuario:
+    """Contexto da execução: `context=` do LangGraph ou `configurable.usuario_id`."""
+    try:
+        runtime = get_runtime(ContextoUsuario)
+    except RuntimeError:  # fora de um grafo
+        runtime = None
+    if runtime is not None and isinstance(runtime.context, ContextoUsuario):
+        return runtime.context
+    configurable = (config or {}).get("configurable", {})
+    return ContextoUsuario(usuario_id=configurable.get("usuario_id", USUARIO_PADRAO))
+
+
+@contextmanager
+def usar_contexto(contexto: ContextoUsuario) -> Iterator[ContextoUsuario]:
+    """Publica `contexto` para as tools executadas dentro do bloco."""
+    token = _atual.set(contexto)
+    try:
+        yield contexto
+    finally:
+        _atual.reset(token)
+
+
+def contexto_atual() -> ContextoUsuario:
+    """Contexto publicado pelo nó de tools; fora dele, resolvido da config da tool."""
+    contexto = _atual.get()
+    if contexto is None:
+        # Tool invocada diretamente (`tool.invoke(args, config)`), sem o nó
+        contexto = resolver_contexto(get_config())
+    return contexto
@@ -1,11 +1,112 @@
 # /src/ch06/grafo_contador.py
-from typing import TypedDict, Literal
+import argparse
+from collections.abc import Sequence
+from typing import Annotated, Iterable, Iterator, Optional, TypedDict, Literal
 from langgraph.graph import StateGraph, START, END
 
+LIMITE_PADRAO = 10
+
+
+class Historico(Sequence):
+    """Histórico imutável e persistente: anexar cria uma versão nova sem copiar as anteriores.
+
+    Cada versão guarda só os itens que ela anexou e aponta para a versão de
+    onde veio; o valor de uma versão nunca muda depois de criada, então várias
+    versões (inclusive as que o LangGraph cria ao reaplicar escritas) convivem
+    sem interferir. O último item sai em O(1); percorrer ou indexar do começo
+    achata a versão numa tupla única uma vez, e ela deixa de apontar para as
+    anteriores.
+    """
+
+    __slots__ = ("_partes", "_tamanho")
+
+    def __init__(self, itens: Iterable = (), *, _anterior: Optional["Historico"] = None):
+        itens = tuple(itens)
+        # (versão anterior ou None, itens desta versão): trocado de uma vez ao achatar
+        self._partes = (_anterior, itens)
+        self._tamanho = len(itens) + (len(_anterior) if _anterior is not None else 0)
+
+    def anexar(self, novos: Sequence) -> "Historico":
+        return Historico(novos, _anterior=self) if novos else self
+
+    def _tupla(self) -> tuple:
+        anterior, itens = self._partes
+        if anterior is None:
+            return itens
+        # Caminha até a primeira versão (ou uma já achatada) sem recursão
+        pedacos = [itens]
+        while anterior is not None:
+            anterior, itens = anterior._partes
+            pedacos.append(itens)
+        tudo = tuple(item for pedaco in reversed(pedacos) for item in pedaco)
+        self._partes = (None, tudo)
+        return tudo
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __getitem__(self, indice):
+        _, itens = self._partes
+        if isinstance(indice, int) and -len(itens) <= indice < 0:
+            return itens[indice]
+        itens = self._tupla()
+        return list(itens[indice]) if isinstance(indice, slice) else itens[indice]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._tupla())
+
+    def __add__(self, outro):
+        # Como uma lista: `historico + [...]` devolve uma lista nova
+        return [*self._tupla(), *outro]
+
+    def __radd__(self, outro):
+        return [*outro, *self._tupla()]
+
+    def __eq__(self, outro) -> bool:
+        return isinstance(outro, (Historico, list, tuple)) and len(outro) == len(self) and list(self) == list(outro)
+
+    def __repr__(self) -> str:
+        return f"Historico({list(self._tupla())!r})"
+
+    def __reduce__(self):
+        # pickle/deepcopy de uma versão achatada, sem percorrer a cadeia recursivamente
+        return (Historico, (list(self._tupla()),))
+
+    def _asdict(self) -> dict:
+        # Usado pelo serializador do LangGraph ao gravar checkpoints (ver `serializador`)
+        return {"itens": list(self._tupla())}
+
+
+def serializador():
+    """Serializador de checkpoints que aceita o Historico ao carregar.
+
+    O LangGraph só reconstrói tipos registrados (`LANGGRAPH_STRICT_MSGPACK`
+    bloqueia os demais): use `MemorySaver(serde=serializador())` ou o
+    equivalente no checkpointer escolhido.
+    """
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    return JsonPlusSerializer(allowed_msgpack_modules=[(Historico.__module__, Historico.__name__)])
+
+
+def anexar(atual: Sequence, novos: Sequence) -> Historico:
+    """Reducer só-de-anexação: O(len(novos)) por passo em vez de copiar o histórico.
+
+    `operator.add` cria uma lista nova a cada passo (`atual + novos`), copiando
+    o histórico inteiro: N iterações custam O(N²). Nenhum valor recebido é
+    alterado; o estado inicial é copiado uma única vez para um `Historico`.
+    """
+    if not isinstance(atual, Historico):
+        atual = Historico(atual)
+    return atual.anexar(novos)
+
+
 # 1. Definir estado
 class ContadorState(TypedDict):
     valor: int
-    historico: list[str]
+    # Os nós devolvem só as entradas novas; o reducer as anexa ao histórico
+    historico: Annotated[Sequence[str], anexar]
+    limite: Optional[int]
 
 # 2. Definir nós
 def incrementar(state: ContadorState) -> dict:
@@ -13,20 +114,23 @@ def incrementar(state: ContadorState) -> dict:
     novo_valor = state["valor"] + 1
     return {
         "valor": novo_valor,
-        "historico": state["historico"] + [f"Incrementado para {novo_valor}"]
+        "historico": [f"Incrementado para {novo_valor}"]
     }
 
 def verificar(state: ContadorState) -> dict:
     """Apenas passa pelo nó de verificação."""
-    return {"historico": state["historico"] + ["Verificando..."]}
+    return {"historico": ["Verificando..."]}
 
 def finalizar(state: ContadorState) -> dict:
     """Apenas passa pelo nó de fim."""
-    return {"historico": state["historico"] + ["Concluido"]}
+    return {"historico": ["Concluido"]}
 
 # 3. Função de decisão
 def deve_continuar(state: ContadorState) -> Literal["continuar", "parar"]:
-    if state["valor"] < 10:
+    limite = state.get("limite")
+    if limite is None:
+        limite = LIMITE_PADRAO
+    if state["valor"] < limite:
         return "continuar"
     return "parar"
 
@@ -38,8 +142,8 @@ grafo.add_node("incrementar", incrementar)
 grafo.add_node("verificar", verificar)
 grafo.add_node("finalizar", finalizar)
 
-# Adicionar arestas
-grafo.add_edge(START, "incrementar")
+# Adicionar arestas (com limite 0 o grafo termina sem passar pelos nós)
+grafo.add_conditional_edges(START, deve_continuar, {"continuar": "incrementar", "parar": END})
 grafo.add_edge("incrementar", "verificar")
 grafo.add_conditional_edges(
     "verificar",
@@ -54,11 +158,30 @@ grafo.add_edge("finalizar", END)
 # 5. Compilar
 app = grafo.compile()
 
+
+def executar(limite: int = LIMITE_PADRAO, grafo_compilado=None) -> dict:
+    """Conta até `limite`; cada iteração são dois passos do grafo (incrementar e verificar)."""
+    if limite < 0:
+        raise ValueError(f"limite precisa ser >= 0, não {limite}")
+    estado_inicial = {"valor": 0, "historico": ["Início"], "limite": limite}
+    return (grafo_compilado or app).invoke(estado_inicial, {"recursion_limit": 2 * limite + 10})
+
+
 # 6. Executar
-estado_inicial = {"valor": 0, "historico": ["Início"]}
-resultado = app.invoke(estado_inicial)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grafo com loop que conta até um limite")
+    parser.add_argument("--limite", type=int, default=LIMITE_PADRAO, help="número de iterações")
+    args = parser.parse_args()
+    if args.limite < 0:
+        parser.error("--limite precisa ser >= 0")
+
+    resultado = executar(args.limite)
 
-print(f"Valor final: {resultado['valor']}")
-print("Histórico:")
-for item in resultado["historico"]:
-    print(f"  - {item}")
+    print(f"Valor final: {resultado['valor']}")
+    print("Histórico:")
+    historico = list(resultado["historico"])
+    if len(historico) > 30:
+        # Históricos longos: só o começo e o fim
+        historico = historico[:10] + [f"... ({len(historico) - 20} entradas omitidas) ..."] + historico[-10:]
+    for item in historico:
+        print(f"  - {item}")
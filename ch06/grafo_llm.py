@@ -1,12 +1,17 @@
 # /src/ch06/grafo_llm.py
 import os
+import sys
 from typing import TypedDict, Annotated
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage, AnyMessage
 from langgraph.graph import StateGraph, START, END
 import operator
 
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelos import criar_modelo  # noqa: E402
+from comum.preguicoso import Preguicoso  # noqa: E402
+
 load_dotenv()
 
 # === ESTADO ===
@@ -14,9 +19,11 @@ class ChatState(TypedDict):
     messages: Annotated[list[AnyMessage], operator.add]
 
 # === MODELO ===
-modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-        temperature=0)
+def _criar_modelo():
+    # O provedor só é importado na primeira chamada ao LLM
+    return criar_modelo("google", temperature=0)
+
+modelo = Preguicoso(_criar_modelo)
 
 # === NÓS ===
 def preparar(state: ChatState) -> dict:
@@ -32,7 +39,7 @@ def preparar(state: ChatState) -> dict:
 
 def chamar_modelo(state: ChatState) -> dict:
     """Chama o LLM."""
-    resposta = modelo.invoke(state["messages"])
+    resposta = modelo.obter().invoke(state["messages"])
     return {"messages": [resposta]}
 
 # === GRAFO ===
@@ -47,12 +54,12 @@ grafo.add_edge(START, "preparar")
 grafo.add_edge("preparar", "chamar_modelo")
 grafo.add_edge("chamar_modelo", END)
 
-# Compilar
-app = grafo.compile()
+# Compilar (uma vez, no primeiro chat)
+app = Preguicoso(grafo.compile)
 
 # === USAR ===
 def chat(mensagem: str) -> str:
-    resultado = app.invoke({
+    resultado = app.obter().invoke({
         "messages": [HumanMessage(content=mensagem)]
     })
     return resultado["messages"][-1].content
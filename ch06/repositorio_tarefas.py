@@ -0,0 +1,173 @@
+# /src/ch06/repositorio_tarefas.py
+# Repositório de tarefas do agente ReAct, indexado em memória e opcionalmente
+# persistido em SQLite.
+#
+# Antes as tarefas ficavam em `dict[usuario_id, list[dict]]`: concluir uma
+# tarefa varria a lista do usuário, filtrar por estado percorria todas e o
+# `NEXT_ID += 1` global podia repetir ids com tools rodando em paralelo. Aqui:
+#
+#   _por_id              id -> Tarefa                      busca e conclusão em O(1)
+#   _por_usuario         usuario -> {id: Tarefa}           listagem em O(k) no resultado
+#   _por_usuario_estado  (usuario, estado) -> {id: Tarefa} idem, filtrada por estado
+#
+# Os dicts internos guardam as tarefas em ordem de id (ordem de inserção), então
+# listar é só copiar os valores. A única escrita que pode sair da ordem é mudar
+# o estado de uma tarefa antiga; o grupo é marcado e reordenado uma vez, na
+# próxima listagem.
+#
+# Os ids vêm de um contador protegido pelo mesmo lock das escritas, e cada
+# escrita atualiza os índices (e o banco, se houver) de forma atômica.
+
+import itertools
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+ESTADOS = ("pendente", "concluida")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id INTEGER PRIMARY KEY,
+    usuario_id INTEGER NOT NULL,
+    titulo TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    vencimento TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tarefas_usuario_estado ON tarefas(usuario_id, estado, id);
+"""
+
+
+def _validar_estado(estado: str):
+    if estado not in ESTADOS:
+        raise ValueError(f"Estado inválido: '{estado}'. Use um de {', '.join(ESTADOS)}.")
+
+
+@dataclass(slots=True)
+class Tarefa:
+    id: int
+    usuario_id: int
+    titulo: str
+    estado: str = "pendente"
+    vencimento: Optional[str] = None
+
+
+class RepositorioTarefas:
+    """Tarefas de todos os usuários, com índices por id e por (usuário, estado).
+
+    Thread-safe: as tools do agente podem rodar em paralelo.
+
+    Args:
+        caminho: Arquivo SQLite onde as tarefas são gravadas (e de onde são
+            carregadas ao criar o repositório). `None` mantém tudo só em memória.
+    """
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._por_id: dict[int, Tarefa] = {}
+        self._por_usuario: dict[int, dict[int, Tarefa]] = {}
+        self._por_usuario_estado: dict[tuple[int, str], dict[int, Tarefa]] = {}
+        self._desordenados: set[tuple[int, str]] = set()
+        self._conn: Optional[sqlite3.Connection] = None
+        if caminho:
+            self._conn = sqlite3.connect(caminho, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            self._conn.executescript(SCHEMA)
+            linhas = self._conn.execute(
+                "SELECT id, usuario_id, titulo, estado, vencimento FROM tarefas ORDER BY id"
+            )
+            for linha in linhas:
+                self._indexar(Tarefa(*linha))
+        self._ids = itertools.count(max(self._por_id, default=0) + 1)
+
+    def fechar(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _indexar(self, tarefa: Tarefa):
+        self._por_id[tarefa.id] = tarefa
+        self._por_usuario.setdefault(tarefa.usuario_id, {})[tarefa.id] = tarefa
+        self._por_usuario_estado.setdefault((tarefa.usuario_id, tarefa.estado), {})[tarefa.id] = tarefa
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+    # === LEITURA ===
+
+    def obter(self, usuario_id: int, tarefa_id: int) -> Optional[Tarefa]:
+        """A tarefa `tarefa_id`, se existir e pertencer ao usuário."""
+        tarefa = self._por_id.get(tarefa_id)
+        if tarefa is None or tarefa.usuario_id != usuario_id:
+            return None
+        return tarefa
+
+    def listar(self, usuario_id: int, estado: Optional[str] = None) -> list[Tarefa]:
+        """Tarefas do usuário em ordem de id, opcionalmente só as de um estado."""
+        with self._lock:
+            if not estado:
+                return list(self._por_usuario.get(usuario_id, {}).values())
+            chave = (usuario_id, estado)
+            grupo = self._por_usuario_estado.get(chave, {})
+            if chave in self._desordenados:
+                grupo = self._por_usuario_estado[chave] = dict(sorted(grupo.items()))
+                self._desordenados.discard(chave)
+            return list(grupo.values())
+
+    def contar(self, usuario_id: int, estado: Optional[str] = None) -> int:
+        with self._lock:
+            if not estado:
+                return len(self._por_usuario.get(usuario_id, ()))
+            return len(self._por_usuario_estado.get((usuario_id, estado), ()))
+
+    # === ESCRITA ===
+
+    def criar(self, usuario_id: int, titulo: str, vencimento: Optional[str] = None, estado: str = "pendente") -> Tarefa:
+        _validar_estado(estado)
+        with self._lock:
+            tarefa = Tarefa(next(self._ids), usuario_id, titulo, estado, vencimento)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO tarefas VALUES (?, ?, ?, ?, ?)",
+                        (tarefa.id, usuario_id, titulo, estado, vencimento),
+                    )
+            self._indexar(tarefa)
+        return tarefa
+
+    def criar_varias(self, usuario_id: int, itens: Iterable[tuple[str, Optional[str]]]) -> list[Tarefa]:
+        """Cria várias tarefas (título, vencimento) numa única transação."""
+        with self._lock:
+            tarefas = [Tarefa(next(self._ids), usuario_id, titulo, "pendente", vencimento) for titulo, vencimento in itens]
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO tarefas VALUES (?, ?, ?, ?, ?)",
+                        ((t.id, t.usuario_id, t.titulo, t.estado, t.vencimento) for t in tarefas),
+                    )
+            for tarefa in tarefas:
+                self._indexar(tarefa)
+        return tarefas
+
+    def mudar_estado(self, usuario_id: int, tarefa_id: int, estado: str) -> Optional[Tarefa]:
+        """Move a tarefa para `estado`; None se ela não existe para o usuário."""
+        _validar_estado(estado)
+        with self._lock:
+            tarefa = self.obter(usuario_id, tarefa_id)
+            if tarefa is None or tarefa.estado == estado:
+                return tarefa
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("UPDATE tarefas SET estado = ? WHERE id = ?", (estado, tarefa_id))
+            del self._por_usuario_estado[usuario_id, tarefa.estado][tarefa_id]
+            tarefa.estado = estado
+            grupo = self._por_usuario_estado.setdefault((usuario_id, estado), {})
+            if grupo and next(reversed(grupo)) > tarefa_id:
+                self._desordenados.add((usuario_id, estado))
+            grupo[tarefa_id] = tarefa
+        return tarefa
+
+    def concluir(self, usuario_id: int, tarefa_id: int) -> Optional[Tarefa]:
+        return self.mudar_estado(usuario_id, tarefa_id, "concluida")
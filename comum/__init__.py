@@ -0,0 +1,2 @@
+# /src/comum/__init__.py
+# Componentes compartilhados pelos agentes dos capítulos e pelo estudo de caso.
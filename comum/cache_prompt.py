@@ -0,0 +1,112 @@
+# /src/comum/cache_prompt.py
+# Prompt caching da Anthropic: prefixo estável (tools + system prompt) marcado
+# como cacheável e métricas de tokens lidos do cache por chamada.
+#
+# A API processa a requisição na ordem tools -> system -> mensagens. Marcar o
+# último bloco de cada parte estática com `cache_control` faz com que, enquanto
+# esse prefixo for byte a byte idêntico, as chamadas seguintes leiam-no do cache
+# (tokens cobrados a ~10% e menor latência até o primeiro token). Por isso o
+# resumo da conversa, que muda, vai num bloco separado depois do system prompt.
+# O cache só é criado para prefixos acima do mínimo do modelo (1024-2048 tokens).
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Sequence
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import BaseTool
+
+# Cache efêmero (TTL de ~5 min renovado a cada acerto)
+CACHE_EFEMERO = {"type": "ephemeral"}
+
+
+def ferramentas_com_cache(tools: Sequence[BaseTool], cache_control: dict = CACHE_EFEMERO) -> list[dict]:
+    """Converte as tools para o formato da Anthropic, marcando a última como fim do prefixo cacheável."""
+    # Importado aqui: só quem usa prompt caching paga o import do pacote da Anthropic
+    from langchain_anthropic.chat_models import convert_to_anthropic_tool
+
+    ferramentas = [dict(convert_to_anthropic_tool(t)) for t in tools]
+    if ferramentas:
+        ferramentas[-1]["cache_control"] = cache_control
+    return ferramentas
+
+
+@dataclass
+class UsoChamada:
+    """Tokens de entrada de uma chamada, separados pela origem."""
+
+    lidos_do_cache: int
+    gravados_no_cache: int
+    sem_cache: int
+    saida: int
+    segundos: float
+
+    @property
+    def entrada(self) -> int:
+        return self.lidos_do_cache + self.gravados_no_cache + self.sem_cache
+
+    def __str__(self) -> str:
+        return (
+            f"entrada {self.entrada} (cache: {self.lidos_do_cache} lidos, "
+            f"{self.gravados_no_cache} gravados; {self.sem_cache} sem cache), "
+            f"saída {self.saida}, {self.segundos:.2f} s"
+        )
+
+
+class MetricasCache:
+    """Acumula o uso de tokens por chamada a partir de `AIMessage.usage_metadata`.
+
+    Args:
+        historico: Quantas chamadas recentes manter em `chamadas` (os totais
+            de `resumo()` cobrem a sessão inteira).
+    """
+
+    def __init__(self, historico: int = 1000):
+        self.chamadas: deque[UsoChamada] = deque(maxlen=historico)
+        self.total_chamadas = 0
+        self._totais = UsoChamada(0, 0, 0, 0, 0.0)
+        self._lock = threading.Lock()
+
+    def registrar(self, resposta: AIMessage, segundos: float = 0.0) -> UsoChamada:
+        uso = resposta.usage_metadata or {}
+        detalhes = uso.get("input_token_details") or {}
+        lidos = detalhes.get("cache_read") or 0
+        gravados = detalhes.get("cache_creation") or 0
+        chamada = UsoChamada(
+            lidos_do_cache=lidos,
+            gravados_no_cache=gravados,
+            sem_cache=max(0, uso.get("input_tokens", 0) - lidos - gravados),
+            saida=uso.get("output_tokens", 0),
+            segundos=segundos,
+        )
+        with self._lock:
+            self.chamadas.append(chamada)
+            self.total_chamadas += 1
+            t = self._totais
+            t.lidos_do_cache += chamada.lidos_do_cache
+            t.gravados_no_cache += chamada.gravados_no_cache
+            t.sem_cache += chamada.sem_cache
+            t.saida += chamada.saida
+            t.segundos += chamada.segundos
+        return chamada
+
+    def ultimas(self, quantidade: int) -> list[UsoChamada]:
+        """As `quantidade` chamadas mais recentes, da mais antiga para a mais nova."""
+        with self._lock:
+            return list(self.chamadas)[-quantidade:] if quantidade > 0 else []
+
+    def resumo(self) -> dict:
+        """Totais da sessão e fração da entrada servida pelo cache."""
+        with self._lock:
+            t = self._totais
+            return {
+                "chamadas": self.total_chamadas,
+                "entrada": t.entrada,
+                "lidos_do_cache": t.lidos_do_cache,
+                "gravados_no_cache": t.gravados_no_cache,
+                "sem_cache": t.sem_cache,
+                "saida": t.saida,
+                "taxa_acerto": t.lidos_do_cache / t.entrada if t.entrada else 0.0,
+                "segundos": t.segundos,
+            }
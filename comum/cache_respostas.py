@@ -0,0 +1,282 @@
+# /src/comum/cache_respostas.py
+# Cache de respostas do LLM para chamadas determinísticas (temperature=0).
+#
+# Implementa o `BaseCache` do LangChain, então basta passar `cache=` ao criar o
+# modelo (ChatGoogleGenerativeAI, ChatAnthropic, ...). Duas camadas:
+#   - memória: LRU limitado por número de entradas, consultado primeiro;
+#   - disco: SQLite, sobrevive entre execuções, limitado por número de entradas
+#     (remove as menos acessadas).
+# Ambas respeitam um TTL. A chave é o hash do prompt normalizado (sem IDs de
+# mensagem, metadados de resposta ou IDs de tool calls, que mudam a cada
+# execução) junto com os parâmetros do modelo e as tools vinculadas.
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+# Arquivo padrão do cache em disco (fora do controle de versão)
+CACHE_RESPOSTAS_PATH = os.getenv(
+    "CACHE_RESPOSTAS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "respostas.db"),
+)
+
+# Campos de mensagem que variam entre execuções sem mudar o conteúdo
+_CAMPOS_VOLATEIS = frozenset({"id", "response_metadata", "usage_metadata"})
+
+_TEMPERATURA = re.compile(r"""["']temperature["'][:,]\s*([0-9.]+)""")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS respostas (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL,
+    criado_em REAL NOT NULL,
+    acessado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_respostas_acessado_em ON respostas(acessado_em);
+"""
+
+
+def _normalizar(valor: Any, ids: dict[str, str]) -> Any:
+    """Remove campos voláteis e troca IDs de tool calls pela ordem em que aparecem."""
+    if isinstance(valor, list):
+        return [_normalizar(v, ids) for v in valor]
+    if not isinstance(valor, dict):
+        return valor
+    if "lc" in valor and isinstance(valor.get("kwargs"), dict):
+        kwargs = {k: v for k, v in valor["kwargs"].items() if k not in _CAMPOS_VOLATEIS}
+        return {**valor, "kwargs": _normalizar(kwargs, ids)}
+    normalizado = {}
+    for k, v in valor.items():
+        # `id` de uma tool call (tool_calls ou bloco tool_use) e o `tool_call_id` que a referencia
+        if isinstance(v, str) and (k == "tool_call_id" or (k == "id" and ("args" in valor or "input" in valor))):
+            v = ids.setdefault(v, f"t{len(ids)}")
+        normalizado[k] = _normalizar(v, ids)
+    return normalizado
+
+
+def _serializar(generations: RETURN_VAL_TYPE) -> str:
+    itens = []
+    for g in generations:
+        item = {"text": g.text, "generation_info": g.generation_info}
+        if isinstance(g, ChatGeneration):
+            item["message"] = message_to_dict(g.message)
+        itens.append(item)
+    return json.dumps(itens, ensure_ascii=False)
+
+
+def _desserializar(valor: str) -> list[Generation]:
+    generations = []
+    for item in json.loads(valor):
+        if "message" in item:
+            mensagem = messages_from_dict([item["message"]])[0]
+            generations.append(ChatGeneration(message=mensagem, generation_info=item["generation_info"]))
+        else:
+            generations.append(Generation(text=item["text"], generation_info=item["generation_info"]))
+    return generations
+
+
+def _copiar(generations: RETURN_VAL_TYPE) -> list[Generation]:
+    """Cópias sem o `id` da mensagem: o LangChain atribui um novo a cada execução."""
+    copias = [g.model_copy(deep=True) for g in generations]
+    for g in copias:
+        if isinstance(g, ChatGeneration):
+            g.message.id = None
+    return copias
+
+
+def chave_cache(prompt: str, llm_string: str) -> str:
+    """Hash estável do prompt normalizado e da configuração do modelo."""
+    try:
+        prompt = json.dumps(
+            _normalizar(json.loads(prompt), {}), sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+    except ValueError:
+        pass  # prompt em texto puro (LLMs de completion)
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+
+def deterministico(llm_string: str) -> bool:
+    """Verdadeiro se a configuração do modelo indica temperature=0."""
+    temperaturas = _TEMPERATURA.findall(llm_string)
+    return bool(temperaturas) and all(float(t) == 0 for t in temperaturas)
+
+
+class CacheRespostas(BaseCache):
+    """Cache em duas camadas (LRU em memória + SQLite) para respostas de LLM.
+
+    Args:
+        caminho: Arquivo SQLite da camada em disco; `None` usa só a memória.
+        max_memoria: Máximo de respostas na camada em memória.
+        max_disco: Máximo de respostas no disco; as menos acessadas saem primeiro.
+        ttl_segundos: Validade de cada resposta; `None` para não expirar.
+        somente_deterministico: Ignora chamadas com temperature diferente de 0,
+            cujas respostas não devem ser reaproveitadas.
+    """
+
+    def __init__(
+        self,
+        caminho: Optional[str] = CACHE_RESPOSTAS_PATH,
+        *,
+        max_memoria: int = 512,
+        max_disco: int = 50_000,
+        ttl_segundos: Optional[float] = 7 * 24 * 3600,
+        somente_deterministico: bool = True,
+    ):
+        self.caminho = caminho
+        self.max_memoria = max_memoria
+        self.max_disco = max_disco
+        self.ttl_segundos = ttl_segundos
+        self.somente_deterministico = somente_deterministico
+        # chave -> (expira_em, generations)
+        self._memoria: OrderedDict[str, tuple[float, RETURN_VAL_TYPE]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.gravacoes = 0
+        self.ignoradas = 0
+        if caminho:
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+            self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def _expira_em(self, agora: float) -> float:
+        return agora + self.ttl_segundos if self.ttl_segundos is not None else float("inf")
+
+    def _guardar_em_memoria(self, chave: str, expira_em: float, valor: RETURN_VAL_TYPE):
+        self._memoria[chave] = (expira_em, valor)
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    # === INTERFACE DO BaseCache ===
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.somente_deterministico and not deterministico(llm_string):
+            with self._lock:
+                self.ignoradas += 1
+            return None
+        chave = chave_cache(prompt, llm_string)
+        agora = time.time()
+        with self._lock:
+            item = self._memoria.get(chave)
+            if item is not None:
+                if item[0] > agora:
+                    self._memoria.move_to_end(chave)
+                    self.acertos_memoria += 1
+                    return _copiar(item[1])
+                del self._memoria[chave]
+
+            if self._conn is not None:
+                linha = self._conn.execute(
+                    "SELECT valor, criado_em FROM respostas WHERE chave = ?", (chave,)
+                ).fetchone()
+                if linha is not None:
+                    valor, criado_em = linha
+                    if self.ttl_segundos is None or criado_em + self.ttl_segundos > agora:
+                        self._conn.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+                        generations = _desserializar(valor)
+                        self._guardar_em_memoria(chave, self._expira_em(criado_em), generations)
+                        self.acertos_disco += 1
+                        return _copiar(generations)
+                    self._conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+
+            self.falhas += 1
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.somente_deterministico and not deterministico(llm_string):
+            return
+        chave = chave_cache(prompt, llm_string)
+        agora = time.time()
+        return_val = _copiar(return_val)
+        with self._lock:
+            self._guardar_em_memoria(chave, self._expira_em(agora), return_val)
+            self.gravacoes += 1
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respostas (chave, valor, criado_em, acessado_em) VALUES (?, ?, ?, ?)",
+                (chave, _serializar(return_val), agora, agora),
+            )
+            # Verificação barata a cada 100 gravações; remove 10% além do limite
+            if self.gravacoes % 100 == 0:
+                self._podar_disco()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memoria.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM respostas")
+
+    # === MANUTENÇÃO ===
+
+    def _podar_disco(self):
+        total = self._conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+        if total <= self.max_disco:
+            return
+        excesso = total - self.max_disco + self.max_disco // 10
+        self._conn.execute(
+            "DELETE FROM respostas WHERE chave IN (SELECT chave FROM respostas ORDER BY acessado_em LIMIT ?)",
+            (excesso,),
+        )
+        if self.ttl_segundos is not None:
+            self._conn.execute("DELETE FROM respostas WHERE criado_em < ?", (time.time() - self.ttl_segundos,))
+
+    def estatisticas(self) -> dict:
+        """Contadores de acertos e falhas e taxa de acerto."""
+        with self._lock:
+            acertos = self.acertos_memoria + self.acertos_disco
+            consultas = acertos + self.falhas
+            return {
+                "acertos_memoria": self.acertos_memoria,
+                "acertos_disco": self.acertos_disco,
+                "falhas": self.falhas,
+                "gravacoes": self.gravacoes,
+                "ignoradas": self.ignoradas,
+                "taxa_acerto": acertos / consultas if consultas else 0.0,
+                "entradas_memoria": len(self._memoria),
+            }
+
+    def fechar(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache_padrao: Optional[CacheRespostas] = None
+_lock_padrao = threading.Lock()
+
+
+def cache_padrao() -> Optional[CacheRespostas]:
+    """Cache compartilhado pelos scripts; `CACHE_RESPOSTAS=0` desativa (devolve None).
+
+    `criar_modelo` (comum/modelos.py) já o usa; num modelo criado à mão:
+    `ChatGoogleGenerativeAI(..., temperature=0, cache=cache_padrao())`.
+    """
+    global _cache_padrao
+    if os.getenv("CACHE_RESPOSTAS", "1") == "0":
+        return None
+    with _lock_padrao:
+        if _cache_padrao is None:
+            ttl = os.getenv("CACHE_RESPOSTAS_TTL_SEGUNDOS")
+            _cache_padrao = CacheRespostas(
+                ttl_segundos=float(ttl) if ttl else 7 * 24 * 3600,
+                max_memoria=int(os.getenv("CACHE_RESPOSTAS_MAX_MEMORIA", "512")),
+                max_disco=int(os.getenv("CACHE_RESPOSTAS_MAX_DISCO", "50000")),
+            )
+        return _cache_padrao
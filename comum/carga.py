@@ -0,0 +1,212 @@
+# /src/comum/carga.py
+# Driver de carga para grafos compilados: N sessões concorrentes, cada uma com
+# vários turnos, medindo latência por turno, vazão, tempo gasto fora do modelo
+# e das tools (overhead do grafo e do checkpointer) e crescimento de memória.
+#
+# Pensado para rodar com o ModeloFalso (comum.modelo_falso), sem rede: assim o
+# que sobra da latência é custo do próprio LangGraph, das tools e do checkpointer.
+
+import asyncio
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil `p` (0-100) por interpolação linear."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    base = int(posicao)
+    proximo = min(base + 1, len(ordenados) - 1)
+    return ordenados[base] + (ordenados[proximo] - ordenados[base]) * (posicao - base)
+
+
+def _uniao(intervalos: list[tuple[float, float]]) -> float:
+    """Duração coberta por intervalos possivelmente sobrepostos (tools em paralelo)."""
+    total, fim_atual = 0.0, float("-inf")
+    for inicio, fim in sorted(intervalos):
+        if fim <= fim_atual:
+            continue
+        total += fim - max(inicio, fim_atual)
+        fim_atual = fim
+    return total
+
+
+class MedidorTurno(BaseCallbackHandler):
+    """Registra os intervalos de chamadas ao modelo e às tools de um turno."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._inicios: dict[UUID, tuple[str, float]] = {}
+        self.intervalos: dict[str, list[tuple[float, float]]] = {"modelo": [], "tools": []}
+
+    def _comecar(self, tipo: str, run_id: UUID):
+        self._inicios[run_id] = (tipo, time.perf_counter())
+
+    def _terminar(self, run_id: UUID):
+        tipo, inicio = self._inicios.pop(run_id, (None, 0.0))
+        if tipo:
+            self.intervalos[tipo].append((inicio, time.perf_counter()))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+        self._comecar("modelo", run_id)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        self._terminar(run_id)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any):
+        self._terminar(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs: Any):
+        self._comecar("tools", run_id)
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs: Any):
+        self._terminar(run_id)
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs: Any):
+        self._terminar(run_id)
+
+    def tempos(self) -> tuple[float, float, float]:
+        """(modelo, tools, modelo ∪ tools) em segundos."""
+        modelo, tools = self.intervalos["modelo"], self.intervalos["tools"]
+        return _uniao(modelo), _uniao(tools), _uniao(modelo + tools)
+
+
+@dataclass
+class ResultadoCarga:
+    sessoes: int
+    turnos_por_sessao: int
+    duracao: float
+    latencias: list[float] = field(default_factory=list)
+    tempo_modelo: list[float] = field(default_factory=list)
+    tempo_tools: list[float] = field(default_factory=list)
+    overhead: list[float] = field(default_factory=list)
+    erros: list[str] = field(default_factory=list)
+    memoria_inicial: Optional[int] = None
+    memoria_final: Optional[int] = None
+    memoria_pico: Optional[int] = None
+
+    @property
+    def turnos(self) -> int:
+        return len(self.latencias)
+
+    def resumo(self) -> dict:
+        ms = lambda v: v * 1000  # noqa: E731
+        dados = {
+            "sessoes": self.sessoes,
+            "turnos": self.turnos,
+            "erros": len(self.erros),
+            "duracao_s": self.duracao,
+            "turnos_por_s": self.turnos / self.duracao if self.duracao else 0.0,
+            "p50_ms": ms(percentil(self.latencias, 50)),
+            "p95_ms": ms(percentil(self.latencias, 95)),
+            "p99_ms": ms(percentil(self.latencias, 99)),
+            "modelo_ms": ms(statistics.fmean(self.tempo_modelo)) if self.tempo_modelo else 0.0,
+            "tools_ms": ms(statistics.fmean(self.tempo_tools)) if self.tempo_tools else 0.0,
+            "overhead_ms": ms(statistics.fmean(self.overhead)) if self.overhead else 0.0,
+            "overhead_p95_ms": ms(percentil(self.overhead, 95)),
+        }
+        if self.memoria_final is not None:
+            dados["memoria_crescimento_kib"] = (self.memoria_final - self.memoria_inicial) / 1024
+            dados["memoria_pico_kib"] = self.memoria_pico / 1024
+        return dados
+
+
+def _registrar(resultado: ResultadoCarga, inicio: float, medidor: MedidorTurno):
+    latencia = time.perf_counter() - inicio
+    modelo, tools, externo = medidor.tempos()
+    resultado.latencias.append(latencia)
+    resultado.tempo_modelo.append(modelo)
+    resultado.tempo_tools.append(tools)
+    resultado.overhead.append(max(0.0, latencia - externo))
+
+
+def _config(sessao: int, medidor: MedidorTurno, extra: Optional[dict]) -> dict:
+    config = {"configurable": {"thread_id": f"carga-{sessao}"}, "callbacks": [medidor]}
+    if extra:
+        config = {**extra, **config, "configurable": {**extra.get("configurable", {}), **config["configurable"]}}
+    return config
+
+
+def executar_carga(
+    agente,
+    *,
+    sessoes: int,
+    turnos: int,
+    mensagem: Callable[[int, int], str] = lambda sessao, turno: f"Pedido {turno} da sessão {sessao}",
+    modo: str = "async",
+    rastrear_memoria: bool = False,
+    config: Optional[dict] = None,
+) -> ResultadoCarga:
+    """Roda `sessoes` sessões concorrentes de `turnos` turnos cada no grafo `agente`.
+
+    Args:
+        agente: Grafo compilado (de preferência com um modelo falso).
+        mensagem: Gera o texto do usuário para (sessão, turno).
+        modo: "async" (ainvoke + asyncio.gather) ou "threads" (invoke em um pool).
+        rastrear_memoria: Mede o crescimento com tracemalloc (deixa tudo mais lento).
+        config: Config extra mesclada à de cada turno (ex.: max_concurrency).
+    """
+    resultado = ResultadoCarga(sessoes=sessoes, turnos_por_sessao=turnos, duracao=0.0)
+
+    def turno_sync(sessao: int, turno: int):
+        medidor = MedidorTurno()
+        inicio = time.perf_counter()
+        try:
+            agente.invoke({"messages": [HumanMessage(content=mensagem(sessao, turno))]}, _config(sessao, medidor, config))
+        except Exception as e:
+            resultado.erros.append(f"{type(e).__name__}: {e}")
+            return
+        _registrar(resultado, inicio, medidor)
+
+    async def turno_async(sessao: int, turno: int):
+        medidor = MedidorTurno()
+        inicio = time.perf_counter()
+        try:
+            await agente.ainvoke(
+                {"messages": [HumanMessage(content=mensagem(sessao, turno))]}, _config(sessao, medidor, config)
+            )
+        except Exception as e:
+            resultado.erros.append(f"{type(e).__name__}: {e}")
+            return
+        _registrar(resultado, inicio, medidor)
+
+    def sessao_sync(sessao: int):
+        for turno in range(turnos):
+            turno_sync(sessao, turno)
+
+    async def sessao_async(sessao: int):
+        for turno in range(turnos):
+            await turno_async(sessao, turno)
+
+    async def todas_async():
+        await asyncio.gather(*(sessao_async(s) for s in range(sessoes)))
+
+    if rastrear_memoria:
+        tracemalloc.start()
+        resultado.memoria_inicial = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    try:
+        if modo == "async":
+            asyncio.run(todas_async())
+        elif modo == "threads":
+            with ThreadPoolExecutor(max_workers=sessoes) as pool:
+                list(pool.map(sessao_sync, range(sessoes)))
+        else:
+            raise ValueError(f"modo desconhecido: {modo}")
+    finally:
+        resultado.duracao = time.perf_counter() - inicio
+        if rastrear_memoria:
+            resultado.memoria_final, resultado.memoria_pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return resultado
@@ -0,0 +1,226 @@
+# /src/comum/contexto.py
+# Janela de contexto com orçamento de tokens para o histórico de mensagens.
+#
+# O estado dos agentes é uma lista só-de-anexação (`operator.add`): sem controle,
+# cada chamada ao LLM envia a conversa inteira e o custo por turno cresce sem
+# limite. Aqui o estado continua intacto (o checkpointer segue gravando só as
+# mensagens novas); em vez de remover mensagens, guardamos um índice de `corte`
+# e um `resumo` do que ficou antes dele. O nó `no_contexto` roda antes do LLM e
+# só avança o corte quando o histórico passa do orçamento, descartando turnos
+# inteiros (a partir de uma HumanMessage), de modo que uma AIMessage com
+# tool_calls nunca é separada das suas ToolMessages.
+
+from typing import Callable, Optional, Sequence, Union
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+from comum.instrumentacao import instrumentar
+
+INSTRUCAO_RESUMO = """Você mantém o resumo de uma conversa entre um usuário e um assistente com ferramentas.
+Atualize o resumo atual incorporando as novas mensagens. Preserve fatos, decisões,
+IDs e valores mencionados e pedidos ainda pendentes; descarte cumprimentos e detalhes
+de saídas de ferramentas que já foram respondidas. Responda apenas com o novo resumo,
+em português, com no máximo {max_palavras} palavras."""
+
+# Tamanho de cada linha do resumo extrativo (usado quando não há modelo de resumo)
+_CARACTERES_POR_LINHA = 200
+
+
+def _texto(mensagem: AnyMessage) -> str:
+    conteudo = mensagem.content
+    if isinstance(conteudo, str):
+        return conteudo
+    return " ".join(b.get("text", "") if isinstance(b, dict) else str(b) for b in conteudo)
+
+
+def _transcricao(mensagens: Sequence[AnyMessage], max_caracteres: int) -> str:
+    """Converte mensagens em texto corrido para o modelo de resumo."""
+    linhas = []
+    for m in mensagens:
+        texto = _texto(m)[:max_caracteres]
+        if isinstance(m, HumanMessage):
+            linhas.append(f"Usuário: {texto}")
+        elif isinstance(m, ToolMessage):
+            linhas.append(f"Ferramenta ({m.name or m.tool_call_id}): {texto}")
+        elif isinstance(m, AIMessage):
+            chamadas = ", ".join(c["name"] for c in m.tool_calls)
+            if chamadas:
+                linhas.append(f"Assistente chamou: {chamadas}")
+            if texto:
+                linhas.append(f"Assistente: {texto}")
+    return "\n".join(linhas)
+
+
+def resumir(
+    resumo: str,
+    descartadas: Sequence[AnyMessage],
+    modelo_resumo: Optional[Union[BaseChatModel, Callable[[], BaseChatModel]]] = None,
+    *,
+    max_caracteres_tool: int = 1500,
+    max_caracteres_resumo: int = 3000,
+) -> str:
+    """Incorpora `descartadas` ao `resumo`: pelo modelo ou, sem ele (ou se falhar), de forma extrativa."""
+    if modelo_resumo is not None:
+        instrucao = INSTRUCAO_RESUMO.format(max_palavras=max_caracteres_resumo // 7)
+        pedido = (
+            f"Resumo atual:\n{resumo or '(vazio)'}\n\n"
+            f"Novas mensagens:\n{_transcricao(descartadas, max_caracteres_tool)}"
+        )
+        try:
+            # Uma fábrica (ex.: `Preguicoso`) só cria o modelo no primeiro resumo
+            modelo = modelo_resumo if hasattr(modelo_resumo, "invoke") else modelo_resumo()
+            # "nostream": os tokens do resumo não aparecem no stream_mode="messages" do grafo
+            novo = modelo.invoke(
+                [SystemMessage(content=instrucao), HumanMessage(content=pedido)], config={"tags": ["nostream"]}
+            )
+            return _texto(novo)[:max_caracteres_resumo]
+        except Exception:
+            pass  # segue com o resumo extrativo
+
+    linhas = [resumo] if resumo else []
+    for m in descartadas:
+        texto = " ".join(_texto(m).split())[:_CARACTERES_POR_LINHA]
+        if isinstance(m, HumanMessage):
+            linhas.append(f"- Usuário: {texto}")
+        elif isinstance(m, AIMessage) and not m.tool_calls and texto:
+            linhas.append(f"  Assistente: {texto}")
+    # Mantém as linhas mais recentes dentro do limite
+    texto = "\n".join(linhas)
+    if len(texto) > max_caracteres_resumo:
+        texto = texto[-max_caracteres_resumo:]
+        texto = texto[texto.find("\n") + 1:]
+    return texto
+
+
+class GerenciadorContexto:
+    """Mantém o histórico enviado ao LLM dentro de um orçamento de tokens.
+
+    O estado do grafo precisa declarar, além de `messages`, os campos
+    `resumo: str` e `corte: int` (ambos opcionais no início da sessão).
+
+    Args:
+        orcamento_tokens: Máximo de tokens do histórico (resumo + mensagens) por chamada.
+        alvo: Fração do orçamento a que o histórico é reduzido quando estoura.
+            Cortar abaixo do limite evita resumir de novo a cada turno.
+        max_caracteres_tool: Saídas de ferramentas de turnos anteriores maiores
+            que isso são truncadas (a resposta do assistente já as resumiu).
+        modelo_resumo: Modelo usado para resumir os turnos descartados, ou uma
+            função sem argumentos que o devolve (ex.: um `Preguicoso`, para o
+            modelo só ser criado no primeiro resumo). Sem ele (ou se a chamada
+            falhar), o resumo é extrativo: as perguntas do usuário e as
+            respostas do assistente, abreviadas.
+        max_caracteres_resumo: Tamanho máximo do resumo guardado no estado.
+        contar_tokens: Função que conta tokens de uma lista de mensagens.
+    """
+
+    def __init__(
+        self,
+        orcamento_tokens: int = 8000,
+        *,
+        alvo: float = 0.5,
+        max_caracteres_tool: int = 1500,
+        modelo_resumo: Optional[Union[BaseChatModel, Callable[[], BaseChatModel]]] = None,
+        max_caracteres_resumo: int = 3000,
+        contar_tokens: Callable[[Sequence[AnyMessage]], int] = count_tokens_approximately,
+    ):
+        self.orcamento_tokens = orcamento_tokens
+        self.alvo = alvo
+        self.max_caracteres_tool = max_caracteres_tool
+        self.modelo_resumo = modelo_resumo
+        self.max_caracteres_resumo = max_caracteres_resumo
+        self.contar_tokens = contar_tokens
+        self.resumos_gerados = 0
+
+    # === JANELA ===
+
+    def _compactar(self, mensagens: Sequence[AnyMessage]) -> list[AnyMessage]:
+        """Trunca ToolMessages volumosas de turnos anteriores ao atual."""
+        ultimo_turno = max(
+            (i for i, m in enumerate(mensagens) if isinstance(m, HumanMessage)), default=len(mensagens)
+        )
+        limite = self.max_caracteres_tool
+        compactadas = list(mensagens)
+        for i in range(ultimo_turno):
+            m = compactadas[i]
+            if isinstance(m, ToolMessage):
+                texto = _texto(m)
+                if len(texto) > limite:
+                    omitidos = len(texto) - limite
+                    compactadas[i] = m.model_copy(update={
+                        "content": f"{texto[:limite]}\n[... saída truncada: {omitidos} caracteres omitidos]"
+                    })
+        return compactadas
+
+    def mensagens(self, state: dict, system_prompt: str, cache_control: Optional[dict] = None) -> list[AnyMessage]:
+        """Monta a lista enviada ao LLM: system prompt (+ resumo) e a janela compactada.
+
+        Com `cache_control`, o system prompt vira um bloco próprio marcado como
+        cacheável e o resumo (que muda) fica num bloco à parte, depois dele.
+        """
+        resumo = state.get("resumo")
+        secao_resumo = f"## Resumo da conversa anterior\n{resumo}" if resumo else None
+        if cache_control is not None:
+            blocos = [{"type": "text", "text": system_prompt, "cache_control": cache_control}]
+            if secao_resumo:
+                blocos.append({"type": "text", "text": secao_resumo})
+            system = SystemMessage(content=blocos)
+        elif secao_resumo:
+            system = SystemMessage(content=f"{system_prompt}\n\n{secao_resumo}")
+        else:
+            system = SystemMessage(content=system_prompt)
+        janela = self._compactar(state["messages"][state.get("corte", 0):])
+        return [system] + janela
+
+    # === NÓ DO GRAFO ===
+
+    @instrumentar("no", "contexto")
+    def no_contexto(self, state: dict) -> dict:
+        """Nó pré-LLM: avança `corte` e atualiza `resumo` quando o histórico estoura o orçamento."""
+        mensagens = state["messages"]
+        corte = state.get("corte", 0)
+        resumo = state.get("resumo", "")
+        janela = self._compactar(mensagens[corte:])
+        custos = [self.contar_tokens([m]) for m in janela]
+        custo_resumo = self.contar_tokens([SystemMessage(content=resumo)]) if resumo else 0
+
+        total = custo_resumo + sum(custos)
+        if total <= self.orcamento_tokens:
+            return {}
+
+        # Candidatos a novo corte: início de cada turno, exceto o atual
+        inicios = [i for i, m in enumerate(janela) if isinstance(m, HumanMessage)]
+        alvo = self.orcamento_tokens * self.alvo
+        # O resumo ocupará no máximo ~max_caracteres_resumo/4 tokens
+        restante = total - custo_resumo + self.max_caracteres_resumo / 4
+        novo_corte = 0
+        for inicio in (i for i in inicios if i > 0):
+            restante -= sum(custos[novo_corte:inicio])
+            novo_corte = inicio
+            if restante <= alvo:
+                break
+        if novo_corte == 0:
+            # Só existe o turno atual: nada a descartar sem quebrar pares de tool calls
+            return {}
+
+        descartadas = janela[:novo_corte]
+        return {"corte": corte + novo_corte, "resumo": self._resumir(resumo, descartadas)}
+
+    # === RESUMO ===
+
+    def _resumir(self, resumo: str, descartadas: Sequence[AnyMessage]) -> str:
+        self.resumos_gerados += 1
+        return resumir(
+            resumo,
+            descartadas,
+            self.modelo_resumo,
+            max_caracteres_tool=self.max_caracteres_tool,
+            max_caracteres_resumo=self.max_caracteres_resumo,
+        )
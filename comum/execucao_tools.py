@@ -0,0 +1,110 @@
+# /src/comum/execucao_tools.py
+# Execução concorrente das tool calls de um mesmo turno do LLM.
+#
+# Quando o modelo pede várias ferramentas independentes em uma única AIMessage,
+# elas podem rodar em paralelo: a latência do turno passa a ser a da tool mais
+# lenta, não a soma de todas. A ordem das ToolMessages devolvidas é sempre a
+# mesma das tool_calls, e a falha de uma tool não afeta as demais.
+
+import asyncio
+import os
+import threading
+from typing import Optional, Sequence
+
+from langchain_core.messages import ToolMessage
+from langchain_core.messages.tool import ToolCall
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import BaseTool
+
+from comum.instrumentacao import medir
+
+# Máximo de tools executadas ao mesmo tempo em um turno (padrão)
+MAX_TOOLS_PARALELAS = int(os.getenv("MAX_TOOLS_PARALELAS", "8"))
+
+# Executores reaproveitados entre turnos, um por limite de concorrência. Threads
+# persistentes também mantêm aquecidos recursos por thread (ex.: conexões SQLite).
+_executores: dict[int, ContextThreadPoolExecutor] = {}
+_lock_executores = threading.Lock()
+
+
+def _executor(max_concorrencia: int) -> ContextThreadPoolExecutor:
+    with _lock_executores:
+        executor = _executores.get(max_concorrencia)
+        if executor is None:
+            executor = ContextThreadPoolExecutor(
+                max_workers=max_concorrencia, thread_name_prefix="tools"
+            )
+            _executores[max_concorrencia] = executor
+        return executor
+
+
+def _limite(config: Optional[RunnableConfig], max_concorrencia: Optional[int]) -> int:
+    """Limite explícito > `max_concurrency` da config > MAX_TOOLS_PARALELAS."""
+    if max_concorrencia is None and config:
+        max_concorrencia = config.get("max_concurrency")
+    return max(1, max_concorrencia or MAX_TOOLS_PARALELAS)
+
+
+def _executar_uma(tool_call: ToolCall, tools_por_nome: dict[str, BaseTool], config: Optional[RunnableConfig]) -> ToolMessage:
+    with medir("tool", tool_call["name"]) as medicao:
+        try:
+            result = tools_por_nome[tool_call["name"]].invoke(tool_call["args"], config)
+        except Exception as e:
+            result = f"Erro ao executar {tool_call['name']}: {e}"
+        medicao.resultado(str(result))
+    return ToolMessage(content=str(result), tool_call_id=tool_call["id"])
+
+
+async def _aexecutar_uma(tool_call: ToolCall, tools_por_nome: dict[str, BaseTool], config: Optional[RunnableConfig]) -> ToolMessage:
+    with medir("tool", tool_call["name"]) as medicao:
+        try:
+            result = await tools_por_nome[tool_call["name"]].ainvoke(tool_call["args"], config)
+        except Exception as e:
+            result = f"Erro ao executar {tool_call['name']}: {e}"
+        medicao.resultado(str(result))
+    return ToolMessage(content=str(result), tool_call_id=tool_call["id"])
+
+
+def executar_tool_calls(
+    tool_calls: Sequence[ToolCall],
+    tools_por_nome: dict[str, BaseTool],
+    config: Optional[RunnableConfig] = None,
+    max_concorrencia: Optional[int] = None,
+) -> list[ToolMessage]:
+    """Executa as tool calls em paralelo em um pool de threads.
+
+    Args:
+        tool_calls: Tool calls da AIMessage, na ordem em que o modelo as emitiu.
+        tools_por_nome: Mapa nome -> tool.
+        config: Config do nó; repassada às tools (callbacks, `get_config()`).
+        max_concorrencia: Máximo de tools simultâneas. Se omitido, usa
+            `config["max_concurrency"]` ou MAX_TOOLS_PARALELAS.
+
+    Returns:
+        Uma ToolMessage por tool call, na mesma ordem de `tool_calls`.
+    """
+    limite = _limite(config, max_concorrencia)
+    if len(tool_calls) <= 1 or limite == 1:
+        return [_executar_uma(tc, tools_por_nome, config) for tc in tool_calls]
+
+    executor = _executor(limite)
+    futuros = [executor.submit(_executar_uma, tc, tools_por_nome, config) for tc in tool_calls]
+    return [f.result() for f in futuros]
+
+
+async def aexecutar_tool_calls(
+    tool_calls: Sequence[ToolCall],
+    tools_por_nome: dict[str, BaseTool],
+    config: Optional[RunnableConfig] = None,
+    max_concorrencia: Optional[int] = None,
+) -> list[ToolMessage]:
+    """Versão asyncio de `executar_tool_calls`, usando `tool.ainvoke`."""
+    limite = _limite(config, max_concorrencia)
+    semaforo = asyncio.Semaphore(limite)
+
+    async def com_limite(tool_call: ToolCall) -> ToolMessage:
+        async with semaforo:
+            return await _aexecutar_uma(tool_call, tools_por_nome, config)
+
+    return list(await asyncio.gather(*(com_limite(tc) for tc in tool_calls)))
@@ -0,0 +1,424 @@
+# /src/comum/instrumentacao.py
+# Instrumentação opcional do caminho quente dos agentes: nós do grafo, tools,
+# checkpointer e consultas SQLite.
+#
+# Cada trecho marcado com `@instrumentar(tipo, nome)` (ou `with medir(...)`)
+# vira uma medição com tempo de parede, tempo e linhas de SQL executado dentro
+# dele, tokens das AIMessages devolvidas e tamanho do resultado. O SQL é
+# atribuído à medição mais interna ativa (via contextvars, que o LangChain e os
+# executores das tools copiam para as threads), então o tempo de banco aparece
+# na tool ou no checkpoint que o causou.
+#
+# Desligada (padrão), o custo é um teste `_coletor is None` por chamada marcada
+# e as conexões SQLite são as comuns do módulo sqlite3. Para ligar:
+#
+#   INSTRUMENTACAO=metricas.jsonl python tarefa/chatbot.py   # uma linha por medição
+#   INSTRUMENTACAO=metricas.prom  python tarefa/chatbot.py   # agregados, formato Prometheus
+#
+# ou `ativar(caminho)` no código. Conexões abertas antes de ativar continuam sem
+# medir SQL até serem reabertas (ex.: `chatbot.configurar_banco`).
+#
+# Resumo de um arquivo JSONL:
+#
+#   python -m comum.instrumentacao metricas.jsonl [--ordenar total|media|p95|sql|chamadas]
+
+import argparse
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+
+@dataclass(slots=True)
+class Medicao:
+    """Uma execução de um nó, tool ou operação do checkpointer."""
+
+    tipo: str
+    nome: str
+    instante: float = 0.0
+    duracao: float = 0.0
+    sql_tempo: float = 0.0
+    sql_consultas: int = 0
+    sql_linhas: int = 0
+    tokens_entrada: int = 0
+    tokens_saida: int = 0
+    tamanho: int = 0
+    erro: Optional[str] = None
+
+    def resultado(self, valor: Any):
+        """Extrai tamanho e uso de tokens do valor devolvido pelo trecho medido."""
+        if isinstance(valor, dict):
+            valor = valor.get("messages", ())
+        if isinstance(valor, str):
+            self.tamanho += len(valor)
+            return
+        if not isinstance(valor, (list, tuple)):
+            return
+        for mensagem in valor:
+            conteudo = getattr(mensagem, "content", None)
+            if isinstance(conteudo, str):
+                self.tamanho += len(conteudo)
+            uso = getattr(mensagem, "usage_metadata", None)
+            if uso:
+                self.tokens_entrada += uso.get("input_tokens", 0)
+                self.tokens_saida += uso.get("output_tokens", 0)
+
+
+class _Agregado:
+    __slots__ = ("duracoes", "erros", "sql_tempo", "sql_consultas", "sql_linhas", "tokens_entrada", "tokens_saida", "tamanho")
+
+    def __init__(self):
+        self.duracoes: list[float] = []
+        self.erros = 0
+        self.sql_tempo = 0.0
+        self.sql_consultas = self.sql_linhas = 0
+        self.tokens_entrada = self.tokens_saida = self.tamanho = 0
+
+    def somar(self, m: Medicao):
+        self.duracoes.append(m.duracao)
+        self.erros += m.erro is not None
+        self.sql_tempo += m.sql_tempo
+        self.sql_consultas += m.sql_consultas
+        self.sql_linhas += m.sql_linhas
+        self.tokens_entrada += m.tokens_entrada
+        self.tokens_saida += m.tokens_saida
+        self.tamanho += m.tamanho
+
+
+class Coletor:
+    """Acumula medições em memória e as exporta para `caminho`.
+
+    Args:
+        caminho: Arquivo de saída. Terminado em `.prom`, recebe os agregados no
+            formato texto do Prometheus (reescrito a cada `exportar()`); caso
+            contrário, cada medição é anexada como uma linha JSON.
+    """
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho
+        self.prometheus = bool(caminho) and caminho.endswith(".prom")
+        self._lock = threading.Lock()
+        self._agregados: dict[tuple[str, str], _Agregado] = {}
+        self._arquivo = open(caminho, "a", encoding="utf-8") if caminho and not self.prometheus else None
+
+    def registrar(self, m: Medicao):
+        with self._lock:
+            agregado = self._agregados.get((m.tipo, m.nome))
+            if agregado is None:
+                agregado = self._agregados[m.tipo, m.nome] = _Agregado()
+            agregado.somar(m)
+            if self._arquivo is not None:
+                self._arquivo.write(json.dumps(asdict(m), ensure_ascii=False) + "\n")
+
+    def resumo(self) -> list[dict]:
+        """Uma linha por (tipo, nome), como as do CLI de resumo."""
+        with self._lock:
+            return [_linha_resumo(tipo, nome, a) for (tipo, nome), a in self._agregados.items()]
+
+    def exportar(self):
+        """Grava o que foi coletado até agora em `caminho`."""
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.flush()
+            elif self.prometheus:
+                with open(self.caminho, "w", encoding="utf-8") as arquivo:
+                    arquivo.write(_prometheus(self._agregados))
+
+    def fechar(self):
+        self.exportar()
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+
+
+# Coletor ativo; None desliga toda a instrumentação
+_coletor: Optional[Coletor] = None
+# Medição mais interna em andamento no contexto atual (recebe o tempo de SQL)
+_atual: contextvars.ContextVar[Optional[Medicao]] = contextvars.ContextVar("medicao_atual", default=None)
+
+
+def ativa() -> bool:
+    return _coletor is not None
+
+
+def coletor() -> Optional[Coletor]:
+    return _coletor
+
+
+def ativar(caminho: Optional[str] = None) -> Coletor:
+    """Liga a instrumentação (substitui o coletor anterior, que é fechado)."""
+    global _coletor
+    anterior, _coletor = _coletor, Coletor(caminho)
+    if anterior is not None:
+        anterior.fechar()
+    return _coletor
+
+
+def desativar() -> Optional[Coletor]:
+    """Desliga a instrumentação, exporta e devolve o coletor que estava ativo."""
+    global _coletor
+    anterior, _coletor = _coletor, None
+    if anterior is not None:
+        anterior.fechar()
+    return anterior
+
+
+# === MEDIÇÃO ===
+
+class _Medindo:
+    __slots__ = ("medicao", "_token", "_inicio")
+
+    def __init__(self, tipo: str, nome: str):
+        self.medicao = Medicao(tipo, nome)
+
+    def __enter__(self) -> Medicao:
+        self._token = _atual.set(self.medicao)
+        self.medicao.instante = time.time()
+        self._inicio = time.perf_counter()
+        return self.medicao
+
+    def __exit__(self, tipo_erro, erro, tb):
+        m = self.medicao
+        m.duracao = time.perf_counter() - self._inicio
+        _atual.reset(self._token)
+        if erro is not None:
+            m.erro = f"{tipo_erro.__name__}: {erro}"
+        coletor_ativo = _coletor
+        if coletor_ativo is not None:
+            coletor_ativo.registrar(m)
+        return False
+
+
+class _Nulo:
+    """Contexto sem efeito devolvido por `medir` com a instrumentação desligada."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+    def resultado(self, valor: Any):
+        pass
+
+
+_NULO = _Nulo()
+
+
+def medir(tipo: str, nome: str):
+    """Context manager que mede o bloco; use `.resultado(valor)` no objeto devolvido."""
+    if _coletor is None:
+        return _NULO
+    return _Medindo(tipo, nome)
+
+
+def instrumentar(tipo: str, nome: Optional[str] = None) -> Callable:
+    """Decorador que mede cada chamada da função (síncrona ou assíncrona).
+
+    Args:
+        tipo: Categoria da medição ("no", "tool", "checkpoint", ...).
+        nome: Rótulo; por padrão o nome da função. Use o mesmo nome nas versões
+            síncrona e assíncrona de um nó para agregá-las juntas.
+    """
+    def decorar(func: Callable) -> Callable:
+        rotulo = nome or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def amedido(*args, **kwargs):
+                if _coletor is None:
+                    return await func(*args, **kwargs)
+                with _Medindo(tipo, rotulo) as m:
+                    valor = await func(*args, **kwargs)
+                    m.resultado(valor)
+                    return valor
+            return amedido
+
+        @functools.wraps(func)
+        def medido(*args, **kwargs):
+            if _coletor is None:
+                return func(*args, **kwargs)
+            with _Medindo(tipo, rotulo) as m:
+                valor = func(*args, **kwargs)
+                m.resultado(valor)
+                return valor
+        return medido
+
+    return decorar
+
+
+# === SQLITE ===
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que soma tempo, comandos e linhas à medição ativa."""
+
+    def execute(self, sql, parametros=()):
+        m = _atual.get()
+        if m is None:
+            return super().execute(sql, parametros)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            m.sql_tempo += time.perf_counter() - inicio
+            m.sql_consultas += 1
+            m.sql_linhas += max(self.rowcount, 0)  # linhas escritas; as lidas contam no fetch
+
+    def executemany(self, sql, parametros):
+        m = _atual.get()
+        if m is None:
+            return super().executemany(sql, parametros)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            m.sql_tempo += time.perf_counter() - inicio
+            m.sql_consultas += 1
+            m.sql_linhas += max(self.rowcount, 0)
+
+    def _ler(self, metodo, *args):
+        # O SQLite avança a consulta sob demanda: boa parte do custo está no fetch
+        m = _atual.get()
+        if m is None:
+            return metodo(*args)
+        inicio = time.perf_counter()
+        linhas = metodo(*args)
+        m.sql_tempo += time.perf_counter() - inicio
+        m.sql_linhas += len(linhas) if isinstance(linhas, list) else linhas is not None
+        return linhas
+
+    def fetchone(self):
+        return self._ler(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._ler(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._ler(super().fetchall)
+
+    def __next__(self):
+        linha = self._ler(super().fetchone)
+        if linha is None:
+            raise StopIteration
+        return linha
+
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão cujos atalhos `execute`/`executemany` usam `CursorInstrumentado`."""
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+
+def fabrica_conexao() -> type[sqlite3.Connection]:
+    """Classe de conexão para `sqlite3.connect(factory=...)`: instrumentada só se ativa."""
+    return ConexaoInstrumentada if _coletor is not None else sqlite3.Connection
+
+
+# === EXPORTAÇÃO E RESUMO ===
+
+def _linha_resumo(tipo: str, nome: str, a: _Agregado) -> dict:
+    from comum.carga import percentil
+
+    total = sum(a.duracoes)
+    return {
+        "tipo": tipo,
+        "nome": nome,
+        "chamadas": len(a.duracoes),
+        "erros": a.erros,
+        "total": total,
+        "media": total / len(a.duracoes) if a.duracoes else 0.0,
+        "p50": percentil(a.duracoes, 50),
+        "p95": percentil(a.duracoes, 95),
+        "sql": a.sql_tempo,
+        "sql_consultas": a.sql_consultas,
+        "sql_linhas": a.sql_linhas,
+        "tokens_entrada": a.tokens_entrada,
+        "tokens_saida": a.tokens_saida,
+        "tamanho": a.tamanho,
+    }
+
+
+def _prometheus(agregados: dict[tuple[str, str], _Agregado]) -> str:
+    from comum.carga import percentil
+
+    def rotulos(tipo: str, nome: str, **extra) -> str:
+        pares = {"tipo": tipo, "nome": nome, **extra}
+        return "{" + ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pares.items()) + "}"
+
+    linhas = [
+        "# HELP agente_duracao_segundos Tempo de parede de nós, tools e checkpointer.",
+        "# TYPE agente_duracao_segundos summary",
+    ]
+    for (tipo, nome), a in sorted(agregados.items()):
+        for q in (0.5, 0.95, 0.99):
+            linhas.append(f"agente_duracao_segundos{rotulos(tipo, nome, quantile=q)} {percentil(a.duracoes, q * 100):.6f}")
+        linhas.append(f"agente_duracao_segundos_sum{rotulos(tipo, nome)} {sum(a.duracoes):.6f}")
+        linhas.append(f"agente_duracao_segundos_count{rotulos(tipo, nome)} {len(a.duracoes)}")
+
+    contadores = [
+        ("agente_erros_total", "Execuções que terminaram em exceção.", lambda a: a.erros),
+        ("agente_sql_segundos_total", "Tempo em consultas SQLite.", lambda a: f"{a.sql_tempo:.6f}"),
+        ("agente_sql_consultas_total", "Comandos SQL executados.", lambda a: a.sql_consultas),
+        ("agente_sql_linhas_total", "Linhas SQL lidas ou escritas.", lambda a: a.sql_linhas),
+        ("agente_tokens_entrada_total", "Tokens de entrada das AIMessages geradas.", lambda a: a.tokens_entrada),
+        ("agente_tokens_saida_total", "Tokens de saída das AIMessages geradas.", lambda a: a.tokens_saida),
+        ("agente_resultado_caracteres_total", "Caracteres devolvidos (conteúdo das mensagens ou da tool).", lambda a: a.tamanho),
+    ]
+    for metrica, ajuda, valor in contadores:
+        linhas += [f"# HELP {metrica} {ajuda}", f"# TYPE {metrica} counter"]
+        linhas += [f"{metrica}{rotulos(tipo, nome)} {valor(a)}" for (tipo, nome), a in sorted(agregados.items())]
+    return "\n".join(linhas) + "\n"
+
+
+def resumir_jsonl(caminho: str) -> list[dict]:
+    """Agrega um arquivo JSONL gravado pelo coletor."""
+    agregados: dict[tuple[str, str], _Agregado] = {}
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                m = Medicao(**json.loads(linha))
+                agregados.setdefault((m.tipo, m.nome), _Agregado()).somar(m)
+    return [_linha_resumo(tipo, nome, a) for (tipo, nome), a in agregados.items()]
+
+
+def imprimir_resumo(linhas: list[dict], ordenar: str = "total"):
+    print(f"{'tipo':<11}{'nome':<28}{'chamadas':>9}{'total (s)':>11}{'média (ms)':>12}{'p95 (ms)':>10}"
+          f"{'SQL (ms)':>10}{'linhas SQL':>11}{'tokens':>9}{'erros':>7}")
+    for r in sorted(linhas, key=lambda r: r[ordenar], reverse=True):
+        print(f"{r['tipo']:<11}{r['nome'][:27]:<28}{r['chamadas']:>9}{r['total']:>11.3f}{r['media'] * 1000:>12.2f}"
+              f"{r['p95'] * 1000:>10.2f}{r['sql'] * 1000:>10.1f}{r['sql_linhas']:>11}"
+              f"{r['tokens_entrada'] + r['tokens_saida']:>9}{r['erros']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo das medições gravadas com INSTRUMENTACAO=arquivo.jsonl")
+    parser.add_argument("arquivo")
+    parser.add_argument("--ordenar", choices=["total", "media", "p95", "sql", "chamadas"], default="total")
+    args = parser.parse_args()
+    imprimir_resumo(resumir_jsonl(args.arquivo), args.ordenar)
+
+
+if os.getenv("INSTRUMENTACAO"):
+    ativar(os.environ["INSTRUMENTACAO"])
+    atexit.register(desativar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# /src/comum/limitador.py
+# Limite de taxa para chamadas ao provedor: requisições por segundo e tokens
+# por minuto, as duas cotas que as APIs de LLM costumam impor.
+#
+# Cada cota é um balde de fichas. Quem chama reserva as fichas na hora (o
+# saldo pode ficar negativo) e espera o tempo que o balde leva para pagar a
+# dívida: assim a espera é calculada sob um lock curto, ninguém dorme segurando
+# o lock, e os pedidos são atendidos na ordem em que reservaram. Os tokens de
+# um pedido só são conhecidos depois da resposta; reserva-se uma estimativa e
+# `corrigir` acerta a diferença com o uso real.
+
+import asyncio
+import threading
+import time
+from typing import Callable, Optional
+
+
+class BaldeFichas:
+    """Até `capacidade` fichas, repostas a `taxa` fichas por segundo (sem lock próprio)."""
+
+    def __init__(self, taxa: float, capacidade: float, agora: float):
+        if taxa <= 0 or capacidade <= 0:
+            raise ValueError("taxa e capacidade do balde precisam ser positivas")
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.fichas = capacidade
+        self._atualizado = agora
+
+    def _repor(self, agora: float):
+        self.fichas = min(self.capacidade, self.fichas + (agora - self._atualizado) * self.taxa)
+        self._atualizado = agora
+
+    def reservar(self, quantidade: float, agora: float) -> float:
+        """Tira `quantidade` fichas e devolve os segundos até o saldo voltar a zero."""
+        self._repor(agora)
+        self.fichas -= quantidade
+        return max(0.0, -self.fichas / self.taxa)
+
+    def devolver(self, quantidade: float, agora: float):
+        """Devolve fichas (ou cobra mais, com `quantidade` negativa)."""
+        self._repor(agora)
+        self.fichas = min(self.capacidade, self.fichas + quantidade)
+
+
+class LimitadorTaxa:
+    """Limita requisições por segundo e tokens por minuto, para threads e asyncio.
+
+    Args:
+        requisicoes_por_segundo: Taxa sustentada de requisições (None = sem limite).
+        tokens_por_minuto: Tokens (entrada + saída) por minuto (None = sem limite).
+        rajada: Requisições que podem sair de uma vez com o balde cheio
+            (padrão: um segundo de requisições, no mínimo 1).
+        rajada_tokens: Tokens que podem ser gastos de uma vez (padrão: um
+            minuto de tokens, como a cota dos provedores).
+        relogio: Fonte de tempo monotônico, em segundos.
+    """
+
+    def __init__(
+        self,
+        requisicoes_por_segundo: Optional[float] = None,
+        tokens_por_minuto: Optional[float] = None,
+        *,
+        rajada: Optional[float] = None,
+        rajada_tokens: Optional[float] = None,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        agora = relogio()
+        self._requisicoes = None
+        if requisicoes_por_segundo:
+            capacidade = rajada or max(1.0, requisicoes_por_segundo)
+            self._requisicoes = BaldeFichas(requisicoes_por_segundo, capacidade, agora)
+        self._tokens = None
+        if tokens_por_minuto:
+            self._tokens = BaldeFichas(tokens_por_minuto / 60, rajada_tokens or tokens_por_minuto, agora)
+        self.esperas = 0
+        self.segundos_esperando = 0.0
+
+    def reservar(self, tokens: int = 0) -> float:
+        """Reserva uma requisição de `tokens` tokens; devolve quanto esperar antes de enviá-la."""
+        with self._lock:
+            agora = self._relogio()
+            espera = 0.0
+            if self._requisicoes is not None:
+                espera = self._requisicoes.reservar(1, agora)
+            if self._tokens is not None and tokens:
+                espera = max(espera, self._tokens.reservar(tokens, agora))
+            if espera > 0:
+                self.esperas += 1
+                self.segundos_esperando += espera
+            return espera
+
+    def tentar(self, tokens: int = 0) -> bool:
+        """Reserva só se houver cota agora, sem espera; devolve se reservou."""
+        with self._lock:
+            agora = self._relogio()
+            baldes = [(self._requisicoes, 1), (self._tokens, tokens if self._tokens is not None else 0)]
+            baldes = [(balde, quantidade) for balde, quantidade in baldes if balde is not None and quantidade]
+            for balde, quantidade in baldes:
+                balde._repor(agora)
+                if balde.fichas < quantidade:
+                    return False
+            for balde, quantidade in baldes:
+                balde.fichas -= quantidade
+            return True
+
+    def corrigir(self, diferenca: int):
+        """Acerta a cota de tokens depois da resposta: `diferenca` = usados - reservados."""
+        if self._tokens is not None and diferenca:
+            with self._lock:
+                self._tokens.devolver(-diferenca, self._relogio())
+
+    def esperar(self, tokens: int = 0):
+        espera = self.reservar(tokens)
+        if espera:
+            time.sleep(espera)
+
+    async def aesperar(self, tokens: int = 0):
+        espera = self.reservar(tokens)
+        if espera:
+            await asyncio.sleep(espera)
@@ -0,0 +1,290 @@
+# /src/comum/memoria.py
+# Memória de conversa com tamanho limitado para os chatbots sem grafo (ch02).
+#
+# Os chatbots guardavam o histórico numa lista que só crescia e mandavam a
+# lista inteira a cada `conversar`: latência, tokens e memória cresciam com a
+# sessão até a chamada estourar o limite de contexto do modelo. Aqui o
+# histórico fica atrás de uma estratégia:
+#
+#   MemoriaCompleta   o comportamento antigo, sem limite (para comparação)
+#   JanelaTokens      só os turnos mais recentes que cabem no orçamento; os
+#                     mais antigos são esquecidos
+#   ResumoContinuo    ao estourar o orçamento, tudo antes do último turno vira
+#                     um resumo
+#   MemoriaHibrida    ao estourar, os turnos mais antigos saem da janela até
+#                     ela voltar a uma fração do orçamento e entram no resumo
+#
+# Todas descartam turnos inteiros (a partir de uma HumanMessage) e contam
+# tokens com um ContadorTokens, que guarda a contagem de cada mensagem: cada
+# mensagem é contada uma vez, e não a cada turno.
+#
+# `para_modelo` não copia o histórico: devolve uma VisaoMensagens que percorre
+# system, janela e mensagens novas no lugar.
+
+import itertools
+import weakref
+from collections import abc, deque
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from comum.contexto import resumir
+
+
+class ContadorTokens:
+    """Conta tokens de mensagens guardando a contagem de cada uma.
+
+    A contagem fica associada ao objeto da mensagem (não ao texto) e sai do
+    cache quando a mensagem é coletada. Mensagens não devem ser alteradas
+    depois de contadas. Chamar a instância com uma lista devolve a soma, como
+    `count_tokens_approximately`.
+    """
+
+    def __init__(self, contar: Callable[[Sequence[BaseMessage]], int] = count_tokens_approximately):
+        self._contar = contar
+        # id(mensagem) -> (referência fraca, tokens)
+        self._cache: dict[int, tuple[weakref.ref, int]] = {}
+        self.calculadas = 0
+        self.reaproveitadas = 0
+
+    def tokens(self, mensagem: BaseMessage) -> int:
+        chave = id(mensagem)
+        item = self._cache.get(chave)
+        if item is not None and item[0]() is mensagem:
+            self.reaproveitadas += 1
+            return item[1]
+        n = self._contar([mensagem])
+        self.calculadas += 1
+        self._cache[chave] = (weakref.ref(mensagem, self._esquecer(chave)), n)
+        return n
+
+    def _esquecer(self, chave: int):
+        def callback(ref: weakref.ref):
+            item = self._cache.get(chave)
+            # O id pode já ter sido reaproveitado por outra mensagem
+            if item is not None and item[0] is ref:
+                del self._cache[chave]
+        return callback
+
+    def __call__(self, mensagens: Iterable[BaseMessage]) -> int:
+        return sum(self.tokens(m) for m in mensagens)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class VisaoMensagens(abc.Sequence):
+    """Sequência somente-leitura que encadeia listas de mensagens sem copiá-las.
+
+    Reflete as listas originais: vale até a próxima alteração delas (no caso
+    de `Memoria.para_modelo`, até o próximo `adicionar`). Quem precisar
+    guardar o resultado deve usar `list(visao)`.
+
+    O ganho é na montagem: o `invoke` de um BaseChatModel ainda converte a
+    sequência numa lista nova, então a cópia do histórico só sai do caminho
+    de quem percorre as mensagens direto (ex.: contagem de tokens).
+    """
+
+    __slots__ = ("_partes", "_tamanho")
+
+    def __init__(self, *partes: Sequence[BaseMessage]):
+        self._partes = tuple(p for p in partes if p)
+        self._tamanho = sum(len(p) for p in self._partes)
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._partes)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return list(self)[indice]
+        if indice < 0:
+            indice += self._tamanho
+        if not 0 <= indice < self._tamanho:
+            raise IndexError("índice fora da visão de mensagens")
+        # Acesso pelas pontas (o caso comum: `mensagens[-1]`) não percorre o meio
+        if indice >= self._tamanho - len(self._partes[-1]):
+            return self._partes[-1][indice - self._tamanho]
+        for parte in self._partes:
+            if indice < len(parte):
+                return parte[indice]
+            indice -= len(parte)
+
+    def __repr__(self) -> str:
+        return f"VisaoMensagens({list(self)!r})"
+
+
+class Memoria:
+    """Histórico de uma conversa, sem o system prompt.
+
+    Uso num chatbot:
+
+        mensagens = memoria.para_modelo([HumanMessage(content=texto)], system_prompt)
+        resposta = modelo.invoke(mensagens)
+        memoria.adicionar(mensagens[-1], resposta)
+
+    Subclasses limitam o histórico em `_ajustar`, chamado a cada `adicionar`.
+    """
+
+    def __init__(self, contador: Optional[ContadorTokens] = None):
+        self.contador = contador or ContadorTokens()
+        self._mensagens: deque[BaseMessage] = deque()
+        self._tokens = 0
+        self._turnos = 0  # HumanMessages na janela
+        self.resumo = ""
+        self.resumos_gerados = 0
+
+    def adicionar(self, *mensagens: BaseMessage):
+        for m in mensagens:
+            self._mensagens.append(m)
+            self._tokens += self.contador.tokens(m)
+            self._turnos += isinstance(m, HumanMessage)
+        self._ajustar()
+
+    def _ajustar(self):
+        pass
+
+    def mensagens(self) -> list[BaseMessage]:
+        return list(self._mensagens)
+
+    @property
+    def tokens(self) -> int:
+        """Tokens guardados: mensagens da janela mais o resumo."""
+        return self._tokens + self._tokens_resumo()
+
+    def _tokens_resumo(self) -> int:
+        return (len(self.resumo) + 3) // 4 if self.resumo else 0
+
+    def para_modelo(self, novas: Sequence[BaseMessage] = (), system_prompt: Optional[str] = None) -> VisaoMensagens:
+        """System prompt (+ resumo), o histórico e `novas`, na ordem em que vão para o modelo.
+
+        Devolve uma visão sobre a janela (sem copiá-la), válida até o próximo `adicionar`.
+        Um chat model do LangChain ainda a copia numa lista dentro do `invoke`.
+        """
+        secao_resumo = f"## Resumo da conversa anterior\n{self.resumo}" if self.resumo else None
+        partes = [p for p in (system_prompt, secao_resumo) if p]
+        system = (SystemMessage(content="\n\n".join(partes)),) if partes else ()
+        return VisaoMensagens(system, self._mensagens, novas)
+
+    def limpar(self):
+        self._mensagens.clear()
+        self._tokens = 0
+        self._turnos = 0
+        self.resumo = ""
+
+    def _remover_turno(self) -> list[BaseMessage]:
+        """Remove o turno mais antigo (até a próxima HumanMessage) e o devolve."""
+        removidas = [self._mensagens.popleft()]
+        while self._mensagens and not isinstance(self._mensagens[0], HumanMessage):
+            removidas.append(self._mensagens.popleft())
+        self._tokens -= self.contador(removidas)
+        self._turnos -= isinstance(removidas[0], HumanMessage)
+        return removidas
+
+
+class MemoriaCompleta(Memoria):
+    """Guarda tudo, como os chatbots faziam antes (sem limite)."""
+
+
+class JanelaTokens(Memoria):
+    """Só os turnos mais recentes que cabem em `orcamento_tokens`; o turno atual é sempre mantido."""
+
+    def __init__(self, orcamento_tokens: int = 4000, contador: Optional[ContadorTokens] = None):
+        super().__init__(contador)
+        self.orcamento_tokens = orcamento_tokens
+
+    def _ajustar(self):
+        while self._tokens > self.orcamento_tokens and self._turnos > 1:
+            self._remover_turno()
+
+
+class MemoriaHibrida(Memoria):
+    """Janela dos turnos recentes mais um resumo dos que saíram dela.
+
+    Quando janela + resumo passam de `orcamento_tokens`, os turnos mais
+    antigos saem até a janela caber em `alvo` do orçamento (descontado o
+    espaço do resumo) e são incorporados ao resumo numa única chamada. Cortar
+    abaixo do limite evita resumir de novo a cada turno.
+
+    Args:
+        orcamento_tokens: Máximo de tokens do histórico (janela + resumo).
+        modelo_resumo: Modelo que escreve o resumo, ou função que o devolve.
+            Sem ele (ou se a chamada falhar), o resumo é extrativo.
+        alvo: Fração do orçamento que a janela ocupa depois de um resumo.
+        max_caracteres_resumo: Tamanho máximo do resumo.
+        contador: Contador de tokens (compartilhável entre memórias).
+    """
+
+    def __init__(
+        self,
+        orcamento_tokens: int = 4000,
+        modelo_resumo: Optional[Union[BaseChatModel, Callable[[], BaseChatModel]]] = None,
+        *,
+        alvo: float = 0.5,
+        max_caracteres_resumo: int = 2000,
+        contador: Optional[ContadorTokens] = None,
+    ):
+        super().__init__(contador)
+        self.orcamento_tokens = orcamento_tokens
+        self.modelo_resumo = modelo_resumo
+        self.alvo = alvo
+        self.max_caracteres_resumo = max_caracteres_resumo
+
+    def _ajustar(self):
+        if self.tokens <= self.orcamento_tokens or self._turnos <= 1:
+            return
+        # O resumo ocupará no máximo ~max_caracteres_resumo/4 tokens
+        limite_janela = self.orcamento_tokens * self.alvo - self.max_caracteres_resumo / 4
+        descartadas: list[BaseMessage] = []
+        while self._turnos > 1 and (self._tokens > limite_janela or not descartadas):
+            descartadas.extend(self._remover_turno())
+        self.resumo = resumir(
+            self.resumo, descartadas, self.modelo_resumo, max_caracteres_resumo=self.max_caracteres_resumo
+        )
+        self.resumos_gerados += 1
+
+
+class ResumoContinuo(MemoriaHibrida):
+    """Ao estourar o orçamento, resume tudo menos o último turno."""
+
+    def __init__(
+        self,
+        orcamento_tokens: int = 4000,
+        modelo_resumo: Optional[Union[BaseChatModel, Callable[[], BaseChatModel]]] = None,
+        *,
+        max_caracteres_resumo: int = 2000,
+        contador: Optional[ContadorTokens] = None,
+    ):
+        super().__init__(
+            orcamento_tokens, modelo_resumo, alvo=0.0, max_caracteres_resumo=max_caracteres_resumo, contador=contador
+        )
+
+
+# Nomes aceitos por `criar_memoria` (e pela variável MEMORIA_ESTRATEGIA)
+ESTRATEGIAS = {
+    "completa": MemoriaCompleta,
+    "janela": JanelaTokens,
+    "resumo": ResumoContinuo,
+    "hibrida": MemoriaHibrida,
+}
+
+
+def criar_memoria(
+    estrategia: str = "hibrida",
+    orcamento_tokens: int = 4000,
+    modelo_resumo: Optional[Union[BaseChatModel, Callable[[], BaseChatModel]]] = None,
+    contador: Optional[ContadorTokens] = None,
+) -> Memoria:
+    """Cria a memória pelo nome da estratégia; `modelo_resumo` só é usado pelas que resumem."""
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"estratégia de memória desconhecida: {estrategia!r} (use {', '.join(ESTRATEGIAS)})")
+    classe = ESTRATEGIAS[estrategia]
+    if classe is MemoriaCompleta:
+        return MemoriaCompleta(contador)
+    if classe is JanelaTokens:
+        return JanelaTokens(orcamento_tokens, contador)
+    return classe(orcamento_tokens, modelo_resumo, contador=contador)
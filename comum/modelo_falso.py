@@ -0,0 +1,169 @@
+# /src/comum/modelo_falso.py
+# Modelo de chat local que reproduz roteiros de tool calls, para testar e medir
+# os grafos sem chave de API nem rede.
+#
+# O roteiro é uma lista de turnos; cada turno é uma lista de passos, e cada passo
+# é uma resposta do "LLM": uma string (resposta final) ou uma lista de tool calls
+# `{"name": ..., "args": {...}}`. O passo é escolhido pelo próprio histórico
+# (quantas AIMessages já vieram depois da última HumanMessage), então sessões
+# concorrentes não interferem umas nas outras.
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence, Union
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+Passo = Union[str, list[dict]]
+
+# Usado quando o roteiro acaba antes de o turno terminar
+RESPOSTA_PADRAO = "Certo, operação concluída."
+
+_ids = itertools.count(1)
+
+
+class ModeloFalso(BaseChatModel):
+    """Chat model roteirizado com latência configurável.
+
+    Attributes:
+        roteiro: Turnos de passos; o turno usado é o número de HumanMessages
+            do histórico (módulo o tamanho do roteiro).
+        latencia: Segundos por chamada (até o primeiro token, no streaming).
+        variacao: Fração aleatória somada à latência (0.2 = até +20%).
+        latencia_por_token: Segundos entre chunks no streaming; sem streaming,
+            a resposta inteira só chega depois de todos eles, como numa API real.
+        temperature: Só informativo; 0 permite usar o cache de respostas.
+    """
+
+    roteiro: list[list[Passo]] = [[RESPOSTA_PADRAO]]
+    latencia: float = 0.0
+    variacao: float = 0.0
+    latencia_por_token: float = 0.0
+    temperature: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "modelo-falso"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"roteiro": self.roteiro, "temperature": self.temperature}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    # === ROTEIRO ===
+
+    def _passo(self, messages: list[BaseMessage], com_tools: bool) -> Passo:
+        if not com_tools:
+            # Chamada sem tools (ex.: resumo do histórico): sempre texto
+            return RESPOSTA_PADRAO
+        turno = sum(isinstance(m, HumanMessage) for m in messages)
+        passo = 0
+        for m in reversed(messages):
+            if isinstance(m, HumanMessage):
+                break
+            passo += isinstance(m, AIMessage)
+        passos = self.roteiro[(turno - 1) % len(self.roteiro)] if self.roteiro else []
+        return passos[passo] if passo < len(passos) else RESPOSTA_PADRAO
+
+    def _responder(self, messages: list[BaseMessage], kwargs: dict) -> AIMessage:
+        passo = self._passo(messages, "tools" in kwargs)
+        if isinstance(passo, str):
+            mensagem = AIMessage(content=passo)
+        else:
+            mensagem = AIMessage(content="", tool_calls=[
+                {"name": c["name"], "args": c.get("args", {}), "id": f"call_{next(_ids)}", "type": "tool_call"}
+                for c in passo
+            ])
+        entrada = count_tokens_approximately(messages)
+        saida = count_tokens_approximately([mensagem])
+        mensagem.usage_metadata = {"input_tokens": entrada, "output_tokens": saida, "total_tokens": entrada + saida}
+        return mensagem
+
+    def _espera(self) -> float:
+        return self.latencia * (1 + random.random() * self.variacao)
+
+    def _geracao(self, mensagem: AIMessage) -> float:
+        if not self.latencia_por_token:
+            return 0.0
+        return self.latencia_por_token * (sum(1 for _ in self._chunks(mensagem)) - 1)
+
+    # === GERAÇÃO ===
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        mensagem = self._responder(messages, kwargs)
+        time.sleep(self._espera() + self._geracao(mensagem))
+        return ChatResult(generations=[ChatGeneration(message=mensagem)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        mensagem = self._responder(messages, kwargs)
+        await asyncio.sleep(self._espera() + self._geracao(mensagem))
+        return ChatResult(generations=[ChatGeneration(message=mensagem)])
+
+    def _chunks(self, mensagem: AIMessage) -> Iterator[AIMessageChunk]:
+        if mensagem.tool_calls:
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {
+                    "name": c["name"], "args": json.dumps(c["args"], ensure_ascii=False),
+                    "id": c["id"], "index": i, "type": "tool_call_chunk",
+                }
+                for i, c in enumerate(mensagem.tool_calls)
+            ], usage_metadata=mensagem.usage_metadata)
+            return
+        palavras = mensagem.content.split(" ")
+        for i, palavra in enumerate(palavras):
+            yield AIMessageChunk(
+                content=palavra if i == 0 else f" {palavra}",
+                usage_metadata=mensagem.usage_metadata if i == len(palavras) - 1 else None,
+            )
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._espera())
+        for n, chunk in enumerate(self._chunks(self._responder(messages, kwargs))):
+            if n and self.latencia_por_token:
+                time.sleep(self.latencia_por_token)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._espera())
+        for n, chunk in enumerate(self._chunks(self._responder(messages, kwargs))):
+            if n and self.latencia_por_token:
+                await asyncio.sleep(self.latencia_por_token)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
@@ -0,0 +1,660 @@
+# /src/comum/modelos.py
+# Fábrica única dos chat models usados pelos scripts, com proteção contra as
+# falhas de uma API remota sob carga.
+#
+# Cada script criava o seu ChatGoogleGenerativeAI/ChatAnthropic com opções
+# diferentes (só o hello_llm tinha timeout e novas tentativas), e um 429 ou
+# uma resposta lenta ia direto para o usuário ou para o grafo. `criar_modelo`
+# devolve o modelo do provedor envolto num ModeloResiliente, que em cada
+# chamada:
+#
+#   1. recusa na hora se o disjuntor do modelo estiver aberto (o provedor
+#      falhou várias vezes seguidas; ver Disjuntor);
+#   2. espera a vez no LimitadorTaxa do provedor (requisições/s e tokens/min,
+#      se MODELO_RPS / MODELO_TPM estiverem definidos);
+#   3. faz a chamada com prazo; se ela passar do p95 das latências recentes,
+#      dispara uma cópia (hedge) e fica com a primeira resposta;
+#   4. em erro transitório (429, 5xx, timeout, conexão), tenta de novo com
+#      espera exponencial com jitter (ou o Retry-After do provedor);
+#   5. registra latência, tentativas e hedges em MetricasModelo (e na
+#      instrumentação, se ligada).
+#
+# As novas tentativas internas do SDK do provedor são desligadas para não se
+# multiplicarem com as daqui. Limitador, disjuntor e métricas são
+# compartilhados por todos os modelos do processo com o mesmo provedor/modelo,
+# já que as cotas e as falhas são do provedor, não de cada instância.
+#
+# Configuração por variáveis de ambiente (ou `Resiliencia(...)` no código):
+#   MODELO_TENTATIVAS (3)  MODELO_TIMEOUT (60 s)  MODELO_HEDGE (1)
+#   MODELO_HEDGE_PERCENTIL (95)  MODELO_FALHAS_CIRCUITO (5)
+#   MODELO_CIRCUITO_SEGUNDOS (30)  MODELO_RPS  MODELO_TPM
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from pydantic import Field
+
+from comum.cache_respostas import cache_padrao
+from comum.carga import percentil
+from comum.instrumentacao import medir
+from comum.limitador import LimitadorTaxa
+
+# Tokens de saída reservados no limitador antes de a resposta chegar
+TOKENS_SAIDA_ESTIMADOS = 500
+
+# Provedor -> (variável com o nome do modelo, modelo padrão)
+MODELOS_PADRAO = {
+    "google": ("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
+    "anthropic": ("ANTHROPIC_MODEL", "claude-3-5-haiku-latest"),
+}
+
+
+class CircuitoAberto(RuntimeError):
+    """O disjuntor do modelo está aberto: a chamada foi recusada sem ir ao provedor."""
+
+
+@dataclass
+class Resiliencia:
+    """Parâmetros de proteção de um ModeloResiliente.
+
+    Attributes:
+        tentativas: Chamadas ao provedor por pedido (1 = sem novas tentativas).
+        espera_inicial: Base da espera antes da 2ª tentativa; dobra a cada falha.
+        espera_maxima: Teto da espera entre tentativas.
+        timeout: Prazo de cada tentativa, em segundos.
+        hedge: Dispara uma cópia da chamada quando ela demora mais que o
+            `hedge_percentil` das latências recentes.
+        hedge_percentil: Percentil da latência que dispara o hedge.
+        hedge_amostras: Latências observadas antes de começar a usar hedge.
+        falhas_para_abrir: Falhas transitórias seguidas que abrem o disjuntor.
+        tempo_aberto: Segundos com o disjuntor aberto antes de testar de novo.
+    """
+
+    tentativas: int = 3
+    espera_inicial: float = 0.5
+    espera_maxima: float = 20.0
+    timeout: float = 60.0
+    hedge: bool = True
+    hedge_percentil: float = 95.0
+    hedge_amostras: int = 20
+    falhas_para_abrir: int = 5
+    tempo_aberto: float = 30.0
+
+    @classmethod
+    def do_ambiente(cls) -> "Resiliencia":
+        return cls(
+            tentativas=int(os.getenv("MODELO_TENTATIVAS", "3")),
+            timeout=float(os.getenv("MODELO_TIMEOUT", "60")),
+            hedge=os.getenv("MODELO_HEDGE", "1") == "1",
+            hedge_percentil=float(os.getenv("MODELO_HEDGE_PERCENTIL", "95")),
+            falhas_para_abrir=int(os.getenv("MODELO_FALHAS_CIRCUITO", "5")),
+            tempo_aberto=float(os.getenv("MODELO_CIRCUITO_SEGUNDOS", "30")),
+        )
+
+
+# === ERROS ===
+
+# Trechos de nomes de exceção (na hierarquia) que indicam falha passageira
+_NOMES_TRANSITORIOS = (
+    "RateLimit", "Timeout", "Overloaded", "Unavailable", "InternalServer",
+    "Connection", "ResourceExhausted", "DeadlineExceeded", "TooManyRequests",
+)
+# Trechos da mensagem de erro com o mesmo sentido (SDKs que embrulham o status)
+_MENSAGENS_TRANSITORIAS = ("429", "500", "502", "503", "504", "RESOURCE_EXHAUSTED", "UNAVAILABLE", "overloaded")
+
+
+def _status(erro: BaseException) -> Optional[int]:
+    for valor in (getattr(erro, "status_code", None), getattr(erro, "code", None),
+                  getattr(getattr(erro, "response", None), "status_code", None)):
+        if isinstance(valor, int):
+            return valor
+    return None
+
+
+def erro_transitorio(erro: BaseException) -> bool:
+    """Se vale a pena tentar de novo: limite de taxa, erro do servidor, timeout ou conexão."""
+    if isinstance(erro, CircuitoAberto):
+        return False
+    if isinstance(erro, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = _status(erro)
+    if status is not None:
+        return status in (408, 409, 425, 429) or status >= 500
+    if any(trecho in classe.__name__ for classe in type(erro).__mro__ for trecho in _NOMES_TRANSITORIOS):
+        return True
+    mensagem = str(erro)
+    return any(trecho in mensagem for trecho in _MENSAGENS_TRANSITORIAS)
+
+
+def _retry_after(erro: BaseException) -> float:
+    """Segundos pedidos pelo provedor no cabeçalho Retry-After (0 se não houver)."""
+    cabecalhos = getattr(getattr(erro, "response", None), "headers", None) or {}
+    try:
+        return float(cabecalhos.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# === DISJUNTOR ===
+
+class Disjuntor:
+    """Circuit breaker: abre após `falhas_para_abrir` falhas transitórias seguidas.
+
+    Aberto, recusa as chamadas (CircuitoAberto) por `tempo_aberto` segundos;
+    depois deixa passar uma chamada de teste (meio-aberto): sucesso fecha o
+    disjuntor, falha o abre de novo.
+    """
+
+    def __init__(self, falhas_para_abrir: int = 5, tempo_aberto: float = 30.0,
+                 relogio: Callable[[], float] = time.monotonic):
+        self.falhas_para_abrir = falhas_para_abrir
+        self.tempo_aberto = tempo_aberto
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._falhas_seguidas = 0
+        self._aberto_ate: Optional[float] = None
+        self._testando = False
+        self.aberturas = 0
+        self.recusadas = 0
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            if self._aberto_ate is None:
+                return "fechado"
+            return "aberto" if self._relogio() < self._aberto_ate else "meio-aberto"
+
+    def verificar(self):
+        """Levanta CircuitoAberto se a chamada não deve ir ao provedor agora."""
+        with self._lock:
+            if self._aberto_ate is None:
+                return
+            restante = self._aberto_ate - self._relogio()
+            if restante <= 0 and not self._testando:
+                self._testando = True  # esta é a chamada de teste
+                return
+            self.recusadas += 1
+            raise CircuitoAberto(
+                f"provedor instável: chamadas suspensas por mais {max(restante, 0):.1f} s"
+                if restante > 0 else "provedor instável: aguardando a chamada de teste"
+            )
+
+    def sucesso(self):
+        with self._lock:
+            self._falhas_seguidas = 0
+            self._aberto_ate = None
+            self._testando = False
+
+    def falha(self):
+        with self._lock:
+            self._falhas_seguidas += 1
+            if self._testando or self._falhas_seguidas >= self.falhas_para_abrir:
+                if self._aberto_ate is None or self._testando:
+                    self.aberturas += 1
+                self._aberto_ate = self._relogio() + self.tempo_aberto
+                self._testando = False
+
+
+# === MÉTRICAS ===
+
+class MetricasModelo:
+    """Latência e desfecho das chamadas de um modelo.
+
+    Args:
+        janela: Latências recentes guardadas para os percentis e o hedge.
+    """
+
+    def __init__(self, janela: int = 1000):
+        self._lock = threading.Lock()
+        self.latencias: deque[float] = deque(maxlen=janela)  # pedidos com sucesso, com novas tentativas
+        self.latencias_tentativa: deque[float] = deque(maxlen=janela)  # chamadas individuais ao provedor
+        self.pedidos = 0
+        self.falhas = 0
+        self.novas_tentativas = 0
+        self.hedges = 0
+        self.hedges_vencedores = 0
+
+    def registrar_tentativa(self, segundos: float):
+        with self._lock:
+            self.latencias_tentativa.append(segundos)
+
+    def registrar(self, segundos: float, ok: bool):
+        with self._lock:
+            self.pedidos += 1
+            if ok:
+                self.latencias.append(segundos)
+            else:
+                self.falhas += 1
+
+    def contar(self, campo: str):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def atraso_hedge(self, p: float, amostras: int) -> Optional[float]:
+        """Latência da chamada a partir da qual vale disparar uma cópia (None = ainda sem dados)."""
+        with self._lock:
+            if len(self.latencias_tentativa) < amostras:
+                return None
+            recentes = list(self.latencias_tentativa)
+        return percentil(recentes, p)
+
+    def resumo(self) -> dict:
+        with self._lock:
+            latencias = list(self.latencias)
+            return {
+                "pedidos": self.pedidos,
+                "falhas": self.falhas,
+                "novas_tentativas": self.novas_tentativas,
+                "hedges": self.hedges,
+                "hedges_vencedores": self.hedges_vencedores,
+                "p50": percentil(latencias, 50),
+                "p95": percentil(latencias, 95),
+                "p99": percentil(latencias, 99),
+            }
+
+
+# Threads das chamadas síncronas (prazo e hedge precisam de uma thread por chamada)
+_executor_chamadas: Optional[ContextThreadPoolExecutor] = None
+_lock_executor = threading.Lock()
+
+
+def _executor() -> ContextThreadPoolExecutor:
+    global _executor_chamadas
+    with _lock_executor:
+        if _executor_chamadas is None:
+            _executor_chamadas = ContextThreadPoolExecutor(
+                max_workers=int(os.getenv("MODELO_THREADS", "64")), thread_name_prefix="modelo"
+            )
+        return _executor_chamadas
+
+
+# === MODELO ===
+
+class ModeloResiliente(BaseChatModel):
+    """Chat model que envolve outro com limite de taxa, novas tentativas, hedge e disjuntor.
+
+    Funciona onde o modelo original funcionaria (invoke/stream, bind_tools,
+    grafos e agentes). O cache de respostas fica neste
+    modelo: um acerto no cache não passa pelo limitador. O streaming tenta de
+    novo só até o primeiro chunk e não usa hedge.
+    """
+
+    interno: BaseChatModel
+    resiliencia: Resiliencia = Field(default_factory=Resiliencia)
+    limitador: Optional[LimitadorTaxa] = None
+    disjuntor: Disjuntor = Field(default_factory=Disjuntor)
+    metricas: MetricasModelo = Field(default_factory=MetricasModelo)
+
+    @property
+    def _llm_type(self) -> str:
+        return self.interno._llm_type
+
+    @property
+    def _identifying_params(self) -> dict:
+        # Mesma chave de cache que o modelo interno teria (inclui a temperature)
+        return self.interno._identifying_params
+
+    @property
+    def nome(self) -> str:
+        return getattr(self.interno, "model", None) or getattr(self.interno, "model_name", None) or self._llm_type
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # O provedor converte as tools para o seu formato; a chamada continua passando por aqui
+        return self.bind(**self.interno.bind_tools(tools, **kwargs).kwargs)
+
+    # === ETAPAS COMUNS ===
+
+    def _reservar(self, messages: list[BaseMessage]) -> int:
+        return count_tokens_approximately(messages) + TOKENS_SAIDA_ESTIMADOS if self.limitador else 0
+
+    def _concluir(self, resultado: ChatResult, reservados: int):
+        if self.limitador is not None and resultado.generations:
+            uso = getattr(resultado.generations[0].message, "usage_metadata", None) or {}
+            if uso.get("total_tokens"):
+                self.limitador.corrigir(uso["total_tokens"] - reservados)
+
+    def _falhou(self, erro: Exception, tentativa: int, reservados: int) -> float:
+        """Trata a falha de uma tentativa: devolve a espera antes da próxima ou relança o erro."""
+        if self.limitador is not None:
+            self.limitador.corrigir(-reservados)  # a chamada não consumiu a cota estimada
+        if not erro_transitorio(erro):
+            self.disjuntor.sucesso()  # o provedor respondeu; o erro é do pedido
+            raise erro
+        self.disjuntor.falha()
+        if tentativa == self.resiliencia.tentativas - 1:
+            raise erro
+        self.metricas.contar("novas_tentativas")
+        base = min(self.resiliencia.espera_maxima, self.resiliencia.espera_inicial * 2 ** tentativa)
+        # Jitter: metade fixa, metade aleatória, para as novas tentativas não saírem juntas
+        return max(base / 2 + random.uniform(0, base / 2), _retry_after(erro))
+
+    def _atraso_hedge(self) -> Optional[float]:
+        r = self.resiliencia
+        return self.metricas.atraso_hedge(r.hedge_percentil, r.hedge_amostras) if r.hedge else None
+
+    def _pode_duplicar(self, reservados: int) -> bool:
+        # O hedge só sai se couber no limite agora: ele não deve provocar 429
+        return self.limitador is None or self.limitador.tentar(reservados)
+
+    # === SÍNCRONO ===
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        inicio = time.perf_counter()
+        with medir("llm", self.nome) as medicao:
+            for tentativa in range(max(1, self.resiliencia.tentativas)):
+                self.disjuntor.verificar()
+                reservados = self._reservar(messages)
+                if self.limitador is not None:
+                    self.limitador.esperar(reservados)
+                try:
+                    resultado = self._tentar(messages, stop, kwargs, reservados)
+                except Exception as erro:
+                    try:
+                        espera = self._falhou(erro, tentativa, reservados)
+                    except Exception:
+                        self.metricas.registrar(time.perf_counter() - inicio, ok=False)
+                        raise
+                    time.sleep(espera)
+                    continue
+                self.disjuntor.sucesso()
+                self._concluir(resultado, reservados)
+                self.metricas.registrar(time.perf_counter() - inicio, ok=True)
+                medicao.resultado([g.message for g in resultado.generations])
+                return resultado
+
+    def _tentar(self, messages, stop, kwargs, reservados: int) -> ChatResult:
+        """Uma tentativa com prazo e, se demorar, uma cópia; vale a primeira resposta."""
+        executor = _executor()
+        inicio = time.perf_counter()
+        futuros = [executor.submit(self.interno._generate, messages, stop, None, **kwargs)]
+        atraso = self._atraso_hedge()
+        if atraso is not None and atraso < self.resiliencia.timeout:
+            if not wait(futuros, timeout=atraso).done and self._pode_duplicar(reservados):
+                self.metricas.contar("hedges")
+                futuros.append(executor.submit(self.interno._generate, messages, stop, None, **kwargs))
+        return self._primeira_resposta(futuros, inicio)
+
+    def _primeira_resposta(self, futuros: list[Future], inicio: float) -> ChatResult:
+        pendentes, erro = set(futuros), None
+        while pendentes:
+            restante = self.resiliencia.timeout - (time.perf_counter() - inicio)
+            prontos, pendentes = wait(pendentes, timeout=max(restante, 0), return_when=FIRST_COMPLETED)
+            if not prontos:
+                break
+            for futuro in prontos:
+                if futuro.exception() is None:
+                    for outro in pendentes:
+                        outro.cancel()  # se já estiver rodando, termina em segundo plano
+                    self._registrar_vencedor(futuro is not futuros[0], inicio)
+                    return futuro.result()
+                erro = futuro.exception()
+        if erro is not None and not pendentes:
+            raise erro
+        raise TimeoutError(f"{self.nome}: sem resposta em {self.resiliencia.timeout:.0f} s")
+
+    def _registrar_vencedor(self, hedge: bool, inicio: float):
+        self.metricas.registrar_tentativa(time.perf_counter() - inicio)
+        if hedge:
+            self.metricas.contar("hedges_vencedores")
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        inicio = time.perf_counter()
+        for tentativa in range(max(1, self.resiliencia.tentativas)):
+            self.disjuntor.verificar()
+            reservados = self._reservar(messages)
+            if self.limitador is not None:
+                self.limitador.esperar(reservados)
+            chunks = self.interno._stream(messages, stop, None, **kwargs)
+            try:
+                primeiro = next(chunks, None)
+            except Exception as erro:
+                try:
+                    espera = self._falhou(erro, tentativa, reservados)
+                except Exception:
+                    self.metricas.registrar(time.perf_counter() - inicio, ok=False)
+                    raise
+                time.sleep(espera)
+                continue
+            self.disjuntor.sucesso()
+            self.metricas.registrar_tentativa(time.perf_counter() - inicio)
+            # Depois do primeiro chunk não há nova tentativa: parte da resposta já saiu
+            for chunk in ([primeiro] if primeiro is not None else []):
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+            for chunk in chunks:
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+            self.metricas.registrar(time.perf_counter() - inicio, ok=True)
+            return
+
+    # === ASSÍNCRONO ===
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        inicio = time.perf_counter()
+        with medir("llm", self.nome) as medicao:
+            for tentativa in range(max(1, self.resiliencia.tentativas)):
+                self.disjuntor.verificar()
+                reservados = self._reservar(messages)
+                if self.limitador is not None:
+                    await self.limitador.aesperar(reservados)
+                try:
+                    resultado = await self._atentar(messages, stop, kwargs, reservados)
+                except Exception as erro:
+                    try:
+                        espera = self._falhou(erro, tentativa, reservados)
+                    except Exception:
+                        self.metricas.registrar(time.perf_counter() - inicio, ok=False)
+                        raise
+                    await asyncio.sleep(espera)
+                    continue
+                self.disjuntor.sucesso()
+                self._concluir(resultado, reservados)
+                self.metricas.registrar(time.perf_counter() - inicio, ok=True)
+                medicao.resultado([g.message for g in resultado.generations])
+                return resultado
+
+    async def _atentar(self, messages, stop, kwargs, reservados: int) -> ChatResult:
+        inicio = time.perf_counter()
+        tarefas = [asyncio.create_task(self.interno._agenerate(messages, stop, None, **kwargs))]
+        try:
+            atraso = self._atraso_hedge()
+            if atraso is not None and atraso < self.resiliencia.timeout:
+                prontas, _ = await asyncio.wait(tarefas, timeout=atraso)
+                if not prontas and self._pode_duplicar(reservados):
+                    self.metricas.contar("hedges")
+                    tarefas.append(asyncio.create_task(self.interno._agenerate(messages, stop, None, **kwargs)))
+            pendentes, erro = set(tarefas), None
+            while pendentes:
+                restante = self.resiliencia.timeout - (time.perf_counter() - inicio)
+                prontas, pendentes = await asyncio.wait(
+                    pendentes, timeout=max(restante, 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not prontas:
+                    break
+                for tarefa in prontas:
+                    if tarefa.exception() is None:
+                        self._registrar_vencedor(tarefa is not tarefas[0], inicio)
+                        return tarefa.result()
+                    erro = tarefa.exception()
+            if erro is not None and not pendentes:
+                raise erro
+            raise TimeoutError(f"{self.nome}: sem resposta em {self.resiliencia.timeout:.0f} s")
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()  # a perdedora (ou as que estouraram o prazo)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        inicio = time.perf_counter()
+        for tentativa in range(max(1, self.resiliencia.tentativas)):
+            self.disjuntor.verificar()
+            reservados = self._reservar(messages)
+            if self.limitador is not None:
+                await self.limitador.aesperar(reservados)
+            chunks = self.interno._astream(messages, stop, None, **kwargs)
+            try:
+                primeiro = await anext(chunks, None)
+            except Exception as erro:
+                try:
+                    espera = self._falhou(erro, tentativa, reservados)
+                except Exception:
+                    self.metricas.registrar(time.perf_counter() - inicio, ok=False)
+                    raise
+                await asyncio.sleep(espera)
+                continue
+            self.disjuntor.sucesso()
+            self.metricas.registrar_tentativa(time.perf_counter() - inicio)
+            if primeiro is not None:
+                if run_manager:
+                    await run_manager.on_llm_new_token(primeiro.text, chunk=primeiro)
+                yield primeiro
+            async for chunk in chunks:
+                if run_manager:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+            self.metricas.registrar(time.perf_counter() - inicio, ok=True)
+            return
+
+
+# === FÁBRICA ===
+
+# Estado compartilhado por provedor (limitador) e por provedor/modelo (disjuntor, métricas)
+_limitadores: dict[str, Optional[LimitadorTaxa]] = {}
+_protecoes: dict[str, tuple[Disjuntor, MetricasModelo]] = {}
+_lock_compartilhados = threading.Lock()
+
+
+def _limitador_do_ambiente(provedor: str) -> Optional[LimitadorTaxa]:
+    with _lock_compartilhados:
+        if provedor not in _limitadores:
+            rps = float(os.getenv("MODELO_RPS", "0"))
+            tpm = float(os.getenv("MODELO_TPM", "0"))
+            _limitadores[provedor] = LimitadorTaxa(rps or None, tpm or None) if rps or tpm else None
+        return _limitadores[provedor]
+
+
+def _protecao(chave: str, resiliencia: Resiliencia) -> tuple[Disjuntor, MetricasModelo]:
+    with _lock_compartilhados:
+        if chave not in _protecoes:
+            _protecoes[chave] = (Disjuntor(resiliencia.falhas_para_abrir, resiliencia.tempo_aberto), MetricasModelo())
+        return _protecoes[chave]
+
+
+def envolver(
+    interno: BaseChatModel,
+    resiliencia: Optional[Resiliencia] = None,
+    *,
+    limitador: Optional[LimitadorTaxa] = None,
+    chave: Optional[str] = None,
+    cache=None,
+) -> ModeloResiliente:
+    """Envolve um chat model já criado (de qualquer provedor, ou o ModeloFalso).
+
+    Com `chave`, disjuntor e métricas são os mesmos de outros modelos com a
+    mesma chave; sem ela, são exclusivos deste modelo.
+    """
+    resiliencia = resiliencia or Resiliencia.do_ambiente()
+    if chave is None:
+        disjuntor, metricas = Disjuntor(resiliencia.falhas_para_abrir, resiliencia.tempo_aberto), MetricasModelo()
+    else:
+        disjuntor, metricas = _protecao(chave, resiliencia)
+    return ModeloResiliente(
+        interno=interno, resiliencia=resiliencia, limitador=limitador,
+        disjuntor=disjuntor, metricas=metricas, cache=cache,
+    )
+
+
+def criar_modelo(
+    provedor: str = "google",
+    *,
+    modelo: Optional[str] = None,
+    temperature: float = 0,
+    cache: bool = True,
+    resiliencia: Optional[Resiliencia] = None,
+    limitador: Optional[LimitadorTaxa] = None,
+    **parametros: Any,
+) -> ModeloResiliente:
+    """Cria o chat model do provedor ("google" ou "anthropic") com as proteções deste módulo.
+
+    Args:
+        modelo: Nome do modelo (padrão: GOOGLE_MODEL / ANTHROPIC_MODEL).
+        temperature: Temperatura do modelo.
+        cache: Usa o cache de respostas (`cache_padrao()`), que só guarda
+            chamadas com temperature=0.
+        resiliencia: Parâmetros de proteção (padrão: variáveis MODELO_*).
+        limitador: Limite de taxa deste modelo, no lugar do compartilhado pelo
+            provedor (MODELO_RPS / MODELO_TPM).
+        **parametros: Repassados ao construtor do provedor (ex.: max_output_tokens).
+    """
+    if provedor not in MODELOS_PADRAO:
+        raise ValueError(f"provedor desconhecido: {provedor!r} (use {', '.join(MODELOS_PADRAO)})")
+    resiliencia = resiliencia or Resiliencia.do_ambiente()
+    variavel, padrao = MODELOS_PADRAO[provedor]
+    nome = modelo or os.getenv(variavel, padrao)
+
+    # Import do provedor só aqui: é o passo mais lento da inicialização dos scripts
+    if provedor == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        # max_retries=1: uma tentativa só no SDK; as novas tentativas são as daqui
+        interno = ChatGoogleGenerativeAI(
+            model=nome, temperature=temperature, timeout=resiliencia.timeout, max_retries=1, **parametros
+        )
+    else:
+        from langchain_anthropic import ChatAnthropic
+
+        interno = ChatAnthropic(
+            model=nome, temperature=temperature, timeout=resiliencia.timeout, max_retries=0, **parametros
+        )
+    return envolver(
+        interno, resiliencia, limitador=limitador or _limitador_do_ambiente(provedor),
+        chave=f"{provedor}:{nome}", cache=cache_padrao() if cache else None,
+    )
+
+
+def metricas_modelos() -> dict[str, dict]:
+    """Resumo das métricas de cada provedor:modelo criado por `criar_modelo`."""
+    with _lock_compartilhados:
+        protecoes = dict(_protecoes)
+    return {
+        chave: {**metricas.resumo(), "disjuntor": disjuntor.estado, "recusadas": disjuntor.recusadas}
+        for chave, (disjuntor, metricas) in protecoes.items()
+    }
@@ -0,0 +1,65 @@
+# /src/comum/preguicoso.py
+# Criação adiada de objetos caros: clientes dos provedores de LLM, modelos com
+# tools bindadas e grafos compilados.
+#
+# Importar `langchain_anthropic` custa ~2 s e `langchain_google_genai` ~0,7 s,
+# e os scripts criavam o modelo já no import, antes de mostrar o primeiro
+# prompt. Com `Preguicoso`, o import do provedor e a criação do cliente só
+# acontecem na primeira chamada a `obter()` (uma vez só, mesmo com várias
+# threads). `aquecer()` adianta essa criação numa thread em segundo plano,
+# enquanto o usuário digita a primeira mensagem.
+
+import threading
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+_VAZIO = object()
+
+
+class Preguicoso(Generic[T]):
+    """Valor criado por `fabrica` na primeira chamada a `obter()` e reaproveitado depois.
+
+    A instância também é chamável (`valor()` equivale a `valor.obter()`), então
+    pode ser passada onde se espera uma função que devolve o objeto.
+    """
+
+    __slots__ = ("_fabrica", "_valor", "_lock")
+
+    def __init__(self, fabrica: Callable[[], T]):
+        self._fabrica = fabrica
+        self._valor = _VAZIO
+        self._lock = threading.Lock()
+
+    def obter(self) -> T:
+        valor = self._valor
+        if valor is _VAZIO:
+            with self._lock:
+                if self._valor is _VAZIO:
+                    # Se a fábrica falhar nada fica guardado; a próxima chamada tenta de novo
+                    self._valor = self._fabrica()
+                valor = self._valor
+        return valor
+
+    __call__ = obter
+
+    @property
+    def criado(self) -> bool:
+        return self._valor is not _VAZIO
+
+    def descartar(self):
+        """Esquece o valor criado; o próximo `obter()` chama a fábrica de novo."""
+        with self._lock:
+            self._valor = _VAZIO
+
+    def aquecer(self) -> threading.Thread:
+        """Cria o valor numa thread daemon; um erro só aparece no próximo `obter()`."""
+        def criar():
+            try:
+                self.obter()
+            except Exception:
+                pass  # a chamada de verdade repete a criação e mostra o erro
+
+        thread = threading.Thread(target=criar, name="aquecer", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,142 @@
+# /src/comum/streaming.py
+# Streaming de turnos dos agentes: em vez de esperar o `invoke` terminar todo o
+# loop ReAct, o grafo é executado com `stream_mode=["messages", "updates"]` e
+# cada execução vira uma sequência de eventos:
+#
+#   token        pedaço de texto gerado pelo LLM
+#   tool_inicio  o LLM pediu uma tool (nome e argumentos completos)
+#   tool_fim     a tool respondeu (conteúdo da ToolMessage)
+#   fim          resposta final, tempo até o primeiro token e tempo total
+#
+# Os tokens vêm do modo "messages" (callbacks do chat model); as tools vêm do
+# modo "updates" (mensagens que cada nó gravou no estado), então funciona com
+# qualquer nome de nó. Chamadas marcadas com a tag "nostream" (ex.: o resumo
+# do histórico) não geram tokens.
+
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator, Optional, TextIO
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+MODOS_STREAM = ["messages", "updates"]
+
+
+@dataclass
+class EventoAgente:
+    """Um evento do turno; `instante` é contado a partir do início do turno (s)."""
+
+    tipo: str
+    instante: float
+    texto: str = ""
+    nome: str = ""
+    tool_call_id: str = ""
+    args: dict = field(default_factory=dict)
+    # Só no evento "fim"
+    primeiro_token: Optional[float] = None
+    total: Optional[float] = None
+
+
+def _texto(conteudo) -> str:
+    if isinstance(conteudo, str):
+        return conteudo
+    return "".join(b.get("text", "") for b in conteudo if isinstance(b, dict) and b.get("type") == "text")
+
+
+class _Tradutor:
+    """Converte as saídas de `stream(stream_mode=MODOS_STREAM)` em EventoAgente."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.primeiro_token: Optional[float] = None
+        self.resposta = ""
+        self._nomes: dict[str, str] = {}
+
+    def _agora(self) -> float:
+        return time.perf_counter() - self.inicio
+
+    def traduzir(self, modo: str, dados: Any) -> list[EventoAgente]:
+        if modo == "messages":
+            mensagem, _ = dados
+            # Chunks do LLM (ou a mensagem inteira, se ela veio do cache sem streaming)
+            if not isinstance(mensagem, (AIMessageChunk, AIMessage)):
+                return []
+            texto = _texto(mensagem.content)
+            if not texto:
+                return []
+            agora = self._agora()
+            if self.primeiro_token is None:
+                self.primeiro_token = agora
+            return [EventoAgente("token", agora, texto=texto)]
+
+        eventos = []
+        for atualizacao in (dados or {}).values():
+            for mensagem in (atualizacao or {}).get("messages", []) if isinstance(atualizacao, dict) else []:
+                if isinstance(mensagem, ToolMessage):
+                    eventos.append(EventoAgente(
+                        "tool_fim", self._agora(), texto=_texto(mensagem.content),
+                        nome=self._nomes.pop(mensagem.tool_call_id, mensagem.name or ""),
+                        tool_call_id=mensagem.tool_call_id,
+                    ))
+                elif isinstance(mensagem, AIMessage):
+                    for chamada in mensagem.tool_calls:
+                        self._nomes[chamada["id"]] = chamada["name"]
+                        eventos.append(EventoAgente(
+                            "tool_inicio", self._agora(), nome=chamada["name"],
+                            tool_call_id=chamada["id"], args=chamada["args"],
+                        ))
+                    if not mensagem.tool_calls:
+                        self.resposta = _texto(mensagem.content)
+        return eventos
+
+    def fim(self) -> EventoAgente:
+        total = self._agora()
+        return EventoAgente("fim", total, texto=self.resposta, primeiro_token=self.primeiro_token, total=total)
+
+
+def transmitir(agente, entrada: dict, config: Optional[dict] = None) -> Iterator[EventoAgente]:
+    """Executa um turno de `agente` produzindo eventos à medida que acontecem."""
+    tradutor = _Tradutor()
+    for modo, dados in agente.stream(entrada, config, stream_mode=MODOS_STREAM):
+        yield from tradutor.traduzir(modo, dados)
+    yield tradutor.fim()
+
+
+async def atransmitir(agente, entrada: dict, config: Optional[dict] = None) -> AsyncIterator[EventoAgente]:
+    """Versão assíncrona de `transmitir` (usa `agente.astream`)."""
+    tradutor = _Tradutor()
+    async for modo, dados in agente.astream(entrada, config, stream_mode=MODOS_STREAM):
+        for evento in tradutor.traduzir(modo, dados):
+            yield evento
+    yield tradutor.fim()
+
+
+def imprimir_eventos(eventos: Iterator[EventoAgente], prefixo: str, saida: TextIO = sys.stdout) -> EventoAgente:
+    """Mostra os eventos no terminal conforme chegam e devolve o evento "fim"."""
+    linha_aberta = texto_desde_tools = False
+    for evento in eventos:
+        if evento.tipo == "token":
+            if not linha_aberta:
+                saida.write(prefixo)
+            saida.write(evento.texto)
+            linha_aberta = texto_desde_tools = True
+        elif evento.tipo in ("tool_inicio", "tool_fim"):
+            if linha_aberta:
+                saida.write("\n")
+            if evento.tipo == "tool_inicio":
+                args = ", ".join(f"{k}={v!r}" for k, v in evento.args.items())
+                saida.write(f"  [tool] {evento.nome}({args})\n")
+            else:
+                saida.write(f"  [tool] {evento.nome} concluída\n")
+            linha_aberta = texto_desde_tools = False
+        elif evento.tipo == "fim":
+            # Resposta que não veio em tokens (ex.: servida pelo cache de respostas)
+            if not texto_desde_tools and evento.texto:
+                saida.write(f"{prefixo}{evento.texto}")
+            primeiro = f"{evento.primeiro_token:.2f} s" if evento.primeiro_token is not None else "-"
+            saida.write(f"\n  (primeiro token em {primeiro}, total {evento.total:.2f} s)\n")
+            saida.flush()
+            return evento
+        saida.flush()
+    return evento
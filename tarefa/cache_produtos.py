@@ -0,0 +1,183 @@
+# /src/cache_produtos.py
+# Cache em memória das leituras de produtos (read-through) para as tools do chatbot.
+#
+# As listagens e buscas são muito mais frequentes que as escritas, então o
+# resultado de cada consulta fica guardado e é reaproveitado até alguma escrita
+# que o afete. A invalidação é feita por contadores de versão, sem varrer o
+# cache: cada resultado depende de algumas "famílias" e guarda a versão de cada
+# uma no momento em que foi lido; só é servido se todas continuam iguais.
+#
+#   família             depende dela                       incrementada quando
+#   ("id", X)           leitura do produto X, páginas      o produto X é escrito
+#                       da listagem que contêm X
+#   ("membros",)        páginas da listagem sem filtro     um produto é criado ou excluído
+#   ("nome", f)         buscas cujo filtro é `f`           o nome antigo ou novo contém `f`
+#   ("estoque", L)      produtos com estoque abaixo de L   o estoque antigo ou novo é < L
+#
+# Assim, mudar o estoque de um produto não descarta as buscas por nome de
+# outros produtos, nem as listas de estoque baixo com limite menor que os
+# estoques envolvidos. Para isso as escritas informam a linha antes e depois
+# (`invalidar([(antes, depois)])`); escritas sem esse detalhe (ou feitas por
+# fora das tools) chamam `invalidar()` e descartam tudo.
+#
+# Um resultado só é guardado se nenhuma escrita foi registrada enquanto ele era
+# lido do banco, então uma leitura concorrente com uma escrita nunca fica no
+# cache com dados antigos.
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+# (id, nome, preco, estoque)
+Linha = tuple
+
+# Acima de tantos contadores por entrada do cache, tudo é descartado de uma vez
+_CONTADORES_POR_ENTRADA = 8
+
+
+class CacheProdutos:
+    """Cache LRU thread-safe de consultas e produtos, invalidado por versão.
+
+    Args:
+        max_entradas: Máximo de resultados guardados; 0 desativa o cache
+            (toda leitura vai ao banco, as métricas continuam contando faltas).
+    """
+
+    def __init__(self, max_entradas: int = 2048):
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        # chave -> (famílias, versões, valor)
+        self._entradas: OrderedDict[Hashable, tuple[tuple, tuple, Any]] = OrderedDict()
+        self._versoes: dict[tuple, int] = {}
+        self._filtros: set[str] = set()
+        self._limites: set[int] = set()
+        # Incrementada a cada invalidação total: faz parte de toda versão
+        self._geracao = 0
+        self._escritas = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.obsoletas = 0
+        self.invalidacoes = 0
+        self.descartes = 0
+
+    # === LEITURA ===
+
+    def _versao(self, familias: tuple) -> tuple:
+        return (self._geracao, *(self._versoes.get(f, 0) for f in familias))
+
+    def _ler(self, chave: Hashable, carregar: Callable[[], Any], familias: Callable[[Any], tuple]) -> Any:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                if entrada[1] == self._versao(entrada[0]):
+                    self._entradas.move_to_end(chave)
+                    self.acertos += 1
+                    return entrada[2]
+                del self._entradas[chave]
+                self.obsoletas += 1
+            self.faltas += 1
+            escritas = self._escritas
+
+        # Fora do lock: leituras de outras sessões não esperam pelo banco
+        valor = carregar()
+        if self.max_entradas <= 0:
+            return valor
+        deps = familias(valor)
+        with self._lock:
+            if self._escritas != escritas:
+                return valor  # houve escrita durante a leitura
+            for familia in deps:
+                if familia[0] == "nome":
+                    self._filtros.add(familia[1])
+                elif familia[0] == "estoque":
+                    self._limites.add(familia[1])
+            self._entradas[chave] = (deps, self._versao(deps), valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.descartes += 1
+        return valor
+
+    def listagem(self, chave: tuple, carregar: Callable[[], Iterable[Linha]]) -> tuple:
+        """Página da listagem sem filtro; depende dos ids exibidos e de criações/exclusões."""
+        return self._ler(
+            ("listagem", *chave), lambda: tuple(carregar()),
+            lambda linhas: (("membros",), *(("id", linha[0]) for linha in linhas)),
+        )
+
+    def por_nome(self, filtro: str, chave: tuple, carregar: Callable[[], Iterable[tuple]]) -> tuple:
+        """Busca pelo trecho de nome `filtro` (sem diferenciar maiúsculas)."""
+        familia = ("nome", filtro.lower())
+        return self._ler(("nome", filtro, *chave), lambda: tuple(carregar()), lambda _: (familia,))
+
+    def por_estoque(self, limite: int, chave: tuple, carregar: Callable[[], Iterable[Linha]]) -> tuple:
+        """Consulta sobre os produtos com estoque menor que `limite`."""
+        familia = ("estoque", limite)
+        return self._ler(("estoque", limite, *chave), lambda: tuple(carregar()), lambda _: (familia,))
+
+    def produto(self, id: int, carregar: Callable[[], Optional[Linha]]) -> Optional[Linha]:
+        """Linha do produto `id` (ou None se não existe)."""
+        familia = ("id", id)
+        return self._ler(("produto", id), carregar, lambda _: (familia,))
+
+    # === ESCRITA ===
+
+    def _incrementar(self, familia: tuple):
+        self._versoes[familia] = self._versoes.get(familia, 0) + 1
+
+    def invalidar(self, alteracoes: Optional[Iterable[tuple[Optional[Linha], Optional[Linha]]]] = None):
+        """Registra escritas já confirmadas no banco.
+
+        Args:
+            alteracoes: Pares (linha antes, linha depois) de cada produto escrito;
+                `antes` é None numa criação e `depois` é None numa exclusão. Sem
+                alterações, todo o cache passa a ser obsoleto.
+        """
+        with self._lock:
+            self._escritas += 1
+            self.invalidacoes += 1
+            if alteracoes is None or len(self._versoes) > _CONTADORES_POR_ENTRADA * max(1, self.max_entradas):
+                self._geracao += 1
+                self._versoes.clear()
+                self._filtros.clear()
+                self._limites.clear()
+                return
+            for antes, depois in alteracoes:
+                linhas = [linha for linha in (antes, depois) if linha is not None]
+                if not linhas:
+                    continue
+                self._incrementar(("id", linhas[0][0]))
+                if antes is None or depois is None:
+                    self._incrementar(("membros",))
+                nomes = [linha[1].lower() for linha in linhas]
+                for filtro in self._filtros:
+                    if any(filtro in nome for nome in nomes):
+                        self._incrementar(("nome", filtro))
+                menor_estoque = min(linha[3] for linha in linhas)
+                for limite in self._limites:
+                    if menor_estoque < limite:
+                        self._incrementar(("estoque", limite))
+
+    def limpar(self):
+        """Esvazia o cache (ex.: ao trocar de banco)."""
+        with self._lock:
+            self._entradas.clear()
+            self._escritas += 1
+            self._geracao += 1
+            self._versoes.clear()
+            self._filtros.clear()
+            self._limites.clear()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "obsoletas": self.obsoletas,
+                "invalidacoes": self.invalidacoes,
+                "descartes": self.descartes,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+            }
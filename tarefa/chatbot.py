@@ -5,18 +5,38 @@
 #Dupla: Matheus Cardoso & Agda Silva
 
 import os
+import sys
+import json
 import sqlite3
 import operator
-from typing import TypedDict, Annotated, Literal, Optional
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import TypedDict, Annotated, Iterable, Literal, Optional
 from dotenv import load_dotenv
 
-from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage, AnyMessage
+from langchain_core.messages import HumanMessage, AIMessage, AnyMessage
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+from pool_conexoes import PoolConexoes
+from cache_produtos import CacheProdutos
+from monitor_estoque import MonitorEstoque
+from checkpointer_sqlite import CheckpointerSQLite
+
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.cache_prompt import CACHE_EFEMERO, MetricasCache, ferramentas_com_cache  # noqa: E402
+from comum.contexto import GerenciadorContexto  # noqa: E402
+from comum.execucao_tools import executar_tool_calls, aexecutar_tool_calls  # noqa: E402
+from comum.instrumentacao import instrumentar  # noqa: E402
+from comum.modelos import criar_modelo  # noqa: E402
+from comum.preguicoso import Preguicoso  # noqa: E402
+from comum.streaming import imprimir_eventos, transmitir  # noqa: E402
 
 load_dotenv()
 
@@ -24,26 +44,273 @@ load_dotenv()
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "produtos.db")
 
+# Uma conexão por thread, reaproveitada entre tool calls
+_pool = PoolConexoes(DB_PATH)
+
+# Resultados das leituras das tools, invalidados a cada escrita (0 desativa)
+_cache = CacheProdutos(int(os.getenv("CACHE_PRODUTOS_MAX", "2048")))
+
+# O SQLite já serializa os escritores; serializá-los também aqui faz as
+# notificações ao cache e ao monitor de estoque chegarem na ordem dos commits
+_escrita = threading.RLock()
+
+# Sessões (checkpoints do grafo) ficam num arquivo irmão do banco de produtos;
+# threads sem atividade há mais de SESSOES_TTL segundos são removidas
+SESSOES_PATH = os.path.join(os.path.dirname(__file__), "sessoes.db")
+SESSOES_TTL = float(os.getenv("SESSOES_TTL_SEGUNDOS", 7 * 24 * 3600))
+
+
+# Índice full-text sobre `produtos.nome`, mantido em sincronia por triggers.
+# O tokenizador trigram permite buscar qualquer trecho do nome (mesma semântica
+# do antigo `LIKE '%x%'`), mas consultando o índice em vez de varrer a tabela.
+SCHEMA_BUSCA = """
+CREATE INDEX IF NOT EXISTS idx_produtos_nome ON produtos(nome);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5(
+    nome, content='produtos', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS produtos_fts_ai AFTER INSERT ON produtos BEGIN
+    INSERT INTO produtos_fts(rowid, nome) VALUES (new.id, new.nome);
+END;
+
+CREATE TRIGGER IF NOT EXISTS produtos_fts_ad AFTER DELETE ON produtos BEGIN
+    INSERT INTO produtos_fts(produtos_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+END;
+
+CREATE TRIGGER IF NOT EXISTS produtos_fts_au AFTER UPDATE OF nome ON produtos BEGIN
+    INSERT INTO produtos_fts(produtos_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+    INSERT INTO produtos_fts(rowid, nome) VALUES (new.id, new.nome);
+END;
+"""
+
+# Buscas com menos caracteres que um trigrama não usam o índice full-text
+TAMANHO_MINIMO_FTS = 3
+
+_busca_fts_disponivel = False
+
 
 def inicializar_banco():
-    """Cria a tabela de produtos se não existir."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS produtos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            preco REAL NOT NULL,
-            estoque INTEGER NOT NULL
-        )
-    """)
-    conn.commit()
-    conn.close()
+    """Cria a tabela de produtos e os índices de busca, migrando bancos existentes."""
+    global _busca_fts_disponivel
+    conn = get_conexao()
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS produtos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL,
+                preco REAL NOT NULL,
+                estoque INTEGER NOT NULL
+            )
+        """)
+        # Índice de cobertura de `produtos_estoque_abaixo`: o filtro, a ordem
+        # (estoque, id) e as colunas exibidas saem do índice, sem ler a tabela
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_produtos_estoque ON produtos(estoque, id, nome, preco)")
+
+    existia = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'produtos_fts'"
+    ).fetchone() is not None
+    try:
+        conn.executescript("BEGIN;" + SCHEMA_BUSCA + "COMMIT;")
+    except sqlite3.OperationalError:
+        # SQLite sem FTS5/trigram: as buscas continuam funcionando via LIKE
+        conn.rollback()
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_produtos_nome ON produtos(nome)")
+        _busca_fts_disponivel = False
+        return
+
+    if not existia:
+        # Banco criado antes do índice full-text: indexar as linhas existentes
+        with conn:
+            conn.execute("INSERT INTO produtos_fts(produtos_fts) VALUES ('rebuild')")
+    _busca_fts_disponivel = True
+
+
+def buscar_por_nome(
+    conn: sqlite3.Connection,
+    texto: str,
+    colunas: str = "id, nome, preco, estoque",
+    limite: int = -1,
+    offset: int = 0,
+    apos_id: Optional[int] = None,
+) -> sqlite3.Cursor:
+    """Busca produtos cujo nome contém `texto`, do mais para o menos relevante.
+
+    Correspondências exatas (sem diferenciar maiúsculas) vêm primeiro, seguidas
+    das demais ordenadas pelo bm25 do índice full-text. Sem o índice, ou para
+    textos menores que um trigrama, recai sobre `LIKE`.
+
+    Com `apos_id` a paginação é por keyset: retorna apenas ids maiores que
+    `apos_id`, ordenados por id (sem ranking).
+    """
+    usa_fts = _busca_fts_disponivel and len(texto) >= TAMANHO_MINIMO_FTS
+    if usa_fts:
+        colunas = ", ".join(f"p.{c.strip()}" for c in colunas.split(","))
+        origem = "produtos_fts f JOIN produtos p ON p.id = f.rowid"
+        condicao = "produtos_fts MATCH ?"
+        params: list = ['"' + texto.replace('"', '""') + '"']
+        chave, ranking = "p.id", "p.nome = ? COLLATE NOCASE DESC, f.rank"
+    else:
+        origem = "produtos"
+        condicao = "nome LIKE ?"
+        params = [f"%{texto}%"]
+        chave, ranking = "id", "nome = ? COLLATE NOCASE DESC, id"
+
+    if apos_id is not None:
+        condicao += f" AND {chave} > ?"
+        params.append(apos_id)
+        ordem = chave
+    else:
+        ordem = ranking
+        params.append(texto)
+
+    return conn.execute(
+        f"SELECT {colunas} FROM {origem} WHERE {condicao} ORDER BY {ordem} LIMIT ? OFFSET ?",
+        (*params, limite, offset),
+    )
+
+
+# === PAGINAÇÃO DAS LISTAGENS ===
+
+# Tamanho padrão e máximo de uma página de produtos
+QUANTIDADE_PADRAO = 50
+QUANTIDADE_MAXIMA = 200
+
+# Teto de caracteres de uma listagem devolvida ao LLM, independente da quantidade
+MAX_CARACTERES_RESPOSTA = 4000
+
+# Candidatos exibidos quando uma busca por nome é ambígua
+MAX_CANDIDATOS = 20
+
+
+def formatar_pagina(linhas: Iterable[tuple], quantidade: int) -> tuple[list[str], Optional[tuple], bool]:
+    """Formata até `quantidade` linhas de produtos sem ultrapassar o teto de caracteres.
+
+    Consome `linhas` de forma preguiçosa (pode ser um cursor SQLite) e para
+    assim que a página enche.
+
+    Returns:
+        (linhas formatadas, última linha incluída, se há mais resultados)
+    """
+    partes: list[str] = []
+    tamanho = 0
+    ultima = None
+    for p in linhas:
+        if len(partes) == quantidade:
+            return partes, ultima, True
+        texto = f"[{p[0]}] {p[1]} - R$ {p[2]:.2f} ({p[3]} em estoque)"
+        tamanho += len(texto) + 1
+        if partes and tamanho > MAX_CARACTERES_RESPOSTA:
+            return partes, ultima, True
+        partes.append(texto)
+        ultima = p
+    return partes, ultima, False
+
+
+def montar_resposta_paginada(cabecalho: str, partes: list[str], continuacao: Optional[str]) -> str:
+    """Junta cabeçalho, itens e o aviso de "mais resultados" em uma única string."""
+    resultado = cabecalho + "\n\n" + "\n".join(partes)
+    if continuacao:
+        resultado += f"\n\n[MAIS RESULTADOS] Há mais produtos. Para ver a próxima página, chame novamente com {continuacao}."
+    return resultado
+
+
+def get_conexao() -> sqlite3.Connection:
+    """Retorna a conexão da thread atual com o banco de dados.
+
+    A conexão vem do pool e não deve ser fechada pelo chamador. Operações de
+    escrita devem usar `with conn:` para confirmar ou desfazer a transação.
+    """
+    return _pool.conexao()
+
+
+def configurar_banco(caminho: str):
+    """Aponta as tools para outro arquivo de banco (ex.: benchmarks e testes)."""
+    global DB_PATH, _pool, _busca_fts_disponivel
+    _pool.fechar()
+    DB_PATH = caminho
+    _pool = PoolConexoes(caminho)
+    _cache.limpar()
+    _monitor.invalidar()
+    _busca_fts_disponivel = False
+
+
+def configurar_cache(max_entradas: int):
+    """Troca o cache de leituras por um novo com outro tamanho (0 desativa)."""
+    global _cache
+    _cache = CacheProdutos(max_entradas)
+
+
+def estatisticas_cache() -> dict:
+    """Acertos, faltas e invalidações do cache de leituras de produtos."""
+    return _cache.estatisticas()
+
+
+SELECT_PRODUTO = "SELECT id, nome, preco, estoque FROM produtos WHERE id = ?"
+
+
+def _carregar_produto(id: int) -> Optional[tuple]:
+    return get_conexao().execute(SELECT_PRODUTO, (id,)).fetchone()
+
 
+def _carregar_estoque_baixo(teto: int) -> list[tuple]:
+    return get_conexao().execute(
+        "SELECT id, nome, preco, estoque FROM produtos WHERE estoque < ? ORDER BY estoque, id", (teto,)
+    ).fetchall()
 
-def get_conexao():
-    """Retorna uma conexão com o banco de dados."""
-    return sqlite3.connect(DB_PATH)
+
+# Produtos com estoque baixo mantidos em memória; MONITOR_ESTOQUE_LIMITE > 0
+# ativa desde o início (ou use `assinar_estoque_baixo`)
+_monitor = MonitorEstoque(_carregar_estoque_baixo, _escrita, teto=int(os.getenv("MONITOR_ESTOQUE_LIMITE", "0")))
+
+
+def assinar_estoque_baixo(limite: int, ao_mudar=None):
+    """Mantém em memória os produtos com estoque < `limite`.
+
+    Depois disso, `produtos_estoque_abaixo` com limite até o maior assinado é
+    respondida sem consultar o banco. `ao_mudar(evento, linha, limite)` é
+    chamado quando um produto entra ("entrou") ou sai ("saiu") do conjunto.
+    """
+    _monitor.assinar(limite, ao_mudar)
+
+
+def configurar_monitor(teto: int):
+    """Reinicia o monitor de estoque baixo sem assinaturas, cobrindo limites até `teto` (0 desativa)."""
+    _monitor.reiniciar(teto)
+
+
+def _registrar_escritas(alteracoes: Optional[Iterable[tuple]] = None):
+    """Repassa escritas confirmadas (linha antes, linha depois) ao cache e ao monitor.
+
+    Deve ser chamada segurando `_escrita`. Sem `alteracoes`, ambos descartam tudo.
+    """
+    if alteracoes is None:
+        _cache.invalidar()
+        _monitor.invalidar()
+        return
+    alteracoes = list(alteracoes)
+    _cache.invalidar(alteracoes)
+    _monitor.aplicar(alteracoes)
+
+
+def _escrever_produto(conn: sqlite3.Connection, sql: str, params: tuple, id: int) -> tuple[Optional[tuple], Optional[tuple]]:
+    """Executa uma escrita no produto `id` e registra a linha antes e depois.
+
+    As duas leituras ficam na mesma transação IMMEDIATE da escrita, então
+    nenhuma escrita concorrente se intercala entre elas.
+    """
+    with _escrita:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            antes = conn.execute(SELECT_PRODUTO, (id,)).fetchone()
+            conn.execute(sql, params)
+            depois = conn.execute(SELECT_PRODUTO, (id,)).fetchone()
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        _registrar_escritas([(antes, depois)])
+    return antes, depois
 
 
 # === SCHEMAS PYDANTIC PARA VALIDAÇÃO (Cap 3) ===
@@ -61,6 +328,13 @@ class AtualizarProdutoInput(BaseModel):
     estoque: Optional[int] = Field(default=None, description="Novo estoque (opcional)")
 
 
+class ListarProdutosInput(BaseModel):
+    filtro_nome: Optional[str] = Field(default=None, description="Texto para filtrar produtos pelo nome (opcional)")
+    quantidade: int = Field(default=QUANTIDADE_PADRAO, ge=1, le=QUANTIDADE_MAXIMA, description="Máximo de produtos por página")
+    offset: int = Field(default=0, ge=0, description="Quantos produtos pular (use o offset devolvido em [MAIS RESULTADOS])")
+    cursor: Optional[str] = Field(default=None, description="Cursor devolvido em [MAIS RESULTADOS] para buscar a próxima página")
+
+
 # Input para atualizar por nome
 class AtualizarPorNomeInput(BaseModel):
     nome: str = Field(description="Nome (ou parte) do produto a ser atualizado")
@@ -69,6 +343,21 @@ class AtualizarPorNomeInput(BaseModel):
     estoque: Optional[int] = Field(default=None, description="Novo estoque (opcional)")
 
 
+def _validar_produto(nome: Optional[str], preco: Optional[float], estoque: Optional[int]) -> Optional[str]:
+    """Retorna o erro dos valores de um produto, ou None se eles são válidos.
+
+    Regra única das tools de cadastro e atualização, individuais e em lote
+    (no lote, um item inválido não impede os demais, por isso não fica no schema).
+    """
+    if nome is not None and not nome.strip():
+        return "nome vazio"
+    if preco is not None and preco < 0:
+        return "preço negativo"
+    if estoque is not None and estoque < 0:
+        return "estoque negativo"
+    return None
+
+
 # === TOOLS PARA CRUD (Cap 3) ===
 
 @tool(args_schema=ProdutoInput)
@@ -78,56 +367,86 @@ def criar_produto(nome: str, preco: float, estoque: int) -> str:
     Use esta ferramenta quando o usuário quiser cadastrar, adicionar ou
     criar um novo produto no sistema.
     """
+    erro = _validar_produto(nome, preco, estoque)
+    if erro:
+        return f"Produto não criado: {erro}."
     try:
         conn = get_conexao()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO produtos (nome, preco, estoque) VALUES (?, ?, ?)",
-            (nome, preco, estoque)
-        )
-        conn.commit()
-        produto_id = cursor.lastrowid
-        conn.close()
+        with _escrita:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO produtos (nome, preco, estoque) VALUES (?, ?, ?)",
+                    (nome, preco, estoque)
+                )
+            produto_id = cursor.lastrowid
+            _registrar_escritas([(None, (produto_id, nome, preco, estoque))])
         return f"Produto criado com sucesso! ID: {produto_id}, Nome: {nome}, Preço: R$ {preco:.2f}, Estoque: {estoque} unidades"
     except Exception as e:
         return f"Erro ao criar produto: {e}"
 
 
-@tool
-def listar_produtos(filtro_nome: Optional[str] = None) -> str:
-    """Lista os produtos cadastrados.
+@tool(args_schema=ListarProdutosInput)
+def listar_produtos(
+    filtro_nome: Optional[str] = None,
+    quantidade: int = QUANTIDADE_PADRAO,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> str:
+    """Lista os produtos cadastrados, em páginas.
 
     Use esta ferramenta quando o usuário quiser ver, listar, consultar ou
-    buscar produtos. Pode filtrar por nome se especificado.
-
-    Args:
-        filtro_nome: Texto para filtrar produtos pelo nome (opcional)
+    buscar produtos. Pode filtrar por nome se especificado. Se a resposta
+    indicar [MAIS RESULTADOS], chame de novo com o cursor/offset informado
+    para obter a próxima página.
     """
     try:
+        apos_id = int(cursor) if cursor else None
+    except ValueError:
+        return f"Cursor inválido: '{cursor}'."
+
+    def carregar():
         conn = get_conexao()
-        cursor = conn.cursor()
 
+        # Uma linha a mais que a página, só para saber se há continuação
         if filtro_nome:
-            cursor.execute(
-                "SELECT id, nome, preco, estoque FROM produtos WHERE nome LIKE ?",
-                (f"%{filtro_nome}%",)
+            return buscar_por_nome(conn, filtro_nome, limite=quantidade + 1, offset=offset, apos_id=apos_id)
+        if apos_id is not None:
+            return conn.execute(
+                "SELECT id, nome, preco, estoque FROM produtos WHERE id > ? ORDER BY id LIMIT ?",
+                (apos_id, quantidade + 1)
             )
-        else:
-            cursor.execute("SELECT id, nome, preco, estoque FROM produtos")
+        return conn.execute(
+            "SELECT id, nome, preco, estoque FROM produtos ORDER BY id LIMIT ? OFFSET ?",
+            (quantidade + 1, offset)
+        )
 
-        produtos = cursor.fetchall()
-        conn.close()
+    try:
+        if filtro_nome:
+            linhas = _cache.por_nome(filtro_nome, ("listar", quantidade, offset, apos_id), carregar)
+        else:
+            linhas = _cache.listagem((quantidade, offset, apos_id), carregar)
+        partes, ultima, mais = formatar_pagina(linhas, quantidade)
 
-        if not produtos:
+        if not partes:
             if filtro_nome:
                 return f"Nenhum produto encontrado com '{filtro_nome}' no nome."
+            if offset or apos_id is not None:
+                return "Não há mais produtos."
             return "Nenhum produto cadastrado."
 
-        resultado = f"Encontrados {len(produtos)} produto(s):\n"
-        for p in produtos:
-            resultado += f"\n[{p[0]}] {p[1]} - R$ {p[2]:.2f} ({p[3]} em estoque)"
+        continuacao = None
+        if mais:
+            # A busca ranqueada não tem chave estável; continua por posição
+            if filtro_nome and apos_id is None:
+                continuacao = f"offset={offset + len(partes)}"
+            else:
+                continuacao = f"cursor='{ultima[0]}'"
 
-        return resultado
+        if not mais and not offset and apos_id is None:
+            cabecalho = f"Encontrados {len(partes)} produto(s):"
+        else:
+            cabecalho = f"Exibindo {len(partes)} produto(s) nesta página:"
+        return montar_resposta_paginada(cabecalho, partes, continuacao)
     except Exception as e:
         return f"Erro ao listar produtos: {e}"
 
@@ -139,15 +458,12 @@ def atualizar_produto(id: int, nome: Optional[str] = None, preco: Optional[float
     Use esta ferramenta quando o usuário quiser modificar, alterar ou
     atualizar informações de um produto (nome, preço ou estoque).
     """
+    erro = _validar_produto(nome, preco, estoque)
+    if erro:
+        return f"Produto ID {id} não atualizado: {erro}."
     try:
-        conn = get_conexao()
-        cursor = conn.cursor()
-
         # Verificar se produto existe
-        cursor.execute("SELECT nome FROM produtos WHERE id = ?", (id,))
-        produto = cursor.fetchone()
-        if not produto:
-            conn.close()
+        if not _cache.produto(id, lambda: _carregar_produto(id)):
             return f"Produto com ID {id} não encontrado."
 
         # Construir query de atualização
@@ -165,14 +481,13 @@ def atualizar_produto(id: int, nome: Optional[str] = None, preco: Optional[float
             valores.append(estoque)
 
         if not campos:
-            conn.close()
             return "Nenhum campo para atualizar foi informado."
 
         valores.append(id)
         query = f"UPDATE produtos SET {', '.join(campos)} WHERE id = ?"
-        cursor.execute(query, valores)
-        conn.commit()
-        conn.close()
+        antes, _ = _escrever_produto(get_conexao(), query, tuple(valores), id)
+        if antes is None:
+            return f"Produto com ID {id} não encontrado."
 
         atualizados = []
         if nome is not None:
@@ -198,20 +513,14 @@ def excluir_produto(id: int) -> str:
         id: ID do produto a ser excluído
     """
     try:
-        conn = get_conexao()
-        cursor = conn.cursor()
-
         # Verificar se produto existe
-        cursor.execute("SELECT nome FROM produtos WHERE id = ?", (id,))
-        produto = cursor.fetchone()
-        if not produto:
-            conn.close()
+        if not _cache.produto(id, lambda: _carregar_produto(id)):
             return f"Produto com ID {id} não encontrado."
 
-        nome_produto = produto[0]
-        cursor.execute("DELETE FROM produtos WHERE id = ?", (id,))
-        conn.commit()
-        conn.close()
+        produto, _ = _escrever_produto(get_conexao(), "DELETE FROM produtos WHERE id = ?", (id,), id)
+        if produto is None:
+            return f"Produto com ID {id} não encontrado."
+        nome_produto = produto[1]
 
         return f"Produto '{nome_produto}' (ID {id}) excluído com sucesso!"
     except Exception as e:
@@ -227,28 +536,29 @@ def atualizar_produto_por_nome(nome: str, novo_nome: Optional[str] = None, preco
 
     - Se houver correspondência exata única, chama `atualizar_produto` por ID.
     - Se houver múltiplas correspondências, retorna a lista com IDs para o usuário escolher.
-    - Se não houver correspondência, tenta busca parcial (LIKE).
+    - Se não houver correspondência, tenta busca parcial pelo índice full-text.
     """
-    try:
+    def carregar():
         conn = get_conexao()
-        cursor = conn.cursor()
 
-        # busca exata
-        cursor.execute("SELECT id, nome FROM produtos WHERE nome = ?", (nome,))
-        rows = cursor.fetchall()
+        # busca exata (basta saber se há mais de MAX_CANDIDATOS)
+        rows = conn.execute("SELECT id, nome FROM produtos WHERE nome = ? LIMIT ?", (nome, MAX_CANDIDATOS + 1)).fetchall()
 
         # se não encontrou, tentar busca parcial
         if not rows:
-            cursor.execute("SELECT id, nome FROM produtos WHERE nome LIKE ?", (f"%{nome}%",))
-            rows = cursor.fetchall()
+            rows = buscar_por_nome(conn, nome, colunas="id, nome", limite=MAX_CANDIDATOS + 1).fetchall()
+        return rows
 
-        conn.close()
+    try:
+        rows = _cache.por_nome(nome, ("atualizar",), carregar)
 
         if not rows:
             return f"Nenhum produto encontrado com nome '{nome}'."
 
         if len(rows) > 1:
-            resp = "; ".join([f"[{r[0]}] {r[1]}" for r in rows])
+            resp = "; ".join([f"[{r[0]}] {r[1]}" for r in rows[:MAX_CANDIDATOS]])
+            if len(rows) > MAX_CANDIDATOS:
+                resp += "; ... (há outros, informe um nome mais específico)"
             return "Múltiplos produtos encontrados: " + resp
 
         prod_id = rows[0][0]
@@ -277,35 +587,286 @@ def atualizar_produto_por_nome(nome: str, novo_nome: Optional[str] = None, preco
 # Input para filtrar por estoque
 class EstoqueFiltroInput(BaseModel):
     limite: int = Field(description="Retorna produtos com estoque menor que este valor")
+    quantidade: int = Field(default=QUANTIDADE_PADRAO, ge=1, le=QUANTIDADE_MAXIMA, description="Máximo de produtos por página")
+    cursor: Optional[str] = Field(default=None, description="Cursor devolvido em [MAIS RESULTADOS] para buscar a próxima página")
 
 
 @tool(args_schema=EstoqueFiltroInput)
-def produtos_estoque_abaixo(limite: int) -> str:
-    """Retorna produtos cujo `estoque` é menor que `limite`.
+def produtos_estoque_abaixo(limite: int, quantidade: int = QUANTIDADE_PADRAO, cursor: Optional[str] = None) -> str:
+    """Retorna produtos cujo `estoque` é menor que `limite`, do menor estoque para o maior.
+
+    O resultado é paginado: se a resposta indicar [MAIS RESULTADOS], chame de
+    novo com o cursor informado.
 
     Args:
         limite: inteiro; retorna produtos com estoque < limite
     """
-    try:
+    # Paginação por keyset em (estoque, id): o cursor é "estoque:id" da última linha
+    apos = None
+    if cursor:
+        try:
+            apos = tuple(int(v) for v in cursor.split(":"))
+            estoque_cursor, id_cursor = apos
+        except ValueError:
+            return f"Cursor inválido: '{cursor}'."
+
+    def carregar():
         conn = get_conexao()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, nome, preco, estoque FROM produtos WHERE estoque < ? ORDER BY estoque ASC", (limite,))
-        produtos = cursor.fetchall()
-        conn.close()
+        if apos:
+            return conn.execute(
+                "SELECT id, nome, preco, estoque FROM produtos "
+                "WHERE estoque < ? AND (estoque, id) > (?, ?) ORDER BY estoque, id LIMIT ?",
+                (limite, estoque_cursor, id_cursor, quantidade + 1)
+            )
+        return conn.execute(
+            "SELECT id, nome, preco, estoque FROM produtos WHERE estoque < ? ORDER BY estoque, id LIMIT ?",
+            (limite, quantidade + 1)
+        )
 
-        if not produtos:
-            return f"Nenhum produto com estoque abaixo de {limite}."
+    try:
+        if _monitor.cobre(limite):
+            linhas = _monitor.abaixo(limite, quantidade + 1, apos)
+        else:
+            linhas = _cache.por_estoque(limite, (quantidade, apos), carregar)
+        partes, ultima, mais = formatar_pagina(linhas, quantidade)
 
-        resultado = f"Produtos com estoque abaixo de {limite} ({len(produtos)}):\n"
-        for p in produtos:
-            resultado += f"\n[{p[0]}] {p[1]} - R$ {p[2]:.2f} ({p[3]} em estoque)"
+        if not partes:
+            if cursor:
+                return f"Não há mais produtos com estoque abaixo de {limite}."
+            return f"Nenhum produto com estoque abaixo de {limite}."
 
-        return resultado
+        continuacao = f"cursor='{ultima[3]}:{ultima[0]}'" if mais else None
+        if mais or cursor:
+            cabecalho = f"Produtos com estoque abaixo de {limite} (exibindo {len(partes)} nesta página):"
+        else:
+            cabecalho = f"Produtos com estoque abaixo de {limite} ({len(partes)}):"
+        return montar_resposta_paginada(cabecalho, partes, continuacao)
     except Exception as e:
         return f"Erro ao listar produtos por estoque: {e}"
 
 
-ALL_TOOLS = [criar_produto, listar_produtos, atualizar_produto, excluir_produto, atualizar_produto_por_nome, produtos_estoque_abaixo]
+# === OPERAÇÕES EM LOTE ===
+
+# Máximo de itens aceitos em uma única chamada de lote
+MAX_ITENS_LOTE = 1000
+
+# Erros por item exibidos na resposta de um lote
+MAX_ERROS_EXIBIDOS = 20
+
+
+class CriarProdutosEmLoteInput(BaseModel):
+    produtos: list[ProdutoInput] = Field(min_length=1, max_length=MAX_ITENS_LOTE, description="Produtos a cadastrar")
+
+
+class AtualizarProdutosEmLoteInput(BaseModel):
+    produtos: list[AtualizarProdutoInput] = Field(
+        min_length=1, max_length=MAX_ITENS_LOTE,
+        description="Atualizações; em cada item informe o id e apenas os campos que mudam"
+    )
+
+
+class ExcluirProdutosEmLoteInput(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=MAX_ITENS_LOTE, description="IDs dos produtos a excluir")
+
+
+def _linhas_existentes(conn: sqlite3.Connection, ids: Iterable[int]) -> dict[int, tuple]:
+    """Mapeia id -> linha (id, nome, preco, estoque) dos produtos existentes entre `ids`, em uma única consulta."""
+    return {linha[0]: linha for linha in conn.execute(
+        "SELECT id, nome, preco, estoque FROM produtos WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(ids)),)
+    )}
+
+
+@contextmanager
+def _transacao(conn: sqlite3.Connection):
+    """Transação IMMEDIATE: confirmada ao sair do bloco, desfeita se ele levantar.
+
+    Use segurando `_escrita`, para que leituras, escritas e o registro no
+    cache e no monitor vejam o mesmo estado do banco.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _executar_lote(conn: sqlite3.Connection, sql: str, itens: list[tuple], rotulos: list[str], erros: list[str]) -> list[int]:
+    """Executa `sql` para todos os itens dentro da transação já aberta.
+
+    Tenta primeiro um `executemany`. Se algum item for rejeitado pelo banco ou
+    não alterar nenhuma linha, o lote volta ao savepoint e é refeito item a
+    item, para que só os itens problemáticos fiquem de fora (e sejam reportados
+    em `erros`).
+
+    Returns:
+        Índices (em `itens`) dos itens aplicados, contados pelo `rowcount`.
+    """
+    if not itens:
+        return []
+    conn.execute("SAVEPOINT lote")
+    try:
+        if conn.executemany(sql, itens).rowcount == len(itens):
+            conn.execute("RELEASE lote")
+            return list(range(len(itens)))
+    except sqlite3.Error:
+        pass
+    conn.execute("ROLLBACK TO lote")
+
+    aplicados = []
+    for i, (item, rotulo) in enumerate(zip(itens, rotulos)):
+        conn.execute("SAVEPOINT item")
+        try:
+            if conn.execute(sql, item).rowcount:
+                aplicados.append(i)
+            else:
+                erros.append(f"{rotulo}: produto não encontrado")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK TO item")
+            erros.append(f"{rotulo}: {e}")
+        conn.execute("RELEASE item")
+    conn.execute("RELEASE lote")
+    return aplicados
+
+
+def _resumo_lote(operacao: str, total: int, aplicados: int, erros: list[str], detalhe: str = "") -> str:
+    resultado = f"Lote de {operacao}: {aplicados} de {total} item(ns) aplicados{detalhe}."
+    if erros:
+        resultado += f"\n\n{len(erros)} item(ns) com erro:\n" + "\n".join(f"- {e}" for e in erros[:MAX_ERROS_EXIBIDOS])
+        if len(erros) > MAX_ERROS_EXIBIDOS:
+            resultado += f"\n- ... e mais {len(erros) - MAX_ERROS_EXIBIDOS} erro(s)"
+    return resultado
+
+
+@tool(args_schema=CriarProdutosEmLoteInput)
+def criar_produtos_em_lote(produtos: list[ProdutoInput]) -> str:
+    """Cadastra vários produtos de uma só vez.
+
+    Use esta ferramenta em vez de chamar `criar_produto` repetidamente quando o
+    usuário pedir para cadastrar dois ou mais produtos.
+    """
+    try:
+        erros = []
+        itens, rotulos = [], []
+        for i, p in enumerate(produtos, start=1):
+            erro = _validar_produto(p.nome, p.preco, p.estoque)
+            if erro:
+                erros.append(f"item {i} ({p.nome!r}): {erro}")
+            else:
+                itens.append((p.nome, p.preco, p.estoque))
+                rotulos.append(f"item {i} ({p.nome!r})")
+
+        conn = get_conexao()
+        detalhe = ""
+        with _escrita:
+            with _transacao(conn):
+                # AUTOINCREMENT: os produtos novos são exatamente os de id acima do maior atual
+                maior_id = conn.execute("SELECT coalesce(max(id), 0) FROM produtos").fetchone()[0]
+                aplicados = len(_executar_lote(
+                    conn, "INSERT INTO produtos (nome, preco, estoque) VALUES (?, ?, ?)", itens, rotulos, erros
+                ))
+                novos = conn.execute(
+                    "SELECT id, nome, preco, estoque FROM produtos WHERE id > ? ORDER BY id", (maior_id,)
+                ).fetchall() if aplicados else []
+            if novos:
+                if aplicados == len(itens):
+                    detalhe = f" (IDs {novos[0][0]} a {novos[-1][0]})"
+                _registrar_escritas((None, linha) for linha in novos)
+        return _resumo_lote("cadastro", len(produtos), aplicados, erros, detalhe)
+    except Exception as e:
+        return f"Erro ao criar produtos em lote: {e}"
+
+
+@tool(args_schema=AtualizarProdutosEmLoteInput)
+def atualizar_produtos_em_lote(produtos: list[AtualizarProdutoInput]) -> str:
+    """Atualiza vários produtos de uma só vez, cada um pelo seu ID.
+
+    Use esta ferramenta em vez de chamar `atualizar_produto` repetidamente
+    quando o usuário pedir para alterar dois ou mais produtos.
+    """
+    try:
+        conn = get_conexao()
+        erros = []
+        aplicados = 0
+        with _escrita:
+            # Existência conferida na mesma transação das escritas: nenhuma
+            # exclusão concorrente se intercala entre a consulta e o UPDATE
+            with _transacao(conn):
+                existentes = _linhas_existentes(conn, {p.id for p in produtos})
+
+                # Agrupar por conjunto de campos alterados: um UPDATE por grupo, sem
+                # reescrever colunas que não mudam (e sem reindexar o nome à toa)
+                grupos: dict[tuple, tuple[list, list]] = {}
+                for i, p in enumerate(produtos, start=1):
+                    campos = tuple(c for c in ("nome", "preco", "estoque") if getattr(p, c) is not None)
+                    erro = (
+                        f"produto com ID {p.id} não encontrado" if p.id not in existentes
+                        else "nenhum campo para atualizar" if not campos
+                        else _validar_produto(p.nome, p.preco, p.estoque)
+                    )
+                    if erro:
+                        erros.append(f"item {i} (ID {p.id}): {erro}")
+                        continue
+                    itens, rotulos = grupos.setdefault(campos, ([], []))
+                    itens.append((*(getattr(p, c) for c in campos), p.id))
+                    rotulos.append(f"item {i} (ID {p.id})")
+
+                alterados = set()
+                for campos, (itens, rotulos) in grupos.items():
+                    sql = f"UPDATE produtos SET {', '.join(f'{c} = ?' for c in campos)} WHERE id = ?"
+                    indices = _executar_lote(conn, sql, itens, rotulos, erros)
+                    aplicados += len(indices)
+                    alterados.update(itens[i][-1] for i in indices)
+                # Linha antes (lida no início) e depois de cada produto, na mesma transação
+                depois = _linhas_existentes(conn, alterados) if alterados else {}
+            if alterados:
+                _registrar_escritas((existentes[pid], depois[pid]) for pid in sorted(alterados))
+        return _resumo_lote("atualização", len(produtos), aplicados, erros)
+    except Exception as e:
+        return f"Erro ao atualizar produtos em lote: {e}"
+
+
+@tool(args_schema=ExcluirProdutosEmLoteInput)
+def excluir_produtos_em_lote(ids: list[int]) -> str:
+    """Exclui vários produtos de uma só vez, pelos seus IDs.
+
+    Use esta ferramenta em vez de chamar `excluir_produto` repetidamente quando
+    o usuário pedir para remover dois ou mais produtos.
+    """
+    try:
+        conn = get_conexao()
+        erros = []
+        with _escrita:
+            with _transacao(conn):
+                existentes = _linhas_existentes(conn, ids)
+
+                itens, rotulos = [], []
+                vistos = set()
+                for i, pid in enumerate(ids, start=1):
+                    if pid in vistos:
+                        erros.append(f"item {i} (ID {pid}): ID repetido no lote")
+                    elif pid not in existentes:
+                        erros.append(f"item {i} (ID {pid}): produto não encontrado")
+                    else:
+                        itens.append((pid,))
+                        rotulos.append(f"item {i} (ID {pid})")
+                    vistos.add(pid)
+
+                indices = _executar_lote(conn, "DELETE FROM produtos WHERE id = ?", itens, rotulos, erros)
+            aplicados = len(indices)
+            if indices:
+                _registrar_escritas((existentes[itens[i][0]], None) for i in indices)
+        return _resumo_lote("exclusão", len(ids), aplicados, erros)
+    except Exception as e:
+        return f"Erro ao excluir produtos em lote: {e}"
+
+
+ALL_TOOLS = [
+    criar_produto, listar_produtos, atualizar_produto, excluir_produto, atualizar_produto_por_nome, produtos_estoque_abaixo,
+    criar_produtos_em_lote, atualizar_produtos_em_lote, excluir_produtos_em_lote,
+]
 TOOLS_BY_NAME = {t.name: t for t in ALL_TOOLS}
 
 SYSTEM_PROMPT = """Você é um assistente de gestão de estoque de produtos.
@@ -316,6 +877,7 @@ SYSTEM_PROMPT = """Você é um assistente de gestão de estoque de produtos.
 - Atualizar dados de produtos existentes
 - Excluir produtos do cadastro
 - Listar produtos com estoque abaixo de x
+- Criar, atualizar ou excluir vários produtos de uma vez (operações em lote)
 
 ## Instruções
 - Responda sempre em português brasileiro
@@ -324,6 +886,8 @@ SYSTEM_PROMPT = """Você é um assistente de gestão de estoque de produtos.
 - Se o usuário não especificar todos os dados necessários, pergunte
 - Para preços, use formato em reais (R$)
 - Para estoque, use unidades inteiras
+- Quando o pedido envolver dois ou mais produtos, prefira as ferramentas em lote a várias chamadas individuais
+- Listagens são paginadas: se a resposta trouxer [MAIS RESULTADOS] e o usuário quiser ver mais, chame a ferramenta novamente com o cursor/offset indicado
 
 ## Exemplos de uso
 - "Cadastre um notebook por R$ 2500 com 10 unidades"
@@ -338,55 +902,92 @@ SYSTEM_PROMPT = """Você é um assistente de gestão de estoque de produtos.
 
 class AgentState(TypedDict):
     messages: Annotated[list[AnyMessage], operator.add]
+    # Janela de contexto: mensagens antes de `corte` só chegam ao LLM via `resumo`
+    resumo: str
+    corte: int
 
 
 # === CONFIGURAR MODELO ===
 
-modelo = ChatAnthropic(
-model=os.getenv("ANTHROPIC_MODEL", "claude-3-5-haiku-latest"),
-temperature=0
+def _criar_modelo():
+    # O pacote do provedor leva ~2 s para importar: `criar_modelo` só o importa
+    # na primeira chamada ao LLM
+    return criar_modelo("anthropic", temperature=0)
+
+
+# Prompt caching (opcional): tools e system prompt formam um prefixo estável,
+# marcado como cacheável; as chamadas seguintes o leem do cache da Anthropic
+PROMPT_CACHE = os.getenv("PROMPT_CACHE", "0") == "1"
+
+# Criados no primeiro uso (`modelo.obter()`), não no import
+modelo = Preguicoso(_criar_modelo)
+modelo_com_tools = Preguicoso(
+    lambda: modelo.obter().bind_tools(ferramentas_com_cache(ALL_TOOLS) if PROMPT_CACHE else ALL_TOOLS)
+)
+
+# Tokens de entrada (lidos do cache / sem cache) e latência de cada chamada ao LLM
+metricas_cache = MetricasCache()
+
+# Orçamento de tokens do histórico; turnos antigos são resumidos pelo próprio modelo
+contexto = GerenciadorContexto(
+    orcamento_tokens=int(os.getenv("CONTEXTO_MAX_TOKENS", "8000")),
+    modelo_resumo=modelo,
 )
-modelo_com_tools = modelo.bind_tools(ALL_TOOLS)
 
 
 # === NÓS DO GRAFO (Cap 6) ===
 
-def no_llm(state: AgentState) -> dict:
-    """Nó que chama o LLM com as tools bindadas."""
-    messages = state["messages"]
+@instrumentar("no", "llm")
+def no_llm(state: AgentState, modelo=None) -> dict:
+    """Nó que chama o LLM com as tools bindadas (`modelo` substitui o padrão)."""
+    # System prompt (+ resumo dos turnos antigos) e a janela recente do histórico
+    messages = contexto.mensagens(state, SYSTEM_PROMPT, CACHE_EFEMERO if PROMPT_CACHE else None)
+
+    inicio = time.perf_counter()
+    response = (modelo or modelo_com_tools.obter()).invoke(messages)
+    metricas_cache.registrar(response, time.perf_counter() - inicio)
+    return {"messages": [response]}
+
 
-    # Adicionar system prompt se não existir
-    if not messages or not isinstance(messages[0], SystemMessage):
-        messages = [SystemMessage(content=SYSTEM_PROMPT)] + messages
+@instrumentar("no", "llm")
+async def ano_llm(state: AgentState, modelo=None) -> dict:
+    """Versão assíncrona de `no_llm`, usada por `agente.ainvoke`/`astream`."""
+    messages = contexto.mensagens(state, SYSTEM_PROMPT, CACHE_EFEMERO if PROMPT_CACHE else None)
 
-    response = modelo_com_tools.invoke(messages)
+    inicio = time.perf_counter()
+    response = await (modelo or modelo_com_tools.obter()).ainvoke(messages)
+    metricas_cache.registrar(response, time.perf_counter() - inicio)
     return {"messages": [response]}
 
 
-def no_tools(state: AgentState) -> dict:
-    """Nó que executa as ferramentas chamadas pelo LLM."""
-    messages = state["messages"]
-    last_message = messages[-1]
-    tool_messages = []
+@instrumentar("no", "tools")
+def no_tools(state: AgentState, config: RunnableConfig) -> dict:
+    """Nó que executa as ferramentas chamadas pelo LLM.
+
+    As tool calls de um mesmo turno rodam em paralelo (limite em
+    `config["max_concurrency"]`); as ToolMessages saem na ordem das chamadas.
+    """
+    last_message = state["messages"][-1]
 
     # Verificar se é AIMessage com tool_calls
     if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
         return {"messages": []}
 
-    for tool_call in last_message.tool_calls:
-        try:
-            result = TOOLS_BY_NAME[tool_call["name"]].invoke(tool_call["args"])
-        except Exception as e:
-            result = f"Erro ao executar {tool_call['name']}: {e}"
+    return {"messages": executar_tool_calls(last_message.tool_calls, TOOLS_BY_NAME, config)}
 
-        tool_messages.append(ToolMessage(
-            content=str(result),
-            tool_call_id=tool_call["id"]
-        ))
 
-    return {"messages": tool_messages}
+@instrumentar("no", "tools")
+async def ano_tools(state: AgentState, config: RunnableConfig) -> dict:
+    """Versão assíncrona de `no_tools`, usada por `agente.ainvoke`/`astream`."""
+    last_message = state["messages"][-1]
 
+    if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
+        return {"messages": []}
+
+    return {"messages": await aexecutar_tool_calls(last_message.tool_calls, TOOLS_BY_NAME, config)}
 
+
+@instrumentar("aresta", "rotear")
 def rotear(state: AgentState) -> Literal["tools", "__end__"]:
     """Decide se deve executar tools ou finalizar."""
     messages = state["messages"]
@@ -401,36 +1002,60 @@ def rotear(state: AgentState) -> Literal["tools", "__end__"]:
 
 # === CONSTRUIR E COMPILAR O GRAFO (Cap 6) ===
 
-def criar_agente():
-    """Cria e retorna o agente compilado com checkpointer."""
+def criar_agente(checkpointer: Optional[BaseCheckpointSaver] = None, modelo=None):
+    """Cria e retorna o agente compilado com checkpointer.
+
+    Por padrão as sessões persistem em `SESSOES_PATH` (SQLite, com TTL).
+    `modelo` troca o ChatAnthropic por outro chat model (ex.: o ModeloFalso
+    de `comum.modelo_falso`, para testes de carga sem rede).
+    """
     graph = StateGraph(AgentState)
 
+    if modelo is None:
+        gerenciador = contexto
+        llm = RunnableLambda(no_llm, afunc=ano_llm, name="llm")
+    else:
+        gerenciador = GerenciadorContexto(contexto.orcamento_tokens, modelo_resumo=modelo)
+        com_tools = modelo.bind_tools(ALL_TOOLS)
+        llm = RunnableLambda(
+            partial(no_llm, modelo=com_tools), afunc=partial(ano_llm, modelo=com_tools), name="llm"
+        )
+
     # Adicionar nós
-    graph.add_node("llm", no_llm)
-    graph.add_node("tools", no_tools)
+    graph.add_node("contexto", gerenciador.no_contexto)
+    graph.add_node("llm", llm)
+    graph.add_node("tools", RunnableLambda(no_tools, afunc=ano_tools, name="tools"))
 
-    # Adicionar arestas
-    graph.add_edge(START, "llm")
+    # Adicionar arestas (o contexto é ajustado antes de cada chamada ao LLM)
+    graph.add_edge(START, "contexto")
+    graph.add_edge("contexto", "llm")
     graph.add_conditional_edges(
         "llm",
         rotear,
         {"tools": "tools", "__end__": END}
     )
-    graph.add_edge("tools", "llm")
+    graph.add_edge("tools", "contexto")
 
     # Compilar com checkpointer para persistência de sessão
-    checkpointer = MemorySaver()
+    if checkpointer is None:
+        checkpointer = CheckpointerSQLite(SESSOES_PATH, ttl_segundos=SESSOES_TTL)
     return graph.compile(checkpointer=checkpointer)
 
 
+# Agente padrão (ChatAnthropic + sessões em SESSOES_PATH), compilado uma vez no primeiro uso
+agente_padrao = Preguicoso(criar_agente)
+
+
 # === LOOP PRINCIPAL ===
 
 def main():
     # Inicializar banco de dados
     inicializar_banco()
 
-    # Criar agente
-    agente = criar_agente()
+    # Criar agente; o cliente da Anthropic é preparado em segundo plano
+    # enquanto o usuário digita a primeira mensagem
+    agente = agente_padrao.obter()
+    modelo_com_tools.aquecer()
 
     # Configuração da thread para persistência
     config: RunnableConfig = {"configurable": {"thread_id": "sessao-produtos"}}
@@ -456,20 +1081,23 @@ def main():
             break
 
         if entrada.lower() == "limpar":
-            # Criar nova sessão
+            # Descartar a sessão anterior e criar uma nova
+            agente.checkpointer.delete_thread(config["configurable"]["thread_id"])
             config: RunnableConfig = {"configurable": {"thread_id": f"sessao-{os.urandom(4).hex()}"}}
             print("Sessão limpa! Iniciando nova conversa.")
             continue
 
-        # Invocar agente
-        resultado = agente.invoke(
-            {"messages": [HumanMessage(content=entrada)]},
-            config=config
+        # Invocar agente exibindo tokens e tools à medida que chegam
+        chamadas_antes = metricas_cache.total_chamadas
+        print()
+        imprimir_eventos(
+            transmitir(agente, {"messages": [HumanMessage(content=entrada)]}, config=config),
+            prefixo="Assistente: ",
         )
 
-        # Exibir resposta
-        resposta = resultado["messages"][-1].content
-        print(f"\nAssistente: {resposta}")
+        if PROMPT_CACHE:
+            for uso in metricas_cache.ultimas(metricas_cache.total_chamadas - chamadas_antes):
+                print(f"  [tokens] {uso}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,450 @@
+# /src/checkpointer_sqlite.py
+# Checkpointer do LangGraph persistido em SQLite, com armazenamento incremental.
+#
+# O MemorySaver guarda, a cada superstep, uma cópia completa de cada canal
+# alterado. Para `messages` (lista com reducer `operator.add`) isso significa
+# regravar a conversa inteira a cada passo: O(n) por checkpoint e O(n²) por
+# sessão. Aqui os canais incrementais são gravados como delta (apenas as
+# mensagens novas em relação à versão anterior do canal), com um snapshot
+# completo a cada `intervalo_snapshot` deltas para limitar o custo da leitura.
+# Sessões ociosas há mais de `ttl_segundos` são removidas automaticamente.
+
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from pool_conexoes import PoolConexoes
+
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.instrumentacao import instrumentar  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    tipo TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    tipo_metadata TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    incrementais TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+
+-- Valor de cada canal por versão. Para canais incrementais, `base_version`
+-- aponta para a versão anterior e `dados` contém só os itens novos.
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    base_version TEXT,
+    tipo TEXT NOT NULL,
+    dados BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    dados BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+
+CREATE TABLE IF NOT EXISTS sessoes (
+    thread_id TEXT PRIMARY KEY,
+    atualizado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessoes_atualizado_em ON sessoes(atualizado_em);
+"""
+
+# Reconstrói um canal incremental: da versão pedida até o snapshot mais próximo
+_SQL_CADEIA = """
+WITH RECURSIVE cadeia(version, base_version, tipo, dados, nivel) AS (
+    SELECT version, base_version, tipo, dados, 0 FROM blobs
+    WHERE thread_id = :thread_id AND checkpoint_ns = :ns AND channel = :channel AND version = :version
+    UNION ALL
+    SELECT b.version, b.base_version, b.tipo, b.dados, c.nivel + 1
+    FROM blobs b JOIN cadeia c ON b.version = c.base_version
+    WHERE b.thread_id = :thread_id AND b.checkpoint_ns = :ns AND b.channel = :channel
+)
+SELECT base_version, tipo, dados FROM cadeia ORDER BY nivel DESC
+"""
+
+
+class CheckpointerSQLite(BaseCheckpointSaver[str]):
+    """Checkpointer persistente em SQLite com deltas para canais só-de-anexação.
+
+    Args:
+        caminho: Arquivo SQLite (pode ser o próprio banco de produtos ou um vizinho).
+        canais_incrementais: Canais cujo reducer apenas anexa itens a uma lista
+            (ex.: `messages` com `operator.add`). Só esses são gravados como delta.
+        intervalo_snapshot: A cada quantos deltas um canal incremental é gravado
+            por inteiro, limitando o tamanho da cadeia lida em `get_tuple`.
+        ttl_segundos: Sessões sem checkpoints novos há mais que isso são
+            removidas. `None` desativa a remoção automática.
+        serde: Serializador; por padrão o do LangGraph (JsonPlus).
+    """
+
+    # Frequência (em puts) da verificação automática de sessões expiradas
+    VERIFICAR_TTL_A_CADA = 200
+
+    def __init__(
+        self,
+        caminho: str,
+        *,
+        canais_incrementais: Iterable[str] = ("messages",),
+        intervalo_snapshot: int = 50,
+        ttl_segundos: Optional[float] = None,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        super().__init__(serde=serde)
+        self.caminho = caminho
+        self.canais_incrementais = frozenset(canais_incrementais)
+        self.intervalo_snapshot = max(1, intervalo_snapshot)
+        self.ttl_segundos = ttl_segundos
+        self._pool = PoolConexoes(caminho)
+        # checkpoint -> {canal: [versão, tamanho, deltas desde o snapshot]}
+        self._incrementais: OrderedDict[tuple[str, str, str], dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._pool.conexao().executescript(SCHEMA)
+
+    def fechar(self):
+        """Fecha as conexões com o banco de sessões."""
+        self._pool.fechar()
+
+    # === ESCRITA ===
+
+    @instrumentar("checkpoint", "put")
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+
+        c = checkpoint.copy()
+        values: dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        conn = self._pool.conexao()
+
+        base = self._incrementais_de(conn, thread_id, checkpoint_ns, parent_id) if parent_id else {}
+        incrementais = dict(base)
+        linhas_blobs = []
+        for canal, versao in new_versions.items():
+            if canal not in values:
+                linhas_blobs.append((thread_id, checkpoint_ns, canal, str(versao), None, "empty", None))
+                incrementais.pop(canal, None)
+                continue
+
+            valor = values[canal]
+            if canal in self.canais_incrementais and isinstance(valor, list):
+                anterior = base.get(canal)
+                if anterior and anterior[1] <= len(valor) and anterior[2] + 1 < self.intervalo_snapshot:
+                    # Delta: só o que foi anexado desde a versão do checkpoint pai
+                    tipo, dados = self.serde.dumps_typed(valor[anterior[1]:])
+                    linhas_blobs.append((thread_id, checkpoint_ns, canal, str(versao), anterior[0], tipo, dados))
+                    incrementais[canal] = [str(versao), len(valor), anterior[2] + 1]
+                    continue
+                incrementais[canal] = [str(versao), len(valor), 0]
+
+            tipo, dados = self.serde.dumps_typed(valor)
+            linhas_blobs.append((thread_id, checkpoint_ns, canal, str(versao), None, tipo, dados))
+
+        tipo_c, dados_c = self.serde.dumps_typed(c)
+        tipo_m, dados_m = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)", linhas_blobs)
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], parent_id, tipo_c, dados_c, tipo_m, dados_m,
+                 json.dumps(incrementais)),
+            )
+            conn.execute(
+                "INSERT INTO sessoes VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET atualizado_em = excluded.atualizado_em",
+                (thread_id, time.time()),
+            )
+        self._lembrar_incrementais(thread_id, checkpoint_ns, checkpoint["id"], incrementais)
+
+        self._puts += 1
+        if self.ttl_segundos is not None and self._puts % self.VERIFICAR_TTL_A_CADA == 0:
+            self.remover_inativas()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    @instrumentar("checkpoint", "put_writes")
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        normais, especiais = [], []
+        for idx, (canal, valor) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(canal, idx)
+            tipo, dados = self.serde.dumps_typed(valor)
+            linha = (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, canal, tipo, dados, task_path)
+            (normais if idx >= 0 else especiais).append(linha)
+
+        conn = self._pool.conexao()
+        with conn:
+            # Writes regulares já gravados não são sobrescritos; os especiais sim
+            conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", normais)
+            conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", especiais)
+
+    # === LEITURA ===
+
+    @instrumentar("checkpoint", "get_tuple")
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        conn = self._pool.conexao()
+        if checkpoint_id := get_checkpoint_id(config):
+            linha = conn.execute(
+                "SELECT checkpoint_id, parent_checkpoint_id, tipo, checkpoint, tipo_metadata, metadata "
+                "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            linha = conn.execute(
+                "SELECT checkpoint_id, parent_checkpoint_id, tipo, checkpoint, tipo_metadata, metadata "
+                "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        if linha is None:
+            return None
+        return self._montar_tupla(conn, thread_id, checkpoint_ns, linha)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        condicoes, params = [], []
+        if config:
+            condicoes.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (ns := config["configurable"].get("checkpoint_ns")) is not None:
+                condicoes.append("checkpoint_ns = ?")
+                params.append(ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                condicoes.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            condicoes.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+        conn = self._pool.conexao()
+        linhas = conn.execute(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, tipo, checkpoint, "
+            f"tipo_metadata, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+            params,
+        ).fetchall()
+        for thread_id, checkpoint_ns, *linha in linhas:
+            if filter:
+                metadata = self.serde.loads_typed((linha[3], linha[4]))
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield self._montar_tupla(conn, thread_id, checkpoint_ns, linha)
+
+    def _montar_tupla(self, conn, thread_id: str, checkpoint_ns: str, linha: Sequence) -> CheckpointTuple:
+        checkpoint_id, parent_id, tipo, dados, tipo_m, dados_m = linha
+        checkpoint: Checkpoint = self.serde.loads_typed((tipo, dados))
+        writes = conn.execute(
+            "SELECT task_id, channel, tipo, dados FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._carregar_valores(conn, thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self.serde.loads_typed((tipo_m, dados_m)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[(task_id, canal, self.serde.loads_typed((t, d))) for task_id, canal, t, d in writes],
+        )
+
+    def _carregar_valores(self, conn, thread_id: str, checkpoint_ns: str, versoes: ChannelVersions) -> dict[str, Any]:
+        valores: dict[str, Any] = {}
+        for canal, versao in versoes.items():
+            if canal in self.canais_incrementais:
+                partes = conn.execute(
+                    _SQL_CADEIA, {"thread_id": thread_id, "ns": checkpoint_ns, "channel": canal, "version": str(versao)}
+                ).fetchall()
+                if not partes or partes[-1][1] == "empty":
+                    continue
+                if partes[0][0] is not None:
+                    raise ValueError(f"Cadeia de deltas incompleta para o canal '{canal}' da sessão '{thread_id}'")
+                valor = self.serde.loads_typed((partes[0][1], partes[0][2]))
+                for _, tipo, dados in partes[1:]:
+                    valor.extend(self.serde.loads_typed((tipo, dados)))
+                valores[canal] = valor
+            else:
+                linha = conn.execute(
+                    "SELECT tipo, dados FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                    (thread_id, checkpoint_ns, canal, str(versao)),
+                ).fetchone()
+                if linha and linha[0] != "empty":
+                    valores[canal] = self.serde.loads_typed(linha)
+        return valores
+
+    def _incrementais_de(self, conn, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> dict:
+        chave = (thread_id, checkpoint_ns, checkpoint_id)
+        with self._lock:
+            if chave in self._incrementais:
+                self._incrementais.move_to_end(chave)
+                return self._incrementais[chave]
+        linha = conn.execute(
+            "SELECT incrementais FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            chave,
+        ).fetchone()
+        return json.loads(linha[0]) if linha else {}
+
+    def _lembrar_incrementais(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, incrementais: dict):
+        with self._lock:
+            self._incrementais[(thread_id, checkpoint_ns, checkpoint_id)] = incrementais
+            while len(self._incrementais) > 4096:
+                self._incrementais.popitem(last=False)
+
+    # === MANUTENÇÃO ===
+
+    def delete_thread(self, thread_id: str) -> None:
+        conn = self._pool.conexao()
+        with conn:
+            for tabela in ("checkpoints", "blobs", "writes", "sessoes"):
+                conn.execute(f"DELETE FROM {tabela} WHERE thread_id = ?", (thread_id,))
+        with self._lock:
+            for chave in [k for k in self._incrementais if k[0] == thread_id]:
+                del self._incrementais[chave]
+
+    def remover_inativas(self, ttl_segundos: Optional[float] = None) -> int:
+        """Remove sessões sem checkpoints novos há mais de `ttl_segundos`.
+
+        Returns:
+            Quantidade de sessões removidas.
+        """
+        ttl = self.ttl_segundos if ttl_segundos is None else ttl_segundos
+        if ttl is None:
+            return 0
+        conn = self._pool.conexao()
+        expiradas = [
+            t for (t,) in conn.execute("SELECT thread_id FROM sessoes WHERE atualizado_em < ?", (time.time() - ttl,))
+        ]
+        for thread_id in expiradas:
+            self.delete_thread(thread_id)
+        return len(expiradas)
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # === VERSÕES ASSÍNCRONAS (executadas em threads) ===
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        tuplas = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for tupla in tuplas:
+            yield tupla
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
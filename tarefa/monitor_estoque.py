@@ -0,0 +1,141 @@
+# /src/monitor_estoque.py
+# Conjunto em memória dos produtos com estoque baixo, mantido incrementalmente.
+#
+# Em vez de consultar o banco a cada "quais produtos têm estoque abaixo de X?",
+# o monitor carrega uma vez os produtos com estoque abaixo de um teto (o maior
+# limite assinado) em uma lista ordenada por (estoque, id) e depois só aplica as
+# escritas das tools: cada criação, alteração ou exclusão remove a chave antiga
+# e insere a nova com `bisect`. Uma consulta com limite <= teto vira uma busca
+# binária mais a fatia da página: O(log k + página), independente do tamanho
+# do catálogo.
+#
+# Quem assina pode receber um callback quando um produto entra ou sai do
+# conjunto abaixo do seu limite (ex.: alertas de reposição).
+#
+# As escritas precisam chegar na ordem dos commits: o chamador as aplica ainda
+# segurando o lock que serializa as escritas (o mesmo passado em `lock_escritas`),
+# e o recarregamento completo também o segura para não se intercalar com elas.
+
+import bisect
+import threading
+from typing import Callable, Iterable, Optional
+
+# (id, nome, preco, estoque)
+Linha = tuple
+
+# Callback de assinatura: (evento "entrou" | "saiu", linha, limite)
+AoMudar = Callable[[str, Linha, int], None]
+
+
+class MonitorEstoque:
+    """Produtos com estoque abaixo de `teto`, ordenados por (estoque, id).
+
+    Args:
+        carregar: Devolve do banco as linhas com estoque menor que o teto informado.
+        lock_escritas: Lock que serializa as escritas no banco.
+        teto: Limite inicial monitorado; 0 deixa o monitor inativo até a
+            primeira assinatura.
+    """
+
+    def __init__(self, carregar: Callable[[int], Iterable[Linha]], lock_escritas, teto: int = 0):
+        self._carregar = carregar
+        self._lock_escritas = lock_escritas
+        self._lock = threading.Lock()
+        self.teto = teto
+        self._chaves: list[tuple[int, int]] = []
+        self._linhas: dict[int, Linha] = {}
+        self._valido = False
+        self._assinaturas: list[tuple[int, AoMudar]] = []
+        self.recargas = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.teto > 0
+
+    def cobre(self, limite: int) -> bool:
+        """Se consultas com este limite podem ser respondidas da memória."""
+        return 0 < limite <= self.teto
+
+    # === ASSINATURA E CARGA ===
+
+    def assinar(self, limite: int, ao_mudar: Optional[AoMudar] = None):
+        """Passa a monitorar estoques abaixo de `limite` (amplia o teto se preciso)."""
+        with self._lock_escritas:
+            with self._lock:
+                if ao_mudar is not None:
+                    self._assinaturas.append((limite, ao_mudar))
+                if limite <= self.teto and self._valido:
+                    return
+                self.teto = max(self.teto, limite)
+            self._recarregar()
+
+    def invalidar(self):
+        """Descarta o conjunto; ele é recarregado do banco na próxima consulta."""
+        with self._lock:
+            self._valido = False
+
+    def reiniciar(self, teto: int = 0):
+        """Remove as assinaturas e passa a monitorar só abaixo de `teto` (0 desativa)."""
+        with self._lock_escritas, self._lock:
+            self.teto = teto
+            self._assinaturas.clear()
+            self._linhas, self._chaves = {}, []
+            self._valido = False
+
+    def _recarregar(self):
+        # Chamado com o lock de escritas: nenhuma escrita se intercala com a leitura
+        linhas = list(self._carregar(self.teto))
+        with self._lock:
+            self._linhas = {linha[0]: linha for linha in linhas}
+            self._chaves = sorted((linha[3], linha[0]) for linha in linhas)
+            self._valido = True
+            self.recargas += 1
+
+    def _garantir_carregado(self):
+        with self._lock:
+            if self._valido:
+                return
+        with self._lock_escritas:
+            if not self._valido:
+                self._recarregar()
+
+    # === CONSULTA ===
+
+    def abaixo(self, limite: int, quantidade: int, apos: Optional[tuple[int, int]] = None) -> list[Linha]:
+        """Até `quantidade` linhas com estoque < `limite`, após a chave (estoque, id) `apos`."""
+        self._garantir_carregado()
+        with self._lock:
+            inicio = bisect.bisect_right(self._chaves, apos) if apos else 0
+            fim = bisect.bisect_left(self._chaves, (limite,))
+            return [self._linhas[id] for _, id in self._chaves[inicio:min(fim, inicio + quantidade)]]
+
+    # === ESCRITAS ===
+
+    def aplicar(self, alteracoes: Iterable[tuple[Optional[Linha], Optional[Linha]]]):
+        """Aplica escritas confirmadas (linha antes, linha depois) na ordem dos commits.
+
+        Escritas registradas só com `invalidar()` (sem as linhas) não geram
+        callbacks: o conjunto é apenas recarregado na próxima consulta.
+        """
+        eventos = []
+        with self._lock:
+            for antes, depois in alteracoes:
+                if self._valido:
+                    id = (antes or depois)[0]
+                    atual = self._linhas.pop(id, None)
+                    if atual is not None:
+                        del self._chaves[bisect.bisect_left(self._chaves, (atual[3], id))]
+                    if depois is not None and depois[3] < self.teto:
+                        self._linhas[id] = depois
+                        bisect.insort(self._chaves, (depois[3], id))
+                for limite, ao_mudar in self._assinaturas:
+                    estava = antes is not None and antes[3] < limite
+                    esta = depois is not None and depois[3] < limite
+                    if esta != estava:
+                        eventos.append((ao_mudar, "entrou" if esta else "saiu", depois or antes, limite))
+        for ao_mudar, evento, linha, limite in eventos:
+            ao_mudar(evento, linha, limite)
+
+    def tamanho(self) -> int:
+        with self._lock:
+            return len(self._chaves)
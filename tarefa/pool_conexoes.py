@@ -0,0 +1,89 @@
+# /src/pool_conexoes.py
+# Pool de conexões SQLite para as tools do chatbot de produtos.
+#
+# Cada thread recebe a sua própria conexão, aberta uma única vez e reaproveitada
+# em todas as chamadas seguintes. Isso elimina o custo de `sqlite3.connect()`
+# (abrir arquivo, ler o schema, aplicar pragmas) a cada tool call e mantém o
+# cache de prepared statements do módulo sqlite3 aquecido entre chamadas.
+
+import os
+import sqlite3
+import sys
+import threading
+
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.instrumentacao import fabrica_conexao  # noqa: E402
+
+# Pragmas aplicados a cada conexão nova
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",       # leitores não bloqueiam o escritor
+    "PRAGMA synchronous = NORMAL",     # seguro com WAL e bem mais rápido que FULL
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",      # ~16 MB de cache de páginas por conexão
+    "PRAGMA mmap_size = 134217728",    # 128 MB mapeados em memória
+)
+
+
+class PoolConexoes:
+    """Pool thread-safe com uma conexão SQLite por thread.
+
+    Args:
+        caminho: Caminho do arquivo do banco de dados.
+        cached_statements: Tamanho do cache de prepared statements por conexão.
+        timeout: Segundos de espera quando o banco está bloqueado por outro escritor.
+    """
+
+    def __init__(self, caminho: str, cached_statements: int = 256, timeout: float = 5.0):
+        self.caminho = caminho
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conexoes: dict[int, sqlite3.Connection] = {}
+        self._geracao = 0
+
+    def conexao(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada."""
+        local = self._local
+        if getattr(local, "geracao", None) == self._geracao:
+            return local.conn
+
+        conn = self._abrir()
+        with self._lock:
+            self._descartar_threads_encerradas()
+            self._conexoes[threading.get_ident()] = conn
+            local.conn = conn
+            local.geracao = self._geracao
+        return conn
+
+    def fechar(self):
+        """Fecha todas as conexões abertas pelo pool.
+
+        As threads que chamarem `conexao()` depois disso recebem conexões novas.
+        """
+        with self._lock:
+            self._geracao += 1
+            for conn in self._conexoes.values():
+                conn.close()
+            self._conexoes.clear()
+
+    def _abrir(self) -> sqlite3.Connection:
+        # check_same_thread=False apenas para permitir que `fechar()` encerre
+        # conexões de outras threads; cada conexão só é usada pela sua thread.
+        conn = sqlite3.connect(
+            self.caminho,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            # Com a instrumentação ligada, mede o SQL de cada conexão nova
+            factory=fabrica_conexao(),
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _descartar_threads_encerradas(self):
+        vivas = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._conexoes if i not in vivas]:
+            self._conexoes.pop(ident).close()
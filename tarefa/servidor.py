@@ -0,0 +1,454 @@
+# /src/servidor.py
+# Servidor HTTP assíncrono (só biblioteca padrão) para o chatbot de produtos.
+#
+# Endpoints:
+#   POST   /sessoes                  -> {"sessao": "<id>"}
+#   POST   /sessoes/<id>/mensagens   {"mensagem": "..."} -> {"resposta": "..."}
+#          Com `Accept: text/event-stream` a resposta chega em eventos SSE
+#          (token, tool_inicio, tool_fim, fim, erro) à medida que o agente executa.
+#   DELETE /sessoes/<id>             -> apaga o histórico da sessão
+#   GET    /saude                    -> carga atual e contadores
+#
+# Cada sessão é um thread_id do checkpointer; turnos da mesma sessão são
+# serializados por um lock. Um semáforo limita os turnos em andamento e uma
+# fila curta absorve picos: acima disso o servidor responde 503 com
+# Retry-After (backpressure) em vez de acumular trabalho. Turnos que passam do
+# tempo limite recebem 504 e o histórico é reparado para a próxima mensagem.
+#
+# Uso: python tarefa/servidor.py [--porta 8000] [--max-concorrentes 64] [--timeout 60]
+#        [--modelo-falso --latencia 0.5]
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+import chatbot
+from checkpointer_sqlite import CheckpointerSQLite
+
+# Permite importar o pacote compartilhado `comum` ao executar este script diretamente
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.modelo_falso import ModeloFalso  # noqa: E402
+from comum.streaming import atransmitir  # noqa: E402
+
+# Maior corpo de requisição aceito (bytes)
+MAX_CORPO = 64 * 1024
+
+# Tempo que uma conexão keep-alive pode ficar ociosa (segundos)
+OCIOSIDADE_CONEXAO = 30.0
+
+# Resposta das tool calls pendentes de um turno interrompido. As tools síncronas
+# continuam nas threads do executor depois do cancelamento e podem ainda gravar
+# no banco: o modelo não pode concluir que a operação falhou
+RESULTADO_DESCONHECIDO = (
+    "Resultado desconhecido: o turno foi interrompido antes do retorno desta ferramenta, "
+    "e a operação pode ter sido concluída ou não. Consulte o estado atual antes de repeti-la."
+)
+
+_ID_SESSAO = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_ROTA_MENSAGENS = re.compile(r"^/sessoes/([^/]+)/mensagens$")
+_ROTA_SESSAO = re.compile(r"^/sessoes/([^/]+)$")
+
+_STATUS = {
+    200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+# Roteiro do modelo falso (--modelo-falso), para testes de carga sem rede
+ROTEIRO_FALSO = [
+    [[{"name": "listar_produtos", "args": {"quantidade": 20}}], "Aqui estão os 20 primeiros produtos."],
+    [[{"name": "produtos_estoque_abaixo", "args": {"limite": 10}}], "Estes produtos estão com estoque baixo."],
+    ["Olá! Posso listar, criar, atualizar ou excluir produtos."],
+]
+
+
+@dataclass
+class Requisicao:
+    metodo: str
+    caminho: str
+    headers: dict[str, str]
+    corpo: bytes
+
+    @property
+    def manter_conexao(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+class Rejeitada(Exception):
+    """Requisição recusada por falta de capacidade (vira 503)."""
+
+
+class CorpoGrande(Exception):
+    """Corpo acima de MAX_CORPO (vira 413)."""
+
+
+def _texto(conteudo) -> str:
+    if isinstance(conteudo, str):
+        return conteudo
+    return "".join(b.get("text", "") for b in conteudo if isinstance(b, dict) and b.get("type") == "text")
+
+
+class ServidorChatbot:
+    """Atende sessões concorrentes do agente com backpressure e tempo limite.
+
+    Args:
+        agente: Grafo compilado com checkpointer (ex.: `chatbot.criar_agente()`).
+        max_concorrentes: Turnos executando ao mesmo tempo.
+        max_fila: Turnos aguardando vaga; além disso, 503 imediato.
+        espera_maxima: Segundos que um turno pode esperar por vaga antes do 503.
+        timeout: Segundos máximos de um turno (504 ao estourar).
+    """
+
+    def __init__(
+        self,
+        agente,
+        *,
+        max_concorrentes: int = 64,
+        max_fila: int = 256,
+        espera_maxima: float = 5.0,
+        timeout: float = 60.0,
+    ):
+        self.agente = agente
+        self.max_concorrentes = max_concorrentes
+        self.max_fila = max_fila
+        self.espera_maxima = espera_maxima
+        self.timeout = timeout
+        self._vagas = asyncio.Semaphore(max_concorrentes)
+        # sessão -> [lock, requisições usando o lock]
+        self._sessoes: dict[str, list] = {}
+        self.em_andamento = 0
+        self.na_fila = 0
+        self.contadores = {"concluidos": 0, "rejeitados": 0, "timeouts": 0, "erros": 0}
+
+    # === CONTROLE DE CARGA ===
+
+    async def _admitir(self, sessao: str):
+        """Adquire o lock da sessão e uma vaga global, ou levanta Rejeitada."""
+        if self.em_andamento + self.na_fila >= self.max_concorrentes + self.max_fila:
+            self.contadores["rejeitados"] += 1
+            raise Rejeitada()
+        entrada = self._sessoes.setdefault(sessao, [asyncio.Lock(), 0])
+        entrada[1] += 1
+        self.na_fila += 1
+        try:
+            async with asyncio.timeout(self.espera_maxima):
+                await entrada[0].acquire()
+                try:
+                    await self._vagas.acquire()
+                except BaseException:
+                    entrada[0].release()
+                    raise
+        except TimeoutError:
+            self._liberar_sessao(sessao, adquirido=False)
+            self.contadores["rejeitados"] += 1
+            raise Rejeitada() from None
+        except BaseException:
+            self._liberar_sessao(sessao, adquirido=False)
+            raise
+        finally:
+            self.na_fila -= 1
+        self.em_andamento += 1
+
+    def _liberar(self, sessao: str):
+        self.em_andamento -= 1
+        self._vagas.release()
+        self._liberar_sessao(sessao, adquirido=True)
+
+    def _liberar_sessao(self, sessao: str, adquirido: bool):
+        entrada = self._sessoes[sessao]
+        if adquirido:
+            entrada[0].release()
+        entrada[1] -= 1
+        if entrada[1] == 0:
+            del self._sessoes[sessao]
+
+    # === TURNOS ===
+
+    def _config(self, sessao: str) -> dict:
+        return {"configurable": {"thread_id": sessao}}
+
+    async def _reparar_sessao(self, sessao: str):
+        """Responde tool calls pendentes de um turno interrompido.
+
+        Sem isso o próximo turno enviaria ao LLM uma AIMessage com tool_calls
+        sem as ToolMessages correspondentes, o que a API rejeita. A resposta é
+        neutra (RESULTADO_DESCONHECIDO): a tool pode ter terminado depois do corte.
+        """
+        config = self._config(sessao)
+        estado = await self.agente.aget_state(config)
+        mensagens = estado.values.get("messages", [])
+        if mensagens and isinstance(mensagens[-1], AIMessage) and mensagens[-1].tool_calls:
+            canceladas = [
+                ToolMessage(content=RESULTADO_DESCONHECIDO, tool_call_id=c["id"])
+                for c in mensagens[-1].tool_calls
+            ]
+            await self.agente.aupdate_state(config, {"messages": canceladas}, as_node="tools")
+
+    async def turno(self, sessao: str, texto: str) -> str:
+        """Executa um turno completo e devolve a resposta final do assistente."""
+        await self._admitir(sessao)
+        try:
+            async with asyncio.timeout(self.timeout):
+                resultado = await self.agente.ainvoke(
+                    {"messages": [HumanMessage(content=texto)]}, self._config(sessao)
+                )
+            self.contadores["concluidos"] += 1
+            return _texto(resultado["messages"][-1].content)
+        except TimeoutError:
+            self.contadores["timeouts"] += 1
+            await self._reparar_sessao(sessao)
+            raise
+        except Exception:
+            # Erro do agente (ex.: provedor fora após as novas tentativas, disjuntor aberto)
+            self.contadores["erros"] += 1
+            await self._reparar_sessao(sessao)
+            raise
+        finally:
+            self._liberar(sessao)
+
+    async def turno_streaming(self, sessao: str, texto: str, enviar):
+        """Executa um turno enviando eventos (`await enviar(evento, dados)`) durante a execução."""
+        await self._admitir(sessao)
+        try:
+            async with asyncio.timeout(self.timeout):
+                async for evento in atransmitir(
+                    self.agente, {"messages": [HumanMessage(content=texto)]}, self._config(sessao)
+                ):
+                    if evento.tipo == "token":
+                        await enviar("token", {"texto": evento.texto})
+                    elif evento.tipo == "tool_inicio":
+                        await enviar("tool_inicio", {
+                            "nome": evento.nome, "tool_call_id": evento.tool_call_id, "args": evento.args,
+                        })
+                    elif evento.tipo == "tool_fim":
+                        await enviar("tool_fim", {
+                            "nome": evento.nome, "tool_call_id": evento.tool_call_id, "conteudo": evento.texto[:500],
+                        })
+                    else:
+                        self.contadores["concluidos"] += 1
+                        await enviar("fim", {
+                            "resposta": evento.texto, "primeiro_token_s": evento.primeiro_token, "total_s": evento.total,
+                        })
+        except TimeoutError:
+            self.contadores["timeouts"] += 1
+            await self._reparar_sessao(sessao)
+            await enviar("erro", {"erro": "tempo limite excedido"})
+        except (ConnectionError, asyncio.CancelledError):
+            # Cliente desconectou no meio do streaming
+            await asyncio.shield(self._reparar_sessao(sessao))
+            raise
+        except Exception:
+            self.contadores["erros"] += 1
+            await self._reparar_sessao(sessao)
+            raise
+        finally:
+            self._liberar(sessao)
+
+    # === HTTP ===
+
+    async def _ler(self, reader: asyncio.StreamReader) -> Optional[Requisicao]:
+        linha = await asyncio.wait_for(reader.readline(), OCIOSIDADE_CONEXAO)
+        if not linha.strip():
+            return None
+        metodo, caminho, _ = linha.decode("latin-1").split(" ", 2)
+        headers = {}
+        while (linha := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            headers[nome.strip().lower()] = valor.strip()
+        tamanho = int(headers.get("content-length") or 0)
+        if tamanho > MAX_CORPO:
+            raise CorpoGrande()
+        corpo = await reader.readexactly(tamanho) if tamanho else b""
+        return Requisicao(metodo, caminho.split("?", 1)[0], headers, corpo)
+
+    async def _responder(self, writer, status: int, dados: Optional[dict], manter: bool, extras: dict = None):
+        corpo = json.dumps(dados, ensure_ascii=False).encode() if dados is not None else b""
+        headers = [
+            f"HTTP/1.1 {status} {_STATUS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(corpo)}",
+            f"Connection: {'keep-alive' if manter else 'close'}",
+        ] + [f"{k}: {v}" for k, v in (extras or {}).items()]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + corpo)
+        await writer.drain()
+
+    async def _mensagem(self, req: Requisicao, writer, sessao: str) -> bool:
+        """Trata POST /sessoes/<id>/mensagens; devolve se a conexão continua aberta."""
+        try:
+            texto = json.loads(req.corpo or b"{}").get("mensagem", "")
+        except (ValueError, AttributeError):
+            texto = ""
+        if not isinstance(texto, str) or not texto.strip():
+            await self._responder(writer, 400, {"erro": "informe 'mensagem' no corpo JSON"}, req.manter_conexao)
+            return req.manter_conexao
+
+        if "text/event-stream" not in req.headers.get("accept", ""):
+            try:
+                resposta = await self.turno(sessao, texto)
+            except Rejeitada:
+                await self._responder(writer, 503, {"erro": "servidor ocupado"}, req.manter_conexao, {"Retry-After": "1"})
+                return req.manter_conexao
+            except TimeoutError:
+                await self._responder(writer, 504, {"erro": "tempo limite excedido"}, req.manter_conexao)
+                return req.manter_conexao
+            except Exception:
+                # Já contado em `turno`
+                await self._responder(writer, 500, {"erro": "erro interno"}, False)
+                return False
+            await self._responder(writer, 200, {"sessao": sessao, "resposta": resposta}, req.manter_conexao)
+            return req.manter_conexao
+
+        async def enviar(evento: str, dados: dict):
+            writer.write(f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n".encode())
+            await writer.drain()
+
+        cabecalho_enviado = False
+
+        async def enviar_com_cabecalho(evento: str, dados: dict):
+            nonlocal cabecalho_enviado
+            if not cabecalho_enviado:
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                    b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+                )
+                cabecalho_enviado = True
+            await enviar(evento, dados)
+
+        try:
+            await self.turno_streaming(sessao, texto, enviar_com_cabecalho)
+        except Rejeitada:
+            await self._responder(writer, 503, {"erro": "servidor ocupado"}, False, {"Retry-After": "1"})
+        except ConnectionError:
+            raise
+        except Exception:
+            # Já contado em `turno_streaming`. Depois do cabeçalho 200 do
+            # streaming, o erro só pode seguir como evento
+            if cabecalho_enviado:
+                await enviar("erro", {"erro": "erro interno"})
+            else:
+                await self._responder(writer, 500, {"erro": "erro interno"}, False)
+        return False
+
+    async def _tratar(self, req: Requisicao, writer) -> bool:
+        manter = req.manter_conexao
+        if req.caminho == "/saude" and req.metodo == "GET":
+            await self._responder(writer, 200, self.saude(), manter)
+            return manter
+        if req.caminho == "/sessoes" and req.metodo == "POST":
+            await self._responder(writer, 201, {"sessao": uuid.uuid4().hex}, manter)
+            return manter
+
+        rota = _ROTA_MENSAGENS.match(req.caminho) or _ROTA_SESSAO.match(req.caminho)
+        if not rota or not _ID_SESSAO.match(rota.group(1)):
+            await self._responder(writer, 404, {"erro": "rota não encontrada"}, manter)
+            return manter
+        sessao = rota.group(1)
+        if rota.re is _ROTA_MENSAGENS and req.metodo == "POST":
+            return await self._mensagem(req, writer, sessao)
+        if rota.re is _ROTA_SESSAO and req.metodo == "DELETE":
+            await self.agente.checkpointer.adelete_thread(sessao)
+            await self._responder(writer, 204, None, manter)
+            return manter
+        await self._responder(writer, 405, {"erro": "método não permitido"}, manter)
+        return manter
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão (várias requisições com keep-alive)."""
+        try:
+            while True:
+                try:
+                    req = await self._ler(reader)
+                except CorpoGrande:
+                    await self._responder(writer, 413, {"erro": f"corpo maior que {MAX_CORPO} bytes"}, False)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    break
+                if req is None or not await self._tratar(req, writer):
+                    break
+        except ConnectionError:
+            pass
+        except Exception:
+            self.contadores["erros"] += 1
+            try:
+                await self._responder(writer, 500, {"erro": "erro interno"}, False)
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    def saude(self) -> dict:
+        return {
+            "em_andamento": self.em_andamento,
+            "na_fila": self.na_fila,
+            "max_concorrentes": self.max_concorrentes,
+            "max_fila": self.max_fila,
+            "sessoes_ativas": len(self._sessoes),
+            **self.contadores,
+            "cache_produtos": chatbot.estatisticas_cache(),
+        }
+
+
+async def servir(servidor: ServidorChatbot, host: str, porta: int):
+    # Tools síncronas, nós síncronos e o checkpointer SQLite rodam no executor
+    # padrão; ele precisa acompanhar o número de turnos simultâneos
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=servidor.max_concorrentes + 4, thread_name_prefix="agente")
+    )
+    tcp = await asyncio.start_server(servidor.atender, host, porta, backlog=1024)
+    endereco = tcp.sockets[0].getsockname()
+    print(f"Servidor ouvindo em http://{endereco[0]}:{endereco[1]}", flush=True)
+    async with tcp:
+        await tcp.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP assíncrono do chatbot de produtos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8000, help="0 escolhe uma porta livre")
+    parser.add_argument("--max-concorrentes", type=int, default=64)
+    parser.add_argument("--max-fila", type=int, default=256)
+    parser.add_argument("--espera-maxima", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--banco", help="arquivo do banco de produtos (padrão: tarefa/produtos.db)")
+    parser.add_argument("--sessoes-db", default=chatbot.SESSOES_PATH, help="arquivo SQLite das sessões")
+    parser.add_argument("--sessoes-em-memoria", action="store_true", help="usa MemorySaver em vez do SQLite")
+    parser.add_argument("--modelo-falso", action="store_true", help="usa o ModeloFalso (sem rede)")
+    parser.add_argument("--latencia", type=float, default=0.5, help="latência do modelo falso (s)")
+    args = parser.parse_args()
+
+    if args.banco:
+        chatbot.configurar_banco(args.banco)
+    chatbot.inicializar_banco()
+
+    if args.sessoes_em_memoria:
+        checkpointer = MemorySaver()
+    else:
+        checkpointer = CheckpointerSQLite(args.sessoes_db, ttl_segundos=chatbot.SESSOES_TTL)
+    modelo = None
+    if args.modelo_falso:
+        modelo = ModeloFalso(roteiro=ROTEIRO_FALSO, latencia=args.latencia, variacao=0.2)
+
+    servidor = ServidorChatbot(
+        chatbot.criar_agente(checkpointer=checkpointer, modelo=modelo),
+        max_concorrentes=args.max_concorrentes,
+        max_fila=args.max_fila,
+        espera_maxima=args.espera_maxima,
+        timeout=args.timeout,
+    )
+    try:
+        asyncio.run(servir(servidor, args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\nEncerrando...")
+
+
+if __name__ == "__main__":
+    main()